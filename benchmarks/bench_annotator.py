@@ -0,0 +1,216 @@
+# coding=utf-8
+
+""" Benchmark of the synonym annotator
+
+Generates synthetic synonyms and texts mentioning some of them, builds an
+`Annotator` automaton over the synonyms, and prints the build and load
+durations as well as the annotation throughput against a scan of the texts
+for every synonym.
+
+Usage:
+    python -m benchmarks.bench_annotator --num-phrases 500000
+"""
+
+import os
+import re
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from mt_ingester.annotator import Annotator
+from mt_ingester.annotator import collect_phrases
+
+
+def generate_words(rng, num_words):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+
+    return sorted(
+        set(
+            "".join(rng.choice(letters) for _ in range(rng.randint(3, 12)))
+            for _ in range(num_words)
+        )
+    )
+
+
+def generate_groups(rng, words, num_phrases):
+    groups = []
+    for index in range(num_phrases):
+        phrase = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        groups.append(("D{:06d}".format(index // 5), [phrase]))
+
+    return groups
+
+
+def generate_texts(rng, words, groups, num_texts, num_words_text):
+    """ Generates texts mostly made of words absent from the synonyms with a
+        tenth of their words and one in twenty phrases drawn from them.
+    """
+
+    words_filler = generate_words(rng=rng, num_words=len(words) // 2)
+
+    texts = []
+    for _ in range(num_texts):
+        tokens = [
+            rng.choice(words if rng.random() < 0.1 else words_filler)
+            for _ in range(num_words_text)
+        ]
+        for _ in range(num_words_text // 20):
+            tokens.insert(
+                rng.randrange(len(tokens)), rng.choice(groups)[1][0]
+            )
+        texts.append(" ".join(tokens).capitalize() + ".")
+
+    return texts
+
+
+def scan(phrases, texts):
+    """ Annotates texts by scanning each of them for every phrase."""
+
+    annotations = []
+    for text in texts:
+        text_lower = text.lower()
+        annotations_text = []
+        for phrase, uis in phrases.items():
+            if phrase not in text_lower:
+                continue
+            pattern = r"\b{}\b".format(re.escape(phrase))
+            for match in re.finditer(pattern, text_lower):
+                annotations_text.append((match.start(), match.end(), uis))
+        annotations.append(annotations_text)
+
+    return annotations
+
+
+def timed(func, *args, **kwargs):
+    time_start = time.perf_counter()
+    result = func(*args, **kwargs)
+
+    return result, time.perf_counter() - time_start
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    words = generate_words(rng=rng, num_words=args.num_words)
+    groups = generate_groups(
+        rng=rng, words=words, num_phrases=args.num_phrases
+    )
+    texts = generate_texts(
+        rng=rng,
+        words=words,
+        groups=groups,
+        num_texts=args.num_texts,
+        num_words_text=args.num_words_text,
+    )
+    size = sum(len(text.encode("utf-8")) for text in texts) / 2.0 ** 20
+
+    dir_tmp = tempfile.mkdtemp()
+    filename_automaton = os.path.join(dir_tmp, "annotator.bin")
+    try:
+        phrases = collect_phrases(groups)
+        annotator, duration = timed(
+            Annotator.build,
+            filename_automaton=filename_automaton,
+            phrases=phrases,
+        )
+        annotator.close()
+        print(
+            "Built {} phrases in {:.2f} s, {:.1f} MB.".format(
+                len(phrases),
+                duration,
+                os.path.getsize(filename_automaton) / 2.0 ** 20,
+            )
+        )
+
+        annotator, duration = timed(Annotator, filename_automaton)
+        print("Loaded in {:.2f} ms.".format(duration * 1000))
+
+        annotations, duration = timed(annotator.annotate, texts)
+        msg = "Automaton: {:.2f} MB in {:.2f} s, {:.2f} MB/s, {} mentions."
+        print(
+            msg.format(
+                size,
+                duration,
+                size / duration,
+                sum(len(annotations_text) for annotations_text in annotations),
+            )
+        )
+
+        # Scan a sample of the texts as scanning them all would take hours.
+        texts_sample = texts[: args.num_texts_scan]
+        size_sample = sum(len(text.encode("utf-8")) for text in texts_sample)
+        annotations_scan, duration = timed(
+            scan,
+            phrases={
+                phrase: tuple(sorted(uis)) for phrase, uis in phrases.items()
+            },
+            texts=texts_sample,
+        )
+        print(
+            "Scan: {:.4f} MB/s over {} texts.".format(
+                size_sample / 2.0 ** 20 / duration, len(texts_sample)
+            )
+        )
+
+        # The scan finds every mention including overlapping ones.
+        annotations_sample = annotator.annotate(texts_sample, do_longest=False)
+        assert [sorted(a) for a in annotations_scan] == [
+            sorted(a) for a in annotations_sample
+        ]
+
+        annotator.close()
+    finally:
+        shutil.rmtree(dir_tmp)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Benchmark of the synonym annotator."
+    )
+    argument_parser.add_argument(
+        "--num-phrases",
+        dest="num_phrases",
+        help="Number of synthetic synonyms",
+        type=int,
+        default=500000,
+    )
+    argument_parser.add_argument(
+        "--num-words",
+        dest="num_words",
+        help="Number of distinct words the synonyms and texts are made of",
+        type=int,
+        default=100000,
+    )
+    argument_parser.add_argument(
+        "--num-texts",
+        dest="num_texts",
+        help="Number of synthetic texts",
+        type=int,
+        default=10000,
+    )
+    argument_parser.add_argument(
+        "--num-words-text",
+        dest="num_words_text",
+        help="Number of words per synthetic text",
+        type=int,
+        default=200,
+    )
+    argument_parser.add_argument(
+        "--num-texts-scan",
+        dest="num_texts_scan",
+        help="Number of texts annotated through the per-synonym scan",
+        type=int,
+        default=5,
+    )
+    argument_parser.add_argument(
+        "--seed",
+        dest="seed",
+        help="The random seed",
+        type=int,
+        default=0,
+    )
+
+    arguments = argument_parser.parse_args()
+
+    main(args=arguments)
@@ -0,0 +1,99 @@
+# coding=utf-8
+
+""" Memory and lookup benchmark of the packed CUI-DUI map
+
+Writes a synthetic MRSAT.RRF file, parses it into a dictionary as well as into
+the `CuiDuiMap` returned by `ParserUmlsSat`, asserts that both hold the same
+pairs, and prints their memory footprint, measured through `tracemalloc`, and
+the time taken to look every CUI up.
+
+Usage:
+    python -m benchmarks.bench_cui_map --num-lines 400000 --num-cuis 500000
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from mt_ingester.parsers import ParserUmlsSat
+from mt_ingester.cui_map import CuiDuiMap
+
+from benchmarks.synthetic import write_mrsat
+
+
+def measure(func):
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def time_lookups(map_cui_dui, cuis):
+    time_start = time.perf_counter()
+    for cui in cuis:
+        if cui in map_cui_dui:
+            map_cui_dui[cui]
+    return time.perf_counter() - time_start
+
+
+def main(args):
+    dir_tmp = tempfile.mkdtemp()
+    filename_mrsat = os.path.join(dir_tmp, "MRSAT.RRF")
+    write_mrsat(filename_mrsat, args.num_lines, args.num_cuis, ratio_mesh=1.0)
+
+    # Build both maps from the file so that their footprint includes the
+    # strings they hold.
+    map_dict, size_dict = measure(
+        lambda: dict(
+            ParserUmlsSat.iterate_pairs(filename_mrsat_rrf=filename_mrsat)
+        )
+    )
+    map_packed, size_packed = measure(
+        lambda: CuiDuiMap.from_pairs(
+            ParserUmlsSat.iterate_pairs(filename_mrsat_rrf=filename_mrsat)
+        )
+    )
+    assert dict(map_packed) == map_dict
+
+    cuis = list(map_dict)
+    duration_dict = time_lookups(map_dict, cuis)
+    duration_packed = time_lookups(map_packed, cuis)
+
+    print(
+        "{} pairs: dict {:6.1f} MB {:5.2f} s, "
+        "packed {:6.1f} MB {:5.2f} s".format(
+            len(map_dict),
+            size_dict / 2 ** 20,
+            duration_dict,
+            size_packed / 2 ** 20,
+            duration_packed,
+        )
+    )
+
+    os.remove(filename_mrsat)
+    os.rmdir(dir_tmp)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Memory and lookup benchmark of the packed CUI-DUI map."
+    )
+    argument_parser.add_argument(
+        "--num-lines",
+        dest="num_lines",
+        help="Number of lines in the synthetic MRSAT file",
+        type=int,
+        default=400000,
+    )
+    argument_parser.add_argument(
+        "--num-cuis",
+        dest="num_cuis",
+        help="Number of distinct CUIs in the synthetic file",
+        type=int,
+        default=500000,
+    )
+
+    main(args=argument_parser.parse_args())
@@ -0,0 +1,129 @@
+# coding=utf-8
+
+""" Scaling benchmark of the definition deduplication of `ParserUmlsDef`
+
+Writes synthetic MRDEF.RRF files with a growing number of distinct definitions
+per CUI and source, parses them with `ParserUmlsDef` as well as with the
+list-based deduplication it replaced, asserts that the results match, and
+prints the timings. The list-based deduplication scales quadratically with the
+number of definitions per CUI and source while `ParserUmlsDef` scales
+linearly.
+
+Usage:
+    python -m benchmarks.bench_definition_dedupe --num-cuis 10
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from mt_ingester.parsers import ParserUmlsSat
+from mt_ingester.parsers import ParserUmlsDef
+from mt_ingester.rrf import iterate_rrf_rows
+
+from benchmarks.synthetic import write_mrsat
+from benchmarks.synthetic import write_mrdef
+
+
+def parse_mrdef_list(filename_mrdef_rrf, map_cui_dui):
+    dui_definitions = {}
+    rows = iterate_rrf_rows(
+        filename_rrf=filename_mrdef_rrf,
+        columns=[
+            ParserUmlsDef.fieldnames_mrdef.index("CUI"),
+            ParserUmlsDef.fieldnames_mrdef.index("SAB"),
+            ParserUmlsDef.fieldnames_mrdef.index("DEF"),
+        ],
+        cuis=map_cui_dui,
+    )
+    for cui, source, definition in rows:
+        if not source or not definition:
+            continue
+        definitions = dui_definitions.setdefault(
+            map_cui_dui[cui], {}
+        ).setdefault(source, [])
+        if definition not in definitions:
+            definitions.append(definition)
+
+    return dui_definitions
+
+
+def timed(func, *args, **kwargs):
+    time_start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - time_start
+
+
+def main(args):
+    dir_tmp = tempfile.mkdtemp()
+    filename_mrsat = os.path.join(dir_tmp, "MRSAT.RRF")
+    filename_mrdef = os.path.join(dir_tmp, "MRDEF.RRF")
+
+    # Map every CUI to a descriptor so that all definitions are kept.
+    write_mrsat(
+        filename_mrsat, args.num_cuis * 10, args.num_cuis, ratio_mesh=1.0
+    )
+    map_cui_dui = ParserUmlsSat().parse(filename_mrsat_rrf=filename_mrsat)
+
+    for num_lines in args.num_lines:
+        # Make (nearly) every definition distinct.
+        write_mrdef(
+            filename_mrdef,
+            num_lines,
+            args.num_cuis,
+            num_definitions_per_cui=num_lines,
+        )
+
+        dui_definitions_list, duration_list = timed(
+            parse_mrdef_list, filename_mrdef, map_cui_dui
+        )
+        dui_definitions, duration = timed(
+            ParserUmlsDef().parse,
+            filename_mrdef_rrf=filename_mrdef,
+            filename_mrsat_rrf=filename_mrsat,
+        )
+        # Discount the parsing of MRSAT.RRF.
+        _, duration_mrsat = timed(
+            ParserUmlsSat().parse, filename_mrsat_rrf=filename_mrsat
+        )
+        duration -= duration_mrsat
+        assert dui_definitions_list == dui_definitions
+
+        print(
+            "MRDEF {:>9d} lines, {:>7d} definitions per CUI and source: "
+            "list {:8.2f} s, dict {:8.2f} s, x{:.1f}".format(
+                num_lines,
+                num_lines // (args.num_cuis * 6),
+                duration_list,
+                duration,
+                duration_list / duration,
+            )
+        )
+
+    for filename in [filename_mrsat, filename_mrdef]:
+        os.remove(filename)
+    os.rmdir(dir_tmp)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Scaling benchmark of the definition deduplication."
+    )
+    argument_parser.add_argument(
+        "--num-lines",
+        dest="num_lines",
+        help="Numbers of lines in the synthetic MRDEF files",
+        type=int,
+        nargs="+",
+        default=[12500, 25000, 50000, 100000],
+    )
+    argument_parser.add_argument(
+        "--num-cuis",
+        dest="num_cuis",
+        help="Number of distinct CUIs in the synthetic files",
+        type=int,
+        default=10,
+    )
+
+    main(args=argument_parser.parse_args())
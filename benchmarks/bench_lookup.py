@@ -0,0 +1,166 @@
+# coding=utf-8
+
+""" Benchmark of the MeSH lookup file
+
+Writes synthetic MeSH descriptor, qualifier, and supplemental XML files,
+exports their records into a `MeshLookup` file and into a pickled dictionary,
+and prints the durations of opening either and of looking up random UIs,
+asserting that the results match.
+
+Usage:
+    python -m benchmarks.bench_lookup --num-descriptors 30000
+"""
+
+import os
+import time
+import pickle
+import random
+import shutil
+import argparse
+import tempfile
+import itertools
+
+from mt_ingester.lookup import MeshLookup
+from mt_ingester.lookup import get_lookup_record
+from mt_ingester.parsers import ParserXmlMeshDescriptors
+from mt_ingester.parsers import ParserXmlMeshQualifiers
+from mt_ingester.parsers import ParserXmlMeshSupplementals
+
+from benchmarks.synthetic_mesh import write_desc
+from benchmarks.synthetic_mesh import write_qual
+from benchmarks.synthetic_mesh import write_supp
+
+
+def timed(func, *args, **kwargs):
+    time_start = time.perf_counter()
+    result = func(*args, **kwargs)
+
+    return result, time.perf_counter() - time_start
+
+
+def load_pickle(filename):
+    with open(filename, "rb") as finp:
+        return pickle.load(finp)
+
+
+def main(args):
+    dir_tmp = tempfile.mkdtemp()
+    filename_desc = os.path.join(dir_tmp, "desc.xml")
+    filename_qual = os.path.join(dir_tmp, "qual.xml")
+    filename_supp = os.path.join(dir_tmp, "supp.xml")
+    filename_lookup = os.path.join(dir_tmp, "lookup.bin")
+    filename_pickle = os.path.join(dir_tmp, "lookup.pkl")
+    try:
+        write_desc(
+            filename=filename_desc,
+            num_descriptors=args.num_descriptors,
+            seed=args.seed,
+        )
+        write_qual(filename=filename_qual, seed=args.seed)
+        write_supp(
+            filename=filename_supp,
+            num_supplementals=args.num_supplementals,
+            num_descriptors=args.num_descriptors,
+            seed=args.seed,
+        )
+
+        docs = itertools.chain(
+            ParserXmlMeshDescriptors().parse(filename_xml=filename_desc),
+            ParserXmlMeshQualifiers().parse(filename_xml=filename_qual),
+            ParserXmlMeshSupplementals().parse(filename_xml=filename_supp),
+        )
+        records = [get_lookup_record(doc) for doc in docs]
+
+        lookup, duration = timed(
+            MeshLookup.build, filename_lookup=filename_lookup, records=records
+        )
+        lookup.close()
+        print(
+            "Built {} records in {:.2f} s, {:.1f} MB.".format(
+                len(records),
+                duration,
+                os.path.getsize(filename_lookup) / 2.0 ** 20,
+            )
+        )
+
+        with open(filename_pickle, "wb") as fout:
+            pickle.dump(
+                {
+                    ui: {
+                        "name": name,
+                        "tree_numbers": tree_numbers,
+                        "synonyms": synonyms,
+                    }
+                    for ui, name, tree_numbers, synonyms in records
+                },
+                fout,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+        rng = random.Random(args.seed)
+        queries = [rng.choice(records)[0] for _ in range(args.num_queries)]
+
+        lookup, duration_lookup = timed(MeshLookup, filename_lookup)
+        entries, duration_pickle = timed(load_pickle, filename_pickle)
+        print(
+            "Opened in {:.3f} ms against {:.1f} ms for the pickle.".format(
+                duration_lookup * 1000, duration_pickle * 1000
+            )
+        )
+
+        results_lookup, duration_lookup = timed(
+            lambda: [lookup[ui] for ui in queries]
+        )
+        results_pickle, duration_pickle = timed(
+            lambda: [entries[ui] for ui in queries]
+        )
+        assert results_lookup == results_pickle
+        print(
+            "Lookups: {:.2f} us/query against {:.2f} us/query for the "
+            "pickle.".format(
+                duration_lookup * 1e6 / len(queries),
+                duration_pickle * 1e6 / len(queries),
+            )
+        )
+
+        lookup.close()
+    finally:
+        shutil.rmtree(dir_tmp)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Benchmark of the MeSH lookup file."
+    )
+    argument_parser.add_argument(
+        "--num-descriptors",
+        dest="num_descriptors",
+        help="Number of synthetic descriptors",
+        type=int,
+        default=30000,
+    )
+    argument_parser.add_argument(
+        "--num-supplementals",
+        dest="num_supplementals",
+        help="Number of synthetic supplementals",
+        type=int,
+        default=100000,
+    )
+    argument_parser.add_argument(
+        "--num-queries",
+        dest="num_queries",
+        help="Number of UI lookups",
+        type=int,
+        default=100000,
+    )
+    argument_parser.add_argument(
+        "--seed",
+        dest="seed",
+        help="The random seed",
+        type=int,
+        default=0,
+    )
+
+    arguments = argument_parser.parse_args()
+
+    main(args=arguments)
@@ -0,0 +1,210 @@
+# coding=utf-8
+
+""" Benchmark of the byte-level RRF reader against `csv.DictReader`
+
+Writes synthetic MRSAT.RRF, MRCONSO.RRF, and MRDEF.RRF files, parses them with
+the UMLS parsers as well as with the `csv.DictReader` based implementation they
+replaced, asserts that the results match, and prints the timings.
+
+Usage:
+    python -m benchmarks.bench_rrf_reader --num-lines 5000000
+"""
+
+import os
+import csv
+import sys
+import time
+import argparse
+import tempfile
+
+from mt_ingester.parsers import ParserUmlsSat
+from mt_ingester.parsers import ParserUmlsConso
+from mt_ingester.parsers import ParserUmlsDef
+
+from benchmarks.synthetic import write_mrsat
+from benchmarks.synthetic import write_mrconso
+from benchmarks.synthetic import write_mrdef
+
+
+csv.field_size_limit(sys.maxsize)
+
+
+def parse_mrsat_csv(filename_mrsat_rrf):
+    map_cui_dui = {}
+    with open(filename_mrsat_rrf, "r") as finp:
+        reader = csv.DictReader(
+            finp, fieldnames=ParserUmlsSat.fieldnames_mrsat, delimiter="|"
+        )
+        for entry in reader:
+            if not entry.get("ATN") in ("MESH_DUI", "TERMUI"):
+                continue
+            if not entry.get("CUI") or not entry.get("ATV"):
+                continue
+            if entry["ATN"] == "TERMUI":
+                if not entry["CODE"] or not entry["CODE"].startswith("D"):
+                    continue
+                dui = entry["CODE"]
+            else:
+                if not entry["ATV"] or not entry["ATV"].startswith("D"):
+                    continue
+                dui = entry["ATV"]
+            map_cui_dui[entry["CUI"]] = dui
+
+    return map_cui_dui
+
+
+def parse_mrconso_csv(filename_mrconso_rrf, map_cui_dui):
+    dui_synonyms = {}
+    with open(filename_mrconso_rrf, "r") as finp:
+        reader = csv.DictReader(
+            finp,
+            fieldnames=ParserUmlsConso.fieldnames_mrconso,
+            delimiter="|",
+        )
+        for entry in reader:
+            if not entry.get("SDUI"):
+                continue
+            if entry["CUI"] not in map_cui_dui.keys():
+                continue
+            if entry.get("LAT") != "ENG":
+                continue
+            dui = map_cui_dui[entry["CUI"]]
+            dui_synonyms.setdefault(dui, []).append(entry["STR"])
+
+    for dui, synonyms in dui_synonyms.items():
+        dui_synonyms[dui] = [synonym.lower() for synonym in synonyms]
+    for dui, synonyms in dui_synonyms.items():
+        dui_synonyms[dui] = list(set(synonyms))
+
+    return dui_synonyms
+
+
+def parse_mrdef_csv(filename_mrdef_rrf, map_cui_dui):
+    dui_definitions = {}
+    with open(filename_mrdef_rrf, "r") as finp:
+        reader = csv.DictReader(
+            finp, fieldnames=ParserUmlsDef.fieldnames_mrdef, delimiter="|"
+        )
+        for entry in reader:
+            if entry.get("CUI") not in map_cui_dui.keys():
+                continue
+            if not entry.get("SAB") or not entry.get("DEF"):
+                continue
+            definitions = dui_definitions.setdefault(
+                map_cui_dui[entry["CUI"]], {}
+            ).setdefault(entry["SAB"], [])
+            if entry["DEF"] not in definitions:
+                definitions.append(entry["DEF"])
+
+    return dui_definitions
+
+
+def normalize(document):
+    """ Sorts the lists of a parsed document so they can be compared."""
+
+    if isinstance(document, dict):
+        return {key: normalize(value) for key, value in document.items()}
+    elif isinstance(document, list):
+        return sorted(document)
+
+    return document
+
+
+def timed(func, *args, **kwargs):
+    time_start = time.perf_counter()
+    result = func(*args, **kwargs)
+
+    return result, time.perf_counter() - time_start
+
+
+def main(args):
+    dir_tmp = tempfile.mkdtemp()
+    filename_mrsat = os.path.join(dir_tmp, "MRSAT.RRF")
+    filename_mrconso = os.path.join(dir_tmp, "MRCONSO.RRF")
+    filename_mrdef = os.path.join(dir_tmp, "MRDEF.RRF")
+
+    write_mrsat(filename_mrsat, args.num_lines, args.num_cuis)
+    write_mrconso(filename_mrconso, args.num_lines, args.num_cuis)
+    write_mrdef(filename_mrdef, args.num_lines // 10, args.num_cuis)
+
+    map_cui_dui_csv, duration_csv = timed(parse_mrsat_csv, filename_mrsat)
+    map_cui_dui, duration_mrsat = timed(
+        ParserUmlsSat(num_workers=args.num_workers).parse,
+        filename_mrsat_rrf=filename_mrsat,
+    )
+    duration = duration_mrsat
+    assert map_cui_dui_csv == dict(map_cui_dui)
+    print(
+        "MRSAT   {:>10d} lines: csv {:8.2f} s, rrf {:8.2f} s, x{:.1f}".format(
+            args.num_lines, duration_csv, duration, duration_csv / duration
+        )
+    )
+
+    # The parsers also parse MRSAT.RRF so its duration is subtracted.
+    dui_synonyms_csv, duration_csv = timed(
+        parse_mrconso_csv, filename_mrconso, map_cui_dui_csv
+    )
+    dui_synonyms, duration = timed(
+        ParserUmlsConso(num_workers=args.num_workers).parse,
+        filename_mrsat_rrf=filename_mrsat,
+        filename_mrconso_rrf=filename_mrconso,
+    )
+    duration -= duration_mrsat
+    assert normalize(dui_synonyms_csv) == normalize(dict(dui_synonyms))
+    print(
+        "MRCONSO {:>10d} lines: csv {:8.2f} s, rrf {:8.2f} s, x{:.1f}".format(
+            args.num_lines, duration_csv, duration, duration_csv / duration
+        )
+    )
+
+    dui_definitions_csv, duration_csv = timed(
+        parse_mrdef_csv, filename_mrdef, map_cui_dui_csv
+    )
+    dui_definitions, duration = timed(
+        ParserUmlsDef(num_workers=args.num_workers).parse,
+        filename_mrdef_rrf=filename_mrdef,
+        filename_mrsat_rrf=filename_mrsat,
+    )
+    duration -= duration_mrsat
+    assert normalize(dui_definitions_csv) == normalize(dict(dui_definitions))
+    print(
+        "MRDEF   {:>10d} lines: csv {:8.2f} s, rrf {:8.2f} s, x{:.1f}".format(
+            args.num_lines // 10,
+            duration_csv,
+            duration,
+            duration_csv / duration,
+        )
+    )
+
+    for filename in [filename_mrsat, filename_mrconso, filename_mrdef]:
+        os.remove(filename)
+    os.rmdir(dir_tmp)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Benchmark of the byte-level RRF reader."
+    )
+    argument_parser.add_argument(
+        "--num-lines",
+        dest="num_lines",
+        help="Number of lines in the synthetic MRSAT/MRCONSO files",
+        type=int,
+        default=2000000,
+    )
+    argument_parser.add_argument(
+        "--num-cuis",
+        dest="num_cuis",
+        help="Number of distinct CUIs in the synthetic files",
+        type=int,
+        default=300000,
+    )
+    argument_parser.add_argument(
+        "--num-workers",
+        dest="num_workers",
+        help="Number of processes the RRF files are parsed in",
+        type=int,
+        default=1,
+    )
+
+    main(args=argument_parser.parse_args())
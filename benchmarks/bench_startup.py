@@ -0,0 +1,120 @@
+# coding=utf-8
+
+""" Benchmark of the cold startup of the `mt_ingester` entry points
+
+Runs each entry point, or the imports a given mode needs, in a fresh
+interpreter a number of times, and prints the median wall-clock duration as
+well as which of the heavy dependencies were imported.
+
+Usage:
+    python -m benchmarks.bench_startup --num-runs 10
+"""
+
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+
+# The heavy dependencies whose import is reported.
+MODULES_HEAVY = ["lxml", "sqlalchemy", "pyarrow", "fform"]
+
+# The startup cases as pairs of names and Python statements.
+CASES = [
+    ("python", "pass"),
+    ("import mt_ingester", "import mt_ingester"),
+    ("import mt_ingester.mt_ingester", "import mt_ingester.mt_ingester"),
+    (
+        "mode synonyms",
+        "from mt_ingester.parsers import ParserUmlsConso",
+    ),
+    (
+        "mode definitions",
+        "from mt_ingester.parsers import ParserUmlsDef",
+    ),
+    (
+        "mode descriptors",
+        "from mt_ingester.parsers import ParserXmlMeshDescriptors",
+    ),
+]
+
+# Appended to each statement to report the heavy dependencies imported.
+STATEMENT_REPORT = (
+    "; import sys; "
+    "print(','.join(m for m in {!r} if m in sys.modules))"
+).format(MODULES_HEAVY)
+
+
+def run(statement):
+    """ Runs a statement in a fresh interpreter.
+
+    Returns:
+        tuple[float, list[str]]: The duration in seconds and the heavy
+            dependencies imported.
+    """
+
+    start = time.perf_counter()
+    output = subprocess.check_output(
+        [sys.executable, "-c", statement + STATEMENT_REPORT],
+        universal_newlines=True,
+    )
+    duration = time.perf_counter() - start
+
+    modules = [module for module in output.strip().split(",") if module]
+
+    return duration, modules
+
+
+def run_help(num_runs):
+    durations = []
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        subprocess.check_call(
+            [sys.executable, "-m", "mt_ingester.mt_ingester", "--help"],
+            stdout=subprocess.DEVNULL,
+        )
+        durations.append(time.perf_counter() - start)
+
+    return statistics.median(durations)
+
+
+def main(args):
+    print("{:<36s} {:>10s}  {}".format("case", "median ms", "heavy imports"))
+
+    for name, statement in CASES:
+        durations = []
+        modules = []
+        for _ in range(args.num_runs):
+            duration, modules = run(statement=statement)
+            durations.append(duration)
+        print(
+            "{:<36s} {:10.1f}  {}".format(
+                name,
+                statistics.median(durations) * 1000,
+                ", ".join(modules) or "-",
+            )
+        )
+
+    print(
+        "{:<36s} {:10.1f}".format(
+            "mt_ingester --help", run_help(num_runs=args.num_runs) * 1000
+        )
+    )
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Benchmark of the entry point cold startup."
+    )
+    argument_parser.add_argument(
+        "--num-runs",
+        dest="num_runs",
+        help="Number of runs per case of which the median is reported",
+        type=int,
+        default=10,
+    )
+
+    arguments = argument_parser.parse_args()
+
+    main(args=arguments)
@@ -0,0 +1,113 @@
+# coding=utf-8
+
+""" Benchmark of tree-number subtree and ancestor queries
+
+Builds the tree numbers of a synthetic MeSH tree, answers subtree and ancestor
+queries for random tree numbers through string-prefix matching over the tree
+numbers and through a `TreeNumberIndex` over their encoded keys, asserts that
+the results match, and prints the timings.
+
+Usage:
+    python -m benchmarks.bench_tree_numbers --num-tree-numbers 60000
+"""
+
+import time
+import random
+import argparse
+
+from mt_ingester.tree_numbers import TreeNumberIndex
+
+from benchmarks.synthetic_mesh import get_tree_number
+
+
+def get_subtree_prefix(tree_numbers, tree_number):
+    prefix = tree_number + "."
+
+    return sorted(
+        candidate
+        for candidate in tree_numbers
+        if candidate == tree_number or candidate.startswith(prefix)
+    )
+
+
+def get_ancestors_prefix(tree_numbers, tree_number):
+    return sorted(
+        candidate
+        for candidate in tree_numbers
+        if tree_number.startswith(candidate + ".")
+    )
+
+
+def timed(func, *args, **kwargs):
+    time_start = time.perf_counter()
+    result = func(*args, **kwargs)
+
+    return result, time.perf_counter() - time_start
+
+
+def main(args):
+    tree_numbers = [
+        get_tree_number(node) for node in range(args.num_tree_numbers)
+    ]
+
+    rng = random.Random(args.seed)
+    queries = [rng.choice(tree_numbers) for _ in range(args.num_queries)]
+
+    index, duration = timed(TreeNumberIndex, tree_numbers)
+    print(
+        "Indexed {} tree numbers in {:.3f} s, {} queries each.".format(
+            len(index), duration, len(queries)
+        )
+    )
+
+    for name, func_prefix, func_index in [
+        ("subtree", get_subtree_prefix, index.get_subtree),
+        ("ancestors", get_ancestors_prefix, index.get_ancestors),
+    ]:
+        results_prefix, duration_prefix = timed(
+            lambda: [func_prefix(tree_numbers, query) for query in queries]
+        )
+        results_index, duration_index = timed(
+            lambda: [func_index(query) for query in queries]
+        )
+        assert results_prefix == results_index
+        print(
+            "{:<9s}: prefix {:8.3f} ms/query, index {:8.4f} ms/query, "
+            "x{:.0f}".format(
+                name,
+                duration_prefix * 1000 / len(queries),
+                duration_index * 1000 / len(queries),
+                duration_prefix / duration_index,
+            )
+        )
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Benchmark of tree-number subtree and ancestor queries."
+    )
+    argument_parser.add_argument(
+        "--num-tree-numbers",
+        dest="num_tree_numbers",
+        help="Number of tree numbers in the synthetic MeSH tree",
+        type=int,
+        default=60000,
+    )
+    argument_parser.add_argument(
+        "--num-queries",
+        dest="num_queries",
+        help="Number of subtree and ancestor queries",
+        type=int,
+        default=200,
+    )
+    argument_parser.add_argument(
+        "--seed",
+        dest="seed",
+        help="The random seed",
+        type=int,
+        default=0,
+    )
+
+    arguments = argument_parser.parse_args()
+
+    main(args=arguments)
@@ -0,0 +1,282 @@
+# coding=utf-8
+
+""" Regression gate comparing benchmark results against a baseline
+
+Loads two JSON files written by `benchmarks.suite`, compares the throughput,
+peak RSS, and DAL calls per record of every benchmark they share, prints a
+table of the changes, and exits with a non-zero status when any benchmark
+regressed beyond its thresholds so that the comparison can guard merges.
+
+Single timings are noisy so a benchmark's throughput only regresses when the
+best of the current repeats falls below the worst of the baseline repeats by
+more than its threshold, i.e., when the spreads of the two runs don't overlap
+within it. Results of a single repeat are compared value against value.
+
+Thresholds are relative, e.g., `0.1` allows a 10% throughput drop, and may be
+overridden per benchmark through a JSON file such as:
+
+    {
+        "default": {"throughput_drop": 0.1},
+        "benchmarks": {
+            "parse_mrsat": {"throughput_drop": 0.25, "memory_increase": 0.2}
+        }
+    }
+
+DAL calls are deterministic for a given input so by default any additional
+call, as well as any call to a DAL method a benchmark didn't previously make,
+is a regression.
+
+Usage:
+    python -m benchmarks.compare baseline.json results.json \
+        --thresholds thresholds.json
+"""
+
+import sys
+import argparse
+from typing import Dict, List, Optional
+
+import ujson
+
+
+# The compared metrics keyed on their threshold name along with whether a
+# decrease rather than an increase is a regression.
+METRICS = [
+    ("throughput_drop", "records_per_sec", True),
+    ("memory_increase", "peak_rss_mb", False),
+    ("dal_calls_increase", "dal_calls_per_record", False),
+]
+
+THRESHOLDS_DEFAULT = {
+    "throughput_drop": 0.1,
+    "memory_increase": 0.1,
+    "dal_calls_increase": 0.0,
+}
+
+
+def load_results(filename: str) -> dict:
+    """ Loads a JSON file written by `benchmarks.suite`."""
+
+    with open(filename) as fin:
+        return ujson.load(fin)
+
+
+def get_thresholds(config: Optional[dict], name: str) -> Dict[str, float]:
+    """ Retrieves the thresholds of a benchmark.
+
+    Args:
+        config (Optional[dict]): The threshold configuration with optional
+            `default` and per-benchmark `benchmarks` overrides.
+        name (str): The benchmark name.
+
+    Returns:
+        Dict[str, float]: The thresholds keyed on their name.
+    """
+
+    thresholds = dict(THRESHOLDS_DEFAULT)
+    if config:
+        thresholds.update(config.get("default", {}))
+        thresholds.update(config.get("benchmarks", {}).get(name, {}))
+
+    return thresholds
+
+
+def get_change(value_baseline: float, value_current: float) -> float:
+    """ Computes the relative change of a metric."""
+
+    if value_baseline:
+        return (value_current - value_baseline) / value_baseline
+
+    # A metric going from nothing to something, e.g., the first DAL call of a
+    # benchmark, is an unbounded increase.
+    return float("inf") if value_current else 0.0
+
+
+def compare_results(
+    results_baseline: dict,
+    results_current: dict,
+    config: Optional[dict] = None,
+) -> List[dict]:
+    """ Compares the metrics of the benchmarks of two runs.
+
+    Args:
+        results_baseline (dict): The baseline run.
+        results_current (dict): The current run.
+        config (Optional[dict]): The threshold configuration. Defaults to
+            `None` in which case `THRESHOLDS_DEFAULT` applies.
+
+    Notes:
+        Metrics recorded along with the `<metric>_best` and `<metric>_worst`
+        of their repeats, i.e., the throughput, regress when the relative
+        change from the worst of the baseline to the best of the current run,
+        reported as `change_bounds`, exceeds the threshold. Other metrics
+        regress when the change of their values does.
+
+    Returns:
+        List[dict]: A row per benchmark and metric with the `baseline` and
+            `current` values, their relative `change`, the `change_bounds`,
+            the `threshold`, and whether the benchmark `regressed`.
+    """
+
+    rows = []
+    benchmarks_baseline = results_baseline["results"]
+    benchmarks_current = results_current["results"]
+    for name, result_baseline in benchmarks_baseline.items():
+        result_current = benchmarks_current.get(name)
+        if result_current is None:
+            continue
+
+        thresholds = get_thresholds(config=config, name=name)
+        for name_threshold, metric, is_decrease in METRICS:
+            value_baseline = result_baseline.get(metric, 0.0)
+            value_current = result_current.get(metric, 0.0)
+            change = get_change(value_baseline, value_current)
+            change_bounds = get_change(
+                result_baseline.get(metric + "_worst", value_baseline),
+                result_current.get(metric + "_best", value_current),
+            )
+            threshold = thresholds[name_threshold]
+            regressed = (
+                -change_bounds if is_decrease else change_bounds
+            ) > threshold
+
+            rows.append(
+                {
+                    "benchmark": name,
+                    "metric": metric,
+                    "baseline": value_baseline,
+                    "current": value_current,
+                    "change": change,
+                    "change_bounds": change_bounds,
+                    "threshold": threshold,
+                    "regressed": regressed,
+                }
+            )
+
+    return rows
+
+
+def get_new_dal_methods(
+    results_baseline: dict, results_current: dict
+) -> Dict[str, List[str]]:
+    """ Retrieves the DAL methods called by a benchmark of the current run but
+        not by the baseline one.
+
+    Returns:
+        Dict[str, List[str]]: The `method:record_type` keys of the new calls
+            keyed on the benchmark name.
+    """
+
+    new_dal_methods = {}
+    benchmarks_current = results_current["results"]
+    for name, result_baseline in results_baseline["results"].items():
+        if name not in benchmarks_current:
+            continue
+
+        methods_baseline = set(result_baseline.get("dal_methods", {}))
+        methods_current = set(benchmarks_current[name].get("dal_methods", {}))
+        methods_new = sorted(methods_current - methods_baseline)
+        if methods_new:
+            new_dal_methods[name] = methods_new
+
+    return new_dal_methods
+
+
+def format_table(rows: List[dict]) -> str:
+    """ Formats the compared metrics as a table."""
+
+    template = "{:<28} {:<22} {:>14} {:>14} {:>9} {:>10} {:>9}  {}"
+    lines = [
+        template.format(
+            "benchmark",
+            "metric",
+            "baseline",
+            "current",
+            "change",
+            "worst/best",
+            "limit",
+            "",
+        )
+    ]
+    for row in rows:
+        lines.append(
+            template.format(
+                row["benchmark"],
+                row["metric"],
+                "{:.2f}".format(row["baseline"]),
+                "{:.2f}".format(row["current"]),
+                "{:+.1%}".format(row["change"]),
+                "{:+.1%}".format(row["change_bounds"]),
+                "{:.1%}".format(row["threshold"]),
+                "REGRESSED" if row["regressed"] else "",
+            )
+        )
+
+    return "\n".join(lines)
+
+
+def main(args) -> int:
+    results_baseline = load_results(filename=args.baseline)
+    results_current = load_results(filename=args.current)
+    config = load_results(args.thresholds) if args.thresholds else None
+
+    records_baseline = results_baseline["metadata"].get("records")
+    records_current = results_current["metadata"].get("records")
+    if records_baseline != records_current:
+        print(
+            "WARNING: The runs were made on inputs of different sizes: "
+            "{} and {}.".format(records_baseline, records_current)
+        )
+
+    names_missing = sorted(
+        set(results_baseline["results"]) - set(results_current["results"])
+    )
+    if names_missing:
+        print(
+            "WARNING: Benchmarks missing from the current run: {}.".format(
+                ", ".join(names_missing)
+            )
+        )
+
+    rows = compare_results(
+        results_baseline=results_baseline,
+        results_current=results_current,
+        config=config,
+    )
+    print(format_table(rows=rows))
+
+    new_dal_methods = get_new_dal_methods(
+        results_baseline=results_baseline, results_current=results_current
+    )
+    for name, methods in new_dal_methods.items():
+        print("New DAL calls in {}: {}.".format(name, ", ".join(methods)))
+
+    # A new kind of DAL call is a regression even when it replaces another.
+    names_regressed = sorted(
+        set([row["benchmark"] for row in rows if row["regressed"]])
+        | set(new_dal_methods)
+    )
+    if names_regressed:
+        print("Regressed benchmarks: {}.".format(", ".join(names_regressed)))
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Compares benchmark results against a baseline."
+    )
+    argument_parser.add_argument(
+        "baseline", help="JSON results of the baseline run"
+    )
+    argument_parser.add_argument(
+        "current", help="JSON results of the current run"
+    )
+    argument_parser.add_argument(
+        "--thresholds",
+        dest="thresholds",
+        help="JSON file of the default and per-benchmark thresholds",
+        required=False,
+    )
+
+    sys.exit(main(args=argument_parser.parse_args()))
@@ -0,0 +1,643 @@
+# coding=utf-8
+
+""" Benchmark suite of the parsers and ingesters
+
+Writes synthetic MeSH XML and UMLS RRF files scaled to a number of
+descriptors, runs every parser and ingester over them, and records their
+throughput in records/sec, their peak RSS, and the number of DAL calls they
+make. Each benchmark runs in a fresh process so that its peak RSS isn't
+inflated by earlier ones. The suite is repeated a number of times and the
+median throughput of each benchmark is recorded along with its best, its
+worst, and its spread. The results are written to a JSON file which can be
+compared against a baseline through `benchmarks.compare`.
+
+The ingesters run against the database of the configuration file, e.g., the
+local database the tests use, whose MeSH schema is dropped and recreated
+before each repeat. They therefore refuse to run unless `--allow-drop`
+confirms that the database is a throwaway one, while `--skip-ingesters` only
+runs the parsers. They run in the order of `ingest.sh` as later ones rely on
+the records created by earlier ones and their timings include parsing their
+input.
+
+Usage:
+    python -m benchmarks.suite --num-descriptors 5000 --repeats 5 \
+        --output results.json --allow-drop \
+        --config-file /etc/mt-ingester/mt-ingester-test.json
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+import ujson
+
+from mt_ingester.parsers import ParserXmlMeshDescriptors
+from mt_ingester.parsers import ParserXmlMeshQualifiers
+from mt_ingester.parsers import ParserXmlMeshSupplementals
+from mt_ingester.parsers import ParserUmlsSat
+from mt_ingester.parsers import ParserUmlsConso
+from mt_ingester.parsers import ParserUmlsDef
+
+from benchmarks.synthetic import write_mrsat
+from benchmarks.synthetic import write_mrconso
+from benchmarks.synthetic import write_mrdef
+from benchmarks.synthetic_mesh import write_desc
+from benchmarks.synthetic_mesh import write_qual
+from benchmarks.synthetic_mesh import write_supp
+
+
+# The number of lines per CUI of the synthetic RRF files, roughly those of a
+# full UMLS release, where the synthetic DUIs cover three CUIs each.
+LINES_PER_CUI = {"mrsat": 15, "mrconso": 4, "mrdef": 1}
+CUIS_PER_DESCRIPTOR = 3
+
+
+def generate_inputs(
+    dirname: str,
+    num_descriptors: int,
+    num_qualifiers: int,
+    ratio_supplementals: float,
+    seed: int,
+) -> dict:
+    """ Writes the synthetic input files.
+
+    Args:
+        dirname (str): The directory the files are written under.
+        num_descriptors (int): The number of descriptors.
+        num_qualifiers (int): The number of qualifiers.
+        ratio_supplementals (float): The number of supplementals per
+            descriptor.
+        seed (int): The random seed.
+
+    Returns:
+        dict: The paths of the files keyed on their type and the number of
+            records they hold under `records`.
+    """
+
+    num_supplementals = int(round(num_descriptors * ratio_supplementals))
+    num_cuis = num_descriptors * CUIS_PER_DESCRIPTOR
+
+    inputs = {
+        "qual": os.path.join(dirname, "qual.xml"),
+        "desc": os.path.join(dirname, "desc.xml"),
+        "supp": os.path.join(dirname, "supp.xml"),
+        "mrsat": os.path.join(dirname, "MRSAT.RRF"),
+        "mrconso": os.path.join(dirname, "MRCONSO.RRF"),
+        "mrdef": os.path.join(dirname, "MRDEF.RRF"),
+        "records": {
+            "qual": num_qualifiers,
+            "desc": num_descriptors,
+            "supp": num_supplementals,
+        },
+    }
+    for name, lines_per_cui in LINES_PER_CUI.items():
+        inputs["records"][name] = num_cuis * lines_per_cui
+
+    write_qual(inputs["qual"], num_qualifiers=num_qualifiers, seed=seed)
+    write_desc(
+        inputs["desc"],
+        num_descriptors=num_descriptors,
+        num_qualifiers=num_qualifiers,
+        seed=seed,
+    )
+    write_supp(
+        inputs["supp"],
+        num_supplementals=num_supplementals,
+        num_descriptors=num_descriptors,
+        num_qualifiers=num_qualifiers,
+        seed=seed,
+    )
+    write_mrsat(
+        inputs["mrsat"], inputs["records"]["mrsat"], num_cuis, seed=seed
+    )
+    write_mrconso(
+        inputs["mrconso"], inputs["records"]["mrconso"], num_cuis, seed=seed
+    )
+    write_mrdef(
+        inputs["mrdef"],
+        inputs["records"]["mrdef"],
+        num_cuis,
+        num_definitions_per_cui=2,
+        seed=seed,
+    )
+
+    return inputs
+
+
+def _count(iterable) -> int:
+    return sum(1 for _ in iterable)
+
+
+def _ingest_xml(parser, ingester, filename_xml: str) -> int:
+    num_records = 0
+    for doc in parser.parse(filename_xml=filename_xml):
+        ingester.ingest(doc=doc)
+        num_records += 1
+
+    return num_records
+
+
+def bench_parse_qualifiers(inputs: dict, dal) -> int:
+    return _count(ParserXmlMeshQualifiers().parse(filename_xml=inputs["qual"]))
+
+
+def bench_parse_descriptors(inputs: dict, dal) -> int:
+    return _count(
+        ParserXmlMeshDescriptors().parse(filename_xml=inputs["desc"])
+    )
+
+
+def bench_parse_supplementals(inputs: dict, dal) -> int:
+    return _count(
+        ParserXmlMeshSupplementals().parse(filename_xml=inputs["supp"])
+    )
+
+
+def bench_parse_mrsat(inputs: dict, dal) -> int:
+    ParserUmlsSat().parse(filename_mrsat_rrf=inputs["mrsat"])
+
+    return inputs["records"]["mrsat"]
+
+
+def bench_parse_mrconso(inputs: dict, dal) -> int:
+    parser = ParserUmlsConso()
+    _count(
+        parser.iterate_groups(
+            filename_mrsat_rrf=inputs["mrsat"],
+            filename_mrconso_rrf=inputs["mrconso"],
+        )
+    )
+
+    return parser.filter_stats["lines"]
+
+
+def bench_parse_mrdef(inputs: dict, dal) -> int:
+    parser = ParserUmlsDef()
+    parser.parse(
+        filename_mrdef_rrf=inputs["mrdef"], filename_mrsat_rrf=inputs["mrsat"]
+    )
+
+    return parser.filter_stats["lines"]
+
+
+def bench_ingest_qualifiers(inputs: dict, dal, do_ingest_links=False) -> int:
+    from mt_ingester.ingesters import IngesterDocumentQualifier
+
+    return _ingest_xml(
+        parser=ParserXmlMeshQualifiers(),
+        ingester=IngesterDocumentQualifier(
+            dal=dal, do_ingest_links=do_ingest_links
+        ),
+        filename_xml=inputs["qual"],
+    )
+
+
+def bench_ingest_descriptors(inputs: dict, dal, do_ingest_links=False) -> int:
+    from mt_ingester.ingesters import IngesterDocumentDescriptor
+
+    return _ingest_xml(
+        parser=ParserXmlMeshDescriptors(),
+        ingester=IngesterDocumentDescriptor(
+            dal=dal, do_ingest_links=do_ingest_links
+        ),
+        filename_xml=inputs["desc"],
+    )
+
+
+def bench_ingest_supplementals(
+    inputs: dict, dal, do_ingest_links=False
+) -> int:
+    from mt_ingester.ingesters import IngesterDocumentSupplemental
+
+    return _ingest_xml(
+        parser=ParserXmlMeshSupplementals(),
+        ingester=IngesterDocumentSupplemental(
+            dal=dal, do_ingest_links=do_ingest_links
+        ),
+        filename_xml=inputs["supp"],
+    )
+
+
+def bench_ingest_synonyms(inputs: dict, dal) -> int:
+    from mt_ingester.ingesters import IngesterUmlsConso
+
+    groups = list(
+        ParserUmlsConso().iterate_groups(
+            filename_mrsat_rrf=inputs["mrsat"],
+            filename_mrconso_rrf=inputs["mrconso"],
+        )
+    )
+    IngesterUmlsConso(dal=dal).ingest(document=groups)
+
+    return len(groups)
+
+
+def bench_ingest_definitions(inputs: dict, dal) -> int:
+    from mt_ingester.ingesters import IngesterUmlsDef
+
+    dui_definitions = ParserUmlsDef().parse(
+        filename_mrdef_rrf=inputs["mrdef"], filename_mrsat_rrf=inputs["mrsat"]
+    )
+    IngesterUmlsDef(dal=dal).ingest(document=dui_definitions)
+
+    return len(dui_definitions)
+
+
+# The benchmarks in the order they're run keyed on their name along with
+# whether they require a database.
+BENCHMARKS = [
+    ("parse_qualifiers", bench_parse_qualifiers, False),
+    ("parse_descriptors", bench_parse_descriptors, False),
+    ("parse_supplementals", bench_parse_supplementals, False),
+    ("parse_mrsat", bench_parse_mrsat, False),
+    ("parse_mrconso", bench_parse_mrconso, False),
+    ("parse_mrdef", bench_parse_mrdef, False),
+    ("ingest_qualifiers", bench_ingest_qualifiers, True),
+    (
+        "ingest_qualifiers_links",
+        lambda inputs, dal: bench_ingest_qualifiers(inputs, dal, True),
+        True,
+    ),
+    ("ingest_descriptors", bench_ingest_descriptors, True),
+    (
+        "ingest_descriptors_links",
+        lambda inputs, dal: bench_ingest_descriptors(inputs, dal, True),
+        True,
+    ),
+    ("ingest_supplementals", bench_ingest_supplementals, True),
+    (
+        "ingest_supplementals_links",
+        lambda inputs, dal: bench_ingest_supplementals(inputs, dal, True),
+        True,
+    ),
+    ("ingest_synonyms", bench_ingest_synonyms, True),
+    ("ingest_definitions", bench_ingest_definitions, True),
+]  # type: List[tuple]
+
+
+def create_dal(filename_config: str):
+    """ Creates a `DalMesh` from a configuration file."""
+
+    from fform.dals_mt import DalMesh
+    from mt_ingester.config import import_config
+
+    cfg = import_config(fname_config_file=filename_config)
+
+    return DalMesh(
+        sql_username=cfg.sql_username,
+        sql_password=cfg.sql_password,
+        sql_host=cfg.sql_host,
+        sql_port=cfg.sql_port,
+        sql_db=cfg.sql_db,
+    )
+
+
+def reset_schema(filename_config: str, create: bool = True):
+    """ Drops and optionally recreates the schema of the benchmark database."""
+
+    from fform.orm_base import Base
+
+    dal = create_dal(filename_config=filename_config)
+    Base.metadata.drop_all(dal.engine)
+    if create:
+        Base.metadata.create_all(dal.engine)
+
+
+def run_benchmark(
+    name: str, inputs: dict, filename_config: Optional[str]
+) -> dict:
+    """ Runs a single benchmark and measures it.
+
+    Notes:
+        This function is meant to run in a fresh process so that the peak RSS
+        it reports is that of the benchmark.
+
+    Args:
+        name (str): The benchmark name.
+        inputs (dict): The synthetic input files.
+        filename_config (Optional[str]): The configuration file of the
+            database or `None` for the parser benchmarks.
+
+    Returns:
+        dict: The measurements.
+    """
+
+    from mt_ingester.instrumentation import DalInstrumented
+
+    func = {name_: func_ for name_, func_, _ in BENCHMARKS}[name]
+
+    dal = None
+    if filename_config is not None:
+        dal = DalInstrumented(dal=create_dal(filename_config=filename_config))
+
+    time_start = time.perf_counter()
+    num_records = func(inputs, dal)
+    duration = time.perf_counter() - time_start
+
+    # Linux reports the peak RSS in KB.
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss /= 1024
+
+    dal_methods = {}  # type: Dict[str, int]
+    if dal is not None:
+        for entry in dal.report():
+            key = "{}:{}".format(entry["method"], entry["record_type"])
+            dal_methods[key] = entry["count"]
+    dal_calls = sum(dal_methods.values())
+
+    return {
+        "records": num_records,
+        "duration": duration,
+        "records_per_sec": num_records / duration if duration else 0.0,
+        "peak_rss_mb": peak_rss / 1024.0,
+        "dal_calls": dal_calls,
+        "dal_calls_per_record": (
+            dal_calls / num_records if num_records else 0.0
+        ),
+        "dal_methods": dal_methods,
+    }
+
+
+def get_revision() -> Optional[str]:
+    """ Retrieves the Git revision of the working tree if any."""
+
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.decode("utf-8").strip()
+
+
+def run_suite(
+    inputs: dict,
+    filename_config: Optional[str],
+    names: Optional[List[str]] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, dict]:
+    """ Runs the benchmarks in order each in a fresh process.
+
+    Args:
+        inputs (dict): The synthetic input files.
+        filename_config (Optional[str]): The configuration file of the
+            database or `None` to skip the ingester benchmarks.
+        names (Optional[List[str]]): The benchmarks to run. Defaults to `None`
+            in which case all are run.
+        log (Callable[[str], None]): The function progress is reported
+            through.
+
+    Returns:
+        Dict[str, dict]: The measurements keyed on the benchmark name.
+    """
+
+    context = multiprocessing.get_context("spawn")
+
+    results = {}
+    for name, _, requires_dal in BENCHMARKS:
+        if names and name not in names:
+            continue
+        if requires_dal and filename_config is None:
+            continue
+
+        with context.Pool(processes=1) as pool:
+            result = pool.apply(
+                run_benchmark,
+                (name, inputs, filename_config if requires_dal else None),
+            )
+        results[name] = result
+
+        log(
+            "{:<28} {:>10d} records {:>12.1f} records/sec {:>8.1f} MB "
+            "{:>8d} DAL calls".format(
+                name,
+                result["records"],
+                result["records_per_sec"],
+                result["peak_rss_mb"],
+                result["dal_calls"],
+            )
+        )
+
+    return results
+
+
+def aggregate_results(runs: List[Dict[str, dict]]) -> Dict[str, dict]:
+    """ Aggregates the measurements of repeated runs of the suite.
+
+    Notes:
+        The throughput of each benchmark is the median of its repeats while
+        its best, its worst, and its spread, i.e., the difference between the
+        two relative to the median, are recorded under the
+        `records_per_sec_best`, `records_per_sec_worst`, and
+        `records_per_sec_spread` keys. The peak RSS is the highest of the
+        repeats while the DAL calls, which are deterministic, are those of the
+        first.
+
+    Args:
+        runs (List[Dict[str, dict]]): The measurements of each run keyed on
+            the benchmark name.
+
+    Returns:
+        Dict[str, dict]: The aggregated measurements keyed on the benchmark
+            name.
+    """
+
+    results = {}
+    for name in runs[0]:
+        results_name = [run[name] for run in runs if name in run]
+        samples = [result["records_per_sec"] for result in results_name]
+        median = statistics.median(samples)
+
+        result = dict(results_name[0])
+        result.update(
+            {
+                "repeats": len(samples),
+                "duration": statistics.median(
+                    [result_["duration"] for result_ in results_name]
+                ),
+                "records_per_sec": median,
+                "records_per_sec_best": max(samples),
+                "records_per_sec_worst": min(samples),
+                "records_per_sec_spread": (
+                    (max(samples) - min(samples)) / median if median else 0.0
+                ),
+                "records_per_sec_samples": samples,
+                "peak_rss_mb": max(
+                    [result_["peak_rss_mb"] for result_ in results_name]
+                ),
+            }
+        )
+        results[name] = result
+
+    return results
+
+
+def main(args):
+    dirname = args.dirname or tempfile.mkdtemp(prefix="mt-ingester-bench-")
+    os.makedirs(dirname, exist_ok=True)
+
+    try:
+        inputs = generate_inputs(
+            dirname=dirname,
+            num_descriptors=args.num_descriptors,
+            num_qualifiers=args.num_qualifiers,
+            ratio_supplementals=args.ratio_supplementals,
+            seed=args.seed,
+        )
+
+        filename_config = None if args.skip_ingesters else args.config_file
+
+        runs = []
+        try:
+            for repeat in range(args.repeats):
+                print("Repeat {}/{}".format(repeat + 1, args.repeats))
+                # Recreate the schema so that every repeat of the ingesters
+                # inserts the same records.
+                if filename_config is not None:
+                    reset_schema(filename_config=filename_config)
+                runs.append(
+                    run_suite(
+                        inputs=inputs,
+                        filename_config=filename_config,
+                        names=args.benchmarks,
+                    )
+                )
+        finally:
+            if filename_config is not None:
+                reset_schema(filename_config=filename_config, create=False)
+    finally:
+        if not args.dirname:
+            shutil.rmtree(dirname, ignore_errors=True)
+
+    output = {
+        "metadata": {
+            "created": datetime.datetime.utcnow().isoformat(),
+            "revision": get_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "num_descriptors": args.num_descriptors,
+            "num_qualifiers": args.num_qualifiers,
+            "ratio_supplementals": args.ratio_supplementals,
+            "seed": args.seed,
+            "repeats": args.repeats,
+            "records": inputs["records"],
+        },
+        "results": aggregate_results(runs=runs),
+    }
+
+    with open(args.output, "w") as fout:
+        ujson.dump(output, fout, indent=2)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="Benchmark suite of the parsers and ingesters."
+    )
+    argument_parser.add_argument(
+        "--num-descriptors",
+        dest="num_descriptors",
+        help="Number of synthetic descriptors the inputs are scaled to",
+        type=int,
+        default=5000,
+    )
+    argument_parser.add_argument(
+        "--num-qualifiers",
+        dest="num_qualifiers",
+        help="Number of synthetic qualifiers",
+        type=int,
+        default=80,
+    )
+    argument_parser.add_argument(
+        "--repeats",
+        dest="repeats",
+        help=(
+            "Number of times the suite is repeated, of which the median, "
+            "best, and worst throughput are recorded"
+        ),
+        type=int,
+        default=5,
+    )
+    argument_parser.add_argument(
+        "--ratio-supplementals",
+        dest="ratio_supplementals",
+        help="Number of synthetic supplementals per descriptor",
+        type=float,
+        default=2.0,
+    )
+    argument_parser.add_argument(
+        "--seed",
+        dest="seed",
+        help="Random seed of the synthetic inputs",
+        type=int,
+        default=0,
+    )
+    argument_parser.add_argument(
+        "--benchmarks",
+        dest="benchmarks",
+        help="Benchmarks to run, e.g., `parse_descriptors`",
+        nargs="+",
+        choices=[name for name, _, _ in BENCHMARKS],
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--skip-ingesters",
+        dest="skip_ingesters",
+        help="Only run the parser benchmarks which need no database",
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--config-file",
+        dest="config_file",
+        help=(
+            "Configuration file of the database the ingesters are run "
+            "against whose schema is dropped and recreated"
+        ),
+        default="/etc/mt-ingester/mt-ingester-test.json",
+    )
+    argument_parser.add_argument(
+        "--allow-drop",
+        dest="allow_drop",
+        help=(
+            "Confirm that the database of the configuration file is a "
+            "throwaway one whose MeSH schema the ingesters may drop"
+        ),
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--dirname",
+        dest="dirname",
+        help="Directory the synthetic inputs are written to and kept in",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--output",
+        dest="output",
+        help="JSON file the results are written to",
+        required=True,
+    )
+
+    arguments = argument_parser.parse_args()
+    if arguments.repeats < 1:
+        argument_parser.error("--repeats must be at least 1")
+    if not arguments.skip_ingesters and not arguments.allow_drop:
+        argument_parser.error(
+            "the ingester benchmarks drop and recreate the MeSH schema of the "
+            "database in --config-file, pass --allow-drop if it's a throwaway "
+            "database or --skip-ingesters to only run the parsers"
+        )
+
+    main(args=arguments)
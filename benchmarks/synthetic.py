@@ -0,0 +1,161 @@
+# coding=utf-8
+
+""" Synthetic input generator module
+
+This module contains functions that write synthetic UMLS RRF files shaped
+like the samples under `tests/assets` but scaled to arbitrary sizes with
+configurable selectivity.
+"""
+
+import random
+
+
+def _cui(index: int) -> str:
+    return "C{:07d}".format(index)
+
+
+def _dui(index: int) -> str:
+    return "D{:06d}".format(index)
+
+
+def write_mrsat(
+    filename: str,
+    num_lines: int,
+    num_cuis: int,
+    ratio_mesh: float = 0.03,
+    seed: int = 0,
+):
+    """ Writes a synthetic MRSAT.RRF file.
+
+    Args:
+        filename (str): Path to the output file.
+        num_lines (int): The number of lines to write.
+        num_cuis (int): The number of distinct CUIs referenced.
+        ratio_mesh (float, optional): The fraction of lines establishing a
+            CUI-DUI relationship through `MESH_DUI` or `TERMUI` attributes.
+            Defaults to `0.03`.
+        seed (int, optional): The random seed. Defaults to `0`.
+    """
+
+    rng = random.Random(seed)
+    atns_other = ["SOS", "DA", "MR", "ST", "LT", "TH", "MMR", "FX", "RN"]
+
+    with open(filename, "w") as fout:
+        for index in range(num_lines):
+            cui_index = rng.randrange(num_cuis)
+            cui = _cui(cui_index)
+            dui = _dui(cui_index // 3)
+            if rng.random() < ratio_mesh:
+                if rng.random() < 0.5:
+                    line = (
+                        "{}|L{:07d}|S{:07d}|A{:08d}|SCUI|N{:010d}|AT{:09d}||"
+                        "MESH_DUI|NDFRT|{}|N||\n"
+                    ).format(cui, index, index, index, index, index, dui)
+                else:
+                    line = (
+                        "{}|L{:07d}|S{:07d}|A{:08d}|AUI|{}|AT{:09d}||"
+                        "TERMUI|MSH|T{:06d}|N||\n"
+                    ).format(cui, index, index, index, dui, index, index)
+            else:
+                line = (
+                    "{}|L{:07d}|S{:07d}|A{:08d}|AUI|{}|AT{:09d}||{}|MSH|"
+                    "value {}|N||\n"
+                ).format(
+                    cui,
+                    index,
+                    index,
+                    index,
+                    dui,
+                    index,
+                    rng.choice(atns_other),
+                    index,
+                )
+            fout.write(line)
+
+
+def write_mrconso(
+    filename: str,
+    num_lines: int,
+    num_cuis: int,
+    ratio_eng: float = 0.6,
+    ratio_msh: float = 0.1,
+    seed: int = 0,
+):
+    """ Writes a synthetic MRCONSO.RRF file.
+
+    Args:
+        filename (str): Path to the output file.
+        num_lines (int): The number of lines to write.
+        num_cuis (int): The number of distinct CUIs referenced.
+        ratio_eng (float, optional): The fraction of English lines. Defaults
+            to `0.6`.
+        ratio_msh (float, optional): The fraction of lines defining an SDUI.
+            Defaults to `0.1`.
+        seed (int, optional): The random seed. Defaults to `0`.
+    """
+
+    rng = random.Random(seed)
+    langs_other = ["FRE", "GER", "SPA", "JPN", "POR", "DUT"]
+    sources = ["MSH", "MEDCIN", "SNOMEDCT_US", "NCI", "ICD10", "MDR"]
+    ttys = ["PM", "ET", "MH", "PT", "SY", "PEP"]
+
+    with open(filename, "w") as fout:
+        for index in range(num_lines):
+            cui_index = rng.randrange(num_cuis)
+            lat = "ENG" if rng.random() < ratio_eng else rng.choice(langs_other)
+            sdui = _dui(cui_index // 3) if rng.random() < ratio_msh else ""
+            fout.write(
+                "{}|{}|P|L{:07d}|PF|S{:07d}|{}|A{:08d}||M{:07d}|{}|{}|{}|{}|"
+                "Synonym {} of concept {}|0|N|256|\n".format(
+                    _cui(cui_index),
+                    lat,
+                    index,
+                    index,
+                    rng.choice("YN"),
+                    index,
+                    index,
+                    sdui,
+                    rng.choice(sources),
+                    rng.choice(ttys),
+                    sdui,
+                    index % 7,
+                    cui_index,
+                )
+            )
+
+
+def write_mrdef(
+    filename: str,
+    num_lines: int,
+    num_cuis: int,
+    num_definitions_per_cui: int = 1,
+    seed: int = 0,
+):
+    """ Writes a synthetic MRDEF.RRF file.
+
+    Args:
+        filename (str): Path to the output file.
+        num_lines (int): The number of lines to write.
+        num_cuis (int): The number of distinct CUIs referenced.
+        num_definitions_per_cui (int, optional): The number of distinct
+            definitions per CUI and source. Defaults to `1`.
+        seed (int, optional): The random seed. Defaults to `0`.
+    """
+
+    rng = random.Random(seed)
+    sources = ["MSH", "NCI", "CSP", "NCI_NICHD", "MEDLINEPLUS", "HPO"]
+
+    with open(filename, "w") as fout:
+        for index in range(num_lines):
+            cui_index = rng.randrange(num_cuis)
+            fout.write(
+                "{}|A{:08d}|AT{:09d}||{}|Definition {} of concept {}.|N||"
+                "\n".format(
+                    _cui(cui_index),
+                    index,
+                    index,
+                    rng.choice(sources),
+                    rng.randrange(num_definitions_per_cui),
+                    cui_index,
+                )
+            )
@@ -0,0 +1,415 @@
+# coding=utf-8
+
+""" Synthetic MeSH XML generator module
+
+This module contains functions that write synthetic MeSH descriptor,
+qualifier, and supplemental XML files by replicating the records of the
+samples under `tests/assets` with fresh identifiers, cross-references to the
+other synthetic records, and a configurable concept, term, and thesaurus ID
+fan-out.
+
+The descriptor UIs follow those referenced by the synthetic UMLS files in the
+`synthetic` module so that both can be ingested together.
+"""
+
+import copy
+import math
+import random
+from typing import List
+
+from lxml import etree
+
+from tests.assets.samples_mesh import sample_desc
+from tests.assets.samples_mesh import sample_qual
+from tests.assets.samples_mesh import sample_supp
+
+from benchmarks.synthetic import _dui
+
+
+# The thesaurus IDs terms are assigned from.
+THESAURUS_IDS = [
+    "NLM (1975)",
+    "NLM (1991)",
+    "NLM (2017)",
+    "FDA SRS (2014)",
+    "INN (19XX)",
+    "USAN (1974)",
+    "CAS REGISTRY",
+    "ORGANISM (2015)",
+]
+
+# The tree number categories and the number of children per tree node.
+TREE_CATEGORIES = ["A", "B", "C", "D", "E", "F", "G", "N"]
+TREE_BRANCHING = 8
+
+
+def _qui(index: int) -> str:
+    return "Q{:06d}".format(index)
+
+
+def _sui(index: int) -> str:
+    return "C{:06d}".format(index)
+
+
+def _count(rng: random.Random, mean: float) -> int:
+    """ Draws a count of at least one whose mean is `mean` through a shifted
+        Poisson distribution.
+    """
+
+    # Knuth's algorithm which is adequate for the small means used here.
+    threshold = math.exp(-max(mean - 1.0, 0.0))
+    count = 0
+    product = rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+
+    return count + 1
+
+
+def get_tree_number(node: int) -> str:
+    """ Retrieves the tree number of a node of a synthetic MeSH tree where
+        nodes are numbered breadth-first.
+
+    Args:
+        node (int): The node number.
+
+    Returns:
+        str: The tree number, e.g., `C04.557.337`.
+    """
+
+    num_roots = len(TREE_CATEGORIES) * TREE_BRANCHING
+    if node < num_roots:
+        return "{}{:02d}".format(
+            TREE_CATEGORIES[node // TREE_BRANCHING], node % TREE_BRANCHING + 1
+        )
+
+    parent, position = divmod(node - num_roots, TREE_BRANCHING)
+
+    return "{}.{:03d}".format(get_tree_number(parent), position + 100)
+
+
+class _RecordFactory(object):
+    """ Class used to replicate a template MeSH record with fresh
+        identifiers.
+    """
+
+    def __init__(
+        self,
+        sample: str,
+        rng: random.Random,
+        num_descriptors: int,
+        num_qualifiers: int,
+        num_concepts: float,
+        num_terms: float,
+        num_thesaurus_ids: float,
+        offset_concepts: int,
+    ):
+        root = etree.fromstring(sample.encode("utf-8"))
+        self.record = root[0]
+        self.root_tag = root.tag
+        self.root_attrib = dict(root.attrib)
+
+        # Detach the concepts from the template keeping the first concept and
+        # its first term as templates.
+        concept_list = self.record.find("ConceptList")
+        self.concept = copy.deepcopy(concept_list[0])
+        term_list = self.concept.find("TermList")
+        self.term = copy.deepcopy(term_list[0])
+        for term in list(term_list):
+            term_list.remove(term)
+        for concept in list(concept_list):
+            concept_list.remove(concept)
+
+        self.rng = rng
+        self.num_descriptors = num_descriptors
+        self.num_qualifiers = num_qualifiers
+        self.num_concepts = num_concepts
+        self.num_terms = num_terms
+        self.num_thesaurus_ids = num_thesaurus_ids
+
+        # Concepts and terms are numbered across records of the same file.
+        self.index_concept = offset_concepts
+        self.index_term = offset_concepts
+
+    def random_dui(self) -> str:
+        return _dui(self.rng.randrange(self.num_descriptors))
+
+    def random_qui(self) -> str:
+        return _qui(self.rng.randrange(self.num_qualifiers))
+
+    def rewrite_references(self, record: etree.Element):
+        """ Points the descriptor and qualifier references to random
+            synthetic records.
+        """
+
+        for element in record.iter("DescriptorReferredTo"):
+            element.find("DescriptorUI").text = self.random_dui()
+        for element in record.iter("QualifierReferredTo"):
+            element.find("QualifierUI").text = self.random_qui()
+
+    def create_concepts(self, record: etree.Element, name: str):
+        """ Fills the `ConceptList` of a record with concepts and terms."""
+
+        concept_list = record.find("ConceptList")
+
+        num_concepts = _count(self.rng, self.num_concepts)
+        concept_uis = [
+            "M{:07d}".format(self.index_concept + index)
+            for index in range(num_concepts)
+        ]
+        self.index_concept += num_concepts
+
+        for index_concept, concept_ui in enumerate(concept_uis):
+            concept = copy.deepcopy(self.concept)
+            concept.set(
+                "PreferredConceptYN", "Y" if index_concept == 0 else "N"
+            )
+            concept.find("ConceptUI").text = concept_ui
+            concept.find("ConceptName/String").text = "{} concept {}".format(
+                name, index_concept
+            )
+
+            # Relate the preferred concept to the others.
+            relation_list = concept.find("ConceptRelationList")
+            if relation_list is not None:
+                relation_template = relation_list[0]
+                for relation in list(relation_list):
+                    relation_list.remove(relation)
+                concept_uis_related = (
+                    concept_uis[1:] if index_concept == 0 else [concept_ui]
+                )
+                for concept_ui_related in concept_uis_related:
+                    relation = copy.deepcopy(relation_template)
+                    relation.find("Concept1UI").text = concept_uis[0]
+                    relation.find("Concept2UI").text = concept_ui_related
+                    relation_list.append(relation)
+                if not len(relation_list):
+                    concept.remove(relation_list)
+
+            term_list = concept.find("TermList")
+            for index_term in range(_count(self.rng, self.num_terms)):
+                term_list.append(
+                    self.create_term(
+                        name="{} concept {} term {}".format(
+                            name, index_concept, index_term
+                        ),
+                        is_concept_preferred=index_term == 0,
+                        is_record_preferred=(
+                            index_concept == 0 and index_term == 0
+                        ),
+                    )
+                )
+
+            concept_list.append(concept)
+
+    def create_term(
+        self, name: str, is_concept_preferred: bool, is_record_preferred: bool
+    ) -> etree.Element:
+        """ Creates a term with random thesaurus IDs."""
+
+        term = copy.deepcopy(self.term)
+        term.set("ConceptPreferredTermYN", "Y" if is_concept_preferred else "N")
+        term.set("RecordPreferredTermYN", "Y" if is_record_preferred else "N")
+        term.set("IsPermutedTermYN", "N")
+        term.find("TermUI").text = "T{:07d}".format(self.index_term)
+        term.find("String").text = name
+        self.index_term += 1
+
+        thesaurus_id_list = term.find("ThesaurusIDlist")
+        if thesaurus_id_list is not None:
+            thesaurus_id_template = thesaurus_id_list[0]
+            for thesaurus_id in list(thesaurus_id_list):
+                thesaurus_id_list.remove(thesaurus_id)
+            num_thesaurus_ids = min(
+                _count(self.rng, self.num_thesaurus_ids), len(THESAURUS_IDS)
+            )
+            for value in self.rng.sample(THESAURUS_IDS, num_thesaurus_ids):
+                thesaurus_id = copy.deepcopy(thesaurus_id_template)
+                thesaurus_id.text = value
+                thesaurus_id_list.append(thesaurus_id)
+
+        return term
+
+    def write(self, filename: str, records: List[etree.Element]):
+        """ Writes records under a root element like the template's."""
+
+        root = etree.Element(self.root_tag, attrib=self.root_attrib)
+        for record in records:
+            root.append(record)
+
+        etree.ElementTree(root).write(
+            filename, xml_declaration=True, encoding="utf-8", pretty_print=True
+        )
+
+
+def write_desc(
+    filename: str,
+    num_descriptors: int,
+    num_qualifiers: int = 80,
+    num_concepts: float = 1.9,
+    num_terms: float = 2.6,
+    num_thesaurus_ids: float = 1.4,
+    num_tree_numbers: float = 1.9,
+    seed: int = 0,
+):
+    """ Writes a synthetic MeSH descriptor XML file.
+
+    Args:
+        filename (str): Path to the output file.
+        num_descriptors (int): The number of descriptors to write.
+        num_qualifiers (int, optional): The number of qualifiers referenced.
+            Defaults to `80`.
+        num_concepts (float, optional): The mean number of concepts per
+            descriptor. Defaults to `1.9`.
+        num_terms (float, optional): The mean number of terms per concept.
+            Defaults to `2.6`.
+        num_thesaurus_ids (float, optional): The mean number of thesaurus IDs
+            per term. Defaults to `1.4`.
+        num_tree_numbers (float, optional): The mean number of tree numbers
+            per descriptor. Defaults to `1.9`.
+        seed (int, optional): The random seed. Defaults to `0`.
+    """
+
+    rng = random.Random(seed)
+    factory = _RecordFactory(
+        sample=sample_desc,
+        rng=rng,
+        num_descriptors=num_descriptors,
+        num_qualifiers=num_qualifiers,
+        num_concepts=num_concepts,
+        num_terms=num_terms,
+        num_thesaurus_ids=num_thesaurus_ids,
+        offset_concepts=0,
+    )
+
+    # Assign the nodes of a synthetic tree to descriptors in turn so that
+    # each descriptor sits at several, mostly unrelated, positions.
+    num_nodes = int(round(num_descriptors * num_tree_numbers))
+    tree_numbers = [[] for _ in range(num_descriptors)]
+    for node in range(num_nodes):
+        tree_numbers[node % num_descriptors].append(get_tree_number(node))
+
+    records = []
+    for index in range(num_descriptors):
+        record = copy.deepcopy(factory.record)
+        name = "Descriptor {}".format(index)
+        record.find("DescriptorUI").text = _dui(index)
+        record.find("DescriptorName/String").text = name
+        factory.rewrite_references(record)
+
+        tree_number_list = record.find("TreeNumberList")
+        tree_number_template = tree_number_list[0]
+        for tree_number in list(tree_number_list):
+            tree_number_list.remove(tree_number)
+        for value in tree_numbers[index]:
+            tree_number = copy.deepcopy(tree_number_template)
+            tree_number.text = value
+            tree_number_list.append(tree_number)
+        if not len(tree_number_list):
+            record.remove(tree_number_list)
+
+        factory.create_concepts(record=record, name=name)
+        records.append(record)
+
+    factory.write(filename=filename, records=records)
+
+
+def write_qual(
+    filename: str,
+    num_qualifiers: int = 80,
+    num_concepts: float = 1.5,
+    num_terms: float = 1.2,
+    seed: int = 0,
+):
+    """ Writes a synthetic MeSH qualifier XML file.
+
+    Args:
+        filename (str): Path to the output file.
+        num_qualifiers (int, optional): The number of qualifiers to write.
+            Defaults to `80`.
+        num_concepts (float, optional): The mean number of concepts per
+            qualifier. Defaults to `1.5`.
+        num_terms (float, optional): The mean number of terms per concept.
+            Defaults to `1.2`.
+        seed (int, optional): The random seed. Defaults to `0`.
+    """
+
+    rng = random.Random(seed)
+    factory = _RecordFactory(
+        sample=sample_qual,
+        rng=rng,
+        num_descriptors=1,
+        num_qualifiers=num_qualifiers,
+        num_concepts=num_concepts,
+        num_terms=num_terms,
+        num_thesaurus_ids=1.0,
+        offset_concepts=10000000,
+    )
+
+    records = []
+    for index in range(num_qualifiers):
+        record = copy.deepcopy(factory.record)
+        name = "qualifier {}".format(index)
+        record.find("QualifierUI").text = _qui(index)
+        record.find("QualifierName/String").text = name
+        for position, tree_number in enumerate(record.iter("TreeNumber")):
+            tree_number.text = "Y{:02d}.{:03d}".format(position + 1, index)
+
+        factory.create_concepts(record=record, name=name)
+        records.append(record)
+
+    factory.write(filename=filename, records=records)
+
+
+def write_supp(
+    filename: str,
+    num_supplementals: int,
+    num_descriptors: int,
+    num_qualifiers: int = 80,
+    num_concepts: float = 1.3,
+    num_terms: float = 1.8,
+    num_thesaurus_ids: float = 1.3,
+    seed: int = 0,
+):
+    """ Writes a synthetic MeSH supplemental XML file.
+
+    Args:
+        filename (str): Path to the output file.
+        num_supplementals (int): The number of supplementals to write.
+        num_descriptors (int): The number of descriptors referenced.
+        num_qualifiers (int, optional): The number of qualifiers referenced.
+            Defaults to `80`.
+        num_concepts (float, optional): The mean number of concepts per
+            supplemental. Defaults to `1.3`.
+        num_terms (float, optional): The mean number of terms per concept.
+            Defaults to `1.8`.
+        num_thesaurus_ids (float, optional): The mean number of thesaurus IDs
+            per term. Defaults to `1.3`.
+        seed (int, optional): The random seed. Defaults to `0`.
+    """
+
+    rng = random.Random(seed)
+    factory = _RecordFactory(
+        sample=sample_supp,
+        rng=rng,
+        num_descriptors=num_descriptors,
+        num_qualifiers=num_qualifiers,
+        num_concepts=num_concepts,
+        num_terms=num_terms,
+        num_thesaurus_ids=num_thesaurus_ids,
+        offset_concepts=20000000,
+    )
+
+    records = []
+    for index in range(num_supplementals):
+        record = copy.deepcopy(factory.record)
+        name = "supplemental {}".format(index)
+        record.find("SupplementalRecordUI").text = _sui(index)
+        record.find("SupplementalRecordName/String").text = name
+        factory.rewrite_references(record)
+
+        factory.create_concepts(record=record, name=name)
+        records.append(record)
+
+    factory.write(filename=filename, records=records)
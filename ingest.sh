@@ -3,30 +3,56 @@ set -e
 [ -n "$PATH_DATA_MESH" ] || echo "PATH_DATA_MESH variable undefined."
 [ -n "$PATH_DATA_MESH" ] || exit 1
 echo "PATH_DATA_MESH set to '$PATH_DATA_MESH'."
+# `PATH_DATA_UMLS` may point into the UMLS distribution archive, e.g.,
+# `zip:///data/umls-2019AA-full.zip!/2019aa-1-meta.nlm!/2019AA/META`, in which
+# case the RRF files are read from it without being extracted.
 [ -n "$PATH_DATA_UMLS" ] || echo "PATH_DATA_UMLS variable undefined."
 [ -n "$PATH_DATA_UMLS" ] || exit 1
 echo "PATH_DATA_UMLS set to '$PATH_DATA_UMLS'."
 
+PATH_INDEX_UMLS="${PATH_INDEX_UMLS:-/tmp/mt-ingester}"
+echo "PATH_INDEX_UMLS set to '$PATH_INDEX_UMLS'."
+
+# Cap the memory, in MB, taken by the parsed UMLS rows on smaller hosts by
+# spilling them to sorted runs under `PATH_INDEX_UMLS`.
+UMLS_ARGS=""
+if [ -n "$MT_INGESTER_MAX_MEMORY" ]; then
+    echo "MT_INGESTER_MAX_MEMORY set to '$MT_INGESTER_MAX_MEMORY' MB."
+    UMLS_ARGS="--max-memory=$MT_INGESTER_MAX_MEMORY --tmp-dir=$PATH_INDEX_UMLS"
+fi
+
+SHADOW_ARGS=""
+if [ -n "$MT_INGESTER_SHADOW" ]; then
+    echo "Create the shadow schema."
+    python -m mt_ingester.mt_ingester --mode shadow-create --config-file="/etc/mt-ingester/mt-ingester-prod.json"
+    SHADOW_ARGS="--into-shadow"
+fi
+
 echo "Ingest qualifiers without adding links (in case they haven't been added yet)."
-python -m mt_ingester.mt_ingester --mode qualifiers --no-do-ingest-links --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/qual2019.xml
+python -m mt_ingester.mt_ingester --mode qualifiers --no-do-ingest-links $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/qual2019.xml
 
 echo "Ingest qualifiers with links."
-python -m mt_ingester.mt_ingester --mode qualifiers --do-ingest-links --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/qual2019.xml
+python -m mt_ingester.mt_ingester --mode qualifiers --do-ingest-links $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/qual2019.xml
 
 echo "Ingest descriptors without adding links (in case they haven't been added yet)."
-python -m mt_ingester.mt_ingester --mode descriptors --no-do-ingest-links --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/desc2019.xml
+python -m mt_ingester.mt_ingester --mode descriptors --no-do-ingest-links $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/desc2019.xml
 
 echo "Ingest descriptors with links."
-python -m mt_ingester.mt_ingester --mode descriptors --do-ingest-links --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/desc2019.xml
+python -m mt_ingester.mt_ingester --mode descriptors --do-ingest-links $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/desc2019.xml
 
 echo "Ingest supplementals without adding links (in case they haven't been added yet)."
-python -m mt_ingester.mt_ingester --mode supplementals --no-do-ingest-links --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/supp2019.xml
+python -m mt_ingester.mt_ingester --mode supplementals --no-do-ingest-links $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/supp2019.xml
 
 echo "Ingest supplementals with links."
-python -m mt_ingester.mt_ingester --mode supplementals --do-ingest-links --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/supp2019.xml
+python -m mt_ingester.mt_ingester --mode supplementals --do-ingest-links $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_MESH"/supp2019.xml
 
 echo "Ingest MeSH descriptor synonyms."
-python -m mt_ingester.mt_ingester --mode synonyms --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_UMLS"/MRSAT.RRF "$PATH_DATA_UMLS"/MRCONSO.RRF
+python -m mt_ingester.mt_ingester --mode synonyms --index-dir="$PATH_INDEX_UMLS" $UMLS_ARGS $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_UMLS"/MRSAT.RRF "$PATH_DATA_UMLS"/MRCONSO.RRF
 
 echo "Ingest MeSH descriptor definitions."
-python -m mt_ingester.mt_ingester --mode definitions --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_UMLS"/MRDEF.RRF "$PATH_DATA_UMLS"/MRSAT.RRF
+python -m mt_ingester.mt_ingester --mode definitions --index-dir="$PATH_INDEX_UMLS" $UMLS_ARGS $SHADOW_ARGS --config-file="/etc/mt-ingester/mt-ingester-prod.json" "$PATH_DATA_UMLS"/MRDEF.RRF "$PATH_DATA_UMLS"/MRSAT.RRF
+
+if [ -n "$MT_INGESTER_SHADOW" ]; then
+    echo "Swap the shadow schema in for the live one."
+    python -m mt_ingester.mt_ingester --mode shadow-swap --config-file="/etc/mt-ingester/mt-ingester-prod.json"
+fi
@@ -1,16 +1,53 @@
 # coding=utf-8
 
-"""Top-level package for mt-ingester."""
+"""Top-level package for mt-ingester.
+
+The submodules are imported on first access, e.g., `mt_ingester.parsers`, so
+that importing the package, or running one of its entry points, only imports
+the dependencies actually used.
+"""
+
+import importlib
 
 __author__ = """Adamos Kyriakou"""
 __email__ = "somada141@gmail.com"
 __version__ = "0.7.1"
 
-from mt_ingester import config
-from mt_ingester import excs
-from mt_ingester import loggers
-from mt_ingester import ingesters
-from mt_ingester import parser_utils
-from mt_ingester import parsers
-from mt_ingester import utils
-from mt_ingester import mt_ingester
+__all__ = [
+    "annotator",
+    "config",
+    "cui_index",
+    "cui_map",
+    "excs",
+    "external_sort",
+    "full_reload",
+    "loggers",
+    "lookup",
+    "instrumentation",
+    "ingesters",
+    "orm",
+    "parser_utils",
+    "parsers",
+    "profiling",
+    "progress",
+    "rrf",
+    "rrf_arrow",
+    "rrf_filters",
+    "shadow",
+    "tree_numbers",
+    "utils",
+    "mt_ingester",
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module("{}.{}".format(__name__, name))
+
+    msg = "module {!r} has no attribute {!r}"
+    msg_fmt = msg.format(__name__, name)
+    raise AttributeError(msg_fmt)
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
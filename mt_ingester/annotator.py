@@ -0,0 +1,453 @@
+# coding=utf-8
+
+""" Synonym annotator module
+
+This module contains the `Annotator` class which tags free text with the MeSH
+descriptors whose names or synonyms it mentions through a token trie over the
+lowercased names and synonyms backed by a memory-mapped automaton file, as
+well as the functions used to collect those names and synonyms from the
+parsed MeSH and UMLS data.
+"""
+
+import re
+import sys
+import zlib
+import array
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from mt_ingester.utils import MappedFile
+from mt_ingester.utils import open_atomic
+from mt_ingester.utils import write_sections
+
+
+# The magic bytes identifying an automaton file.
+MAGIC = b"MTANNOT1"
+
+# The header holding the magic bytes, the number of hash-table slots, the
+# number of phrases, the number of phrase-UI pairs, the number of UIs, and the
+# byte sizes of the phrase and UI blobs.
+HEADER = struct.Struct("<8sQQQQQQ")
+
+# The pattern text and phrases are tokenized with.
+regex_token = re.compile(r"\w+")
+
+# The constants of the hash combining the token hashes of a phrase.
+HASH_OFFSET = 0xCBF29CE484222325
+HASH_MULTIPLIER = 0x100000001B3
+HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+# The maximum number of tokens whose hashes are memoized by an annotator.
+MEMO_SIZE_MAX = 1 << 20
+
+
+def normalize_phrase(phrase: str) -> str:
+    """ Normalizes a name or synonym into the lowercased tokens it's matched
+        on, separated by single spaces, e.g., `A-23187` into `a 23187`.
+    """
+
+    return " ".join(regex_token.findall(phrase.lower()))
+
+
+def hash_token(token: str) -> int:
+    """ Hashes a token into 64 bits through two seeded CRC-32 checksums."""
+
+    data = token.encode("utf-8")
+
+    return (zlib.crc32(data) << 32) | zlib.crc32(data, 0x9E3779B9)
+
+
+def hash_tokens(token_hashes: Iterable[int]) -> Iterator[int]:
+    """ Combines the hashes of the tokens of a phrase yielding the hash of
+        each of its token prefixes. Zero is reserved for empty slots.
+    """
+
+    value = HASH_OFFSET
+    for token_hash in token_hashes:
+        value = ((value * HASH_MULTIPLIER) ^ token_hash) & HASH_MASK
+        yield value or 1
+
+
+def get_record_names(doc: dict) -> Tuple[Optional[str], List[str]]:
+    """ Retrieves the UI and the names of the terms of a parsed descriptor or
+        supplemental record.
+
+    Args:
+        doc (dict): The `<DescriptorRecord>` or `<SupplementalRecord>` parsed
+            through `ParserXmlMeshDescriptors` or
+            `ParserXmlMeshSupplementals`.
+
+    Returns:
+        Tuple[Optional[str], List[str]]: The record UI and the record and
+            term names.
+    """
+
+    ui = doc.get("DescriptorUI") or doc.get("SupplementalRecordUI")
+
+    names = [
+        doc.get("DescriptorName") or doc.get("SupplementalRecordName") or ""
+    ]
+    for doc_concept in doc.get("ConceptList") or []:
+        for doc_term in doc_concept.get("TermList") or []:
+            names.append(doc_term.get("String") or "")
+
+    return ui, [name for name in names if name]
+
+
+def collect_phrases(
+    groups: Iterable[Tuple[str, Iterable[str]]],
+    phrases: Optional[Dict[str, Set[str]]] = None,
+) -> Dict[str, Set[str]]:
+    """ Collects the normalized phrases of groups of UIs and names.
+
+    Args:
+        groups (Iterable[Tuple[str, Iterable[str]]]): The UIs and names, e.g.,
+            yielded by `ParserUmlsConso.iterate_groups` or mapped through
+            `get_record_names`.
+        phrases (Optional[Dict[str, Set[str]]]): The phrases to add to.
+            Defaults to `None` in which case a new dictionary is created.
+
+    Returns:
+        Dict[str, Set[str]]: The UIs keyed on the normalized phrases.
+    """
+
+    if phrases is None:
+        phrases = {}
+
+    for ui, names in groups:
+        if not ui:
+            continue
+        for name in names:
+            phrase = normalize_phrase(name)
+            if phrase:
+                phrases.setdefault(phrase, set()).add(ui)
+
+    return phrases
+
+
+class Annotator(MappedFile):
+    """ Class used to annotate text with the UIs of the names and synonyms it
+        mentions.
+
+    Notes:
+        The automaton file holds an open-addressing hash table keyed on the
+        hashes of the token prefixes of every phrase, flagging prefixes of
+        longer phrases and pointing complete phrases to their UIs, followed by
+        the phrases, so that matching extends from each token as long as the
+        tokens read are a phrase prefix and complete matches are verified
+        against the stored phrase. Opening the file only reads the header and
+        the UIs, see `MappedFile`.
+    """
+
+    attr_filename = "filename_automaton"
+
+    def __init__(self, filename_automaton: str):
+        """ Constructor and initialization.
+
+        Args:
+            filename_automaton (str): Path to the automaton file.
+        """
+
+        # Internalize arguments.
+        self.filename_automaton = filename_automaton
+
+        self._open()
+
+    def _open(self):
+        """ Maps the automaton file, reads its header, and casts its
+            sections.
+        """
+
+        if sys.byteorder != "little":
+            msg = "Automaton files can only be read on little-endian hosts."
+            raise ValueError(msg)
+
+        self._map(offset=HEADER.size)
+
+        (
+            magic,
+            self.num_slots,
+            self.num_phrases,
+            self.num_pairs,
+            num_uis,
+            size_phrases,
+            size_uis,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            msg = "File '{}' is not an annotator automaton."
+            msg_fmt = msg.format(self.filename_automaton)
+            raise ValueError(msg_fmt)
+
+        self._slot_hashes = self._take(8 * self.num_slots, "Q")
+        self._slot_values = self._take(4 * self.num_slots, "I")
+        self._phrase_offsets = self._take(8 * (self.num_phrases + 1), "Q")
+        self._ui_offsets = self._take(4 * (self.num_phrases + 1), "I")
+        self._phrase_uis = self._take(4 * self.num_pairs, "I")
+        self._phrases = self._take(size_phrases)
+        self.uis = bytes(self._take(size_uis)).decode("utf-8").split("\n")
+        self.uis = self.uis[:num_uis]
+
+        self._mask = self.num_slots - 1
+        self._memo = {}  # type: Dict[str, Tuple[int, bool]]
+
+    @classmethod
+    def build(
+        cls, filename_automaton: str, phrases: Dict[str, Set[str]]
+    ) -> "Annotator":
+        """ Writes the automaton of a set of phrases to a file, through
+            `utils.open_atomic`, and opens it.
+
+        Args:
+            filename_automaton (str): Path to the automaton file.
+            phrases (Dict[str, Set[str]]): The UIs keyed on the normalized
+                phrases, e.g., assembled through `collect_phrases`.
+
+        Returns:
+            Annotator: The annotator opened over the written file.
+        """
+
+        phrases_sorted = sorted(phrases)
+        uis = sorted(set(ui for uis in phrases.values() for ui in uis))
+        ui_indices = {ui: index for index, ui in enumerate(uis)}
+
+        # Assign every token prefix of every phrase a value flagging whether
+        # it prefixes a longer phrase in its lowest bit and pointing to the
+        # phrase, offset by one, should it be complete.
+        values = {}  # type: Dict[int, int]
+        for index, phrase in enumerate(phrases_sorted):
+            hashes = list(hash_tokens(map(hash_token, phrase.split(" "))))
+            for value in hashes[:-1]:
+                values[value] = values.get(value, 0) | 1
+            # Keep the first of two phrases whose hashes collide as complete
+            # matches are verified against the stored phrase.
+            value = values.get(hashes[-1], 0)
+            if not value >> 1:
+                values[hashes[-1]] = value | ((index + 1) << 1)
+
+        num_slots = 8
+        while num_slots < 2 * len(values):
+            num_slots *= 2
+        mask = num_slots - 1
+
+        slot_hashes = array.array("Q", bytes(8 * num_slots))
+        slot_values = array.array("I", bytes(4 * num_slots))
+        for value_hash, value in values.items():
+            slot = value_hash & mask
+            while slot_hashes[slot]:
+                slot = (slot + 1) & mask
+            slot_hashes[slot] = value_hash
+            slot_values[slot] = value
+
+        phrase_offsets = array.array("Q", [0])
+        ui_offsets = array.array("I", [0])
+        phrase_uis = array.array("I")
+        blob_phrases = bytearray()
+        for phrase in phrases_sorted:
+            blob_phrases += phrase.encode("utf-8")
+            phrase_offsets.append(len(blob_phrases))
+            phrase_uis.extend(sorted(ui_indices[ui] for ui in phrases[phrase]))
+            ui_offsets.append(len(phrase_uis))
+        blob_uis = "\n".join(uis).encode("utf-8")
+
+        with open_atomic(filename=filename_automaton) as fout:
+            fout.write(
+                HEADER.pack(
+                    MAGIC,
+                    num_slots,
+                    len(phrases_sorted),
+                    len(phrase_uis),
+                    len(uis),
+                    len(blob_phrases),
+                    len(blob_uis),
+                )
+            )
+            write_sections(
+                fout=fout,
+                sections=[
+                    slot_hashes.tobytes(),
+                    slot_values.tobytes(),
+                    phrase_offsets.tobytes(),
+                    ui_offsets.tobytes(),
+                    phrase_uis.tobytes(),
+                    bytes(blob_phrases),
+                    blob_uis,
+                ],
+            )
+
+        return cls(filename_automaton=filename_automaton)
+
+    def _lookup(self, value_hash: int) -> int:
+        """ Retrieves the value of a token-prefix hash or `0` if absent."""
+
+        slot_hashes = self._slot_hashes
+        slot = value_hash & self._mask
+        while True:
+            slot_hash = slot_hashes[slot]
+            if slot_hash == value_hash:
+                return self._slot_values[slot]
+            if not slot_hash:
+                return 0
+            slot = (slot + 1) & self._mask
+
+    def get_phrase(self, index: int) -> str:
+        """ Retrieves a stored phrase by its index."""
+
+        start = self._phrase_offsets[index]
+        stop = self._phrase_offsets[index + 1]
+
+        return bytes(self._phrases[start:stop]).decode("utf-8")
+
+    def get_uis(self, index: int) -> Tuple[str, ...]:
+        """ Retrieves the UIs of a stored phrase by its index."""
+
+        start = self._ui_offsets[index]
+        stop = self._ui_offsets[index + 1]
+
+        return tuple(self.uis[ui] for ui in self._phrase_uis[start:stop])
+
+    def _hash_tokens(self, tokens: List[str]) -> Tuple[List[int], List[bool]]:
+        """ Hashes tokens and looks up whether they start any phrase,
+            memoizing both for frequent tokens.
+
+        Returns:
+            Tuple[List[int], List[bool]]: The token hashes and whether each
+                token starts a phrase.
+        """
+
+        memo = self._memo
+        if len(memo) > MEMO_SIZE_MAX:
+            memo.clear()
+
+        hashes = []
+        starts = []
+        for token in tokens:
+            entry = memo.get(token)
+            if entry is None:
+                token_hash = hash_token(token)
+                value_hash = next(hash_tokens([token_hash]))
+                entry = memo[token] = (
+                    token_hash,
+                    bool(self._lookup(value_hash)),
+                )
+            hashes.append(entry[0])
+            starts.append(entry[1])
+
+        return hashes, starts
+
+    def annotate_text(
+        self, text: str, do_longest: bool = True
+    ) -> List[Tuple[int, int, Tuple[str, ...]]]:
+        """ Annotates a text with the phrases it mentions.
+
+        Args:
+            text (str): The text to annotate.
+            do_longest (bool, optional): Whether to only keep the longest
+                phrase starting at each token and skip the tokens it spans.
+                Defaults to `True`. Otherwise all phrases, including
+                overlapping ones, are kept.
+
+        Returns:
+            List[Tuple[int, int, Tuple[str, ...]]]: The start and end offsets
+                of the mentions in `text` and the UIs of the mentioned
+                phrases.
+        """
+
+        # Lowercasing can change the length of some texts, e.g., with dotted
+        # capitals, in which case the tokens are lowercased one by one so
+        # that their offsets are those in the text.
+        text_lower = text.lower()
+        if len(text_lower) == len(text):
+            matches = list(regex_token.finditer(text_lower))
+            tokens = [match.group() for match in matches]
+        else:
+            matches = list(regex_token.finditer(text))
+            tokens = [match.group().lower() for match in matches]
+
+        hashes, starts = self._hash_tokens(tokens)
+        slot_hashes = self._slot_hashes
+        slot_values = self._slot_values
+        mask = self._mask
+
+        annotations = []
+        num_tokens = len(tokens)
+        index = 0
+        while index < num_tokens:
+            # Skip the tokens no phrase starts with without hashing.
+            if not starts[index]:
+                index += 1
+                continue
+
+            value_hash = HASH_OFFSET
+            stop = None
+            phrase_index = None
+            for position in range(index, num_tokens):
+                value_hash = (
+                    (value_hash * HASH_MULTIPLIER) ^ hashes[position]
+                ) & HASH_MASK or 1
+
+                # Probe the hash table inline as this is the hot loop, see
+                # `_lookup`.
+                slot = value_hash & mask
+                slot_hash = slot_hashes[slot]
+                while slot_hash and slot_hash != value_hash:
+                    slot = (slot + 1) & mask
+                    slot_hash = slot_hashes[slot]
+                if not slot_hash:
+                    break
+                value = slot_values[slot]
+
+                # Verify complete matches against the stored phrase.
+                if value >> 1:
+                    candidate = (value >> 1) - 1
+                    phrase = " ".join(tokens[index : position + 1])
+                    if self.get_phrase(candidate) == phrase:
+                        if not do_longest:
+                            annotations.append(
+                                (
+                                    matches[index].start(),
+                                    matches[position].end(),
+                                    self.get_uis(candidate),
+                                )
+                            )
+                        stop = position
+                        phrase_index = candidate
+
+                if not value & 1:
+                    break
+
+            if do_longest and stop is not None:
+                annotations.append(
+                    (
+                        matches[index].start(),
+                        matches[stop].end(),
+                        self.get_uis(phrase_index),
+                    )
+                )
+                index = stop + 1
+            else:
+                index += 1
+
+        return annotations
+
+    def annotate(
+        self, texts: Iterable[str], do_longest: bool = True
+    ) -> List[List[Tuple[int, int, Tuple[str, ...]]]]:
+        """ Annotates a batch of texts through `annotate_text`.
+
+        Args:
+            texts (Iterable[str]): The texts to annotate.
+            do_longest (bool, optional): Whether to only keep the longest
+                phrase starting at each token. Defaults to `True`.
+
+        Returns:
+            List[List[Tuple[int, int, Tuple[str, ...]]]]: The annotations of
+                each text.
+        """
+
+        return [
+            self.annotate_text(text=text, do_longest=do_longest)
+            for text in texts
+        ]
+
+    def __len__(self) -> int:
+        return self.num_phrases
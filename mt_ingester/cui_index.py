@@ -0,0 +1,256 @@
+# coding=utf-8
+
+""" Persistent CUI-DUI index module
+
+This module contains the `CuiDuiIndex` class, a read-only mapping between UMLS
+CUIs and MeSH descriptor IDs backed by a memory-mapped, sorted, fixed-width
+file, as well as the functions used to key such index files on the MRSAT.RRF
+file they were built from so that they can be reused across runs and parsers.
+"""
+
+import os
+import struct
+import bisect
+import hashlib
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
+from mt_ingester.rrf import is_zip_location
+from mt_ingester.rrf import split_zip_location
+from mt_ingester.utils import MappedFile
+from mt_ingester.utils import open_atomic
+
+
+# The magic bytes identifying an index file.
+MAGIC = b"MTCUIDUI"
+
+# The header holding the magic bytes, the CUI width, the DUI width, and the
+# number of records.
+HEADER = struct.Struct("<8sIIQ")
+
+# The number of records between consecutive CUIs kept in memory to narrow
+# lookups down to a single block of records.
+FENCE_STRIDE = 64
+
+# The number of bytes read from the head and tail of a file when computing its
+# key.
+DIGEST_SAMPLE_SIZE = 1 << 20
+
+
+def compute_file_key(filename: str) -> str:
+    """ Computes a key identifying the contents of a file from its size,
+        modification time, and a digest of its head and tail.
+
+    Notes:
+        Only the head and tail of the file are digested as hashing an entire
+        MRSAT.RRF file would cost as much as the scan the index is meant to
+        avoid.
+
+    Args:
+        filename (str): Path to the file.
+
+    Returns:
+        str: The file key.
+    """
+
+    stat = os.stat(filename)
+
+    digest = hashlib.sha1()
+    with open(filename, "rb") as finp:
+        digest.update(finp.read(DIGEST_SAMPLE_SIZE))
+        if stat.st_size > DIGEST_SAMPLE_SIZE:
+            finp.seek(
+                max(DIGEST_SAMPLE_SIZE, stat.st_size - DIGEST_SAMPLE_SIZE)
+            )
+            digest.update(finp.read())
+
+    key = "{}-{}-{}".format(
+        stat.st_size, stat.st_mtime_ns, digest.hexdigest()[:16]
+    )
+
+    return key
+
+
+def get_index_filename(dirname_index: str, filename_mrsat_rrf: str) -> str:
+    """ Assembles the path of the index file of an MRSAT.RRF file.
+
+    Notes:
+        The index of a file read from a zip archive is keyed on the archive
+        and the path of the member within it.
+
+    Args:
+        dirname_index (str): The directory holding the index files.
+        filename_mrsat_rrf (str): Path to the MRSAT.RRF file or a `zip://`
+            location.
+
+    Returns:
+        str: Path to the index file.
+    """
+
+    if is_zip_location(filename_mrsat_rrf):
+        filename_archive, members = split_zip_location(filename_mrsat_rrf)
+        key = "{}-{}".format(
+            compute_file_key(filename_archive),
+            hashlib.sha1("!".join(members).encode("utf-8")).hexdigest()[:8],
+        )
+    else:
+        key = compute_file_key(filename_mrsat_rrf)
+
+    filename_index = os.path.join(dirname_index, "MRSAT-{}.idx".format(key))
+
+    return filename_index
+
+
+class CuiDuiIndex(MappedFile, Mapping):
+    """ Read-only mapping between UMLS CUIs and MeSH descriptor IDs backed by
+        a memory-mapped index file.
+
+    Notes:
+        The index file holds a fixed-size header followed by fixed-width
+        records, space-padded and sorted by CUI. Every `FENCE_STRIDE`-th CUI
+        is kept in memory so that a lookup bisects that list and searches a
+        single block of the mapped file for the CUI, see `MappedFile`.
+    """
+
+    attr_filename = "filename_index"
+
+    def __init__(self, filename_index: str):
+        """ Constructor and initialization.
+
+        Args:
+            filename_index (str): Path to the index file.
+        """
+
+        # Internalize arguments.
+        self.filename_index = filename_index
+
+        self._open()
+
+    def _open(self):
+        """ Maps the index file and reads its header."""
+
+        self._map(offset=HEADER.size)
+
+        magic = None
+        if len(self._mmap) >= HEADER.size:
+            (
+                magic,
+                self.cui_width,
+                self.dui_width,
+                self.count,
+            ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            msg = "File '{}' is not a CUI-DUI index."
+            msg_fmt = msg.format(self.filename_index)
+            raise ValueError(msg_fmt)
+
+        self.record_width = self.cui_width + self.dui_width
+        self._block_width = FENCE_STRIDE * self.record_width
+
+        # The last CUI looked up and its record offset as the parsers look a
+        # CUI up twice and the RRF files are grouped by CUI.
+        self._last = (None, None)
+
+        # An empty index, e.g., of a file without MeSH rows, has no records
+        # to fence and zero-width ones.
+        self._fences = []
+        if self.count:
+            self._fences = [
+                self._mmap[offset : offset + self.cui_width]
+                for offset in range(
+                    HEADER.size,
+                    HEADER.size + self.count * self.record_width,
+                    self._block_width,
+                )
+            ]
+
+    @classmethod
+    def build(
+        cls, filename_index: str, map_cui_dui: Dict[str, str]
+    ) -> "CuiDuiIndex":
+        """ Writes a mapping between UMLS CUIs and MeSH descriptor IDs to an
+            index file, through `utils.open_atomic`, and opens it.
+
+        Args:
+            filename_index (str): Path to the index file.
+            map_cui_dui (Dict[str, str]): The mapping to write.
+
+        Returns:
+            CuiDuiIndex: The index opened over the written file.
+        """
+
+        cuis = sorted(map_cui_dui)
+        cui_width = max([len(cui.encode("utf-8")) for cui in cuis] or [0])
+        dui_width = max(
+            [len(dui.encode("utf-8")) for dui in map_cui_dui.values()] or [0]
+        )
+
+        with open_atomic(filename=filename_index) as fout:
+            fout.write(HEADER.pack(MAGIC, cui_width, dui_width, len(cuis)))
+            for cui in cuis:
+                fout.write(cui.encode("utf-8").ljust(cui_width))
+                fout.write(map_cui_dui[cui].encode("utf-8").ljust(dui_width))
+
+        # Never leave an index that can't be opened in place for later runs
+        # to reuse.
+        try:
+            return cls(filename_index=filename_index)
+        except BaseException:
+            os.remove(filename_index)
+            raise
+
+    def _find(self, cui: str) -> Optional[int]:
+        """ Retrieves the offset of the record of a CUI or `None` if the CUI
+            isn't in the index.
+        """
+
+        if cui == self._last[0]:
+            return self._last[1]
+
+        key = cui.encode("utf-8")
+        if len(key) < self.cui_width:
+            key = key.ljust(self.cui_width)
+
+        offset = None
+
+        # Find the block whose first CUI is the last one not after the key
+        # and search that block for the key. Only matches aligned to the start
+        # of a record are CUIs.
+        index_block = bisect.bisect_right(self._fences, key) - 1
+        if index_block >= 0 and len(key) == self.cui_width:
+            start = HEADER.size + index_block * self._block_width
+            block = self._mmap[start : start + self._block_width]
+            position = block.find(key)
+            while position != -1:
+                if position % self.record_width == 0:
+                    offset = start + position
+                    break
+                position = block.find(key, position + 1)
+
+        self._last = (cui, offset)
+
+        return offset
+
+    def __getitem__(self, cui: str) -> str:
+        offset = self._find(cui)
+        if offset is None:
+            raise KeyError(cui)
+
+        dui = self._mmap[
+            offset + self.cui_width : offset + self.record_width
+        ].rstrip(b" ")
+
+        return dui.decode("utf-8")
+
+    def __contains__(self, cui) -> bool:
+        return isinstance(cui, str) and self._find(cui) is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.count):
+            offset = HEADER.size + index * self.record_width
+            cui = self._mmap[offset : offset + self.cui_width].rstrip(b" ")
+            yield cui.decode("utf-8")
@@ -0,0 +1,291 @@
+# coding=utf-8
+
+""" Packed CUI-DUI map module
+
+This module contains the `CuiDuiMap` class, an in-memory read-only mapping
+between UMLS CUIs and MeSH descriptor IDs which packs both into integers held
+in a hash table of parallel arrays, as well as the functions used to encode
+and decode such identifiers.
+"""
+
+import re
+import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# The number of bits of the encoded identifiers holding the numeric tail, the
+# number of digits of the tail, and the prefix letter.
+BITS_NUMBER = 50
+BITS_NUM_DIGITS = 6
+
+# The initial number of slots of the hash table and the fraction of slots that
+# may be used before it's doubled.
+MIN_CAPACITY = 1024
+MAX_LOAD_FACTOR = 0.6
+
+# The multiplier spreading encoded CUIs over the hash table, i.e., 2^64 divided
+# by the golden ratio.
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+HASH_MASK = (1 << 64) - 1
+
+# The identifiers that can be encoded, i.e., an uppercase letter followed by at
+# most 15 digits which fit in `BITS_NUMBER`.
+regex_ui = re.compile(r"[A-Z][0-9]{1,15}")
+
+
+def encode_ui(ui: str) -> Optional[int]:
+    """ Packs a UMLS or MeSH identifier, i.e., a single uppercase letter
+        followed by a numeric tail like `C0024537` or `D016780`, into an
+        integer.
+
+    Notes:
+        The number of digits of the tail is encoded along with its value so
+        that zero-padding is preserved.
+
+    Args:
+        ui (str): The identifier to encode.
+
+    Returns:
+        Optional[int]: The encoded identifier or `None` if the identifier
+            doesn't follow the expected format.
+    """
+
+    if not regex_ui.fullmatch(ui):
+        return None
+
+    code = (
+        (ord(ui[0]) << (BITS_NUMBER + BITS_NUM_DIGITS))
+        | ((len(ui) - 1) << BITS_NUMBER)
+        | int(ui[1:])
+    )
+
+    return code
+
+
+def decode_ui(code: int) -> str:
+    """ Unpacks an identifier encoded through `encode_ui`.
+
+    Args:
+        code (int): The encoded identifier.
+
+    Returns:
+        str: The identifier.
+    """
+
+    prefix = chr(code >> (BITS_NUMBER + BITS_NUM_DIGITS))
+    num_digits = (code >> BITS_NUMBER) & ((1 << BITS_NUM_DIGITS) - 1)
+    number = code & ((1 << BITS_NUMBER) - 1)
+
+    return "{0}{1:0{2}d}".format(prefix, number, num_digits)
+
+
+class CuiDuiMap(Mapping):
+    """ Read-only mapping between UMLS CUIs and MeSH descriptor IDs packed into
+        a hash table of integers.
+
+    Notes:
+        CUIs are encoded through `encode_ui` while DUIs, of which there are
+        far fewer, are replaced by their index in a list of distinct DUIs.
+        Both are held in parallel arrays forming an open-addressing hash table
+        with linear probing so that a pair takes ~20 bytes rather than the
+        ~200 bytes of a dictionary entry between two strings. CUIs that can't
+        be encoded are kept in a regular dictionary.
+
+        When a CUI appears several times the last pair wins as when filling a
+        dictionary.
+    """
+
+    def __init__(self, capacity: int = MIN_CAPACITY):
+        """ Constructor and initialization.
+
+        Notes:
+            Instances should be created through the `from_pairs` and `merge`
+            class methods.
+
+        Args:
+            capacity (int, optional): The number of pairs to allocate room
+                for. Defaults to `MIN_CAPACITY`.
+        """
+
+        self._allocate(capacity=capacity)
+
+        # The distinct DUIs where index zero marks an empty slot.
+        self._duis_distinct = [None]  # type: List[Optional[str]]
+
+        self._overflow = {}  # type: Dict[str, str]
+
+        # The last CUI looked up and its slot as the parsers look a CUI up
+        # twice and the RRF files are grouped by CUI.
+        self._last = (None, None)
+
+    def _allocate(self, capacity: int):
+        """ Allocates an empty hash table with room for a number of pairs."""
+
+        num_slots = MIN_CAPACITY
+        while num_slots * MAX_LOAD_FACTOR < capacity:
+            num_slots *= 2
+
+        self._cuis = array.array("Q", bytes(8 * num_slots))
+        self._duis = array.array("I", bytes(4 * num_slots))
+        self._shift = 64 - (num_slots.bit_length() - 1)
+        self._mask = num_slots - 1
+        self._count = 0
+        self._max_count = int(num_slots * MAX_LOAD_FACTOR)
+
+    def _probe(self, code_cui: int) -> int:
+        """ Retrieves the slot holding an encoded CUI or the empty slot it
+            would be inserted at.
+        """
+
+        cuis = self._cuis
+        mask = self._mask
+
+        # Spread the consecutive encoded CUIs through Fibonacci hashing.
+        slot = ((code_cui * HASH_MULTIPLIER) & HASH_MASK) >> self._shift
+        while True:
+            key = cuis[slot]
+            if key == code_cui or key == 0:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _insert(self, code_cui: int, index_dui: int):
+        """ Sets the DUI index of an encoded CUI growing the table if full."""
+
+        slot = self._probe(code_cui)
+        if self._cuis[slot] == 0:
+            self._cuis[slot] = code_cui
+            self._count += 1
+        self._duis[slot] = index_dui
+
+        if self._count > self._max_count:
+            self._grow()
+
+    def _grow(self):
+        """ Doubles the table and reinserts the pairs."""
+
+        cuis = self._cuis
+        duis = self._duis
+
+        self._allocate(capacity=self._count * 2)
+        for code_cui, index_dui in zip(cuis, duis):
+            if code_cui != 0:
+                slot = self._probe(code_cui)
+                self._cuis[slot] = code_cui
+                self._duis[slot] = index_dui
+                self._count += 1
+
+    def _index_dui(self, dui: str, dui_indices: Dict[str, int]) -> int:
+        """ Retrieves the index of a DUI among the distinct DUIs adding it if
+            needed.
+
+        Notes:
+            The indices of the distinct DUIs are only kept while the map is
+            built and are therefore passed in.
+        """
+
+        index_dui = dui_indices.get(dui)
+        if index_dui is None:
+            index_dui = len(self._duis_distinct)
+            dui_indices[dui] = index_dui
+            self._duis_distinct.append(dui)
+
+        return index_dui
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, str]]) -> "CuiDuiMap":
+        """ Creates a map from `(cui, dui)` pairs.
+
+        Args:
+            pairs (Iterable[Tuple[str, str]]): The pairs in file order.
+
+        Returns:
+            CuiDuiMap: The map.
+        """
+
+        map_cui_dui = cls()
+        dui_indices = {}  # type: Dict[str, int]
+        for cui, dui in pairs:
+            code_cui = encode_ui(cui)
+            if code_cui is None:
+                map_cui_dui._overflow[cui] = dui
+            else:
+                map_cui_dui._insert(
+                    code_cui, map_cui_dui._index_dui(dui, dui_indices)
+                )
+
+        return map_cui_dui
+
+    @classmethod
+    def merge(cls, maps: Sequence["CuiDuiMap"]) -> "CuiDuiMap":
+        """ Merges maps created over consecutive parts of a file where the
+            pairs of later maps override those of earlier ones.
+
+        Args:
+            maps (Sequence[CuiDuiMap]): The maps in file order.
+
+        Returns:
+            CuiDuiMap: The merged map.
+        """
+
+        maps = list(maps)
+        if len(maps) == 1:
+            return maps[0]
+
+        map_merged = cls(capacity=sum([len(map_part) for map_part in maps]))
+        dui_indices = {}  # type: Dict[str, int]
+        for map_part in maps:
+            # Translate the DUI indices of the part to those of the merged map.
+            indices_merged = [0] + [
+                map_merged._index_dui(dui, dui_indices)
+                for dui in map_part._duis_distinct[1:]
+            ]
+
+            for code_cui, index_dui in zip(map_part._cuis, map_part._duis):
+                if code_cui != 0:
+                    map_merged._insert(code_cui, indices_merged[index_dui])
+            map_merged._overflow.update(map_part._overflow)
+
+        return map_merged
+
+    def _find(self, cui: str) -> Optional[int]:
+        """ Retrieves the slot of the pair of a CUI or `None` if the CUI isn't
+            in the hash table.
+        """
+
+        if cui == self._last[0]:
+            return self._last[1]
+
+        slot = None
+
+        code_cui = encode_ui(cui)
+        if code_cui is not None:
+            slot = self._probe(code_cui)
+            if self._cuis[slot] == 0:
+                slot = None
+
+        self._last = (cui, slot)
+
+        return slot
+
+    def __getitem__(self, cui: str) -> str:
+        slot = self._find(cui)
+        if slot is not None:
+            return self._duis_distinct[self._duis[slot]]
+
+        return self._overflow[cui]
+
+    def __contains__(self, cui) -> bool:
+        if not isinstance(cui, str):
+            return False
+
+        return self._find(cui) is not None or cui in self._overflow
+
+    def __len__(self) -> int:
+        return self._count + len(self._overflow)
+
+    def __iter__(self) -> Iterator[str]:
+        for code_cui in self._cuis:
+            if code_cui != 0:
+                yield decode_ui(code_cui)
+        yield from self._overflow
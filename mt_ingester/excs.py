@@ -24,3 +24,19 @@ class ConfigFileInvalid(Exception):
 
     def __init__(self, message, *args):
         super(ConfigFileInvalid, self).__init__(message, *args)
+
+
+class ShadowSchemaInvalid(Exception):
+    """ Exception raised when a shadow schema fails validation."""
+
+    def __init__(self, message, *args):
+        super(ShadowSchemaInvalid, self).__init__(message, *args)
+
+
+class BackendUnavailable(Exception):
+    """ Exception raised when the optional dependencies of a parsing backend
+        are not installed.
+    """
+
+    def __init__(self, message, *args):
+        super(BackendUnavailable, self).__init__(message, *args)
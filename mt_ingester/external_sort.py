@@ -0,0 +1,229 @@
+# coding=utf-8
+
+""" External sorting module
+
+This module contains the `ExternalSorter` class which sorts and deduplicates
+more items than should be held in memory by spilling sorted runs to temporary
+files and lazily merging them, as well as the `iterate_groups` function used to
+group the sorted `(key, value)` pairs it yields and the `estimate_size`
+function used to bound the memory taken by the buffered items.
+"""
+
+import os
+import sys
+import heapq
+import pickle
+import shutil
+import tempfile
+import itertools
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+
+def estimate_size(item: Any) -> int:
+    """ Estimates the memory taken by an item including the items of tuples
+        and lists as well as the pointer holding it in a list.
+
+    Args:
+        item (Any): The item.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+
+    size = sys.getsizeof(item) + 8
+    if isinstance(item, (tuple, list)):
+        size += sum([estimate_size(element) for element in item])
+
+    return size
+
+
+class ExternalSorter(object):
+    """ Class used to sort and deduplicate a stream of items in bounded memory.
+
+    Notes:
+        Items are buffered in memory until `max_items` are held, or their
+        estimated size exceeds `max_memory`, at which point the buffer is
+        sorted, deduplicated, and spilled to a temporary file as
+        a run of pickled chunks. Iterating over the sorter merges the runs and
+        the remaining buffer through `heapq.merge` only holding a chunk of
+        each run in memory.
+
+        The temporary files are removed once the sorter has been iterated
+        over or closed, including the runs of other sorters, e.g., in worker
+        processes, written under `dirname_runs` and added through
+        `add_runs`.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 1000000,
+        chunk_size: int = 10000,
+        dirname_tmp: Optional[str] = None,
+        max_memory: Optional[int] = None,
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            max_items (int, optional): The number of items buffered in memory
+                before a run is spilled to disk. Defaults to `1000000`.
+            chunk_size (int, optional): The number of items pickled together
+                within a run. Defaults to `10000`.
+            dirname_tmp (Optional[str]): The directory under which the
+                temporary run files are created. Defaults to `None` in which
+                case the default temporary directory is used.
+            max_memory (Optional[int]): The estimated size in bytes of the
+                buffered items, as per `estimate_size`, above which a run is
+                spilled to disk. Defaults to `None` in which case only
+                `max_items` bounds the buffer.
+        """
+
+        # Internalize arguments.
+        self.max_items = max_items
+        self.chunk_size = chunk_size
+        self.dirname_tmp = dirname_tmp
+        self.max_memory = max_memory
+
+        self.items = []  # type: List[Any]
+        # The estimated size of the buffered items when `max_memory` is set.
+        self.size = 0
+        self.filenames_runs = []  # type: List[str]
+
+        self._dirname_runs = None  # type: Optional[str]
+
+    @property
+    def dirname_runs(self) -> str:
+        """ The directory holding the run files, created on first access."""
+
+        if self._dirname_runs is None:
+            self._dirname_runs = tempfile.mkdtemp(
+                prefix="mt-ingester-", dir=self.dirname_tmp
+            )
+
+        return self._dirname_runs
+
+    def add(self, item: Any):
+        """ Adds an item spilling the buffered items to disk once `max_items`
+            are held or `max_memory` is exceeded.
+
+        Args:
+            item (Any): The item to add.
+        """
+
+        self.items.append(item)
+
+        if self.max_memory is not None:
+            self.size += estimate_size(item)
+            if self.size > self.max_memory:
+                self.spill()
+                return
+
+        if len(self.items) >= self.max_items:
+            self.spill()
+
+    def extend(self, items: Iterable[Any]):
+        """ Adds several items.
+
+        Args:
+            items (Iterable[Any]): The items to add.
+        """
+
+        for item in items:
+            self.add(item)
+
+    @staticmethod
+    def _sort_unique(items: List[Any]) -> List[Any]:
+        """ Sorts a list of items and removes duplicates."""
+
+        return [item for item, _ in itertools.groupby(sorted(items))]
+
+    def spill(self):
+        """ Sorts and deduplicates the buffered items and writes them to a new
+            run file.
+        """
+
+        if not self.items:
+            return
+
+        filename_run = os.path.join(
+            self.dirname_runs, "run-{:06d}".format(len(self.filenames_runs))
+        )
+        items = self._sort_unique(self.items)
+        self.items = []
+        self.size = 0
+
+        with open(filename_run, "wb") as fout:
+            for index in range(0, len(items), self.chunk_size):
+                pickle.dump(
+                    items[index : index + self.chunk_size],
+                    fout,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+
+        self.filenames_runs.append(filename_run)
+
+    def add_runs(self, filenames_runs: Iterable[str]):
+        """ Adds run files spilled by other sorters so that they're merged
+            with the runs of this sorter.
+
+        Args:
+            filenames_runs (Iterable[str]): The sorted and deduplicated run
+                files, e.g., spilled by sorters whose `dirname_tmp` is the
+                `dirname_runs` of this sorter so that they're removed along
+                with its own runs.
+        """
+
+        self.filenames_runs.extend(filenames_runs)
+
+    @staticmethod
+    def _iterate_run(filename_run: str) -> Iterator[Any]:
+        """ Yields the items of a run file chunk by chunk."""
+
+        with open(filename_run, "rb") as finp:
+            while True:
+                try:
+                    chunk = pickle.load(finp)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def __iter__(self) -> Iterator[Any]:
+        """ Yields the added items sorted and deduplicated."""
+
+        try:
+            runs = [
+                self._iterate_run(filename_run)
+                for filename_run in self.filenames_runs
+            ]
+            runs.append(iter(self._sort_unique(self.items)))
+            self.items = []
+            self.size = 0
+
+            merged = heapq.merge(*runs) if len(runs) > 1 else runs[0]
+            for item, _ in itertools.groupby(merged):
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        """ Removes the run files."""
+
+        if self._dirname_runs is not None:
+            shutil.rmtree(self._dirname_runs, ignore_errors=True)
+            self._dirname_runs = None
+        self.filenames_runs = []
+
+
+def iterate_groups(
+    pairs: Iterable[Tuple[Any, Any]]
+) -> Iterator[Tuple[Any, List[Any]]]:
+    """ Groups consecutive `(key, value)` pairs sharing a key.
+
+    Args:
+        pairs (Iterable[Tuple[Any, Any]]): The pairs sorted by key.
+
+    Yields:
+        Tuple[Any, List[Any]]: The key and the values of the pairs under it.
+    """
+
+    for key, group in itertools.groupby(pairs, key=lambda pair: pair[0]):
+        yield key, [value for _, value in group]
@@ -0,0 +1,388 @@
+# coding=utf-8
+
+""" Full-reload support module
+
+This module contains the `DeferredIndexes` context manager which drops the
+non-essential indexes and foreign-key constraints of the MeSH tables before a
+full reload and rebuilds them once the load completes or aborts.
+"""
+
+import os
+import signal
+import concurrent.futures
+from typing import List, Dict, Optional
+
+import ujson
+import sqlalchemy
+
+from fform.orm_base import Base
+from fform.orm_mt import Descriptor
+
+from mt_ingester.loggers import create_logger
+
+# Register the tables derived by `mt-ingester` with the ORM metadata.
+from mt_ingester import orm  # noqa: F401
+
+
+def get_mesh_schema() -> str:
+    """ Retrieves the name of the schema the MeSH tables are defined under.
+
+    Returns:
+        str: The schema name.
+    """
+
+    return Descriptor.__table__.schema or "public"
+
+
+def get_mesh_table_names() -> List[str]:
+    """ Retrieves the names of the tables defined under the MeSH schema.
+
+    Returns:
+        List[str]: The table names.
+    """
+
+    schema = Descriptor.__table__.schema
+
+    table_names = [
+        table.name
+        for table in Base.metadata.sorted_tables
+        if table.schema == schema
+    ]
+
+    return table_names
+
+
+class DeferredIndexes(object):
+    """ Context manager that drops the non-unique indexes and foreign-key
+        constraints of a set of tables upon entry and recreates them, followed
+        by an `ANALYZE`, upon exit regardless of whether the load succeeded.
+
+    Notes:
+        Unique indexes and primary keys are retained as they back the
+        `ON CONFLICT` clauses of the DAL upserts.
+
+        The dropped definitions are written to a JSON state file prior to being
+        dropped. Should the process be killed before they're restored, the next
+        run will restore them from that file before doing anything else.
+    """
+
+    # Query retrieving the non-unique indexes not backing any constraint.
+    sql_indexes = """
+        SELECT t.relname AS table_name,
+               i.relname AS index_name,
+               pg_get_indexdef(i.oid) AS definition
+        FROM pg_index AS x
+        JOIN pg_class AS i ON i.oid = x.indexrelid
+        JOIN pg_class AS t ON t.oid = x.indrelid
+        JOIN pg_namespace AS n ON n.oid = t.relnamespace
+        WHERE n.nspname = :schema
+          AND t.relname = ANY(:table_names)
+          AND NOT x.indisunique
+          AND NOT x.indisprimary
+          AND NOT EXISTS (
+            SELECT 1 FROM pg_constraint AS c WHERE c.conindid = x.indexrelid
+          )
+        ORDER BY t.relname, i.relname
+    """
+
+    # Query retrieving the foreign-key constraints.
+    sql_foreign_keys = """
+        SELECT t.relname AS table_name,
+               c.conname AS constraint_name,
+               pg_get_constraintdef(c.oid) AS definition
+        FROM pg_constraint AS c
+        JOIN pg_class AS t ON t.oid = c.conrelid
+        JOIN pg_namespace AS n ON n.oid = t.relnamespace
+        WHERE c.contype = 'f'
+          AND n.nspname = :schema
+          AND t.relname = ANY(:table_names)
+        ORDER BY t.relname, c.conname
+    """
+
+    def __init__(
+        self,
+        engine: sqlalchemy.engine.Engine,
+        schema: str,
+        table_names: List[str],
+        filename_state: str,
+        num_workers: int = 4,
+        **kwargs
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): The engine connected to the
+                database holding the tables.
+            schema (str): The schema the tables reside in.
+            table_names (List[str]): The names of the tables whose indexes and
+                foreign-keys will be deferred.
+            filename_state (str): Path to the JSON file where the dropped
+                definitions are stored until they are restored.
+            num_workers (int, optional): The number of connections used to
+                rebuild indexes and analyze tables in parallel. Defaults to
+                `4`.
+        """
+
+        # Internalize arguments.
+        self.engine = engine
+        self.schema = schema
+        self.table_names = table_names
+        self.filename_state = filename_state
+        self.num_workers = num_workers
+
+        self.logger = create_logger(
+            logger_name=type(self).__name__,
+            logger_level=kwargs.get("logger_level", "DEBUG"),
+        )
+
+        self._sigterm_handler = None
+
+    def _quote(self, identifier: str) -> str:
+        """ Quotes an SQL identifier."""
+
+        return self.engine.dialect.identifier_preparer.quote(identifier)
+
+    def _qualify(self, name: str) -> str:
+        """ Quotes and schema-qualifies an SQL identifier."""
+
+        return "{}.{}".format(self._quote(self.schema), self._quote(name))
+
+    def _execute_parallel(self, statements: List[str]):
+        """ Executes independent statements in parallel, each in its own
+            connection and transaction.
+
+        Args:
+            statements (List[str]): The SQL statements to execute.
+
+        Raises:
+            Exception: The first exception raised by any of the statements
+                after all of them have been attempted.
+        """
+
+        def execute(statement: str):
+            with self.engine.begin() as connection:
+                # Allow the server to use parallel workers when building
+                # indexes (PostgreSQL 11+).
+                if connection.dialect.server_version_info >= (11,):
+                    connection.execute(
+                        "SET max_parallel_maintenance_workers TO {}".format(
+                            self.num_workers
+                        )
+                    )
+                connection.execute(statement)
+
+        errors = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.num_workers
+        ) as executor:
+            futures = {
+                executor.submit(execute, statement): statement
+                for statement in statements
+            }
+            for future in concurrent.futures.as_completed(futures):
+                exc = future.exception()
+                if exc is not None:
+                    msg = "Statement '{}' failed: {}"
+                    msg_fmt = msg.format(futures[future], exc)
+                    self.logger.error(msg_fmt)
+                    errors.append(exc)
+
+        if errors:
+            raise errors[0]
+
+    def retrieve_definitions(self) -> Dict[str, List[dict]]:
+        """ Retrieves the definitions of the indexes and foreign-key
+            constraints to be deferred.
+
+        Returns:
+            Dict[str, List[dict]]: Dictionary with `indexes` and `foreign_keys`
+                keys valued with lists of the retrieved definitions.
+        """
+
+        params = {"schema": self.schema, "table_names": self.table_names}
+
+        with self.engine.connect() as connection:
+            indexes = [
+                dict(row)
+                for row in connection.execute(
+                    sqlalchemy.text(self.sql_indexes), params
+                )
+            ]
+            foreign_keys = [
+                dict(row)
+                for row in connection.execute(
+                    sqlalchemy.text(self.sql_foreign_keys), params
+                )
+            ]
+
+        return {"indexes": indexes, "foreign_keys": foreign_keys}
+
+    def drop(self) -> Dict[str, List[dict]]:
+        """ Drops the non-unique indexes and foreign-key constraints of the
+            tables after storing their definitions in the state file.
+
+        Returns:
+            Dict[str, List[dict]]: The definitions of the dropped indexes and
+                foreign-key constraints.
+        """
+
+        definitions = self.retrieve_definitions()
+
+        with open(self.filename_state, "w") as fout:
+            ujson.dump(definitions, fout)
+
+        msg = "Dropping {} indexes and {} foreign-keys on {} tables."
+        msg_fmt = msg.format(
+            len(definitions["indexes"]),
+            len(definitions["foreign_keys"]),
+            len(self.table_names),
+        )
+        self.logger.info(msg_fmt)
+
+        with self.engine.begin() as connection:
+            for foreign_key in definitions["foreign_keys"]:
+                connection.execute(
+                    "ALTER TABLE {} DROP CONSTRAINT IF EXISTS {}".format(
+                        self._qualify(foreign_key["table_name"]),
+                        self._quote(foreign_key["constraint_name"]),
+                    )
+                )
+            for index in definitions["indexes"]:
+                connection.execute(
+                    "DROP INDEX IF EXISTS {}".format(
+                        self._qualify(index["index_name"])
+                    )
+                )
+
+        return definitions
+
+    def restore(self, definitions: Optional[Dict[str, List[dict]]] = None):
+        """ Recreates previously dropped indexes and foreign-key constraints
+            and analyzes the tables. The state file is removed once all
+            definitions have been restored.
+
+        Args:
+            definitions (Optional[Dict[str, List[dict]]]): The definitions to
+                restore. Defaults to `None` in which case they're read from the
+                state file.
+        """
+
+        if definitions is None:
+            with open(self.filename_state, "r") as finp:
+                definitions = ujson.load(finp)
+
+        msg = "Rebuilding {} indexes and {} foreign-keys."
+        msg_fmt = msg.format(
+            len(definitions["indexes"]), len(definitions["foreign_keys"])
+        )
+        self.logger.info(msg_fmt)
+
+        # Rebuild the indexes in parallel. Indexes that already exist, e.g.,
+        # restored by a previous run, are skipped.
+        self._execute_parallel(
+            [
+                index["definition"].replace(
+                    "CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1
+                )
+                for index in definitions["indexes"]
+            ]
+        )
+
+        # Restore the foreign-keys as `NOT VALID` so they're enforced from this
+        # point on, and validate them against the loaded rows separately so
+        # that a violation doesn't prevent the remaining ones from being
+        # restored.
+        with self.engine.begin() as connection:
+            for foreign_key in definitions["foreign_keys"]:
+                connection.execute(
+                    "ALTER TABLE {} DROP CONSTRAINT IF EXISTS {}".format(
+                        self._qualify(foreign_key["table_name"]),
+                        self._quote(foreign_key["constraint_name"]),
+                    )
+                )
+                connection.execute(
+                    "ALTER TABLE {} ADD CONSTRAINT {} {} NOT VALID".format(
+                        self._qualify(foreign_key["table_name"]),
+                        self._quote(foreign_key["constraint_name"]),
+                        foreign_key["definition"],
+                    )
+                )
+
+        for foreign_key in definitions["foreign_keys"]:
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        "ALTER TABLE {} VALIDATE CONSTRAINT {}".format(
+                            self._qualify(foreign_key["table_name"]),
+                            self._quote(foreign_key["constraint_name"]),
+                        )
+                    )
+            except sqlalchemy.exc.IntegrityError as exc:
+                msg = "Foreign-key '{}' left unvalidated: {}"
+                msg_fmt = msg.format(foreign_key["constraint_name"], exc)
+                self.logger.error(msg_fmt)
+
+        if os.path.exists(self.filename_state):
+            os.remove(self.filename_state)
+
+        # Skip the tables missing from the schema, e.g., tables added to the
+        # ORM metadata after the schema was created which haven't been
+        # written to.
+        with self.engine.connect() as connection:
+            table_names = [
+                table_name
+                for table_name in self.table_names
+                if connection.dialect.has_table(
+                    connection, table_name, schema=self.schema
+                )
+            ]
+
+        msg = "Analyzing {} tables."
+        msg_fmt = msg.format(len(table_names))
+        self.logger.info(msg_fmt)
+
+        self._execute_parallel(
+            [
+                "ANALYZE {}".format(self._qualify(table_name))
+                for table_name in table_names
+            ]
+        )
+
+    def __enter__(self):
+
+        # Restore the definitions of a previous run that never completed.
+        if os.path.exists(self.filename_state):
+            msg = "Restoring definitions left over in state file '{}'."
+            msg_fmt = msg.format(self.filename_state)
+            self.logger.warning(msg_fmt)
+            self.restore()
+
+        # Turn `SIGTERM` into an exception so that `__exit__` runs.
+        def raise_system_exit(signum, frame):
+            raise SystemExit(128 + signum)
+
+        self._sigterm_handler = signal.signal(signal.SIGTERM, raise_system_exit)
+
+        # `__exit__` doesn't run when `__enter__` fails so the handler is
+        # restored here.
+        try:
+            self.drop()
+        except BaseException:
+            signal.signal(signal.SIGTERM, self._sigterm_handler)
+            raise
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+
+        try:
+            if exc_type is not None:
+                msg = "Load aborted with '{}'. Restoring indexes."
+                msg_fmt = msg.format(exc_val)
+                self.logger.error(msg_fmt)
+
+            self.restore()
+        finally:
+            signal.signal(signal.SIGTERM, self._sigterm_handler)
+
+        return False
@@ -2,17 +2,31 @@
 
 import abc
 import hashlib
-from typing import Union, List, Dict
+import time
+from typing import Union, List, Dict, Iterable, Tuple
 
+import sqlalchemy
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert
 from fform.orm_mt import Concept
 from fform.orm_mt import Descriptor
+from fform.orm_mt import DescriptorSynonym
+from fform.orm_mt import DescriptorDefinition
 from fform.orm_mt import Qualifier
+from fform.orm_mt import TreeNumber
 from fform.orm_mt import EntryCombinationType
 from fform.orm_mt import DescriptorDefinitionSourceType
 from fform.dals_mt import DalMesh
 
 from mt_ingester.loggers import create_logger
+from mt_ingester.orm import TreeNumberClosure
+from mt_ingester.orm import TreeNumberKey
+from mt_ingester.tree_numbers import encode_tree_number
+from mt_ingester.tree_numbers import get_tree_number_closure
+from mt_ingester.tree_numbers import get_tree_number_ids_missing
 from mt_ingester.utils import log_ingestion_of_document
+from mt_ingester.utils import chunk_iterable
+from mt_ingester.utils import call_dal
 
 
 class IngesterDocumentBase(object):
@@ -201,7 +215,7 @@ class IngesterDocumentQualifier(IngesterDocumentBase):
         """
 
         super(IngesterDocumentQualifier, self).__init__(
-            dal=dal, do_ingest_links=do_ingest_links, kwargs=kwargs
+            dal=dal, do_ingest_links=do_ingest_links, **kwargs
         )
 
     @log_ingestion_of_document(document_name="QualifierRecord")
@@ -268,7 +282,7 @@ class IngesterDocumentSupplemental(IngesterDocumentBase):
         """
 
         super(IngesterDocumentSupplemental, self).__init__(
-            dal=dal, do_ingest_links=do_ingest_links, kwargs=kwargs
+            dal=dal, do_ingest_links=do_ingest_links, **kwargs
         )
 
     @log_ingestion_of_document(document_name="SupplementalRecord")
@@ -401,20 +415,48 @@ class IngesterDocumentSupplemental(IngesterDocumentBase):
 
 
 class IngesterDocumentDescriptor(IngesterDocumentBase):
-    """Class to ingest a parsed XML `<DescriptorRecord>` document."""
+    """Class to ingest a parsed XML `<DescriptorRecord>` document.
 
-    def __init__(self, dal: DalMesh, do_ingest_links: bool, **kwargs):
+    Notes:
+        The IDs of the ingested tree numbers are collected across documents
+        so that their closure and keys can be computed in memory and written
+        in bulk through `ingest_tree_number_closure` and
+        `ingest_tree_number_keys` once all documents have been ingested.
+    """
+
+    def __init__(
+        self,
+        dal: DalMesh,
+        do_ingest_links: bool,
+        do_ingest_tree_number_closure: bool = True,
+        batch_size: int = 50000,
+        **kwargs
+    ):
         """Constructor and initialization.
 
         Args:
             dal (DalMesh): The `DalMesh` instance that will facilitate storing
                 the qualifier dictionary to the DB.
+            do_ingest_tree_number_closure (bool, optional): Whether to collect
+                the ingested tree numbers for `ingest_tree_number_closure`
+                and `ingest_tree_number_keys`. Defaults to `True`.
+            batch_size (int, optional): The maximum number of tree-number
+                closure or key rows inserted per statement. Defaults to
+                `50000`.
         """
 
         super(IngesterDocumentDescriptor, self).__init__(
-            dal=dal, do_ingest_links=do_ingest_links, kwargs=kwargs
+            dal=dal, do_ingest_links=do_ingest_links, **kwargs
         )
 
+        # Internalize arguments.
+        self.do_ingest_tree_number_closure = do_ingest_tree_number_closure
+        self.batch_size = batch_size
+
+        # The IDs of the ingested `TreeNumber` records keyed on their tree
+        # numbers.
+        self.tree_number_ids = {}  # type: Dict[str, int]
+
     @log_ingestion_of_document(document_name="DescriptorRecord")
     def ingest(self, doc: dict) -> Union[int, None]:
         """Ingests a parsed element of type `<DescriptorRecord>` and creates a
@@ -554,6 +596,10 @@ class IngesterDocumentDescriptor(IngesterDocumentBase):
                 descriptor_id=descriptor_id, tree_number_id=tree_number_id
             )
 
+            if self.do_ingest_tree_number_closure:
+                tree_number = doc_tree_number.get("TreeNumber")
+                self.tree_number_ids[tree_number] = tree_number_id
+
         # Upsert the `Concept` and `DescriptorConcept` records.
         for doc_concept in doc.get("ConceptList", []):
             # Upsert the `Concept` record.
@@ -567,137 +613,546 @@ class IngesterDocumentDescriptor(IngesterDocumentBase):
 
         return descriptor_id
 
+    def get_tree_number_ids(self, tree_numbers: List[str]) -> Dict[str, int]:
+        """ Resolves tree numbers to the primary-key IDs of the corresponding
+            `TreeNumber` records through chunked `IN (...)` queries.
 
-class IngesterUmlsConso(object):
-    """ Class used to ingest the MeSH descriptor synonyms parsed from the UMLS
-        MRCONSO.RRF through the `ParserUmlsConso` class and .
+        Args:
+            tree_numbers (List[str]): The tree numbers to resolve.
+
+        Returns:
+            Dict[str, int]: Dictionary keyed on the tree numbers that were
+                found in the database with values of the `TreeNumber` IDs.
+        """
+
+        tree_number_ids = {}
+        for tree_numbers_chunk in chunk_iterable(tree_numbers, 1000):
+            # noinspection PyTypeChecker
+            records = self.dal.bget_by_attr(
+                orm_class=TreeNumber,
+                attr_name="tree_number",
+                attr_values=tree_numbers_chunk,
+            )  # type: List[TreeNumber]
+
+            for record in records:
+                tree_number_ids[record.tree_number] = record.tree_number_id
+
+        return tree_number_ids
+
+    def ingest_tree_number_closure(self) -> int:
+        """ Computes the closure of the tree numbers ingested so far and
+            replaces their `TreeNumberClosure` records in a single
+            transaction.
+
+        Notes:
+            Ancestors that weren't ingested, e.g., when ingesting part of the
+            MeSH hierarchy, are resolved against the existing `TreeNumber`
+            records and skipped when missing.
+
+        Returns:
+            int: The number of `TreeNumberClosure` records inserted.
+        """
+
+        if not self.tree_number_ids:
+            return 0
+
+        time_start = time.perf_counter()
+
+        tree_number_ids = dict(self.tree_number_ids)
+        tree_numbers_missing = get_tree_number_ids_missing(tree_number_ids)
+        if tree_numbers_missing:
+            tree_number_ids.update(
+                self.get_tree_number_ids(tree_numbers=tree_numbers_missing)
+            )
+
+        # Assemble the closure rows as columns of IDs.
+        ancestor_ids = []
+        descendant_ids = []
+        depths = []
+        num_skipped = 0
+        for ancestor, descendant, depth in get_tree_number_closure(
+            self.tree_number_ids.keys()
+        ):
+            ancestor_id = tree_number_ids.get(ancestor)
+            if ancestor_id is None:
+                num_skipped += 1
+                continue
+
+            ancestor_ids.append(ancestor_id)
+            descendant_ids.append(tree_number_ids[descendant])
+            depths.append(depth)
+
+        if num_skipped:
+            msg = "Skipped {} closure rows of tree numbers missing ancestors."
+            msg_fmt = msg.format(num_skipped)
+            self.logger.warning(msg_fmt)
+
+        self.replace_rows(
+            orm_class=TreeNumberClosure,
+            column_name_id="descendant_tree_number_id",
+            columns={
+                "ancestor_tree_number_id": (
+                    ancestor_ids,
+                    sqlalchemy.BigInteger,
+                ),
+                "descendant_tree_number_id": (
+                    descendant_ids,
+                    sqlalchemy.BigInteger,
+                ),
+                "depth": (depths, sqlalchemy.SmallInteger),
+            },
+        )
+
+        duration = time.perf_counter() - time_start
+
+        msg = "Ingested {} closure rows for {} tree numbers in {:.2f} s."
+        msg_fmt = msg.format(len(depths), len(self.tree_number_ids), duration)
+        self.logger.info(msg_fmt)
+
+        return len(depths)
+
+    def ingest_tree_number_keys(self) -> int:
+        """ Encodes the tree numbers ingested so far through
+            `encode_tree_number` and replaces their `TreeNumberKey` records
+            in a single transaction.
+
+        Returns:
+            int: The number of `TreeNumberKey` records inserted.
+        """
+
+        if not self.tree_number_ids:
+            return 0
+
+        time_start = time.perf_counter()
+
+        self.replace_rows(
+            orm_class=TreeNumberKey,
+            column_name_id="tree_number_id",
+            columns={
+                "tree_number_id": (
+                    list(self.tree_number_ids.values()),
+                    sqlalchemy.BigInteger,
+                ),
+                "key": (
+                    [
+                        encode_tree_number(tree_number=tree_number)
+                        for tree_number in self.tree_number_ids.keys()
+                    ],
+                    sqlalchemy.LargeBinary,
+                ),
+            },
+        )
+
+        duration = time.perf_counter() - time_start
+
+        msg = "Ingested {} tree-number keys in {:.2f} s."
+        msg_fmt = msg.format(len(self.tree_number_ids), duration)
+        self.logger.info(msg_fmt)
+
+        return len(self.tree_number_ids)
+
+    def replace_rows(
+        self,
+        orm_class,
+        column_name_id: str,
+        columns: Dict[str, Tuple[list, type]],
+    ) -> None:
+        """ Replaces the rows of the table of an ORM class whose values under
+            a given column are among those inserted within a single
+            transaction.
+
+        Notes:
+            The columns are passed as arrays and unnested server-side so that
+            each statement inserts up to `batch_size` rows in a single round
+            trip. The table is created on databases predating it.
+
+            The statements bypass the DAL methods so they're routed through
+            `call_dal` for the DAL proxies, e.g., `DalInstrumented`, to
+            account for them.
+
+        Args:
+            orm_class: The ORM class whose table the rows are replaced in.
+            column_name_id (str): The name of the column whose inserted values
+                identify the rows to delete, e.g., `tree_number_id`.
+            columns (Dict[str, Tuple[list, type]]): The values of the rows to
+                insert and their SQLAlchemy type keyed on the column names.
+        """
+
+        call_dal(
+            dal=self.dal,
+            name="replace_rows",
+            func=self._replace_rows,
+            num_rows=len(columns[column_name_id][0]),
+            orm_class=orm_class,
+            column_name_id=column_name_id,
+            columns=columns,
+        )
+
+    def _replace_rows(
+        self,
+        orm_class,
+        column_name_id: str,
+        columns: Dict[str, Tuple[list, type]],
+    ) -> None:
+        """ Replaces the rows of a table, see `replace_rows`."""
+
+        table = orm_class.__table__
+        column_names = list(columns.keys())
+
+        statement_delete = table.delete().where(
+            table.c[column_name_id].in_(
+                sqlalchemy.bindparam("ids", expanding=True)
+            )
+        )
+        statement_insert = table.insert().from_select(
+            column_names,
+            sqlalchemy.select(
+                [
+                    sqlalchemy.func.unnest(
+                        sqlalchemy.bindparam(column_name, type_=ARRAY(type_))
+                    )
+                    for column_name, (_, type_) in columns.items()
+                ]
+            ),
+        )
+
+        ids = sorted(set(columns[column_name_id][0]))
+        num_rows = len(columns[column_name_id][0])
+
+        with self.dal.engine.begin() as connection:
+            table.create(bind=connection, checkfirst=True)
+
+            for ids_chunk in chunk_iterable(ids, self.batch_size):
+                connection.execute(statement_delete, {"ids": ids_chunk})
+
+            for start in range(0, num_rows, self.batch_size):
+                stop = start + self.batch_size
+                connection.execute(
+                    statement_insert,
+                    {
+                        column_name: values[start:stop]
+                        for column_name, (values, _) in columns.items()
+                    },
+                )
+
+
+class IngesterUmlsBase(object):
+    """ Base class for the ingesters of data parsed from the UMLS RRF files
+        which provides bulk resolution of MeSH descriptors.
     """
 
-    def __init__(self, dal: DalMesh, **kwargs):
+    def __init__(self, dal: DalMesh, batch_size: int = 1000, **kwargs):
         """ Constructor and initialization.
 
         Args:
             dal (DalMesh): The DAL class used to interact with the database.
+            batch_size (int, optional): The maximum number of descriptor UIs
+                resolved per `IN (...)` query and the maximum number of rows
+                inserted per statement. Defaults to `1000`.
         """
 
         # Internalize arguments.
         self.dal = dal
+        self.batch_size = batch_size
 
         self.logger = create_logger(
             logger_name=type(self).__name__,
             logger_level=kwargs.get("logger_level", "DEBUG"),
         )
 
-    def ingest(self, document: Dict[str, List[str]]) -> None:
+    def get_descriptor_ids(self, descriptor_uis: List[str]) -> Dict[str, int]:
+        """ Resolves MeSH descriptor UIs to the primary-key IDs of the
+            corresponding `Descriptor` records through chunked `IN (...)`
+            queries.
+
+        Args:
+            descriptor_uis (List[str]): The MeSH descriptor UIs to resolve.
+
+        Returns:
+            Dict[str, int]: Dictionary keyed on the descriptor UIs that were
+                found in the database with values of the `Descriptor` IDs.
+        """
+
+        descriptor_ids = {}
+        for descriptor_uis_chunk in chunk_iterable(
+            descriptor_uis, self.batch_size
+        ):
+            # noinspection PyTypeChecker
+            descriptors = self.dal.bget_by_attr(
+                orm_class=Descriptor,
+                attr_name="ui",
+                attr_values=descriptor_uis_chunk,
+            )  # type: List[Descriptor]
+
+            for descriptor in descriptors:
+                descriptor_ids[descriptor.ui] = descriptor.descriptor_id
+
+        return descriptor_ids
+
+    def log_missing_descriptors(self, descriptor_uis_missing: List[str]):
+        """ Emits a single warning summarizing the MeSH descriptor UIs for
+            which no `Descriptor` record was found.
+
+        Args:
+            descriptor_uis_missing (List[str]): The unresolved descriptor UIs.
+        """
+
+        if not descriptor_uis_missing:
+            return
+
+        msg = "No `Descriptor` records found for {} UIs, e.g., {}."
+        msg_fmt = msg.format(
+            len(descriptor_uis_missing),
+            ", ".join(
+                "'{}'".format(ui) for ui in sorted(descriptor_uis_missing)[:10]
+            ),
+        )
+        self.logger.warning(msg_fmt)
+
+    def insert_rows(self, orm_class, rows: List[dict]) -> int:
+        """ Inserts rows into the table of an ORM class through multi-row
+            `INSERT ... ON CONFLICT DO NOTHING` statements of at most
+            `batch_size` rows each.
+
+        Notes:
+            The statements bypass the DAL methods so they're routed through
+            `call_dal` for the DAL proxies, e.g., `DalInstrumented`, to
+            account for them.
+
+        Args:
+            orm_class: The ORM class whose table the rows are inserted into.
+            rows (List[dict]): The rows to insert as dictionaries keyed on the
+                column names.
+
+        Returns:
+            int: The number of rows inserted, i.e., excluding those skipped as
+                conflicting with existing ones.
+        """
+
+        num_rows_inserted = 0
+        for rows_chunk in chunk_iterable(rows, self.batch_size):
+            num_rows_inserted += call_dal(
+                dal=self.dal,
+                name="insert_rows",
+                func=self._insert_rows,
+                num_rows=len(rows_chunk),
+                orm_class=orm_class,
+                rows=rows_chunk,
+            )
+
+        return num_rows_inserted
+
+    def _insert_rows(self, orm_class, rows: List[dict]) -> int:
+        """ Inserts a chunk of rows in a single statement, see
+            `insert_rows`.
+        """
+
+        statement = insert(orm_class.__table__).values(rows)
+        statement = statement.on_conflict_do_nothing()
+
+        with self.dal.engine.begin() as connection:
+            result = connection.execute(statement)
+
+        return result.rowcount
+
+
+class IngesterUmlsConso(IngesterUmlsBase):
+    """ Class used to ingest the MeSH descriptor synonyms parsed from the UMLS
+        MRCONSO.RRF through the `ParserUmlsConso` class and .
+    """
+
+    def __init__(self, dal: DalMesh, batch_size: int = 1000, **kwargs):
+        """ Constructor and initialization.
+
+        Args:
+            dal (DalMesh): The DAL class used to interact with the database.
+            batch_size (int, optional): The maximum number of descriptor UIs
+                resolved per query and synonyms inserted per statement.
+                Defaults to `1000`.
+        """
+
+        super(IngesterUmlsConso, self).__init__(
+            dal=dal, batch_size=batch_size, **kwargs
+        )
+
+    def ingest(
+        self,
+        document: Union[
+            Dict[str, List[str]], Iterable[Tuple[str, List[str]]]
+        ],
+    ) -> None:
         """ The MRCONSO.RRF data dictionary parsed through the `ParserUmlsConso`
             class.
 
+        Notes:
+            The descriptors are resolved and their synonyms inserted
+            `batch_size` descriptors at a time so that a stream of groups,
+            e.g., yielded by `ParserUmlsConso.iterate_groups`, is ingested as
+            it's consumed.
+
         Args:
-            document (Dict[str, List[str]]): The MRCONSO.RRF data dictionary
-                parsed through the `ParserUmlsConso` class.
+            document (Union[Dict[str, List[str]], Iterable[Tuple[str,
+                List[str]]]]): The MRCONSO.RRF data dictionary parsed through
+                the `ParserUmlsConso` class or an iterable of descriptor UIs
+                and synonyms.
         """
 
-        msg = "Ingesting synonyms for {} MeSH descriptors."
-        msg_fmt = msg.format(len(document.keys()))
-        self.logger.info(msg_fmt)
+        if isinstance(document, dict):
+            msg = "Ingesting synonyms for {} MeSH descriptors."
+            msg_fmt = msg.format(len(document.keys()))
+            self.logger.info(msg_fmt)
 
-        # Iterate over the descriptor synonyms and ingest them according to the
-        # type of MeSH entity they're referring to.
-        for descriptor_ui, synonyms in document.items():
+            groups = document.items()
+        else:
+            groups = document
+
+        num_descriptors = 0
+        num_synonyms = 0
+        descriptor_uis_missing = []
+        for groups_chunk in chunk_iterable(groups, self.batch_size):
+            # Resolve the descriptor UIs of the chunk to `Descriptor` IDs.
+            descriptor_ids = self.get_descriptor_ids(
+                [descriptor_ui for descriptor_ui, _ in groups_chunk]
+            )
 
-            # Calculate the MD5s of the synonyms.
-            md5s = [
-                hashlib.md5(synonym.encode("utf-8")).digest()
-                for synonym in synonyms
-            ]
+            # Assemble the `DescriptorSynonym` rows for the resolved
+            # descriptors.
+            rows = []
+            for descriptor_ui, synonyms in groups_chunk:
+                descriptor_id = descriptor_ids.get(descriptor_ui)
+                if not descriptor_id:
+                    descriptor_uis_missing.append(descriptor_ui)
+                    continue
 
-            msg = "Ingesting synonyms for MeSH descriptor with UI '{}'."
-            msg_fmt = msg.format(descriptor_ui)
-            self.logger.info(msg_fmt)
+                num_descriptors += 1
 
-            # noinspection PyTypeChecker
-            descriptor = self.dal.get_by_attr(
-                orm_class=Descriptor, attr_name="ui", attr_value=descriptor_ui
-            )  # type: Descriptor
-
-            if not descriptor:
-                msg = "No `Descriptor` record found with UI '{}'."
-                msg_fmt = msg.format(descriptor_ui)
-                self.logger.warning(msg_fmt)
-                continue
+                for synonym in synonyms:
+                    rows.append(
+                        {
+                            "descriptor_id": descriptor_id,
+                            "synonym": synonym,
+                            "md5": hashlib.md5(
+                                synonym.encode("utf-8")
+                            ).digest(),
+                        }
+                    )
 
-            self.dal.biodi_descriptor_synonyms(
-                descriptor_id=descriptor.descriptor_id,
-                synonyms=synonyms,
-                md5s=md5s,
-            )
+            self.insert_rows(orm_class=DescriptorSynonym, rows=rows)
+            num_synonyms += len(rows)
+
+        self.log_missing_descriptors(descriptor_uis_missing)
+
+        msg = "Inserted {} synonyms for {} MeSH descriptors."
+        msg_fmt = msg.format(num_synonyms, num_descriptors)
+        self.logger.info(msg_fmt)
 
 
-class IngesterUmlsDef(object):
+class IngesterUmlsDef(IngesterUmlsBase):
     """ Class used to ingest the MeSH descriptor definitions parsed from the
         UMLS MRDEF.RRF through the `ParserUmlsDef` class.
     """
 
-    def __init__(self, dal: DalMesh, **kwargs):
+    def __init__(self, dal: DalMesh, batch_size: int = 1000, **kwargs):
         """ Constructor and initialization.
 
         Args:
             dal (DalMesh): The DAL class used to interact with the database.
+            batch_size (int, optional): The maximum number of descriptor UIs
+                resolved per query and definitions inserted per statement.
+                Defaults to `1000`.
         """
 
-        # Internalize arguments.
-        self.dal = dal
-
-        self.logger = create_logger(
-            logger_name=type(self).__name__,
-            logger_level=kwargs.get("logger_level", "DEBUG"),
+        super(IngesterUmlsDef, self).__init__(
+            dal=dal, batch_size=batch_size, **kwargs
         )
 
-    def ingest(self, document: dict):
+    def ingest(
+        self,
+        document: Union[
+            Dict[str, Dict[str, List[str]]],
+            Iterable[Tuple[str, Dict[str, List[str]]]],
+        ],
+    ):
         """ The MRDEF.RRF data dictionary parsed through the `ParserUmlsDef`
             class.
 
+        Notes:
+            The descriptors are resolved `batch_size` descriptors at a time so
+            that a stream of groups, e.g., yielded by
+            `ParserUmlsDef.iterate_groups`, is ingested as it's consumed.
+
         Args:
-            document (Dict[str, List[str]]): The MRDEF.RRF data dictionary
-                parsed through the `ParserUmlsDef` class.
+            document (Union[Dict[str, Dict[str, List[str]]], Iterable[Tuple[
+                str, Dict[str, List[str]]]]]): The MRDEF.RRF data dictionary
+                parsed through the `ParserUmlsDef` class or an iterable of
+                descriptor UIs and definitions keyed on the definition source.
         """
 
-        msg = "Ingesting definitions for {} MeSH descriptors."
-        msg_fmt = msg.format(len(document.keys()))
-        self.logger.info(msg_fmt)
-
-        # Iterate over the definitions and ingest.
-        for descriptor_ui, data in document.items():
-
-            msg = "Ingesting definition for MeSH descriptor with " "UI '{}'"
-            msg_fmt = msg.format(descriptor_ui)
+        if isinstance(document, dict):
+            msg = "Ingesting definitions for {} MeSH descriptors."
+            msg_fmt = msg.format(len(document.keys()))
             self.logger.info(msg_fmt)
 
-            # noinspection PyTypeChecker
-            descriptor = self.dal.get_by_attr(
-                orm_class=Descriptor, attr_name="ui", attr_value=descriptor_ui
-            )  # type: Descriptor
-
-            if not descriptor:
-                msg = "No `Descriptor` record found with UI '{}'."
-                msg_fmt = msg.format(descriptor_ui)
-                self.logger.warning(msg_fmt)
-                continue
+            groups = document.items()
+        else:
+            groups = document
+
+        time_start = time.perf_counter()
+
+        # Assemble the `DescriptorDefinition` rows for the resolved
+        # descriptors and known definition sources and insert them in batches.
+        num_definitions = 0
+        descriptor_uis_missing = []
+        rows = []
+        for groups_chunk in chunk_iterable(groups, self.batch_size):
+            # Resolve the descriptor UIs of the chunk to `Descriptor` IDs.
+            descriptor_ids = self.get_descriptor_ids(
+                [descriptor_ui for descriptor_ui, _ in groups_chunk]
+            )
 
-            for source, definitions in data.items():
-                source_member = DescriptorDefinitionSourceType.get_member(
-                    source
-                )
-                if not source_member:
+            for descriptor_ui, data in groups_chunk:
+                descriptor_id = descriptor_ids.get(descriptor_ui)
+                if not descriptor_id:
+                    descriptor_uis_missing.append(descriptor_ui)
                     continue
 
-                for definition in definitions:
-                    # Calculate the MD5 of the definition.
-                    md5 = hashlib.md5(definition.encode("utf-8")).digest()
+                for source, definitions in data.items():
+                    source_member = DescriptorDefinitionSourceType.get_member(
+                        source
+                    )
+                    if not source_member:
+                        continue
+
+                    for definition in definitions:
+                        rows.append(
+                            {
+                                "descriptor_id": descriptor_id,
+                                "source": source_member,
+                                "definition": definition,
+                                "md5": hashlib.md5(
+                                    definition.encode("utf-8")
+                                ).digest(),
+                            }
+                        )
 
-                    self.dal.iodi_descriptor_definition(
-                        descriptor_id=descriptor.descriptor_id,
-                        source=source_member,
-                        definition=definition,
-                        md5=md5,
+                if len(rows) >= self.batch_size:
+                    num_definitions += self.insert_rows(
+                        orm_class=DescriptorDefinition, rows=rows
                     )
+                    rows = []
+
+        num_definitions += self.insert_rows(
+            orm_class=DescriptorDefinition, rows=rows
+        )
+
+        self.log_missing_descriptors(descriptor_uis_missing)
+
+        duration = time.perf_counter() - time_start
+
+        msg = "Ingested {} definitions in {:.2f} s ({:.1f} definitions/sec)."
+        msg_fmt = msg.format(
+            num_definitions,
+            duration,
+            num_definitions / duration if duration else 0.0,
+        )
+        self.logger.info(msg_fmt)
@@ -0,0 +1,274 @@
+# coding=utf-8
+
+""" DAL instrumentation module
+
+This module contains the `DalInstrumented` proxy class which wraps a DAL, e.g.,
+`DalMesh`, and records the number of calls, latency, and rows touched for each
+DAL method and parent record type.
+"""
+
+import sys
+import time
+import random
+from typing import Any, Callable, List, Dict, Tuple
+
+import ujson
+
+from mt_ingester.loggers import create_logger
+from mt_ingester.utils import call_dal
+from mt_ingester.utils import document_names_by_code
+
+
+class DalCallStats(object):
+    """ Class holding the statistics of the calls to a single DAL method under
+        a single parent record type.
+
+    Notes:
+        The percentiles are computed over a uniform sample of at most
+        `max_samples` call durations, kept through reservoir sampling, so that
+        the memory taken doesn't grow with the number of calls.
+    """
+
+    # The maximum number of call durations sampled.
+    max_samples = 10000
+
+    def __init__(self):
+        """ Constructor and initialization."""
+
+        self.count = 0
+        self.rows = 0
+        self.total = 0.0
+        self.durations = []  # type: List[float]
+
+        self._random = random.Random(0)
+
+    def add(self, duration: float, rows: int):
+        """ Records a call.
+
+        Args:
+            duration (float): The duration of the call in seconds.
+            rows (int): The number of rows touched by the call.
+        """
+
+        self.count += 1
+        self.rows += rows
+        self.total += duration
+
+        if len(self.durations) < self.max_samples:
+            self.durations.append(duration)
+        else:
+            index = self._random.randrange(self.count)
+            if index < self.max_samples:
+                self.durations[index] = duration
+
+    @property
+    def mean(self) -> float:
+        """ The mean duration of the calls in seconds."""
+
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def p99(self) -> float:
+        """ The 99th percentile of the call durations in seconds."""
+
+        if not self.durations:
+            return 0.0
+
+        durations = sorted(self.durations)
+        index = min(len(durations) - 1, int(round(0.99 * (len(durations) - 1))))
+
+        return durations[index]
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "rows": self.rows,
+            "total": self.total,
+            "mean": self.mean,
+            "p99": self.p99,
+        }
+
+
+class DalInstrumented(object):
+    """ Proxy class wrapping a DAL and recording statistics on the calls made
+        to its public methods.
+
+    Notes:
+        The parent record type of a call is the `document_name` of the
+        innermost ingester method decorated with `log_ingestion_of_document`
+        found on the call stack, e.g., `Term` or `DescriptorRecord`.
+
+        When instrumentation isn't needed the bare DAL should be passed to the
+        ingesters instead so that no overhead is incurred.
+    """
+
+    # The maximum number of frames inspected when looking for the parent
+    # record type of a call.
+    max_frame_depth = 8
+
+    def __init__(self, dal, **kwargs):
+        """ Constructor and initialization.
+
+        Args:
+            dal: The DAL instance to wrap.
+        """
+
+        # Internalize arguments.
+        self.dal = dal
+
+        self.stats = {}  # type: Dict[Tuple[str, str], DalCallStats]
+
+        self.logger = create_logger(
+            logger_name=type(self).__name__,
+            logger_level=kwargs.get("logger_level", "DEBUG"),
+        )
+
+    def _get_record_type(self) -> str:
+        """ Retrieves the parent record type of the current DAL call by walking
+            up the call stack.
+        """
+
+        frame = sys._getframe(2)
+        for _ in range(self.max_frame_depth):
+            if frame is None:
+                break
+            document_name = document_names_by_code.get(frame.f_code)
+            if document_name:
+                return document_name
+            frame = frame.f_back
+
+        return "-"
+
+    @staticmethod
+    def _count_rows(args: tuple, kwargs: dict, result) -> int:
+        """ Estimates the number of rows touched by a DAL call as the length
+            of the longest list argument or list result or `1` otherwise.
+        """
+
+        lengths = [
+            len(value)
+            for value in list(args) + list(kwargs.values()) + [result]
+            if isinstance(value, (list, tuple))
+        ]
+
+        if lengths:
+            return max(lengths)
+
+        return 0 if result is None else 1
+
+    def _get_stats(self, name: str, record_type: str) -> DalCallStats:
+        """ Retrieves the statistics of a DAL method under a parent record
+            type creating them on the first call.
+        """
+
+        stats = self.stats.get((name, record_type))
+        if stats is None:
+            stats = self.stats[(name, record_type)] = DalCallStats()
+
+        return stats
+
+    def call_method(
+        self, name: str, func: Callable[..., Any], num_rows: int = 0, **kwargs
+    ) -> Any:
+        """ Calls a function writing to the DB outside the DAL methods, e.g.,
+            the bulk inserts of the ingesters, and records it as a call to a
+            DAL method, see `utils.call_dal`.
+        """
+
+        record_type = self._get_record_type()
+
+        time_start = time.perf_counter()
+        result = call_dal(
+            dal=self.dal, name=name, func=func, num_rows=num_rows, **kwargs
+        )
+        duration = time.perf_counter() - time_start
+
+        self._get_stats(name, record_type).add(duration, num_rows)
+
+        return result
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.dal, name)
+
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            record_type = self._get_record_type()
+
+            time_start = time.perf_counter()
+            result = attr(*args, **kwargs)
+            duration = time.perf_counter() - time_start
+
+            self._get_stats(name, record_type).add(
+                duration, self._count_rows(args, kwargs, result)
+            )
+
+            return result
+
+        # Cache the wrapper so that subsequent lookups bypass `__getattr__`.
+        self.__dict__[name] = wrapper
+
+        return wrapper
+
+    def report(self) -> List[dict]:
+        """ Assembles the recorded statistics sorted by descending total
+            duration.
+
+        Returns:
+            List[dict]: The statistics per DAL method and parent record type.
+        """
+
+        report = []
+        for (method, record_type), stats in self.stats.items():
+            entry = {"method": method, "record_type": record_type}
+            entry.update(stats.to_dict())
+            report.append(entry)
+
+        report.sort(key=lambda _entry: _entry["total"], reverse=True)
+
+        return report
+
+    def log_report(self):
+        """ Logs the recorded statistics as a table sorted by descending total
+            duration.
+        """
+
+        lines = [
+            "{:<48} {:<20} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+                "method",
+                "record type",
+                "calls",
+                "total (s)",
+                "mean (ms)",
+                "p99 (ms)",
+                "rows",
+            )
+        ]
+        for entry in self.report():
+            lines.append(
+                "{:<48} {:<20} {:>10d} {:>10.3f} {:>10.3f} {:>10.3f} "
+                "{:>10d}".format(
+                    entry["method"],
+                    entry["record_type"],
+                    entry["count"],
+                    entry["total"],
+                    entry["mean"] * 1000.0,
+                    entry["p99"] * 1000.0,
+                    entry["rows"],
+                )
+            )
+
+        msg = "DAL call statistics:\n{}"
+        msg_fmt = msg.format("\n".join(lines))
+        self.logger.info(msg_fmt)
+
+    def dump_report(self, filename_json: str):
+        """ Writes the recorded statistics to a JSON file.
+
+        Args:
+            filename_json (str): Path to the output JSON file.
+        """
+
+        with open(filename_json, "w") as fout:
+            ujson.dump(self.report(), fout, indent=2)
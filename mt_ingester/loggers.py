@@ -3,18 +3,100 @@
 """ Application-wide logger-factory module
 
 This module contains a function that creates and customizes `logging.Logger`
-objects for use across the entire-application.
+objects for use across the entire-application as well as functions that route
+the records of these loggers through a bounded queue drained by a background
+thread so that slow handlers, e.g., a stalled syslog daemon, don't stall the
+application.
 """
 
 from __future__ import unicode_literals
 
+import os
 import sys
+import queue
+import atexit
 import logging
 import logging.handlers
 
 import colorlog
 
 
+# The handler shared by all loggers created through `create_logger` while
+# queued logging is enabled through `enable_queue_logging`.
+queue_handler = None
+
+
+def create_handlers(
+    project_name="mt-ingester",
+    do_log_stdout=True,
+    do_log_syslog=True,
+    do_color_logs=True,
+):
+    """ Creates the handlers of the loggers created through `create_logger`.
+
+    Args:
+        project_name (str): Name of the project under which the logger will be
+            created.
+        do_log_stdout (bool, optional): Whether to create a 'standard-out'
+            logging handler. Defaults to `True`.
+        do_log_syslog (bool, optional): Whether to create a 'syslog'
+            logging handler. Defaults to `True`.
+        do_color_logs (bool, optional): Whether to emitted colorful log
+            messages.
+
+    Returns:
+        list[logging.Handler]: The created handlers.
+    """
+
+    handlers = []
+
+    # Assemble the logging format.
+    fmt_tmpl = (
+        "{0}: %(process)d %(processName)s %(asctime)-15s "
+        "%(levelname)-8s %(name)-10s %(funcName)s %(message)s"
+    )
+    fmt = fmt_tmpl.format(project_name)
+
+    # Create a colourful formatter (should one be needed).
+    formatter_w_color = colorlog.ColoredFormatter(
+        fmt="%(log_color)s" + fmt,
+        datefmt="%Y-%m-%dT%H:%M:%SZ",
+        reset=True,
+        log_colors={
+            "DEBUG": "blue",
+            "INFO": "green",
+            "WARNING": "yellow",
+            "ERROR": "red",
+            "CRITICAL": "red,bg_white",
+        },
+        secondary_log_colors={},
+        style="%",
+    )
+
+    # Create a formatter without colours.
+    formatter_wo_color = logging.Formatter(fmt=fmt)
+
+    # Create an 'stdout' logging handler and set its output format (if
+    # enabled).
+    if do_log_stdout:
+        handler_stdout = logging.StreamHandler(sys.stdout)
+        handler_stdout.setFormatter(
+            formatter_w_color if do_color_logs else formatter_wo_color
+        )
+        handlers.append(handler_stdout)
+
+    # Create a 'syslog' logging handler and set its output format (if
+    # enabled).
+    if do_log_syslog and ("darwin" not in sys.platform):
+        handler_syslog = logging.handlers.SysLogHandler(address="/dev/log")
+        # Syslog does not like colours and displays the colour-codes in a mess
+        # so we're using the colour-less formatter instead.
+        handler_syslog.setFormatter(formatter_wo_color)
+        handlers.append(handler_syslog)
+
+    return handlers
+
+
 def create_logger(
     logger_name,
     logger_level="DEBUG",
@@ -40,6 +122,10 @@ def create_logger(
         logger the only change that can be applied to that logger would be the
         logging-level.
 
+        While queued logging is enabled through `enable_queue_logging` the
+        logger is given the shared queue handler instead and the handler
+        arguments are ignored in favour of those of `enable_queue_logging`.
+
     Args:
         logger_name (str): Uniquely identifying name of the logger.
         logger_level (str): Logging level as defined in the `logging` package.
@@ -69,48 +155,189 @@ def create_logger(
     if logger.handlers:
         return logger
 
-    # Assemble the logging format.
-    fmt_tmpl = (
-        "{0}: %(process)d %(processName)s %(asctime)-15s "
-        "%(levelname)-8s %(name)-10s %(funcName)s %(message)s"
-    )
-    fmt = fmt_tmpl.format(project_name)
+    if queue_handler is not None:
+        logger.addHandler(queue_handler)
+        return logger
 
-    # Create a colourful formatter (should one be needed).
-    formatter_w_color = colorlog.ColoredFormatter(
-        fmt="%(log_color)s" + fmt,
-        datefmt="%Y-%m-%dT%H:%M:%SZ",
-        reset=True,
-        log_colors={
-            "DEBUG": "blue",
-            "INFO": "green",
-            "WARNING": "yellow",
-            "ERROR": "red",
-            "CRITICAL": "red,bg_white",
-        },
-        secondary_log_colors={},
-        style="%",
+    handlers = create_handlers(
+        project_name=project_name,
+        do_log_stdout=do_log_stdout,
+        do_log_syslog=do_log_syslog,
+        do_color_logs=do_color_logs,
     )
+    for handler in handlers:
+        logger.addHandler(handler)
 
-    # Create a formatter without colours.
-    formatter_wo_color = logging.Formatter(fmt=fmt)
+    return logger
 
-    # Create an 'stdout' logging handler, set its output format, and add to the
-    # logger (if enabled).
-    if do_log_stdout:
-        handler_stdout = logging.StreamHandler(sys.stdout)
-        handler_stdout.setFormatter(
-            formatter_w_color if do_color_logs else formatter_wo_color
+
+class QueueListenerBlocking(logging.handlers.QueueListener):
+    """ Queue listener waiting for room in a bounded queue when stopped."""
+
+    def enqueue_sentinel(self):
+        # The queue may be full but is being drained by the listener thread.
+        self.queue.put(self._sentinel)
+
+
+class QueueHandlerBounded(logging.handlers.QueueHandler):
+    """ Queue handler enqueuing records in a bounded queue drained by a
+        `QueueListenerBlocking`.
+
+    Notes:
+        Records are handled within the same process so they're enqueued as-is
+        and formatted by the listener thread rather than the logging thread.
+
+        When the queue is full records are either dropped and counted or the
+        logging thread waits for room depending on `do_block`.
+
+        Records are handled directly by the listener handlers, i.e.,
+        synchronously, in forked processes, which the listener thread isn't
+        running in, and once the listener has been stopped.
+    """
+
+    def __init__(self, queue_, listener, do_block=True):
+        """ Constructor and initialization.
+
+        Args:
+            queue_ (queue.Queue): The bounded queue.
+            listener (QueueListenerBlocking): The listener draining the queue.
+            do_block (bool, optional): Whether to wait for room in the queue
+                instead of dropping records. Defaults to `True`.
+        """
+
+        super(QueueHandlerBounded, self).__init__(queue_)
+
+        # Internalize arguments.
+        self.listener = listener
+        self.do_block = do_block
+
+        self.pid = os.getpid()
+        self.is_stopped = False
+        self.num_dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        if self.do_block:
+            self.queue.put(record)
+            return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.num_dropped += 1
+
+    def handle_directly(self, record):
+        for handler in self.listener.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def emit(self, record):
+        if self.is_stopped or os.getpid() != self.pid:
+            self.handle_directly(record)
+        else:
+            super(QueueHandlerBounded, self).emit(record)
+
+    def stop(self):
+        """ Stops the listener once it has handled all queued records."""
+
+        if self.is_stopped or os.getpid() != self.pid:
+            return
+
+        self.listener.stop()
+        self.is_stopped = True
+
+        if self.num_dropped:
+            msg = "Dropped {0} log records while the log queue was full."
+            msg_fmt = msg.format(self.num_dropped)
+            self.handle_directly(
+                logging.makeLogRecord(
+                    {
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": msg_fmt,
+                    }
+                )
+            )
+
+
+def enable_queue_logging(
+    max_size=10000,
+    do_block=True,
+    project_name="mt-ingester",
+    do_log_stdout=True,
+    do_log_syslog=True,
+    do_color_logs=True,
+    handlers=None,
+):
+    """ Routes the records of the loggers created through `create_logger`
+        thereafter through a bounded queue drained by a background thread.
+
+    Note:
+        The queue is flushed when `disable_queue_logging` is called or the
+        interpreter exits.
+
+    Args:
+        max_size (int, optional): The maximum number of queued records.
+            Defaults to `10000`.
+        do_block (bool, optional): Whether to wait for room in a full queue
+            instead of dropping records. Defaults to `True`.
+        project_name (str): Name of the project the records are emitted under.
+        do_log_stdout (bool, optional): Whether to log to standard-out.
+            Defaults to `True`.
+        do_log_syslog (bool, optional): Whether to log to syslog. Defaults to
+            `True`.
+        do_color_logs (bool, optional): Whether to emitted colorful log
+            messages.
+        handlers (list[logging.Handler], optional): The handlers the queued
+            records are handled by. Defaults to `None` in which case they're
+            created through `create_handlers`.
+
+    Returns:
+        QueueHandlerBounded: The handler shared by the loggers.
+    """
+
+    global queue_handler
+
+    if queue_handler is not None:
+        return queue_handler
+
+    if handlers is None:
+        handlers = create_handlers(
+            project_name=project_name,
+            do_log_stdout=do_log_stdout,
+            do_log_syslog=do_log_syslog,
+            do_color_logs=do_color_logs,
         )
-        logger.addHandler(handler_stdout)
 
-    # Create a 'syslog' logging handler, set its output format, and add to the
-    # logger (if enabled).
-    if do_log_syslog and ("darwin" not in sys.platform):
-        handler_syslog = logging.handlers.SysLogHandler(address="/dev/log")
-        # Syslog does not like colours and displays the colour-codes in a mess
-        # so we're using the colour-less formatter instead.
-        handler_syslog.setFormatter(formatter_wo_color)
-        logger.addHandler(handler_syslog)
+    queue_ = queue.Queue(maxsize=max_size)
+    listener = QueueListenerBlocking(
+        queue_, *handlers, respect_handler_level=True
+    )
+    queue_handler = QueueHandlerBounded(
+        queue_=queue_, listener=listener, do_block=do_block
+    )
+    listener.start()
 
-    return logger
+    atexit.register(disable_queue_logging)
+
+    return queue_handler
+
+
+def disable_queue_logging():
+    """ Flushes the log queue and stops its listener thread.
+
+    Note:
+        Loggers which were given the queue handler keep it but their records
+        are handled synchronously thereafter.
+    """
+
+    global queue_handler
+
+    if queue_handler is None:
+        return
+
+    queue_handler.stop()
+    queue_handler = None
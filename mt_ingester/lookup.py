@@ -0,0 +1,373 @@
+# coding=utf-8
+
+""" MeSH lookup module
+
+This module contains the `MeshLookup` class which serves the names, tree
+numbers, and synonyms of the MeSH descriptors, qualifiers, and supplemental
+records by their UI out of a compact memory-mapped file so that services don't
+need to query the DB, as well as the functions used to collect those from the
+parsed MeSH data.
+"""
+
+import sys
+import array
+import zlib
+import struct
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from mt_ingester.utils import MappedFile
+from mt_ingester.utils import open_atomic
+from mt_ingester.utils import write_sections
+
+
+# The magic bytes identifying a lookup file.
+MAGIC = b"MTLOOKP1"
+
+# The header holding the magic bytes, the number of records, the byte width of
+# the UIs, the number of hash-table slots, the number of pooled strings, the
+# number of record-tree number and record-synonym pairs, and the byte size of
+# the string pool.
+HEADER = struct.Struct("<8sQQQQQQQ")
+
+
+def get_lookup_record(doc: dict) -> Tuple[str, str, List[str], List[str]]:
+    """ Retrieves the UI, name, tree numbers, and synonyms of a parsed
+        descriptor, qualifier, or supplemental record.
+
+    Notes:
+        The synonyms are the names of the record terms other than the record
+        name, deduplicated ignoring case.
+
+    Args:
+        doc (dict): The `<DescriptorRecord>`, `<QualifierRecord>`, or
+            `<SupplementalRecord>` parsed through `ParserXmlMeshDescriptors`,
+            `ParserXmlMeshQualifiers`, or `ParserXmlMeshSupplementals`.
+
+    Returns:
+        Tuple[str, str, List[str], List[str]]: The record UI, name, tree
+            numbers, and synonyms.
+    """
+
+    for key_ui, key_name in [
+        ("DescriptorUI", "DescriptorName"),
+        ("QualifierUI", "QualifierName"),
+        ("SupplementalRecordUI", "SupplementalRecordName"),
+    ]:
+        if key_ui in doc:
+            ui = doc[key_ui]
+            name = doc.get(key_name) or ""
+            break
+    else:
+        msg = "Record with keys '{}' is not a MeSH record."
+        msg_fmt = msg.format(sorted(doc.keys()))
+        raise ValueError(msg_fmt)
+
+    tree_numbers = [
+        doc_tree_number["TreeNumber"]
+        for doc_tree_number in doc.get("TreeNumberList") or []
+        if doc_tree_number.get("TreeNumber")
+    ]
+
+    synonyms = []
+    seen = {name.lower()}
+    for doc_concept in doc.get("ConceptList") or []:
+        for doc_term in doc_concept.get("TermList") or []:
+            synonym = doc_term.get("String") or ""
+            if synonym and synonym.lower() not in seen:
+                seen.add(synonym.lower())
+                synonyms.append(synonym)
+
+    return ui, name, tree_numbers, synonyms
+
+
+class MeshLookup(MappedFile, Mapping):
+    """ Read-only mapping between MeSH UIs and their names, tree numbers, and
+        synonyms backed by a memory-mapped lookup file.
+
+    Notes:
+        The lookup file holds the fixed-width UIs in sorted order and an
+        open-addressing hash table keyed on their CRC-32 checksums pointing
+        to them, followed by the per-record offsets into the lists of tree
+        numbers and synonyms and a pool of the deduplicated strings these
+        point to. Opening the file only reads the header, and every lookup
+        reads the few pages it touches, see `MappedFile`.
+    """
+
+    attr_filename = "filename_lookup"
+
+    def __init__(self, filename_lookup: str):
+        """ Constructor and initialization.
+
+        Args:
+            filename_lookup (str): Path to the lookup file.
+        """
+
+        # Internalize arguments.
+        self.filename_lookup = filename_lookup
+
+        self._open()
+
+    def _open(self):
+        """ Maps the lookup file, reads its header, and casts its sections."""
+
+        if sys.byteorder != "little":
+            msg = "Lookup files can only be read on little-endian hosts."
+            raise ValueError(msg)
+
+        self._map(offset=HEADER.size)
+
+        (
+            magic,
+            self.num_records,
+            self.ui_width,
+            self.num_slots,
+            num_strings,
+            num_tree_numbers,
+            num_synonyms,
+            size_pool,
+        ) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            msg = "File '{}' is not a MeSH lookup file."
+            msg_fmt = msg.format(self.filename_lookup)
+            raise ValueError(msg_fmt)
+
+        # The UIs and the string pool are sliced from the map directly as
+        # slicing the map is cheaper than slicing and copying a view.
+        self._offset_uis = self._skip(self.ui_width * self.num_records)
+        self._slots = self._take(4 * self.num_slots, "I")
+        self._names = self._take(4 * self.num_records, "I")
+        self._tree_number_offsets = self._take(4 * (self.num_records + 1), "I")
+        self._tree_numbers = self._take(4 * num_tree_numbers, "I")
+        self._synonym_offsets = self._take(4 * (self.num_records + 1), "I")
+        self._synonyms = self._take(4 * num_synonyms, "I")
+        self._string_offsets = self._take(8 * (num_strings + 1), "Q")
+        self._offset_pool = self._skip(size_pool)
+
+    @classmethod
+    def build(
+        cls,
+        filename_lookup: str,
+        records: Iterable[Tuple[str, str, List[str], List[str]]],
+        synonyms: Optional[Iterable[Tuple[str, Iterable[str]]]] = None,
+    ) -> "MeshLookup":
+        """ Writes the lookup file of a set of records, through
+            `utils.open_atomic`, and opens it.
+
+        Args:
+            filename_lookup (str): Path to the lookup file.
+            records (Iterable[Tuple[str, str, List[str], List[str]]]): The
+                UI, name, tree numbers, and synonyms of every record, e.g.,
+                mapped through `get_lookup_record`. Later records replace
+                earlier ones with the same UI.
+            synonyms (Optional[Iterable[Tuple[str, Iterable[str]]]]): Further
+                synonyms keyed on the record UIs, e.g., yielded by
+                `ParserUmlsConso.iterate_groups`, which are appended to those
+                of the records unless they only differ in case. Synonyms of
+                UIs absent from `records` are skipped. Defaults to `None`.
+
+        Returns:
+            MeshLookup: The lookup opened over the written file.
+        """
+
+        entries = {}  # type: Dict[str, Tuple[str, List[str], List[str]]]
+        for ui, name, tree_numbers, synonyms_record in records:
+            entries[ui] = (name, list(tree_numbers), list(synonyms_record))
+
+        for ui, synonyms_group in synonyms or []:
+            entry = entries.get(ui)
+            if entry is None:
+                continue
+            seen = set(synonym.lower() for synonym in entry[2])
+            seen.add(entry[0].lower())
+            for synonym in synonyms_group:
+                if synonym and synonym.lower() not in seen:
+                    seen.add(synonym.lower())
+                    entry[2].append(synonym)
+
+        uis = sorted(entries)
+        uis_encoded = [ui.encode("utf-8") for ui in uis]
+        ui_width = max(map(len, uis_encoded), default=0)
+
+        # Pool every distinct string once and point the records to it.
+        string_indices = {}  # type: Dict[str, int]
+        string_offsets = array.array("Q", [0])
+        blob_pool = bytearray()
+
+        def get_string_index(string: str) -> int:
+            index = string_indices.get(string)
+            if index is None:
+                index = string_indices[string] = len(string_indices)
+                blob_pool.extend(string.encode("utf-8"))
+                string_offsets.append(len(blob_pool))
+
+            return index
+
+        names = array.array("I")
+        tree_number_offsets = array.array("I", [0])
+        tree_numbers = array.array("I")
+        synonym_offsets = array.array("I", [0])
+        synonyms_all = array.array("I")
+        for ui in uis:
+            name, tree_numbers_record, synonyms_record = entries[ui]
+            names.append(get_string_index(name))
+            tree_numbers.extend(map(get_string_index, tree_numbers_record))
+            tree_number_offsets.append(len(tree_numbers))
+            synonyms_all.extend(map(get_string_index, synonyms_record))
+            synonym_offsets.append(len(synonyms_all))
+
+        blob_uis = b"".join(ui.ljust(ui_width, b"\0") for ui in uis_encoded)
+
+        # Point the slots of the UI checksums to the records, offset by one so
+        # that zero marks empty slots.
+        num_slots = 8
+        while num_slots < 2 * len(uis):
+            num_slots *= 2
+        mask = num_slots - 1
+
+        slots = array.array("I", bytes(4 * num_slots))
+        for index, ui in enumerate(uis_encoded):
+            slot = zlib.crc32(ui) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = index + 1
+
+        with open_atomic(filename=filename_lookup) as fout:
+            fout.write(
+                HEADER.pack(
+                    MAGIC,
+                    len(uis),
+                    ui_width,
+                    num_slots,
+                    len(string_indices),
+                    len(tree_numbers),
+                    len(synonyms_all),
+                    len(blob_pool),
+                )
+            )
+            write_sections(
+                fout=fout,
+                sections=[
+                    blob_uis,
+                    slots.tobytes(),
+                    names.tobytes(),
+                    tree_number_offsets.tobytes(),
+                    tree_numbers.tobytes(),
+                    synonym_offsets.tobytes(),
+                    synonyms_all.tobytes(),
+                    string_offsets.tobytes(),
+                    bytes(blob_pool),
+                ],
+            )
+
+        return cls(filename_lookup=filename_lookup)
+
+    def _get_ui(self, index: int) -> bytes:
+        """ Retrieves the null-padded UI of a record by its index."""
+
+        start = self._offset_uis + index * self.ui_width
+
+        return self._mmap[start : start + self.ui_width]
+
+    def get_index(self, ui: str) -> Optional[int]:
+        """ Retrieves the index of a record by probing the hash table of the
+            UIs or `None` if absent.
+        """
+
+        key = ui.encode("utf-8")
+        if len(key) > self.ui_width:
+            return None
+
+        slots = self._slots
+        mask = self.num_slots - 1
+        slot = zlib.crc32(key) & mask
+        key = key.ljust(self.ui_width, b"\0")
+        while True:
+            value = slots[slot]
+            if not value:
+                return None
+            if self._get_ui(value - 1) == key:
+                return value - 1
+            slot = (slot + 1) & mask
+
+    def _get_string(self, index: int) -> str:
+        """ Retrieves a pooled string by its index."""
+
+        start = self._offset_pool + self._string_offsets[index]
+        stop = self._offset_pool + self._string_offsets[index + 1]
+
+        return self._mmap[start:stop].decode("utf-8")
+
+    def _get_strings(
+        self, offsets: memoryview, items: memoryview, index: int
+    ) -> List[str]:
+        """ Retrieves the pooled strings of a record by its index."""
+
+        return [
+            self._get_string(item)
+            for item in items[offsets[index] : offsets[index + 1]]
+        ]
+
+    def _get_index_or_raise(self, ui: str) -> int:
+        index = self.get_index(ui)
+        if index is None:
+            raise KeyError(ui)
+
+        return index
+
+    def get_name(self, ui: str) -> str:
+        """ Retrieves the name of a record by its UI."""
+
+        return self._get_string(self._names[self._get_index_or_raise(ui)])
+
+    def get_tree_numbers(self, ui: str) -> List[str]:
+        """ Retrieves the tree numbers of a record by its UI."""
+
+        return self._get_strings(
+            offsets=self._tree_number_offsets,
+            items=self._tree_numbers,
+            index=self._get_index_or_raise(ui),
+        )
+
+    def get_synonyms(self, ui: str) -> List[str]:
+        """ Retrieves the synonyms of a record by its UI."""
+
+        return self._get_strings(
+            offsets=self._synonym_offsets,
+            items=self._synonyms,
+            index=self._get_index_or_raise(ui),
+        )
+
+    def __getitem__(self, ui: str) -> dict:
+        """ Retrieves the name, tree numbers, and synonyms of a record by its
+            UI.
+
+        Returns:
+            dict: The record keyed on `name`, `tree_numbers`, and `synonyms`.
+        """
+
+        index = self._get_index_or_raise(ui)
+
+        return {
+            "name": self._get_string(self._names[index]),
+            "tree_numbers": self._get_strings(
+                offsets=self._tree_number_offsets,
+                items=self._tree_numbers,
+                index=index,
+            ),
+            "synonyms": self._get_strings(
+                offsets=self._synonym_offsets,
+                items=self._synonyms,
+                index=index,
+            ),
+        }
+
+    def __contains__(self, ui: object) -> bool:
+        return isinstance(ui, str) and self.get_index(ui) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.num_records):
+            yield self._get_ui(index).rstrip(b"\0").decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.num_records
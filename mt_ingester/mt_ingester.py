@@ -1,27 +1,22 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-"""Main module."""
+"""Main module.
+
+The dependencies of each mode, e.g., `lxml` for the MeSH XML modes or the ORM
+for the modes writing to the database, are imported within `main` once the
+arguments have been parsed so that `--help` and each mode only import what
+they use.
+"""
 
 import os
 import argparse
-
-from fform.dals_mt import DalMesh
-
-from mt_ingester.parsers import ParserXmlMeshDescriptors
-from mt_ingester.parsers import ParserXmlMeshQualifiers
-from mt_ingester.parsers import ParserXmlMeshSupplementals
-from mt_ingester.parsers import ParserUmlsConso
-from mt_ingester.parsers import ParserUmlsDef
-from mt_ingester.ingesters import IngesterDocumentDescriptor
-from mt_ingester.ingesters import IngesterDocumentQualifier
-from mt_ingester.ingesters import IngesterDocumentSupplemental
-from mt_ingester.ingesters import IngesterUmlsConso
-from mt_ingester.ingesters import IngesterUmlsDef
-from mt_ingester.config import import_config
+import contextlib
 
 
 def load_config(args):
+    from mt_ingester.config import import_config
+
     if args.config_file:
         cfg = import_config(fname_config_file=args.config_file)
     elif "CT_INGESTER_CONFIG" in os.environ:
@@ -35,6 +30,23 @@ def load_config(args):
 
 
 def main(args):
+    # Route the log records through a bounded queue drained by a background
+    # thread so that slow log handlers don't stall the ingestion.
+    if args.log_queue_size:
+        from mt_ingester.loggers import enable_queue_logging
+
+        enable_queue_logging(
+            max_size=args.log_queue_size, do_block=not args.log_queue_drop
+        )
+
+    from fform.dals_mt import DalMesh
+
+    from mt_ingester.instrumentation import DalInstrumented
+    from mt_ingester.profiling import create_profiler
+    from mt_ingester.profiling import get_profile_label
+    from mt_ingester.progress import ProgressReporter
+    from mt_ingester.progress import get_file_size
+
     cfg = load_config(args=args)
 
     dal = DalMesh(
@@ -45,38 +57,223 @@ def main(args):
         sql_db=cfg.sql_db,
     )
 
+    # Profile the parse, transform, and DB write stages separately.
+    profiler = create_profiler(
+        mode=args.profile,
+        label=get_profile_label(
+            mode=args.mode, filename=next(iter(args.filenames), None)
+        ),
+        dirname=args.dirname_profile,
+        top=args.profile_top,
+        logger_level=cfg.logger_level,
+    )
+    dal = profiler.wrap_dal(dal=dal)
+
+    # Report the progress and throughput at a fixed interval.
+    progress = ProgressReporter(
+        label=profiler.label,
+        interval=args.progress_interval,
+        logger_level=cfg.logger_level,
+    )
+    dal = progress.wrap_dal(dal=dal)
+
+    # Wrap the DAL to record per-method call statistics.
+    if args.instrument or args.instrument_json:
+        dal = DalInstrumented(dal=dal)
+
+    shadow_schema = None
+    if args.mode in ["shadow-create", "shadow-swap"] or args.into_shadow:
+        from mt_ingester.full_reload import get_mesh_schema
+        from mt_ingester.shadow import ShadowSchema
+
+        shadow_schema = ShadowSchema(
+            engine=dal.engine,
+            schema=get_mesh_schema(),
+            min_row_count_ratio=args.min_row_count_ratio,
+        )
+
+    if arguments.mode == "shadow-create":
+        shadow_schema.create()
+        return
+    elif arguments.mode == "shadow-swap":
+        shadow_schema.swap()
+        return
+
+    # Redirect the DAL to the shadow schema.
+    if args.into_shadow:
+        shadow_schema.attach(engine=dal.engine)
+
+    # Convert the memory cap of the UMLS parsers to bytes.
+    max_memory = None
+    if args.max_memory is not None:
+        max_memory = args.max_memory * 2 ** 20
+
     parser = None
     ingester = None
     if arguments.mode == "descriptors":
-        parser = ParserXmlMeshDescriptors()
+        from mt_ingester.parsers import ParserXmlMeshDescriptors
+        from mt_ingester.ingesters import IngesterDocumentDescriptor
+
+        parser = ParserXmlMeshDescriptors(logger_level=cfg.logger_level)
         ingester = IngesterDocumentDescriptor(
-            dal=dal, do_ingest_links=arguments.do_ingest_links
+            dal=dal,
+            do_ingest_links=arguments.do_ingest_links,
+            do_ingest_tree_number_closure=args.do_ingest_tree_number_closure,
+            logger_level=cfg.logger_level,
         )
     elif arguments.mode == "qualifiers":
-        parser = ParserXmlMeshQualifiers()
+        from mt_ingester.parsers import ParserXmlMeshQualifiers
+        from mt_ingester.ingesters import IngesterDocumentQualifier
+
+        parser = ParserXmlMeshQualifiers(logger_level=cfg.logger_level)
         ingester = IngesterDocumentQualifier(
-            dal=dal, do_ingest_links=arguments.do_ingest_links
+            dal=dal,
+            do_ingest_links=arguments.do_ingest_links,
+            logger_level=cfg.logger_level,
         )
     elif arguments.mode == "supplementals":
-        parser = ParserXmlMeshSupplementals()
+        from mt_ingester.parsers import ParserXmlMeshSupplementals
+        from mt_ingester.ingesters import IngesterDocumentSupplemental
+
+        parser = ParserXmlMeshSupplementals(logger_level=cfg.logger_level)
         ingester = IngesterDocumentSupplemental(
-            dal=dal, do_ingest_links=arguments.do_ingest_links
+            dal=dal,
+            do_ingest_links=arguments.do_ingest_links,
+            logger_level=cfg.logger_level,
         )
     elif arguments.mode == "synonyms":
-        parser = ParserUmlsConso()
-        ingester = IngesterUmlsConso(dal=dal)
+        from mt_ingester.parsers import ParserUmlsConso
+        from mt_ingester.ingesters import IngesterUmlsConso
+
+        parser = ParserUmlsConso(
+            num_workers=args.num_workers,
+            dirname_index=args.dirname_index,
+            backend=args.backend,
+            filter_spec=ParserUmlsConso.create_filter_spec(
+                languages=args.languages,
+                sources_include=args.sources_include,
+                sources_exclude=args.sources_exclude,
+                term_types_include=args.term_types_include,
+                term_types_exclude=args.term_types_exclude,
+                suppress=args.suppress,
+                preferred_only=args.preferred_only,
+            ),
+            max_memory=max_memory,
+            dirname_tmp=args.dirname_tmp,
+            logger_level=cfg.logger_level,
+        )
+        ingester = IngesterUmlsConso(
+            dal=dal, batch_size=args.batch_size, logger_level=cfg.logger_level
+        )
     elif arguments.mode == "definitions":
-        parser = ParserUmlsDef()
-        ingester = IngesterUmlsDef(dal=dal)
+        from mt_ingester.parsers import ParserUmlsDef
+        from mt_ingester.ingesters import IngesterUmlsDef
+
+        parser = ParserUmlsDef(
+            num_workers=args.num_workers,
+            dirname_index=args.dirname_index,
+            backend=args.backend,
+            filter_spec=ParserUmlsDef.create_filter_spec(
+                sources_include=args.sources_include,
+                sources_exclude=args.sources_exclude,
+                suppress=args.suppress,
+            ),
+            max_memory=max_memory,
+            dirname_tmp=args.dirname_tmp,
+            logger_level=cfg.logger_level,
+        )
+        ingester = IngesterUmlsDef(
+            dal=dal, batch_size=args.batch_size, logger_level=cfg.logger_level
+        )
 
-    if arguments.mode in ["descriptors", "qualifiers", "supplementals"]:
-        for filename in args.filenames:
-            docs = parser.parse(filename_xml=filename)
-            for doc in docs:
-                ingester.ingest(doc=doc)
-    elif arguments.mode in ("synonyms", "definitions"):
-        docs = parser.parse(args.filenames[0], args.filenames[1])
-        ingester.ingest(docs)
+    # Defer the non-essential indexes and foreign-keys of the MeSH tables until
+    # the load completes when performing a full reload.
+    if args.full_reload:
+        from mt_ingester.full_reload import DeferredIndexes
+        from mt_ingester.full_reload import get_mesh_schema
+        from mt_ingester.full_reload import get_mesh_table_names
+
+        context = DeferredIndexes(
+            engine=dal.engine,
+            schema=(
+                shadow_schema.schema_shadow
+                if args.into_shadow
+                else get_mesh_schema()
+            ),
+            table_names=get_mesh_table_names(),
+            filename_state=args.full_reload_state,
+            num_workers=args.full_reload_workers,
+        )
+    else:
+        context = contextlib.nullcontext()
+
+    with context, profiler, progress:
+        if arguments.mode in ["descriptors", "qualifiers", "supplementals"]:
+            for filename in args.filenames:
+                # Base the ETA on the byte offset of the XML file.
+                progress.track_file(
+                    size=get_file_size(filename=filename),
+                    get_position=parser.get_position,
+                )
+                docs = parser.parse(filename_xml=filename)
+                for doc in progress.iterate(profiler.iterate("parse", docs)):
+                    with profiler.stage("transform"):
+                        ingester.ingest(doc=doc)
+            # Write the closure and keys of the tree numbers across all files
+            # in bulk.
+            if arguments.mode == "descriptors":
+                with profiler.stage("write"):
+                    ingester.ingest_tree_number_closure()
+                    ingester.ingest_tree_number_keys()
+        elif arguments.mode in ["synonyms", "definitions"]:
+            from mt_ingester.rrf import get_read_position
+
+            # Base the ETA on the byte offset the streamed file has been read
+            # up to, i.e., the MRCONSO.rrf file that follows the MRSAT.rrf one
+            # or the MRDEF.rrf file that precedes it.
+            filename_rrf = (
+                args.filenames[1]
+                if arguments.mode == "synonyms"
+                else args.filenames[0]
+            )
+            progress.track_file(
+                size=get_file_size(filename=filename_rrf),
+                get_position=lambda: get_read_position(filename_rrf),
+            )
+
+        if arguments.mode == "synonyms":
+            # Stream the synonyms grouped by descriptor so that they needn't
+            # be held in memory all at once.
+            docs = parser.iterate_groups(args.filenames[0], args.filenames[1])
+            with profiler.stage("transform"):
+                ingester.ingest(
+                    progress.iterate(profiler.iterate("parse", docs))
+                )
+        elif arguments.mode == "definitions":
+            # Stream the definitions grouped by descriptor when the memory is
+            # capped.
+            if max_memory is not None:
+                docs = progress.iterate(
+                    profiler.iterate(
+                        "parse",
+                        parser.iterate_groups(
+                            args.filenames[0], args.filenames[1]
+                        ),
+                    )
+                )
+            else:
+                with profiler.stage("parse"):
+                    docs = parser.parse(args.filenames[0], args.filenames[1])
+                docs = progress.iterate(docs.items())
+            with profiler.stage("transform"):
+                ingester.ingest(docs)
+
+    profiler.log_summary()
+
+    if isinstance(dal, DalInstrumented):
+        dal.log_report()
+        if args.instrument_json:
+            dal.dump_report(filename_json=args.instrument_json)
 
 
 # main sentinel
@@ -86,7 +283,13 @@ if __name__ == "__main__":
         description="mt-ingester: MeSH XML dump parser and SQL ingester."
     )
     argument_parser.add_argument(
-        "filenames", nargs="+", help="MeSH XML files to ingest."
+        "filenames",
+        nargs="*",
+        help=(
+            "MeSH XML files or UMLS RRF files to ingest. RRF files can be "
+            "read from the UMLS distribution through "
+            "`zip://<archive>!/<member>` locations."
+        ),
     )
     argument_parser.add_argument(
         "--mode",
@@ -98,6 +301,8 @@ if __name__ == "__main__":
             "supplementals",
             "synonyms",
             "definitions",
+            "shadow-create",
+            "shadow-swap",
         ],
         required=True,
     )
@@ -107,6 +312,228 @@ if __name__ == "__main__":
     argument_parser.add_argument(
         "--no-do-ingest-links", dest="do_ingest_links", action="store_false"
     )
+    argument_parser.add_argument(
+        "--no-tree-number-closure",
+        dest="do_ingest_tree_number_closure",
+        help=(
+            "Skip building the tree-number closure and key tables during "
+            "descriptor ingestion"
+        ),
+        action="store_false",
+    )
+    argument_parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        help="Number of rows per bulk query during UMLS ingestion",
+        type=int,
+        default=1000,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--num-workers",
+        dest="num_workers",
+        help="Number of processes UMLS RRF files are parsed in",
+        type=int,
+        default=1,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--index-dir",
+        dest="dirname_index",
+        help=(
+            "Directory where the CUI-DUI index of the MRSAT.rrf file is "
+            "stored and reused from across runs"
+        ),
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--backend",
+        dest="backend",
+        help=(
+            "Backend UMLS RRF files are read with where 'arrow' requires "
+            "`pyarrow`"
+        ),
+        choices=["python", "arrow"],
+        default="python",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--languages",
+        dest="languages",
+        help=(
+            "`LAT` values of the MRCONSO.RRF rows to keep where `ALL` or no "
+            "values keep all languages"
+        ),
+        nargs="*",
+        default=["ENG"],
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--sources-include",
+        dest="sources_include",
+        help="`SAB` values of the MRCONSO.RRF or MRDEF.RRF rows to keep",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--sources-exclude",
+        dest="sources_exclude",
+        help="`SAB` values of the MRCONSO.RRF or MRDEF.RRF rows to drop",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--term-types-include",
+        dest="term_types_include",
+        help="`TTY` values of the MRCONSO.RRF rows to keep",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--term-types-exclude",
+        dest="term_types_exclude",
+        help="`TTY` values of the MRCONSO.RRF rows to drop",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--suppress",
+        dest="suppress",
+        help=(
+            "`SUPPRESS` values of the MRCONSO.RRF or MRDEF.RRF rows to keep, "
+            "e.g., `N` to drop suppressible atoms"
+        ),
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--preferred-only",
+        dest="preferred_only",
+        help="Only keep the MRCONSO.RRF rows whose `ISPREF` value is `Y`",
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--max-memory",
+        dest="max_memory",
+        help=(
+            "Memory in MB the parsed UMLS rows may take before they're "
+            "spilled to disk as sorted runs"
+        ),
+        type=int,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--tmp-dir",
+        dest="dirname_tmp",
+        help="Directory the sorted runs of the UMLS parsers are spilled to",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--full-reload",
+        dest="full_reload",
+        help=(
+            "Drop non-unique indexes and foreign-keys on the MeSH tables "
+            "during the load and rebuild them afterwards"
+        ),
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--full-reload-workers",
+        dest="full_reload_workers",
+        help="Number of connections used to rebuild indexes in parallel",
+        type=int,
+        default=4,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--full-reload-state",
+        dest="full_reload_state",
+        help="File storing the dropped definitions until they're restored",
+        default="mt-ingester-full-reload.json",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--into-shadow",
+        dest="into_shadow",
+        help="Load into the shadow schema created with `shadow-create`",
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--min-row-count-ratio",
+        dest="min_row_count_ratio",
+        help=(
+            "Minimum ratio of shadow over live rows per table required by "
+            "`shadow-swap`"
+        ),
+        type=float,
+        default=0.9,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--instrument",
+        dest="instrument",
+        help="Record and report call statistics per DAL method",
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--instrument-json",
+        dest="instrument_json",
+        help="JSON file the DAL call statistics are written to",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--log-queue-size",
+        dest="log_queue_size",
+        help=(
+            "Maximum number of log records queued for a background thread "
+            "to handle where `0` handles them synchronously"
+        ),
+        type=int,
+        default=0,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--log-queue-drop",
+        dest="log_queue_drop",
+        help="Drop log records while the log queue is full instead of waiting",
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--progress-interval",
+        dest="progress_interval",
+        help=(
+            "Interval in seconds between progress and throughput reports "
+            "where `0` disables them"
+        ),
+        type=float,
+        default=30.0,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--profile",
+        dest="profile",
+        help=(
+            "Profile the parse, transform, and DB write stages separately "
+            "where 'sampling' is cheap enough for production loads"
+        ),
+        choices=["cprofile", "sampling", "tracemalloc"],
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--profile-dir",
+        dest="dirname_profile",
+        help="Directory the profiling artifacts are written to",
+        default=".",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--profile-top",
+        dest="profile_top",
+        help="Number of entries per stage in the profile summary",
+        type=int,
+        default=20,
+        required=False,
+    )
     argument_parser.add_argument(
         "--config-file",
         dest="config_file",
@@ -115,4 +542,23 @@ if __name__ == "__main__":
     )
     arguments = argument_parser.parse_args()
 
+    # The synonyms mode takes the MRSAT.rrf file followed by the MRCONSO.rrf
+    # file, the definitions mode the MRDEF.rrf file followed by the MRSAT.rrf
+    # file, and the XML modes one or more XML files.
+    if arguments.mode == "synonyms" and len(arguments.filenames) != 2:
+        argument_parser.error(
+            "mode 'synonyms' requires the MRSAT.rrf and MRCONSO.rrf files"
+        )
+    elif arguments.mode == "definitions" and len(arguments.filenames) != 2:
+        argument_parser.error(
+            "mode 'definitions' requires the MRDEF.rrf and MRSAT.rrf files"
+        )
+    elif (
+        arguments.mode in ["descriptors", "qualifiers", "supplementals"]
+        and not arguments.filenames
+    ):
+        argument_parser.error(
+            "mode '{}' requires at least one XML file".format(arguments.mode)
+        )
+
     main(args=arguments)
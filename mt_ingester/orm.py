@@ -0,0 +1,85 @@
+# coding=utf-8
+
+""" ORM module
+
+This module contains the ORM classes of the tables derived by `mt-ingester`
+from the MeSH data, e.g., the tree-number closure and keys, which aren't
+defined in `fform`. They're declared on the `fform` metadata under the MeSH
+schema so that they're created, deferred, and swapped along with the MeSH
+tables.
+"""
+
+import sqlalchemy
+
+from fform.orm_base import Base
+from fform.orm_mt import TreeNumber
+
+
+class TreeNumberClosure(Base):
+    """ Table of the ancestor/descendant pairs of the MeSH tree numbers so
+        that a subtree, e.g., all tree numbers under `C04`, is retrieved
+        through an index lookup rather than a `LIKE 'C04.%'` scan.
+
+    Notes:
+        Every tree number is paired with itself at a `depth` of `0`.
+    """
+
+    # Set table name.
+    __tablename__ = "tree_number_closures"
+
+    # Foreign key to the ancestor tree number ID. The column type is that of
+    # the referenced column.
+    ancestor_tree_number_id = sqlalchemy.Column(
+        sqlalchemy.ForeignKey(TreeNumber.tree_number_id, ondelete="CASCADE"),
+        name="ancestor_tree_number_id",
+        primary_key=True,
+    )
+
+    # Foreign key to the descendant tree number ID.
+    descendant_tree_number_id = sqlalchemy.Column(
+        sqlalchemy.ForeignKey(TreeNumber.tree_number_id, ondelete="CASCADE"),
+        name="descendant_tree_number_id",
+        primary_key=True,
+        index=True,
+    )
+
+    # The number of levels between the ancestor and the descendant.
+    depth = sqlalchemy.Column(
+        name="depth",
+        type_=sqlalchemy.types.SmallInteger(),
+        nullable=False,
+    )
+
+    # Set table arguments.
+    __table_args__ = {"schema": TreeNumber.__table__.schema}
+
+
+class TreeNumberKey(Base):
+    """ Table of the compact sortable keys of the MeSH tree numbers so that a
+        subtree is retrieved through a single range scan.
+
+    Notes:
+        The keys are created through `tree_numbers.encode_tree_number` and
+        the subtree of a key `k` is the range `[k, k || '\\xffff')`.
+    """
+
+    # Set table name.
+    __tablename__ = "tree_number_keys"
+
+    # Foreign key to the tree number ID.
+    tree_number_id = sqlalchemy.Column(
+        sqlalchemy.ForeignKey(TreeNumber.tree_number_id, ondelete="CASCADE"),
+        name="tree_number_id",
+        primary_key=True,
+    )
+
+    # The key of two bytes per tree-number level.
+    key = sqlalchemy.Column(
+        name="key",
+        type_=sqlalchemy.types.LargeBinary(),
+        nullable=False,
+        index=True,
+    )
+
+    # Set table arguments.
+    __table_args__ = {"schema": TreeNumber.__table__.schema}
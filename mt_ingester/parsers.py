@@ -1,26 +1,45 @@
 # coding=utf-8
 
+from __future__ import annotations
+
+import os
 import abc
 import gzip
 import datetime
-import csv
-import sys
-from typing import Union, Optional, List, Dict
-
-from lxml import etree
-
-from fform.orm_mt import DescriptorClassType
-from fform.orm_mt import RelationNameType
-from fform.orm_mt import LexicalTagType
-from fform.orm_mt import SupplementalClassType
+from collections import Counter
+from typing import (
+    Union,
+    Optional,
+    List,
+    Dict,
+    Mapping,
+    Iterable,
+    Iterator,
+    Sequence,
+    Tuple,
+)
 
 from mt_ingester.loggers import create_logger
+from mt_ingester import rrf_arrow
 from mt_ingester.parser_utils import convert_yn_boolean
-
-
-# Set the maximum CSV field size to the system maximum as UMLS files may have
-# large fields.
-csv.field_size_limit(sys.maxsize)
+from mt_ingester.rrf import iterate_rrf_rows
+from mt_ingester.rrf import map_file_ranges
+from mt_ingester.rrf import get_worker_state
+from mt_ingester.cui_index import CuiDuiIndex
+from mt_ingester.cui_index import get_index_filename
+from mt_ingester.cui_map import CuiDuiMap
+from mt_ingester.external_sort import ExternalSorter
+from mt_ingester.external_sort import iterate_groups
+from mt_ingester.rrf_filters import RrfFilter
+from mt_ingester.rrf_filters import RrfFilterSpec
+from mt_ingester.rrf_filters import iterate_filtered_rows
+from mt_ingester.rrf_filters import format_filter_stats
+from mt_ingester.utils import LazyModule
+
+# The XML parsers' dependencies are imported on first use so that the UMLS
+# parsers can be used without importing them.
+etree = LazyModule("lxml.etree", globals())
+orm_mt = LazyModule("fform.orm_mt", globals())
 
 
 class ParserBase(object):
@@ -35,7 +54,10 @@ class ParserBase(object):
 class ParserXmlBase(ParserBase):
     def __init__(self, **kwargs):
 
-        super(ParserXmlBase, self).__init__(kwargs=kwargs)
+        super(ParserXmlBase, self).__init__(**kwargs)
+
+        # The XML file being parsed, if any, used to report progress.
+        self.file_xml = None
 
     @staticmethod
     def _et(element: etree.Element,) -> Union[str, None]:
@@ -91,8 +113,33 @@ class ParserXmlBase(ParserBase):
         else:
             file_xml = open(filename_xml, "rb")
 
+        self.file_xml = file_xml
+
         return file_xml
 
+    def get_position(self) -> Optional[int]:
+        """ Retrieves the byte offset up to which the XML file being parsed
+            has been read, within the compressed file for gzipped ones.
+
+        Notes:
+            This method may be called from another thread, e.g., by a
+            `ProgressReporter`, while the file is being read.
+
+        Returns:
+            Optional[int]: The byte offset or `None` if no file is being
+                parsed.
+        """
+
+        file_xml = self.file_xml
+        if isinstance(file_xml, gzip.GzipFile):
+            file_xml = file_xml.fileobj
+
+        try:
+            return file_xml.tell() if file_xml is not None else None
+        except ValueError:
+            # The file has been closed.
+            return None
+
     @abc.abstractmethod
     def parse(self, filename_xml):
         raise NotImplementedError
@@ -101,7 +148,7 @@ class ParserXmlBase(ParserBase):
 class ParserXmlMeshBase(ParserXmlBase):
     def __init__(self, **kwargs):
 
-        super(ParserXmlMeshBase, self).__init__(kwargs=kwargs)
+        super(ParserXmlMeshBase, self).__init__(**kwargs)
 
     def _ets(self, element: etree.Element) -> Union[str, None]:
         """Extracts the text out of an element containing an element of
@@ -269,7 +316,7 @@ class ParserXmlMeshBase(ParserXmlBase):
             return {}
 
         concept_relation = {
-            "RelationName": RelationNameType.get_member(
+            "RelationName": orm_mt.RelationNameType.get_member(
                 self._eav(element, "RelationName")
             ),
             "Concept1UI": self._et(element.find("Concept1UI")),
@@ -360,7 +407,7 @@ class ParserXmlMeshBase(ParserXmlBase):
                 element, "ConceptPreferredTermYN"
             ),
             "IsPermutedTermYN": self._eav(element, "IsPermutedTermYN"),
-            "LexicalTag": LexicalTagType.get_member(
+            "LexicalTag": orm_mt.LexicalTagType.get_member(
                 self._eav(element, "LexicalTag")
             ),
             "RecordPreferredTermYN": self._eav(
@@ -635,7 +682,7 @@ class ParserXmlMeshBase(ParserXmlBase):
 class ParserXmlMeshDescriptors(ParserXmlMeshBase):
     def __init__(self, **kwargs):
 
-        super(ParserXmlMeshDescriptors, self).__init__(kwargs=kwargs)
+        super(ParserXmlMeshDescriptors, self).__init__(**kwargs)
 
     def parse_allowable_qualifier(self, element: etree.Element) -> dict:
         """Parses an element of type `<AllowableQualifier>` and returns the
@@ -806,7 +853,7 @@ class ParserXmlMeshDescriptors(ParserXmlMeshBase):
             return {}
 
         descriptor_record = {
-            "DescriptorClass": DescriptorClassType.get_member(
+            "DescriptorClass": orm_mt.DescriptorClassType.get_member(
                 self._eav(element, "DescriptorClass")
             ),
             "DescriptorUI": self._et(element.find("DescriptorUI")),
@@ -872,7 +919,7 @@ class ParserXmlMeshDescriptors(ParserXmlMeshBase):
 class ParserXmlMeshQualifiers(ParserXmlMeshBase):
     def __init__(self, **kwargs):
 
-        super(ParserXmlMeshQualifiers, self).__init__(kwargs=kwargs)
+        super(ParserXmlMeshQualifiers, self).__init__(**kwargs)
 
     def parse_qualifier_record(self, element: etree.Element) -> dict:
         """Parses an element of type `<QualifierRecord>` and returns the values
@@ -932,7 +979,7 @@ class ParserXmlMeshQualifiers(ParserXmlMeshBase):
 class ParserXmlMeshSupplementals(ParserXmlMeshBase):
     def __init__(self, **kwargs):
 
-        super(ParserXmlMeshSupplementals, self).__init__(kwargs=kwargs)
+        super(ParserXmlMeshSupplementals, self).__init__(**kwargs)
 
     def parse_heading_mapped_to(self, element: etree.Element) -> dict:
         """Parses an element of type `<HeadingMappedTo>` and returns the values
@@ -1087,7 +1134,7 @@ class ParserXmlMeshSupplementals(ParserXmlMeshBase):
             return {}
 
         supplemental_record = {
-            "SupplementalClass": SupplementalClassType.get_member(
+            "SupplementalClass": orm_mt.SupplementalClassType.get_member(
                 self._eav(element, "SCRClass")
             ),
             "SupplementalRecordUI": self._et(
@@ -1145,6 +1192,11 @@ class ParserXmlMeshSupplementals(ParserXmlMeshBase):
 class ParserUmlsSat(ParserBase):
     """ Class used to parse the UMLS MRSAT.rrf file and create a map between
         UMLS CUIs and MeSH descriptor IDs.
+
+    Notes:
+        Unlike the MRCONSO.rrf and MRDEF.rrf parsers this parser takes no
+        `RrfFilterSpec` as the CUI-DUI map is shared by both and cached in
+        index files keyed on the MRSAT.rrf file alone.
     """
 
     # Define the header field names of the MRSAT.rrf file as defined in
@@ -1166,62 +1218,207 @@ class ParserUmlsSat(ParserBase):
         "CVF",
     ]
 
-    def __init__(self, **kwargs: dict):
-        """ Constructor and initialization."""
-        super(ParserUmlsSat, self).__init__(kwargs=kwargs)
+    def __init__(
+        self,
+        num_workers: int = 1,
+        dirname_index: Optional[str] = None,
+        backend: str = "python",
+        **kwargs: dict
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            num_workers (int, optional): The number of processes the file is
+                parsed in. Defaults to `1`.
+            dirname_index (Optional[str]): The directory where CUI-DUI index
+                files are stored and reused from. Defaults to `None` in which
+                case the file is parsed into a dictionary on every call.
+            backend (str, optional): The backend used to read the RRF files,
+                i.e., `python` for the byte-level reader or `arrow` for the
+                columnar reader which requires `pyarrow`. Defaults to
+                `python`.
+        """
 
-    def parse(self, filename_mrsat_rrf: str) -> Dict[str, str]:
-        """ Parses the MRSAT.rrf file and creates a dictionary keyed on UMLS
+        super(ParserUmlsSat, self).__init__(**kwargs)
+
+        self.num_workers = num_workers
+        self.dirname_index = dirname_index
+        self.backend = backend
+
+    def parse(self, filename_mrsat_rrf: str) -> Mapping[str, str]:
+        """ Parses the MRSAT.rrf file and creates a mapping keyed on UMLS
             CUIs with values of MeSH descriptor IDs.
 
+        Notes:
+            When an index directory was defined the result is a `CuiDuiIndex`
+            which is reused as long as the MRSAT.rrf file is unchanged, and a
+            `CuiDuiMap` otherwise.
+
         Args:
             filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
 
         Returns:
-            Dict[str, str]: Result dictionary keyed on UMLS CUIs with
-                values of MeSH descriptor IDs.
+            Mapping[str, str]: Result mapping keyed on UMLS CUIs with values
+                of MeSH descriptor IDs.
+        """
+
+        if self.dirname_index is None:
+            return self.parse_file(filename_mrsat_rrf=filename_mrsat_rrf)
+
+        filename_index = get_index_filename(
+            dirname_index=self.dirname_index,
+            filename_mrsat_rrf=filename_mrsat_rrf,
+        )
+
+        if os.path.exists(filename_index):
+            try:
+                index = CuiDuiIndex(filename_index=filename_index)
+            except ValueError:
+                # Discard indexes that can't be opened, e.g., truncated ones,
+                # and write them again.
+                msg = "Discarding invalid CUI-DUI index '{0}'"
+                msg_fmt = msg.format(filename_index)
+                self.logger.warning(msg=msg_fmt)
+
+                os.remove(filename_index)
+            else:
+                msg = (
+                    "Reusing CUI-DUI index '{0}' of UMLS MRSAT RRF file '{1}'"
+                )
+                msg_fmt = msg.format(filename_index, filename_mrsat_rrf)
+                self.logger.info(msg=msg_fmt)
+
+                return index
+
+        map_cui_dui = self.parse_file(filename_mrsat_rrf=filename_mrsat_rrf)
+
+        msg = "Writing CUI-DUI index '{0}'"
+        msg_fmt = msg.format(filename_index)
+        self.logger.info(msg=msg_fmt)
+
+        os.makedirs(self.dirname_index, exist_ok=True)
+
+        return CuiDuiIndex.build(
+            filename_index=filename_index, map_cui_dui=map_cui_dui
+        )
+
+    def parse_file(self, filename_mrsat_rrf: str) -> CuiDuiMap:
+        """ Parses the MRSAT.rrf file and creates a packed mapping keyed on
+            UMLS CUIs with values of MeSH descriptor IDs.
+
+        Args:
+            filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
+
+        Returns:
+            CuiDuiMap: Result mapping keyed on UMLS CUIs with values of MeSH
+                descriptor IDs.
         """
 
         msg = "Parsing UMLS MRSAT RRF file '{0}'"
         msg_fmt = msg.format(filename_mrsat_rrf)
         self.logger.info(msg=msg_fmt)
 
-        # Iterate over the MRSAT.rrf lines and create a dictionary mapping UMLS
-        # concept IDs (CUIs) to MeSH descriptor IDs (DUIs).
-        map_cui_dui = {}
-        with open(filename_mrsat_rrf, "r") as finp:
-            reader = csv.DictReader(
-                finp, fieldnames=self.fieldnames_mrsat, delimiter="|"
+        if self.backend == "arrow":
+            return CuiDuiMap.from_pairs(
+                rrf_arrow.iterate_mrsat(
+                    filename_mrsat_rrf=filename_mrsat_rrf,
+                    fieldnames=self.fieldnames_mrsat,
+                )
             )
 
-            for entry in reader:
-                # Skip entries that don't establish the relationship between
-                # a UMLS concept and a MeSH descriptor.
-                if not entry.get("ATN") in ("MESH_DUI", "TERMUI"):
-                    continue
+        # Parse the file in ranges and merge the partial maps in file order so
+        # that later entries override earlier ones as in a serial parse.
+        map_cui_dui = CuiDuiMap.merge(
+            map_file_ranges(
+                func=self.parse_range,
+                filename_rrf=filename_mrsat_rrf,
+                num_workers=self.num_workers,
+            )
+        )
 
-                # Skip entries that don't define a value for CUI or ATV.
-                if not entry.get("CUI") or not entry.get("ATV"):
-                    continue
+        return map_cui_dui
 
-                # Retrieve the UMLS CUI.
-                cui = entry["CUI"]
+    @classmethod
+    def parse_range(
+        cls, filename_mrsat_rrf: str, start: int, end: Optional[int]
+    ) -> CuiDuiMap:
+        """ Parses a byte range of the MRSAT.rrf file and creates a packed
+            mapping keyed on UMLS CUIs with values of MeSH descriptor IDs.
 
-                # Retrieve the MeSH DUI depending on the value of `ATN`.
-                if entry["ATN"] == "TERMUI":
-                    if not entry["CODE"] or not entry["CODE"].startswith("D"):
-                        continue
-                    dui = entry["CODE"]
-                elif entry["ATN"] == "MESH_DUI":
-                    if not entry["ATV"] or not entry["ATV"].startswith("D"):
-                        continue
-                    dui = entry["ATV"]
-                else:
-                    raise NotImplementedError
+        Args:
+            filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
+            start (int): The byte offset of the first line in the range.
+            end (Optional[int]): The byte offset the range ends at or `None`
+                for the end of the file.
 
-                map_cui_dui[cui] = dui
+        Returns:
+            CuiDuiMap: Result mapping keyed on UMLS CUIs with values of MeSH
+                descriptor IDs.
+        """
 
-        return map_cui_dui
+        return CuiDuiMap.from_pairs(
+            cls.iterate_pairs(
+                filename_mrsat_rrf=filename_mrsat_rrf, start=start, end=end
+            )
+        )
+
+    @classmethod
+    def iterate_pairs(
+        cls, filename_mrsat_rrf: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """ Reads a byte range of the MRSAT.rrf file and yields the pairs of
+            UMLS CUIs and MeSH descriptor IDs it defines in file order.
+
+        Args:
+            filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
+            start (int, optional): The byte offset of the first line in the
+                range. Defaults to `0`.
+            end (Optional[int]): The byte offset the range ends at or `None`
+                for the end of the file.
+
+        Yields:
+            Tuple[str, str]: The UMLS CUI and the MeSH descriptor ID.
+        """
+
+        # Iterate over the MRSAT.rrf lines and yield the UMLS concept IDs
+        # (CUIs) along with MeSH descriptor IDs (DUIs). Lines that don't
+        # contain either `ATN` value are rejected before being split.
+        rows = iterate_rrf_rows(
+            filename_rrf=filename_mrsat_rrf,
+            columns=[
+                cls.fieldnames_mrsat.index("CUI"),
+                cls.fieldnames_mrsat.index("CODE"),
+                cls.fieldnames_mrsat.index("ATN"),
+                cls.fieldnames_mrsat.index("ATV"),
+            ],
+            tokens=[b"|MESH_DUI|", b"|TERMUI|"],
+            start=start,
+            end=end,
+        )
+
+        for cui, code, atn, atv in rows:
+            # Skip entries that don't establish the relationship between
+            # a UMLS concept and a MeSH descriptor.
+            if atn not in ("MESH_DUI", "TERMUI"):
+                continue
+
+            # Skip entries that don't define a value for CUI or ATV.
+            if not cui or not atv:
+                continue
+
+            # Retrieve the MeSH DUI depending on the value of `ATN`.
+            if atn == "TERMUI":
+                if not code or not code.startswith("D"):
+                    continue
+                dui = code
+            elif atn == "MESH_DUI":
+                if not atv.startswith("D"):
+                    continue
+                dui = atv
+            else:
+                raise NotImplementedError
+
+            yield cui, dui
 
 
 class ParserUmlsConso(ParserBase):
@@ -1257,10 +1454,113 @@ class ParserUmlsConso(ParserBase):
         "CVF",
     ]
 
-    def __init__(self, **kwargs: dict):
-        """ Constructor and initialization."""
+    def __init__(
+        self,
+        num_workers: int = 1,
+        dirname_index: Optional[str] = None,
+        backend: str = "python",
+        filter_spec: Optional[RrfFilterSpec] = None,
+        max_memory: Optional[int] = None,
+        dirname_tmp: Optional[str] = None,
+        **kwargs: dict
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            num_workers (int, optional): The number of processes the files are
+                parsed in. Defaults to `1`.
+            dirname_index (Optional[str]): The directory where CUI-DUI index
+                files of the MRSAT.rrf file are stored and reused from.
+                Defaults to `None` in which case no index is used.
+            backend (str, optional): The backend used to read the RRF files,
+                i.e., `python` for the byte-level reader or `arrow` for the
+                columnar reader which requires `pyarrow`. Defaults to
+                `python`.
+            filter_spec (Optional[RrfFilterSpec]): The filters the MRCONSO.rrf
+                rows must pass. Defaults to `None` in which case the spec
+                returned by `create_filter_spec` is used.
+            max_memory (Optional[int]): The estimated size in bytes the
+                parsed rows may take in memory before they're spilled to
+                disk as sorted runs which are merged once the file has been
+                read. Defaults to `None` in which case the rows are
+                accumulated in memory.
+            dirname_tmp (Optional[str]): The directory under which the sorted
+                runs are created. Defaults to `None` in which case the default
+                temporary directory is used.
+        """
+
+        super(ParserUmlsConso, self).__init__(**kwargs)
+
+        self.num_workers = num_workers
+        self.dirname_index = dirname_index
+        self.backend = backend
+        self.filter_spec = (
+            filter_spec
+            if filter_spec is not None
+            else self.create_filter_spec()
+        )
+        self.max_memory = max_memory
+        self.dirname_tmp = dirname_tmp
+
+        # The number of rows dropped by each filter during the last parse.
+        self.filter_stats = Counter()
+
+    @classmethod
+    def create_filter_spec(
+        cls,
+        languages: Optional[Sequence[str]] = ("ENG",),
+        sources_include: Optional[List[str]] = None,
+        sources_exclude: Optional[List[str]] = None,
+        term_types_include: Optional[List[str]] = None,
+        term_types_exclude: Optional[List[str]] = None,
+        suppress: Optional[List[str]] = None,
+        preferred_only: bool = False,
+    ) -> RrfFilterSpec:
+        """ Creates a spec of the filters the MRCONSO.rrf rows must pass which
+            always drops rows not referring to a MeSH entity, i.e., those with
+            an empty `SDUI`.
+
+        Args:
+            languages (Optional[Sequence[str]]): The `LAT` values to keep.
+                Defaults to `ENG`. If `None`, empty, or including `ALL` all
+                languages are kept.
+            sources_include (Optional[List[str]]): The `SAB` values to keep.
+            sources_exclude (Optional[List[str]]): The `SAB` values to drop.
+            term_types_include (Optional[List[str]]): The `TTY` values to keep.
+            term_types_exclude (Optional[List[str]]): The `TTY` values to drop.
+            suppress (Optional[List[str]]): The `SUPPRESS` values to keep.
+            preferred_only (bool, optional): Whether to only keep the rows
+                whose `ISPREF` value is `Y`. Defaults to `False`.
+
+        Returns:
+            RrfFilterSpec: The filter spec.
+        """
+
+        if languages is not None and (not languages or "ALL" in languages):
+            languages = None
+
+        return RrfFilterSpec.create(
+            languages=languages,
+            sources_include=sources_include,
+            sources_exclude=sources_exclude,
+            term_types_include=term_types_include,
+            term_types_exclude=term_types_exclude,
+            suppress=suppress,
+            preferred_only=preferred_only,
+            fields_non_empty=["SDUI"],
+        )
 
-        super(ParserUmlsConso, self).__init__(kwargs=kwargs)
+    def log_filter_stats(self, filename_mrconso_rrf: str):
+        """ Logs the number of rows dropped by each filter during the last
+            parse.
+        """
+
+        msg = "Filtered UMLS MRCONSO RRF file '{0}': {1}"
+        msg_fmt = msg.format(
+            filename_mrconso_rrf,
+            format_filter_stats(self.filter_stats, self.filter_spec),
+        )
+        self.logger.info(msg=msg_fmt)
 
     def parse(
         self, filename_mrsat_rrf: str, filename_mrconso_rrf: str
@@ -1277,36 +1577,55 @@ class ParserUmlsConso(ParserBase):
             descriptor IDs with values of lists of synonyms.
         """
 
+        # Merge the synonyms from sorted runs spilled to disk when the memory
+        # is capped so that only the deduplicated synonyms are held.
+        if self.max_memory is not None:
+            return dict(
+                self.iterate_groups(
+                    filename_mrsat_rrf=filename_mrsat_rrf,
+                    filename_mrconso_rrf=filename_mrconso_rrf,
+                )
+            )
+
         # Create a `ParserUmlsSat` parser and use it to parse the MRSAT.RRF file
         # to create a map between CUIs and MeSH descriptor IDs.
-        parser_mrsat = ParserUmlsSat()
+        parser_mrsat = ParserUmlsSat(
+            num_workers=self.num_workers,
+            dirname_index=self.dirname_index,
+            backend=self.backend,
+        )
         map_cui_dui = parser_mrsat.parse(filename_mrsat_rrf=filename_mrsat_rrf)
 
         msg = "Parsing UMLS MRCONSO RRF file '{0}'"
         msg_fmt = msg.format(filename_mrconso_rrf)
         self.logger.info(msg=msg_fmt)
 
-        dui_synonyms = {}
-        with open(filename_mrconso_rrf, "r") as finp:
-            reader = csv.DictReader(
-                finp, fieldnames=self.fieldnames_mrconso, delimiter="|"
-            )
-
-            for entry in reader:
-                # Skip that do not refer to a MeSH entity.
-                if not entry.get("SDUI"):
-                    continue
-
-                if entry["CUI"] not in map_cui_dui.keys():
-                    continue
+        self.filter_stats = Counter()
 
-                # Skip non-Engish entries.
-                if entry.get("LAT") != "ENG":
-                    continue
-
-                dui = map_cui_dui[entry["CUI"]]
-
-                dui_synonyms.setdefault(dui, []).append(entry["STR"])
+        dui_synonyms = {}
+        if self.backend == "arrow":
+            for dui, synonym in rrf_arrow.iterate_mrconso(
+                filename_mrconso_rrf=filename_mrconso_rrf,
+                fieldnames=self.fieldnames_mrconso,
+                map_cui_dui=map_cui_dui,
+                filter_spec=self.filter_spec,
+                stats=self.filter_stats,
+            ):
+                dui_synonyms.setdefault(dui, []).append(synonym)
+        else:
+            # Parse the file in ranges and concatenate the partial synonym
+            # lists in file order.
+            for dui_synonyms_range, stats_range in map_file_ranges(
+                func=self.parse_range,
+                filename_rrf=filename_mrconso_rrf,
+                num_workers=self.num_workers,
+                state=(map_cui_dui, self.filter_spec),
+            ):
+                for dui, synonyms in dui_synonyms_range.items():
+                    dui_synonyms.setdefault(dui, []).extend(synonyms)
+                self.filter_stats.update(stats_range)
+
+        self.log_filter_stats(filename_mrconso_rrf=filename_mrconso_rrf)
 
         # Lowercase all synonyms
         for dui, synonyms in dui_synonyms.items():
@@ -1318,6 +1637,262 @@ class ParserUmlsConso(ParserBase):
 
         return dui_synonyms
 
+    @classmethod
+    def parse_range(
+        cls, filename_mrconso_rrf: str, start: int, end: Optional[int]
+    ) -> Tuple[Dict[str, List[str]], Counter]:
+        """ Parses a byte range of the MRCONSO.rrf file and creates a
+            dictionary keyed on MeSH descriptor IDs with values of lists of
+            synonyms in file order.
+
+        Notes:
+            The CUI-DUI map and the filter spec are retrieved through
+            `get_worker_state`.
+
+        Args:
+            filename_mrconso_rrf (str): Path to the MRCONSO.rrf file.
+            start (int): The byte offset of the first line in the range.
+            end (Optional[int]): The byte offset the range ends at or `None`
+                for the end of the file.
+
+        Returns:
+            Tuple[Dict[str, List[str]], Counter]: Result dictionary keyed on
+            MeSH descriptor IDs with values of lists of synonyms and the
+            number of rows dropped by each filter.
+        """
+
+        map_cui_dui, filter_spec = get_worker_state()
+
+        dui_synonyms = {}
+        stats = Counter()
+        for dui, synonym in cls.iterate_synonyms(
+            filename_mrconso_rrf=filename_mrconso_rrf,
+            map_cui_dui=map_cui_dui,
+            filter_spec=filter_spec,
+            stats=stats,
+            start=start,
+            end=end,
+        ):
+            dui_synonyms.setdefault(dui, []).append(synonym)
+
+        return dui_synonyms, stats
+
+    @classmethod
+    def iterate_synonyms(
+        cls,
+        filename_mrconso_rrf: str,
+        map_cui_dui: Mapping[str, str],
+        filter_spec: Optional[RrfFilterSpec] = None,
+        stats: Optional[Counter] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Iterator[Tuple[str, str]]:
+        """ Iterates over a byte range of the MRCONSO.rrf file and yields the
+            synonyms of MeSH descriptors passing the filters in file order.
+
+        Args:
+            filename_mrconso_rrf (str): Path to the MRCONSO.rrf file.
+            map_cui_dui (Mapping[str, str]): Mapping between UMLS CUIs and MeSH
+                descriptor IDs.
+            filter_spec (Optional[RrfFilterSpec]): The filters to apply.
+                Defaults to `None` in which case the spec returned by
+                `create_filter_spec` is used.
+            stats (Optional[Counter]): The counter the number of rows dropped
+                by each filter is added to. Defaults to `None`.
+            start (int, optional): The byte offset of the first line in the
+                range. Defaults to `0`.
+            end (Optional[int]): The byte offset the range ends at. Defaults
+                to `None` for the end of the file.
+
+        Yields:
+            Tuple[str, str]: The MeSH descriptor ID and the synonym.
+        """
+
+        if filter_spec is None:
+            filter_spec = cls.create_filter_spec()
+
+        # Iterate over the MRCONSO.rrf rows passing the filters, e.g., in
+        # English and referring to a MeSH entity, whose CUI refers to a MeSH
+        # descriptor.
+        rows = iterate_filtered_rows(
+            filename_rrf=filename_mrconso_rrf,
+            fieldnames=cls.fieldnames_mrconso,
+            columns=["CUI", "STR"],
+            filter_spec=filter_spec,
+            cuis=map_cui_dui,
+            stats=stats,
+            start=start,
+            end=end,
+        )
+
+        for cui, synonym in rows:
+            yield map_cui_dui[cui], synonym
+
+    @classmethod
+    def sort_range(
+        cls, filename_mrconso_rrf: str, start: int, end: Optional[int]
+    ) -> Tuple[List[str], Counter]:
+        """ Parses a byte range of the MRCONSO.rrf file and spills its
+            descriptor-synonym pairs to sorted runs.
+
+        Notes:
+            The CUI-DUI map, the filter spec, the directory the runs are
+            spilled under, and the bounds of the runs are retrieved through
+            `get_worker_state`. The runs are left in place to be merged, and
+            removed, by the sorter of `iterate_groups`.
+
+        Args:
+            filename_mrconso_rrf (str): Path to the MRCONSO.rrf file.
+            start (int): The byte offset of the first line in the range.
+            end (Optional[int]): The byte offset the range ends at or `None`
+                for the end of the file.
+
+        Returns:
+            Tuple[List[str], Counter]: The run files and the number of rows
+            dropped by each filter.
+        """
+
+        (
+            map_cui_dui,
+            filter_spec,
+            dirname_runs,
+            max_run_size,
+            max_memory,
+        ) = get_worker_state()
+
+        stats = Counter()
+        sorter = ExternalSorter(
+            max_items=max_run_size,
+            dirname_tmp=dirname_runs,
+            max_memory=max_memory,
+        )
+        for dui, synonym in cls.iterate_synonyms(
+            filename_mrconso_rrf=filename_mrconso_rrf,
+            map_cui_dui=map_cui_dui,
+            filter_spec=filter_spec,
+            stats=stats,
+            start=start,
+            end=end,
+        ):
+            sorter.add((dui, synonym.lower()))
+        sorter.spill()
+
+        return sorter.filenames_runs, stats
+
+    def iterate_groups(
+        self,
+        filename_mrsat_rrf: str,
+        filename_mrconso_rrf: str,
+        max_run_size: int = 1000000,
+        dirname_tmp: Optional[str] = None,
+    ) -> Iterator[Tuple[str, List[str]]]:
+        """ Parses the MRSAT.rrf and MRCONSO.rrf files and yields the MeSH
+            descriptor IDs, in order, along with their lowercased and
+            deduplicated synonyms without building the entire result in memory.
+
+        Notes:
+            The synonyms of a descriptor may appear anywhere in the
+            MRCONSO.rrf file so they're put in order through an external sort
+            which spills sorted runs to temporary files. The first group is
+            therefore yielded once the file has been read while subsequent
+            groups are merged from the runs as they're consumed.
+
+            The synonyms of each group are sorted.
+
+            With more than one worker, the file is parsed in ranges through
+            `sort_range`, each spilling its own sorted runs, under a share of
+            `max_run_size` and `max_memory` per worker, which are merged
+            here.
+
+        Args:
+            filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
+            filename_mrconso_rrf (str): Path to the MRCONSO.rrf file.
+            max_run_size (int, optional): The number of descriptor-synonym
+                pairs held in memory before a sorted run is spilled to disk.
+                Defaults to `1000000`.
+            dirname_tmp (Optional[str]): The directory under which the run
+                files are created. Defaults to `None` in which case the
+                parser's `dirname_tmp` is used.
+
+        Yields:
+            Tuple[str, List[str]]: The MeSH descriptor ID and its synonyms.
+        """
+
+        parser_mrsat = ParserUmlsSat(
+            num_workers=self.num_workers,
+            dirname_index=self.dirname_index,
+            backend=self.backend,
+        )
+        map_cui_dui = parser_mrsat.parse(filename_mrsat_rrf=filename_mrsat_rrf)
+
+        msg = "Parsing UMLS MRCONSO RRF file '{0}' into sorted runs"
+        msg_fmt = msg.format(filename_mrconso_rrf)
+        self.logger.info(msg=msg_fmt)
+
+        self.filter_stats = Counter()
+
+        pairs = []  # type: Iterable[Tuple[str, str]]
+        if self.backend == "arrow":
+            pairs = rrf_arrow.iterate_mrconso(
+                filename_mrconso_rrf=filename_mrconso_rrf,
+                fieldnames=self.fieldnames_mrconso,
+                map_cui_dui=map_cui_dui,
+                filter_spec=self.filter_spec,
+                stats=self.filter_stats,
+            )
+        elif self.num_workers <= 1:
+            pairs = self.iterate_synonyms(
+                filename_mrconso_rrf=filename_mrconso_rrf,
+                map_cui_dui=map_cui_dui,
+                filter_spec=self.filter_spec,
+                stats=self.filter_stats,
+            )
+
+        sorter = ExternalSorter(
+            max_items=max_run_size,
+            dirname_tmp=(
+                dirname_tmp if dirname_tmp is not None else self.dirname_tmp
+            ),
+            max_memory=self.max_memory,
+        )
+        try:
+            if self.backend != "arrow" and self.num_workers > 1:
+                # Spill the runs of each range under the directory of the
+                # sorter so that they're removed along with its own.
+                for filenames_runs, stats_range in map_file_ranges(
+                    func=self.sort_range,
+                    filename_rrf=filename_mrconso_rrf,
+                    num_workers=self.num_workers,
+                    state=(
+                        map_cui_dui,
+                        self.filter_spec,
+                        sorter.dirname_runs,
+                        max(max_run_size // self.num_workers, 1),
+                        (
+                            self.max_memory // self.num_workers
+                            if self.max_memory is not None
+                            else None
+                        ),
+                    ),
+                ):
+                    sorter.add_runs(filenames_runs)
+                    self.filter_stats.update(stats_range)
+
+            for dui, synonym in pairs:
+                sorter.add((dui, synonym.lower()))
+
+            self.log_filter_stats(filename_mrconso_rrf=filename_mrconso_rrf)
+
+            msg = "Merging {0} sorted runs of UMLS MRCONSO RRF file '{1}'"
+            msg_fmt = msg.format(
+                len(sorter.filenames_runs) + 1, filename_mrconso_rrf
+            )
+            self.logger.info(msg=msg_fmt)
+
+            yield from iterate_groups(sorter)
+        finally:
+            sorter.close()
+
 
 class ParserUmlsDef(ParserBase):
     """ Class used to parse the UML MRDEF.rrf file and collect a dictionary of
@@ -1342,10 +1917,124 @@ class ParserUmlsDef(ParserBase):
         "CVF",
     ]
 
-    def __init__(self, **kwargs: dict):
-        """ Constructor and initialization."""
+    def __init__(
+        self,
+        num_workers: int = 1,
+        dirname_index: Optional[str] = None,
+        backend: str = "python",
+        filter_spec: Optional[RrfFilterSpec] = None,
+        max_memory: Optional[int] = None,
+        dirname_tmp: Optional[str] = None,
+        **kwargs: dict
+    ):
+        """ Constructor and initialization.
 
-        super(ParserUmlsDef, self).__init__(kwargs=kwargs)
+        Args:
+            num_workers (int, optional): The number of processes the files are
+                parsed in. Defaults to `1`.
+            dirname_index (Optional[str]): The directory where CUI-DUI index
+                files of the MRSAT.rrf file are stored and reused from.
+                Defaults to `None` in which case no index is used.
+            backend (str, optional): The backend used to read the RRF files,
+                i.e., `python` for the byte-level reader or `arrow` for the
+                columnar reader which requires `pyarrow`. Defaults to
+                `python`.
+            filter_spec (Optional[RrfFilterSpec]): The filters the MRDEF.rrf
+                rows must pass. Defaults to `None` in which case the spec
+                returned by `create_filter_spec` is used.
+            max_memory (Optional[int]): The estimated size in bytes the
+                parsed rows may take in memory before they're spilled to
+                disk as sorted runs which are merged once the file has been
+                read. Defaults to `None` in which case the rows are
+                accumulated in memory.
+            dirname_tmp (Optional[str]): The directory under which the sorted
+                runs are created. Defaults to `None` in which case the default
+                temporary directory is used.
+        """
+
+        super(ParserUmlsDef, self).__init__(**kwargs)
+
+        self.num_workers = num_workers
+        self.dirname_index = dirname_index
+        self.backend = backend
+        self.filter_spec = (
+            filter_spec
+            if filter_spec is not None
+            else self.create_filter_spec()
+        )
+        self.max_memory = max_memory
+        self.dirname_tmp = dirname_tmp
+
+        # The number of rows dropped by each filter during the last parse.
+        self.filter_stats = Counter()
+
+    @classmethod
+    def create_filter_spec(
+        cls,
+        sources_include: Optional[List[str]] = None,
+        sources_exclude: Optional[List[str]] = None,
+        suppress: Optional[List[str]] = None,
+    ) -> RrfFilterSpec:
+        """ Creates a spec of the filters the MRDEF.rrf rows must pass which
+            always drops rows lacking a definition source or a definition.
+
+        Args:
+            sources_include (Optional[List[str]]): The `SAB` values to keep.
+            sources_exclude (Optional[List[str]]): The `SAB` values to drop.
+            suppress (Optional[List[str]]): The `SUPPRESS` values to keep.
+
+        Returns:
+            RrfFilterSpec: The filter spec.
+        """
+
+        return RrfFilterSpec.create(
+            sources_include=sources_include,
+            sources_exclude=sources_exclude,
+            suppress=suppress,
+            fields_non_empty=["SAB", "DEF"],
+        )
+
+    def get_filter_spec(
+        self,
+        sources_include: Optional[List[str]] = None,
+        sources_exclude: Optional[List[str]] = None,
+    ) -> RrfFilterSpec:
+        """ Retrieves the parser's filter spec where the `SAB` filter is
+            replaced when source names are defined.
+
+        Args:
+            sources_include (Optional[List[str]]): The `SAB` values to keep.
+            sources_exclude (Optional[List[str]]): The `SAB` values to drop.
+
+        Returns:
+            RrfFilterSpec: The filter spec.
+        """
+
+        if sources_include is None and sources_exclude is None:
+            return self.filter_spec
+
+        return self.filter_spec.replace(
+            RrfFilter(
+                field="SAB",
+                include=sources_include,
+                exclude=sources_exclude,
+                non_empty=True,
+            )
+        )
+
+    def log_filter_stats(
+        self, filename_mrdef_rrf: str, filter_spec: RrfFilterSpec
+    ):
+        """ Logs the number of rows dropped by each filter during the last
+            parse.
+        """
+
+        msg = "Filtered UMLS MRDEF RRF file '{0}': {1}"
+        msg_fmt = msg.format(
+            filename_mrdef_rrf,
+            format_filter_stats(self.filter_stats, filter_spec),
+        )
+        self.logger.info(msg=msg_fmt)
 
     def parse(
         self,
@@ -1368,10 +2057,12 @@ class ParserUmlsDef(ParserBase):
             filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
             sources_include (Optional[List[str]] = None): A list of source names
                 to which the results will be limited to. Should *not* be used in
-                conjunction with the `sources_exclude` argument.
+                conjunction with the `sources_exclude` argument. Replaces the
+                `SAB` filter of the parser's filter spec when defined.
             sources_exclude (Optional[List[str]] = None): A list of source names
                 to be excluded from the results. Should *not* be used in
-                conjunction with the `sources_include` argument.
+                conjunction with the `sources_include` argument. Replaces the
+                `SAB` filter of the parser's filter spec when defined.
 
         Returns:
             Dict[str, Dict[str, List[str]]]: Result dictionary keyed on MeSH
@@ -1380,56 +2071,280 @@ class ParserUmlsDef(ParserBase):
             list of the definitions themselves.
         """
 
+        # Merge the definitions from sorted runs spilled to disk when the
+        # memory is capped so that only the deduplicated definitions are held.
+        if self.max_memory is not None:
+            return dict(
+                self.iterate_groups(
+                    filename_mrdef_rrf=filename_mrdef_rrf,
+                    filename_mrsat_rrf=filename_mrsat_rrf,
+                    sources_include=sources_include,
+                    sources_exclude=sources_exclude,
+                )
+            )
+
         # Create a `ParserUmlsSat` parser and use it to parse the MRSAT.RRF file
         # to create a map between CUIs and MeSH IDs.
-        parser_mrsat = ParserUmlsSat()
+        parser_mrsat = ParserUmlsSat(
+            num_workers=self.num_workers,
+            dirname_index=self.dirname_index,
+            backend=self.backend,
+        )
         map_cui_dui = parser_mrsat.parse(filename_mrsat_rrf=filename_mrsat_rrf)
 
         msg = "Parsing UMLS MRDEF RRF file '{0}'"
         msg_fmt = msg.format(filename_mrdef_rrf)
         self.logger.info(msg=msg_fmt)
 
+        filter_spec = self.get_filter_spec(
+            sources_include=sources_include, sources_exclude=sources_exclude
+        )
+
+        self.filter_stats = Counter()
+
+        # The definitions are accumulated as the keys of dictionaries, serving
+        # as insertion-ordered sets, so that definitions already encountered
+        # are skipped in constant time.
         dui_definitions = {}
-        with open(filename_mrdef_rrf, "r") as finp:
-            reader = csv.DictReader(
-                finp, fieldnames=self.fieldnames_mrdef, delimiter="|"
-            )
+        if self.backend == "arrow":
+            for dui, source, definition in rrf_arrow.iterate_mrdef(
+                filename_mrdef_rrf=filename_mrdef_rrf,
+                fieldnames=self.fieldnames_mrdef,
+                map_cui_dui=map_cui_dui,
+                filter_spec=filter_spec,
+                stats=self.filter_stats,
+            ):
+                dui_definitions.setdefault(dui, {}).setdefault(source, {})[
+                    definition
+                ] = None
+        else:
+            # Parse the file in ranges and merge the partial definitions in
+            # file order.
+            for dui_definitions_range, stats_range in map_file_ranges(
+                func=self.parse_range,
+                filename_rrf=filename_mrdef_rrf,
+                num_workers=self.num_workers,
+                state=(map_cui_dui, filter_spec),
+            ):
+                for dui, data in dui_definitions_range.items():
+                    for source, definitions_range in data.items():
+                        dui_definitions.setdefault(dui, {}).setdefault(
+                            source, {}
+                        ).update(definitions_range)
+                self.filter_stats.update(stats_range)
+
+        self.log_filter_stats(
+            filename_mrdef_rrf=filename_mrdef_rrf, filter_spec=filter_spec
+        )
 
-            for entry in reader:
-                # Skip entries whose CUIs don't refer to MeSH descriptors as
-                # defined in the `map_cui_dui` dictionary.
-                if entry.get("CUI") not in map_cui_dui.keys():
-                    continue
+        # Convert the sets of definitions to lists.
+        for dui, data in dui_definitions.items():
+            for source, definitions in data.items():
+                data[source] = list(definitions)
 
-                # Skip entries that don't define a definition source.
-                if not entry.get("SAB"):
-                    continue
+        return dui_definitions
 
-                # Skip entries that don't define a definition.
-                if not entry.get("DEF"):
-                    continue
+    @classmethod
+    def parse_range(
+        cls, filename_mrdef_rrf: str, start: int, end: Optional[int]
+    ) -> Tuple[Dict[str, Dict[str, Dict[str, None]]], Counter]:
+        """ Parses a byte range of the MRDEF.rrf file and creates a dictionary
+            keyed on MeSH descriptor IDs with values of dictionaries of
+            definitions keyed on the definition source name.
 
-                # If `sources_include` is defined then skip entries with a
-                # source not present in `sources_include`.
-                if sources_include is not None:
-                    if entry["SAB"] not in sources_include:
-                        continue
-
-                # If `sources_exclude` is defined then skip entries with a
-                # source present in `sources_exclude`.
-                if sources_exclude is not None:
-                    if entry["SAB"] in sources_exclude:
-                        continue
-
-                # Retrieve the list of definitions for this MeSH descriptor and
-                # definition source.
-                definitions = dui_definitions.setdefault(
-                    map_cui_dui[entry["CUI"]], {}
-                ).setdefault(entry["SAB"], [])
-
-                # Add the new definition if it doesn't already exist in the
-                # list.
-                if entry["DEF"] not in definitions:
-                    definitions.append(entry["DEF"])
+        Notes:
+            The definitions are returned as the keys of dictionaries valued
+            with `None` which serve as insertion-ordered sets. The CUI-DUI map
+            and the filter spec are retrieved through `get_worker_state`.
 
-        return dui_definitions
+        Args:
+            filename_mrdef_rrf (str): Path to the MRDEF.rrf file.
+            start (int): The byte offset of the first line in the range.
+            end (Optional[int]): The byte offset the range ends at or `None`
+                for the end of the file.
+
+        Returns:
+            Tuple[Dict[str, Dict[str, Dict[str, None]]], Counter]: Result
+            dictionary keyed on MeSH descriptor IDs with values of dictionaries
+            of definitions and the number of rows dropped by each filter.
+        """
+
+        map_cui_dui, filter_spec = get_worker_state()
+
+        dui_definitions = {}
+        stats = Counter()
+        for dui, source, definition in cls.iterate_definitions(
+            filename_mrdef_rrf=filename_mrdef_rrf,
+            map_cui_dui=map_cui_dui,
+            filter_spec=filter_spec,
+            stats=stats,
+            start=start,
+            end=end,
+        ):
+            # Add the definition to the set of definitions for this MeSH
+            # descriptor and definition source unless already present.
+            dui_definitions.setdefault(dui, {}).setdefault(source, {})[
+                definition
+            ] = None
+
+        return dui_definitions, stats
+
+    @classmethod
+    def iterate_definitions(
+        cls,
+        filename_mrdef_rrf: str,
+        map_cui_dui: Mapping[str, str],
+        filter_spec: Optional[RrfFilterSpec] = None,
+        stats: Optional[Counter] = None,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> Iterator[Tuple[str, str, str]]:
+        """ Iterates over a byte range of the MRDEF.rrf file and yields the
+            definitions of MeSH descriptors passing the filters in file order.
+
+        Args:
+            filename_mrdef_rrf (str): Path to the MRDEF.rrf file.
+            map_cui_dui (Mapping[str, str]): Mapping between UMLS CUIs and MeSH
+                descriptor IDs.
+            filter_spec (Optional[RrfFilterSpec]): The filters to apply.
+                Defaults to `None` in which case the spec returned by
+                `create_filter_spec` is used.
+            stats (Optional[Counter]): The counter the number of rows dropped
+                by each filter is added to. Defaults to `None`.
+            start (int, optional): The byte offset of the first line in the
+                range. Defaults to `0`.
+            end (Optional[int]): The byte offset the range ends at. Defaults
+                to `None` for the end of the file.
+
+        Yields:
+            Tuple[str, str, str]: The MeSH descriptor ID, the definition
+                source name, and the definition.
+        """
+
+        if filter_spec is None:
+            filter_spec = cls.create_filter_spec()
+
+        # Iterate over the MRDEF.rrf rows passing the filters, e.g., defining
+        # a definition source and a definition, whose CUI refers to a MeSH
+        # descriptor. The CUIs are only looked up for rows passing the
+        # filters.
+        rows = iterate_filtered_rows(
+            filename_rrf=filename_mrdef_rrf,
+            fieldnames=cls.fieldnames_mrdef,
+            columns=["CUI", "SAB", "DEF"],
+            filter_spec=filter_spec,
+            cuis=map_cui_dui,
+            stats=stats,
+            start=start,
+            end=end,
+        )
+
+        for cui, source, definition in rows:
+            yield map_cui_dui[cui], source, definition
+
+    def iterate_groups(
+        self,
+        filename_mrdef_rrf: str,
+        filename_mrsat_rrf: str,
+        sources_include: Optional[List[str]] = None,
+        sources_exclude: Optional[List[str]] = None,
+        max_run_size: int = 1000000,
+        dirname_tmp: Optional[str] = None,
+    ) -> Iterator[Tuple[str, Dict[str, List[str]]]]:
+        """ Parses the MRSAT.rrf and MRDEF.rrf files and yields the MeSH
+            descriptor IDs, in order, along with their definitions keyed on
+            the definition source name without building the entire result in
+            memory.
+
+        Notes:
+            The definitions are put in order through an external sort, as in
+            `ParserUmlsConso.iterate_groups`, along with their position in the
+            file so that the definitions of each source are deduplicated and
+            listed in file order as in the result of `parse`.
+
+        Args:
+            filename_mrdef_rrf (str): Path to the MRDEF.rrf file.
+            filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
+            sources_include (Optional[List[str]]): A list of source names to
+                which the results will be limited to.
+            sources_exclude (Optional[List[str]]): A list of source names to
+                be excluded from the results.
+            max_run_size (int, optional): The number of definitions held in
+                memory before a sorted run is spilled to disk. Defaults to
+                `1000000`.
+            dirname_tmp (Optional[str]): The directory under which the run
+                files are created. Defaults to `None` in which case the
+                parser's `dirname_tmp` is used.
+
+        Yields:
+            Tuple[str, Dict[str, List[str]]]: The MeSH descriptor ID and its
+                definitions keyed on the definition source name.
+        """
+
+        parser_mrsat = ParserUmlsSat(
+            num_workers=self.num_workers,
+            dirname_index=self.dirname_index,
+            backend=self.backend,
+        )
+        map_cui_dui = parser_mrsat.parse(filename_mrsat_rrf=filename_mrsat_rrf)
+
+        msg = "Parsing UMLS MRDEF RRF file '{0}' into sorted runs"
+        msg_fmt = msg.format(filename_mrdef_rrf)
+        self.logger.info(msg=msg_fmt)
+
+        filter_spec = self.get_filter_spec(
+            sources_include=sources_include, sources_exclude=sources_exclude
+        )
+
+        self.filter_stats = Counter()
+
+        if self.backend == "arrow":
+            triplets = rrf_arrow.iterate_mrdef(
+                filename_mrdef_rrf=filename_mrdef_rrf,
+                fieldnames=self.fieldnames_mrdef,
+                map_cui_dui=map_cui_dui,
+                filter_spec=filter_spec,
+                stats=self.filter_stats,
+            )
+        else:
+            triplets = self.iterate_definitions(
+                filename_mrdef_rrf=filename_mrdef_rrf,
+                map_cui_dui=map_cui_dui,
+                filter_spec=filter_spec,
+                stats=self.filter_stats,
+            )
+
+        sorter = ExternalSorter(
+            max_items=max_run_size,
+            dirname_tmp=(
+                dirname_tmp if dirname_tmp is not None else self.dirname_tmp
+            ),
+            max_memory=self.max_memory,
+        )
+        try:
+            for position, (dui, source, definition) in enumerate(triplets):
+                sorter.add((dui, (source, position, definition)))
+
+            self.log_filter_stats(
+                filename_mrdef_rrf=filename_mrdef_rrf, filter_spec=filter_spec
+            )
+
+            msg = "Merging {0} sorted runs of UMLS MRDEF RRF file '{1}'"
+            msg_fmt = msg.format(
+                len(sorter.filenames_runs) + 1, filename_mrdef_rrf
+            )
+            self.logger.info(msg=msg_fmt)
+
+            for dui, entries in iterate_groups(sorter):
+                # The entries are sorted by source and position so the first
+                # occurrence of a definition is kept.
+                data = {}
+                for source, _, definition in entries:
+                    data.setdefault(source, {})[definition] = None
+
+                yield dui, {
+                    source: list(definitions)
+                    for source, definitions in data.items()
+                }
+        finally:
+            sorter.close()
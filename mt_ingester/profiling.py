@@ -0,0 +1,585 @@
+# coding=utf-8
+
+""" Stage profiling module
+
+This module contains the profilers selected through the `--profile` argument
+of the ingestion scripts. Each profiles the parse, transform, and DB write
+stages of an ingestion separately, writes its artifacts named after the
+ingestion and profiling modes, and logs a top-N summary per stage:
+
+- `ProfilerCprofile` records a deterministic `cProfile` profile per stage.
+- `ProfilerSampling` samples the stack of the profiled thread at a fixed
+    interval from a background thread, which is cheap enough to run on
+    production loads.
+- `ProfilerTracemalloc` attributes the memory allocated through `tracemalloc`
+    to each stage and keeps a snapshot taken close to the peak.
+
+Stages nest, e.g., the DB writes an ingester makes are taken out of its
+transform stage, and only the calling thread is profiled so the processes
+RRF files are parsed in through `--num-workers` are not.
+"""
+
+import io
+import os
+import sys
+import threading
+import contextlib
+import collections
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from mt_ingester.loggers import create_logger
+from mt_ingester.utils import LazyModule
+from mt_ingester.utils import call_dal
+
+# The profiling modules are imported once profiling is enabled.
+pstats = LazyModule("pstats", globals())
+cProfile = LazyModule("cProfile", globals())
+tracemalloc = LazyModule("tracemalloc", globals())
+
+
+class Profiler(object):
+    """ Profiler which profiles nothing and incurs no overhead, used when
+        profiling isn't enabled.
+    """
+
+    mode = None  # type: Optional[str]
+
+    def __init__(
+        self,
+        label: str = "mt-ingester",
+        dirname: str = ".",
+        top: int = 20,
+        **kwargs
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            label (str): The label the artifacts are named after, e.g., the
+                ingestion mode and input filename.
+            dirname (str): The directory the artifacts are written to.
+            top (int): The number of entries per stage in the summary.
+        """
+
+        # Internalize arguments.
+        self.label = label
+        self.dirname = dirname
+        self.top = top
+
+        self.logger = create_logger(
+            logger_name=type(self).__name__,
+            logger_level=kwargs.get("logger_level", "DEBUG"),
+        )
+
+    def start(self):
+        """ Starts profiling."""
+
+        pass
+
+    def stop(self):
+        """ Stops profiling."""
+
+        pass
+
+    def stage(self, name: str):
+        """ Creates a context manager under which the code is profiled as part
+            of a stage.
+
+        Args:
+            name (str): The stage name, e.g., `parse`.
+        """
+
+        return contextlib.nullcontext()
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterable:
+        """ Wraps an iterable so that producing each of its items is profiled
+            as part of a stage, e.g., documents yielded by a parser.
+
+        Args:
+            name (str): The stage name, e.g., `parse`.
+            iterable (Iterable): The iterable to wrap.
+        """
+
+        return iterable
+
+    def wrap_dal(self, dal):
+        """ Wraps a DAL so that its calls are profiled as the `write` stage.
+
+        Args:
+            dal: The DAL instance to wrap.
+        """
+
+        return dal
+
+    def get_filename(self, suffix: str) -> str:
+        """ Assembles the path of an artifact.
+
+        Args:
+            suffix (str): The artifact suffix, e.g., `parse.prof`.
+
+        Returns:
+            str: The artifact path.
+        """
+
+        filename = "{}.{}.{}".format(self.label, self.mode, suffix)
+
+        return os.path.join(self.dirname, filename)
+
+    def dump(self) -> List[str]:
+        """ Writes the profiling artifacts.
+
+        Returns:
+            List[str]: The paths of the written artifacts.
+        """
+
+        return []
+
+    def summarize(self) -> str:
+        """ Summarizes the top entries per stage."""
+
+        return ""
+
+    def log_summary(self):
+        """ Writes the profiling artifacts and logs the summary."""
+
+        if self.mode is None:
+            return
+
+        filenames = self.dump()
+
+        msg = "Profile summary ({0}) with artifacts written to {1}:\n{2}"
+        msg_fmt = msg.format(self.mode, filenames, self.summarize())
+        self.logger.info(msg=msg_fmt)
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class ProfilerStaged(Profiler):
+    """ Base class of the profilers keeping track of the current stage.
+
+    Notes:
+        Subclasses implement `switch` which is called whenever the current
+        stage changes, where `None` denotes code outside any stage.
+    """
+
+    def __init__(self, **kwargs):
+        super(ProfilerStaged, self).__init__(**kwargs)
+
+        self.stage_current = None  # type: Optional[str]
+
+    def switch(self, previous: Optional[str], current: Optional[str]):
+        """ Called when the current stage changes.
+
+        Args:
+            previous (Optional[str]): The stage left.
+            current (Optional[str]): The stage entered.
+        """
+
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        previous = self.stage_current
+
+        self.stage_current = name
+        self.switch(previous=previous, current=name)
+        try:
+            yield
+        finally:
+            self.stage_current = previous
+            self.switch(previous=name, current=previous)
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def wrap_dal(self, dal):
+        return DalProfiled(dal=dal, profiler=self)
+
+
+class ProfilerCprofile(ProfilerStaged):
+    """ Profiler recording a deterministic `cProfile` profile per stage.
+
+    Notes:
+        The profiles are written to `.prof` files readable through `pstats`
+        or `snakeviz` and the summary lists the functions with the highest
+        internal time per stage.
+    """
+
+    mode = "cprofile"
+
+    def __init__(self, **kwargs):
+        super(ProfilerCprofile, self).__init__(**kwargs)
+
+        self.profiles = collections.OrderedDict()
+
+    def switch(self, previous: Optional[str], current: Optional[str]):
+        # Only one profile can be enabled at a time so the profile of the
+        # stage left is paused.
+        if previous is not None:
+            self.profiles[previous].disable()
+        if current is not None:
+            if current not in self.profiles:
+                self.profiles[current] = cProfile.Profile()
+            self.profiles[current].enable()
+
+    def dump(self) -> List[str]:
+        filenames = []
+        for name, profile in self.profiles.items():
+            filename = self.get_filename(suffix="{}.prof".format(name))
+            profile.dump_stats(filename)
+            filenames.append(filename)
+
+        return filenames
+
+    def summarize(self) -> str:
+        summaries = []
+        for name, profile in self.profiles.items():
+            stream = io.StringIO()
+            stats = pstats.Stats(profile, stream=stream)
+            stats.sort_stats("tottime").print_stats(self.top)
+            summaries.append(
+                "Stage '{}' ({:.3f} s):\n{}".format(
+                    name, stats.total_tt, stream.getvalue().strip()
+                )
+            )
+
+        return "\n\n".join(summaries)
+
+
+class ProfilerSampling(ProfilerStaged):
+    """ Profiler sampling the stack of the profiled thread at a fixed interval.
+
+    Notes:
+        Sampling happens in a background thread so the profiled code is only
+        slowed down by the time the sampler holds the GIL, i.e., walking the
+        stack once per interval, and by a stage switch per parsed document
+        and DAL call.
+
+        The samples are written as collapsed stacks, rooted at their stage,
+        readable through `flamegraph.pl` or `speedscope`, and the summary
+        lists the functions with the most samples per stage.
+    """
+
+    mode = "sampling"
+
+    def __init__(self, interval: float = 0.01, **kwargs):
+        """ Constructor and initialization.
+
+        Args:
+            interval (float, optional): The sampling interval in seconds.
+                Defaults to `0.01`.
+        """
+
+        super(ProfilerSampling, self).__init__(**kwargs)
+
+        # Internalize arguments.
+        self.interval = interval
+
+        self.samples = collections.Counter()
+        self.thread_id = None  # type: Optional[int]
+        self.thread = None  # type: Optional[threading.Thread]
+        self.event_stop = threading.Event()
+
+    def switch(self, previous: Optional[str], current: Optional[str]):
+        # The sampler reads `stage_current` directly.
+        pass
+
+    def sample(self):
+        """ Records the stack of the profiled thread along with its stage."""
+
+        stage = self.stage_current
+        if stage is None:
+            return
+
+        frame = sys._current_frames().get(self.thread_id)
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+
+        self.samples[(stage, tuple(codes))] += 1
+
+    def run(self):
+        while not self.event_stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.event_stop.clear()
+        self.thread = threading.Thread(
+            target=self.run, name=type(self).__name__, daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.event_stop.set()
+            self.thread.join()
+            self.thread = None
+
+    @staticmethod
+    def format_code(code) -> str:
+        return "{} ({}:{})".format(
+            code.co_name, code.co_filename, code.co_firstlineno
+        )
+
+    def dump(self) -> List[str]:
+        # Code objects can't be ordered so the stacks are formatted before
+        # being sorted.
+        counts_stack = collections.Counter()
+        for (stage, codes), count in self.samples.items():
+            frames = [stage] + [self.format_code(code) for code in codes]
+            counts_stack[";".join(frames)] += count
+
+        filename = self.get_filename(suffix="collapsed")
+        with open(filename, "w") as fout:
+            for stack, count in sorted(counts_stack.items()):
+                fout.write("{} {}\n".format(stack, count))
+
+        return [filename]
+
+    def summarize(self) -> str:
+        counts_stage = collections.Counter()
+        counts_self = collections.defaultdict(collections.Counter)
+        counts_total = collections.defaultdict(collections.Counter)
+        for (stage, codes), count in self.samples.items():
+            counts_stage[stage] += count
+            if codes:
+                counts_self[stage][codes[-1]] += count
+            # Recursive functions are only counted once per sample.
+            for code in set(codes):
+                counts_total[stage][code] += count
+
+        summaries = []
+        for stage, count_stage in counts_stage.most_common():
+            lines = [
+                "Stage '{}' ({} samples, ~{:.3f} s):".format(
+                    stage, count_stage, count_stage * self.interval
+                ),
+                "{:>8} {:>8}  {}".format("self %", "total %", "function"),
+            ]
+            for code, count in counts_self[stage].most_common(self.top):
+                lines.append(
+                    "{:>8.1f} {:>8.1f}  {}".format(
+                        100.0 * count / count_stage,
+                        100.0 * counts_total[stage][code] / count_stage,
+                        self.format_code(code),
+                    )
+                )
+            summaries.append("\n".join(lines))
+
+        return "\n\n".join(summaries)
+
+
+class ProfilerTracemalloc(ProfilerStaged):
+    """ Profiler attributing the memory allocated through `tracemalloc` to
+        each stage.
+
+    Notes:
+        The memory attributed to a stage is the net size of the blocks it
+        allocated and didn't free, excluding nested stages. A snapshot is
+        retaken whenever the traced memory grows by `ratio_snapshot` over the
+        last one so that the snapshot written, and summarized per line, is
+        close to the peak.
+    """
+
+    mode = "tracemalloc"
+
+    def __init__(
+        self, num_frames: int = 10, ratio_snapshot: float = 1.1, **kwargs
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            num_frames (int, optional): The number of frames stored per
+                traceback. Defaults to `10`.
+            ratio_snapshot (float, optional): The growth of the traced memory
+                over the last snapshot that triggers a new one. Defaults to
+                `1.1`.
+        """
+
+        super(ProfilerTracemalloc, self).__init__(**kwargs)
+
+        # Internalize arguments.
+        self.num_frames = num_frames
+        self.ratio_snapshot = ratio_snapshot
+
+        self.sizes = collections.OrderedDict()  # type: Dict[str, int]
+        self.size_last = 0
+        self.size_snapshot = 0
+        self.size_peak = 0
+        self.snapshot = None  # type: Optional[tracemalloc.Snapshot]
+
+    def take_snapshot(self, size: int):
+        self.snapshot = tracemalloc.take_snapshot()
+        self.size_snapshot = size
+
+    def switch(self, previous: Optional[str], current: Optional[str]):
+        size, _ = tracemalloc.get_traced_memory()
+        if previous is not None:
+            self.sizes[previous] = (
+                self.sizes.get(previous, 0) + size - self.size_last
+            )
+        self.size_last = size
+
+        if size > self.size_snapshot * self.ratio_snapshot:
+            self.take_snapshot(size=size)
+
+    def start(self):
+        tracemalloc.start(self.num_frames)
+        self.size_last, _ = tracemalloc.get_traced_memory()
+
+    def stop(self):
+        size, self.size_peak = tracemalloc.get_traced_memory()
+        if self.snapshot is None or size > self.size_snapshot:
+            self.take_snapshot(size=size)
+        tracemalloc.stop()
+
+    def dump(self) -> List[str]:
+        if self.snapshot is None:
+            return []
+
+        filename = self.get_filename(suffix="snapshot")
+        self.snapshot.dump(filename)
+
+        return [filename]
+
+    def summarize(self) -> str:
+        lines = [
+            "Peak traced memory: {:.1f} MB".format(self.size_peak / 2 ** 20)
+        ]
+        for stage, size in self.sizes.items():
+            lines.append(
+                "Stage '{}': {:+.1f} MB net".format(stage, size / 2 ** 20)
+            )
+
+        if self.snapshot is not None:
+            lines.append(
+                "Top lines of the snapshot at {:.1f} MB:".format(
+                    self.size_snapshot / 2 ** 20
+                )
+            )
+            snapshot = self.snapshot.filter_traces(
+                [tracemalloc.Filter(False, tracemalloc.__file__)]
+            )
+            for stat in snapshot.statistics("lineno")[:self.top]:
+                lines.append(
+                    "{:>10.1f} KB {:>10d} blocks  {}".format(
+                        stat.size / 1024.0, stat.count, stat.traceback
+                    )
+                )
+
+        return "\n".join(lines)
+
+
+class DalProfiled(object):
+    """ Proxy class wrapping a DAL and profiling the calls made to its public
+        methods, and the writes routed through `utils.call_dal`, as the
+        `write` stage.
+    """
+
+    stage_name = "write"
+
+    def __init__(self, dal, profiler: ProfilerStaged):
+        """ Constructor and initialization.
+
+        Args:
+            dal: The DAL instance to wrap.
+            profiler (ProfilerStaged): The profiler the calls are staged in.
+        """
+
+        # Internalize arguments.
+        self.dal = dal
+        self.profiler = profiler
+
+    def call_method(
+        self, name: str, func: Callable[..., Any], num_rows: int = 0, **kwargs
+    ) -> Any:
+        """ Profiles a function writing to the DB outside the DAL methods,
+            e.g., the bulk inserts of the ingesters, as the `write` stage, see
+            `utils.call_dal`.
+        """
+
+        with self.profiler.stage(self.stage_name):
+            return call_dal(
+                dal=self.dal, name=name, func=func, num_rows=num_rows, **kwargs
+            )
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.dal, name)
+
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            with self.profiler.stage(self.stage_name):
+                return attr(*args, **kwargs)
+
+        # Cache the wrapper so that subsequent lookups bypass `__getattr__`.
+        self.__dict__[name] = wrapper
+
+        return wrapper
+
+
+profilers = {
+    ProfilerCprofile.mode: ProfilerCprofile,
+    ProfilerSampling.mode: ProfilerSampling,
+    ProfilerTracemalloc.mode: ProfilerTracemalloc,
+}
+
+
+def create_profiler(mode: Optional[str] = None, **kwargs) -> Profiler:
+    """ Creates the profiler of a profiling mode.
+
+    Args:
+        mode (Optional[str]): The profiling mode, i.e., `cprofile`,
+            `sampling`, or `tracemalloc`. Defaults to `None` in which case a
+            profiler which profiles nothing is created.
+        **kwargs: The arguments passed to the profiler.
+
+    Returns:
+        Profiler: The profiler.
+    """
+
+    if mode is None:
+        return Profiler(**kwargs)
+
+    if mode not in profilers:
+        msg = "Unknown profiling mode '{}' not among {}."
+        msg_fmt = msg.format(mode, sorted(profilers.keys()))
+        raise ValueError(msg_fmt)
+
+    return profilers[mode](**kwargs)
+
+
+def get_profile_label(mode: str, filename: Optional[str] = None) -> str:
+    """ Assembles the label profiling artifacts are named after from an
+        ingestion mode and input file.
+
+    Args:
+        mode (str): The ingestion mode, e.g., `descriptors`.
+        filename (Optional[str]): The input file or `zip://` location.
+
+    Returns:
+        str: The label, e.g., `descriptors-desc2019.xml`.
+    """
+
+    if not filename:
+        return mode
+
+    # Keep the member name of `zip://` locations.
+    basename = filename.replace("!", "/").rstrip("/").split("/")[-1]
+
+    return "{}-{}".format(mode, basename)
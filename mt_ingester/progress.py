@@ -0,0 +1,330 @@
+# coding=utf-8
+
+""" Progress reporting module
+
+This module contains the `ProgressReporter` class which logs the progress and
+throughput of an ingestion, i.e., the records ingested per second, the ETA
+based on the byte offset the input file has been read up to, the DAL calls per
+second, and the memory taken, at a fixed interval from a background thread so
+that the ingestion itself only increments a few counters.
+"""
+
+import os
+import sys
+import time
+import resource
+import datetime
+import threading
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from mt_ingester.loggers import create_logger
+from mt_ingester.utils import call_dal
+
+
+def get_rss() -> float:
+    """ Retrieves the resident set size of the current process in MB.
+
+    Notes:
+        The current size is read from `/proc` where available and the peak
+        size is returned otherwise.
+    """
+
+    try:
+        with open("/proc/self/statm") as fin:
+            num_pages = int(fin.read().split()[1])
+        return num_pages * resource.getpagesize() / 2.0 ** 20
+    except (IOError, OSError, IndexError, ValueError):
+        pass
+
+    # The peak size is reported in bytes on macOS and in KB elsewhere.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / 2.0 ** 20
+
+    return peak / 2.0 ** 10
+
+
+class ProgressReporter(object):
+    """ Class used to report the progress and throughput of an ingestion at a
+        fixed interval.
+
+    Notes:
+        The records are counted as they're iterated over through `iterate`
+        and the DAL calls as they're made through the DAL returned by
+        `wrap_dal`. The reports are logged from a background thread started
+        and stopped by using the reporter as a context manager.
+
+        When `interval` isn't positive nothing is reported and the iterables
+        and DAL are left unwrapped.
+    """
+
+    def __init__(
+        self,
+        label: str = "mt-ingester",
+        interval: float = 30.0,
+        **kwargs
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            label (str): The label the reports are logged under, e.g., the
+                ingestion mode and input filename.
+            interval (float, optional): The interval between reports in
+                seconds. Defaults to `30.0`.
+        """
+
+        # Internalize arguments.
+        self.label = label
+        self.interval = interval
+
+        self.num_records = 0
+        self.num_dal_calls = 0
+
+        # The size of the input file and a callable returning the byte offset
+        # it has been read up to, set through `track_file`.
+        self.size = None  # type: Optional[int]
+        self.get_position = None  # type: Optional[Callable[[], int]]
+
+        self.time_start = None  # type: Optional[float]
+        self.time_last = None  # type: Optional[float]
+        self.num_records_last = 0
+        self.num_dal_calls_last = 0
+
+        self.thread = None  # type: Optional[threading.Thread]
+        self.event_stop = threading.Event()
+
+        self.logger = create_logger(
+            logger_name=type(self).__name__,
+            logger_level=kwargs.get("logger_level", "DEBUG"),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def track_file(
+        self, size: Optional[int], get_position: Callable[[], Optional[int]]
+    ):
+        """ Sets the input file whose byte offset the ETA is based on.
+
+        Args:
+            size (Optional[int]): The size of the file in bytes.
+            get_position (Callable[[], Optional[int]]): A callable returning
+                the byte offset the file has been read up to, e.g.,
+                `ParserXmlBase.get_position`.
+        """
+
+        self.size = size
+        self.get_position = get_position
+
+    def iterate(self, iterable: Iterable) -> Iterable:
+        """ Wraps an iterable so that its items are counted as records.
+
+        Args:
+            iterable (Iterable): The iterable to wrap, e.g., the documents
+                yielded by a parser.
+        """
+
+        if not self.enabled:
+            return iterable
+
+        return self._iterate(iterable=iterable)
+
+    def _iterate(self, iterable: Iterable) -> Iterator:
+        for item in iterable:
+            self.num_records += 1
+            yield item
+
+    def wrap_dal(self, dal):
+        """ Wraps a DAL so that the calls made to it are counted.
+
+        Args:
+            dal: The DAL instance to wrap.
+        """
+
+        if not self.enabled:
+            return dal
+
+        return DalCounted(dal=dal, progress=self)
+
+    def report(self, now: Optional[float] = None) -> dict:
+        """ Assembles the progress since the last report.
+
+        Args:
+            now (Optional[float]): The `time.monotonic` time of the report.
+                Defaults to `None` in which case the current time is used.
+
+        Returns:
+            dict: The number of `records`, the `records_per_sec` and
+                `dal_calls_per_sec` since the last report, the `elapsed` and
+                `eta` seconds, the `fraction` of the input file read, and the
+                `rss_mb`.
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        duration = max(now - self.time_last, 1e-9)
+        elapsed = now - self.time_start
+        num_records = self.num_records
+        num_dal_calls = self.num_dal_calls
+
+        report = {
+            "records": num_records,
+            "records_per_sec": (
+                (num_records - self.num_records_last) / duration
+            ),
+            "dal_calls_per_sec": (
+                (num_dal_calls - self.num_dal_calls_last) / duration
+            ),
+            "elapsed": elapsed,
+            "fraction": None,
+            "eta": None,
+            "rss_mb": get_rss(),
+        }
+
+        position = self.get_position() if self.get_position else None
+        if position and self.size:
+            fraction = min(position / float(self.size), 1.0)
+            report["fraction"] = fraction
+            report["eta"] = elapsed * (1.0 - fraction) / fraction
+
+        self.time_last = now
+        self.num_records_last = num_records
+        self.num_dal_calls_last = num_dal_calls
+
+        return report
+
+    @staticmethod
+    def format_report(report: dict) -> str:
+        """ Formats a report for logging."""
+
+        entries = [
+            "{} records".format(report["records"]),
+            "{:.1f} records/sec".format(report["records_per_sec"]),
+            "{:.1f} DAL calls/sec".format(report["dal_calls_per_sec"]),
+            "{:.1f} MB RSS".format(report["rss_mb"]),
+        ]
+        if report["fraction"] is not None:
+            entries.append(
+                "{:.1%} read, ETA {}".format(
+                    report["fraction"],
+                    datetime.timedelta(seconds=int(report["eta"])),
+                )
+            )
+
+        return ", ".join(entries)
+
+    def log_report(self):
+        report = self.report()
+
+        msg = "Progress of '{0}': {1}"
+        msg_fmt = msg.format(self.label, self.format_report(report=report))
+        self.logger.info(msg=msg_fmt, extra={"progress": report})
+
+    def run(self):
+        while not self.event_stop.wait(self.interval):
+            self.log_report()
+
+    def start(self):
+        """ Starts reporting."""
+
+        if not self.enabled:
+            return
+
+        self.time_start = self.time_last = time.monotonic()
+        self.event_stop.clear()
+        self.thread = threading.Thread(
+            target=self.run, name=type(self).__name__, daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        """ Stops reporting and logs the overall throughput."""
+
+        if self.thread is None:
+            return
+
+        self.event_stop.set()
+        self.thread.join()
+        self.thread = None
+
+        # Report the totals over the entire ingestion.
+        self.time_last = self.time_start
+        self.num_records_last = 0
+        self.num_dal_calls_last = 0
+        report = self.report()
+
+        msg = "Completed '{0}' in {1}: {2}"
+        msg_fmt = msg.format(
+            self.label,
+            datetime.timedelta(seconds=int(report["elapsed"])),
+            self.format_report(report=report),
+        )
+        self.logger.info(msg=msg_fmt, extra={"progress": report})
+
+    def __enter__(self) -> "ProgressReporter":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class DalCounted(object):
+    """ Proxy class wrapping a DAL and counting the calls made to its public
+        methods.
+    """
+
+    def __init__(self, dal, progress: ProgressReporter):
+        """ Constructor and initialization.
+
+        Args:
+            dal: The DAL instance to wrap.
+            progress (ProgressReporter): The reporter the calls are counted
+                in.
+        """
+
+        # Internalize arguments.
+        self.dal = dal
+        self.progress = progress
+
+    def call_method(
+        self, name: str, func: Callable[..., Any], num_rows: int = 0, **kwargs
+    ) -> Any:
+        """ Counts a function writing to the DB outside the DAL methods, e.g.,
+            the bulk inserts of the ingesters, see `utils.call_dal`.
+        """
+
+        self.progress.num_dal_calls += 1
+        return call_dal(
+            dal=self.dal, name=name, func=func, num_rows=num_rows, **kwargs
+        )
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.dal, name)
+
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        progress = self.progress
+
+        def wrapper(*args, **kwargs):
+            progress.num_dal_calls += 1
+            return attr(*args, **kwargs)
+
+        # Cache the wrapper so that subsequent lookups bypass `__getattr__`.
+        self.__dict__[name] = wrapper
+
+        return wrapper
+
+
+def get_file_size(filename: str) -> Optional[int]:
+    """ Retrieves the size of a file in bytes or `None` if it can't be read,
+        e.g., for `zip://` locations.
+    """
+
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return None
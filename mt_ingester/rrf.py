@@ -0,0 +1,575 @@
+# coding=utf-8
+
+""" UMLS RRF file reading module
+
+This module contains functions to read the pipe-delimited UMLS RRF files, e.g.,
+MRSAT.RRF, MRCONSO.RRF, and MRDEF.RRF, as bytes, reject lines through cheap
+substring checks before they're split, and split the surviving lines only
+extracting the required columns.
+
+Notes:
+    RRF files don't quote or escape their fields so unlike `csv.DictReader`
+    no quote-handling is performed.
+
+    RRF files can be read directly from the UMLS distribution archives through
+    `zip://<archive>!/<member>` locations, e.g.,
+    `zip:///data/umls-2019AA-full.zip!/2019AA/META/MRCONSO.RRF`, where
+    archives nested within the archive are separated by further `!`, e.g.,
+    `zip:///data/umls.zip!/2019aa-1-meta.nlm!/2019AA/META/MRCONSO.RRF`.
+    Members split into `.aa`, `.ab`, etc parts and gzipped members are read as
+    a single stream.
+"""
+
+import io
+import os
+import re
+import gzip
+import zipfile
+import functools
+import multiprocessing
+import concurrent.futures
+from collections import Counter
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Container,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+
+# The number of bytes read at a time when scanning for pre-filter tokens.
+BLOCK_SIZE = 1 << 22
+
+# State shared with the worker processes of `map_file_ranges`.
+_worker_state = None
+
+# Callables returning the byte offset up to which the RRF files being read, or
+# last read, have been read keyed on their location, see `get_read_position`.
+_read_positions = {}  # type: Dict[str, Callable[[], int]]
+
+
+def get_read_position(location: str) -> Optional[int]:
+    """ Retrieves the byte offset up to which an RRF file has been read in its
+        entirety through `iterate_rrf_rows`, or the number of bytes of the
+        ranges completed through `map_file_ranges`.
+
+    Notes:
+        This function may be called from another thread, e.g., by a
+        `ProgressReporter`, while the file is being read. The offset of a file
+        which has been read is kept until it's read again.
+
+    Args:
+        location (str): The path of the RRF file or a `zip://` location.
+
+    Returns:
+        Optional[int]: The byte offset or `None` if the file hasn't been read
+            in this process.
+    """
+
+    get_position = _read_positions.get(location)
+    if get_position is None:
+        return None
+
+    try:
+        return get_position()
+    except ValueError:
+        # The file has been closed.
+        return None
+
+# The scheme prefix of locations pointing to members of zip archives.
+ZIP_SCHEME = "zip://"
+
+# The separator between an archive and the path of a member within it.
+ZIP_SEPARATOR = "!/"
+
+# Regular expression matching the suffixes of the parts of a split member,
+# e.g., `.aa`, `.ab.gz`, etc.
+regex_part_suffix = re.compile(r"^\.[a-z]{2}(\.gz)?$")
+
+
+def is_zip_location(location: str) -> bool:
+    """ Checks whether a location points to a member of a zip archive.
+
+    Args:
+        location (str): The location, i.e., a path or a `zip://` location.
+
+    Returns:
+        bool: Whether the location is a `zip://` location.
+    """
+
+    return location.startswith(ZIP_SCHEME)
+
+
+def split_zip_location(location: str) -> Tuple[str, List[str]]:
+    """ Splits a `zip://` location into the path of the archive and the
+        member paths leading to the RRF file.
+
+    Args:
+        location (str): The `zip://` location.
+
+    Returns:
+        Tuple[str, List[str]]: The path of the archive and the member paths,
+            one per nesting level.
+    """
+
+    parts = location[len(ZIP_SCHEME) :].split(ZIP_SEPARATOR)
+    if len(parts) < 2 or not all(parts):
+        msg = "Invalid zip location '{}'."
+        msg_fmt = msg.format(location)
+        raise ValueError(msg_fmt)
+
+    return parts[0], parts[1:]
+
+
+def find_member_parts(archive: zipfile.ZipFile, member: str) -> List[str]:
+    """ Finds the names of the archive members holding the contents of a
+        member that may have been gzipped or split into parts.
+
+    Args:
+        archive (zipfile.ZipFile): The archive.
+        member (str): The path of the member.
+
+    Returns:
+        List[str]: The names of the members to be read in order.
+
+    Raises:
+        FileNotFoundError: Raised when no matching member exists.
+    """
+
+    names = archive.namelist()
+    names_set = set(names)
+
+    for name in [member, member + ".gz"]:
+        if name in names_set:
+            return [name]
+
+    names_parts = sorted(
+        name
+        for name in names
+        if name.startswith(member)
+        and regex_part_suffix.match(name[len(member) :])
+    )
+    if names_parts:
+        return names_parts
+
+    msg = "Member '{}' not found in archive '{}'."
+    msg_fmt = msg.format(member, archive.filename)
+    raise FileNotFoundError(msg_fmt)
+
+
+class ZipMemberStream(io.RawIOBase):
+    """ Read-only, non-seekable stream over the contents of a member of a
+        (possibly nested) zip archive which may be gzipped or split into
+        parts.
+    """
+
+    def __init__(self, location: str):
+        """ Constructor and initialization.
+
+        Args:
+            location (str): The `zip://` location of the member.
+        """
+
+        super(ZipMemberStream, self).__init__()
+
+        filename_archive, members = split_zip_location(location)
+
+        self._file = None
+        self._position = 0
+
+        # Open the nested archives down to the one holding the member. The
+        # archives are kept open until the stream is closed.
+        self._archives = [zipfile.ZipFile(filename_archive)]
+        try:
+            for member in members[:-1]:
+                self._archives.append(
+                    zipfile.ZipFile(self._archives[-1].open(member))
+                )
+
+            self._names = find_member_parts(self._archives[-1], members[-1])
+        except BaseException:
+            self.close()
+            raise
+
+    def _open_next(self) -> bool:
+        """ Opens the next part of the member if any remain."""
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        if not self._names:
+            return False
+
+        name = self._names.pop(0)
+        self._file = self._archives[-1].open(name)
+        if name.endswith(".gz"):
+            self._file = gzip.GzipFile(fileobj=self._file, mode="rb")
+
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            if self._file is None and not self._open_next():
+                return 0
+
+            num_bytes = self._file.readinto(buffer)
+            if num_bytes:
+                self._position += num_bytes
+                return num_bytes
+
+            self._open_next()
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            if self._file is not None:
+                self._file.close()
+            for archive in reversed(self._archives):
+                archive.close()
+        super(ZipMemberStream, self).close()
+
+
+def open_rrf(location: str) -> BinaryIO:
+    """ Opens an RRF file or a `zip://` location for binary reading.
+
+    Args:
+        location (str): The path of the RRF file or a `zip://` location.
+
+    Returns:
+        BinaryIO: The binary file object.
+    """
+
+    if is_zip_location(location):
+        return io.BufferedReader(ZipMemberStream(location), BLOCK_SIZE)
+
+    return open(location, "rb")
+
+
+def iterate_lines(
+    file_rrf: BinaryIO, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """ Yields the lines of a binary file from its current position up to a
+        given byte offset.
+
+    Args:
+        file_rrf (BinaryIO): The binary file object.
+        end (Optional[int]): The byte offset at which to stop. Defaults to
+            `None` in which case the file is read to its end.
+
+    Yields:
+        bytes: The lines including the trailing newline.
+    """
+
+    if end is None:
+        yield from file_rrf
+        return
+
+    position = file_rrf.tell()
+    for line in file_rrf:
+        if position >= end:
+            return
+        position += len(line)
+        yield line
+
+
+def iterate_lines_with_tokens(
+    file_rrf: BinaryIO,
+    tokens: Sequence[bytes],
+    block_size: int = BLOCK_SIZE,
+    end: Optional[int] = None,
+    stats: Optional[Counter] = None,
+) -> Iterator[bytes]:
+    """ Yields the lines of a binary file containing at least one of a set of
+        tokens in file order.
+
+    Notes:
+        Rather than testing every line, the file is read in blocks that are
+        searched for the tokens with `bytes.find` so that only the matching
+        lines are ever sliced out. This is considerably faster when only a
+        small fraction of the lines match.
+
+    Args:
+        file_rrf (BinaryIO): The binary file object.
+        tokens (Sequence[bytes]): The tokens to search for.
+        block_size (int, optional): The number of bytes read at a time.
+            Defaults to `BLOCK_SIZE`.
+        end (Optional[int]): The byte offset at which to stop. Defaults to
+            `None` in which case the file is read to its end.
+        stats (Optional[Counter]): The counter the number of lines read is
+            added to under `lines`. Defaults to `None`.
+
+    Yields:
+        bytes: The matching lines without the trailing newline.
+    """
+
+    position = file_rrf.tell()
+    remainder = b""
+    while True:
+        if end is None:
+            block = file_rrf.read(block_size)
+        else:
+            block = file_rrf.read(max(0, min(block_size, end - position)))
+        position += len(block)
+
+        # Handle a last line lacking a trailing newline.
+        if not block:
+            if remainder and stats is not None:
+                stats["lines"] += 1
+            if remainder and any(token in remainder for token in tokens):
+                yield remainder
+            return
+
+        if remainder:
+            block = remainder + block
+
+        # Only search up to the last complete line and carry the rest over.
+        end_lines = block.rfind(b"\n") + 1
+        if end_lines == 0:
+            remainder = block
+            continue
+        remainder = block[end_lines:]
+
+        if stats is not None:
+            stats["lines"] += block.count(b"\n", 0, end_lines)
+
+        starts = []
+        for token in tokens:
+            index = block.find(token, 0, end_lines)
+            while index != -1:
+                starts.append(block.rfind(b"\n", 0, index) + 1)
+                index = block.find(
+                    token, block.find(b"\n", index) + 1, end_lines
+                )
+
+        # Lines matching multiple tokens must only be yielded once.
+        if len(tokens) > 1:
+            starts = sorted(set(starts))
+
+        for start in starts:
+            yield block[start : block.find(b"\n", start)]
+
+
+def iterate_rrf_rows(
+    filename_rrf: str,
+    columns: Sequence[int],
+    tokens: Optional[Sequence[bytes]] = None,
+    cuis: Optional[Container[str]] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+    stats: Optional[Counter] = None,
+) -> Iterator[List[str]]:
+    """ Iterates over the lines of an RRF file and yields the values of the
+        requested columns for the lines that pass the pre-filters.
+
+    Args:
+        filename_rrf (str): Path to the RRF file or a `zip://` location.
+        columns (Sequence[int]): The zero-based indices of the columns to
+            extract.
+        tokens (Optional[Sequence[bytes]]): Byte-strings at least one of which
+            must be present in a line for it to be split. Defaults to `None` in
+            which case no substring pre-filter is applied.
+        cuis (Optional[Container[str]]): UMLS CUIs the first column of a line
+            must be in for it to be split. Defaults to `None` in which case no
+            CUI pre-filter is applied.
+        start (int, optional): The byte offset of the first line to read.
+            Defaults to `0`.
+        end (Optional[int]): The byte offset at which to stop. Defaults to
+            `None` in which case the file is read to its end.
+        stats (Optional[Counter]): The counter the number of lines read, and
+            dropped by each pre-filter, is added to under `lines`, `tokens`,
+            `cuis`, and `malformed`. Defaults to `None`.
+
+    Yields:
+        List[str]: The decoded values of the requested columns.
+    """
+
+    # The minimum number of fields a line needs to define all columns.
+    num_fields_min = max(columns) + 1
+
+    stats_lines = Counter()
+    num_lines = 0
+    num_cuis = 0
+    num_malformed = 0
+
+    with open_rrf(filename_rrf) as finp:
+        if start:
+            finp.seek(start)
+
+        # Expose the offset reads of the entire file have reached.
+        do_track = not start and end is None
+        if do_track:
+            _read_positions[filename_rrf] = finp.tell
+
+        if tokens is not None:
+            lines = iterate_lines_with_tokens(
+                file_rrf=finp, tokens=tokens, end=end, stats=stats_lines
+            )
+        else:
+            lines = iterate_lines(file_rrf=finp, end=end)
+
+        try:
+            for line in lines:
+                num_lines += 1
+
+                if cuis is not None:
+                    if line[: line.find(b"|")].decode("utf-8") not in cuis:
+                        num_cuis += 1
+                        continue
+
+                fields = line.rstrip(b"\r\n").split(b"|")
+
+                # Skip blank or truncated lines.
+                if len(fields) < num_fields_min:
+                    num_malformed += 1
+                    continue
+
+                yield [fields[column].decode("utf-8") for column in columns]
+        finally:
+            if stats is not None:
+                if tokens is not None:
+                    stats["lines"] += stats_lines["lines"]
+                    stats["tokens"] += stats_lines["lines"] - num_lines
+                else:
+                    stats["lines"] += num_lines
+                stats["cuis"] += num_cuis
+                stats["malformed"] += num_malformed
+
+            # Keep the final offset once the file is closed.
+            if do_track:
+                position = finp.tell()
+                _read_positions[filename_rrf] = lambda: position
+
+
+def find_chunk_ranges(
+    filename_rrf: str, num_chunks: int
+) -> List[Tuple[int, int]]:
+    """ Splits a file into byte ranges of roughly equal size whose boundaries
+        are aligned to the start of a line.
+
+    Args:
+        filename_rrf (str): Path to the file.
+        num_chunks (int): The number of ranges to split the file into.
+
+    Returns:
+        List[Tuple[int, int]]: The `(start, end)` byte offsets of the ranges.
+    """
+
+    size = os.path.getsize(filename_rrf)
+
+    boundaries = [0]
+    with open(filename_rrf, "rb") as finp:
+        for index in range(1, num_chunks):
+            finp.seek(max(size * index // num_chunks - 1, boundaries[-1]))
+            finp.readline()
+            boundaries.append(min(finp.tell(), size))
+    boundaries.append(size)
+
+    ranges = [
+        (start, end) for start, end in zip(boundaries[:-1], boundaries[1:])
+        if end > start
+    ]
+
+    return ranges
+
+
+def get_worker_state() -> Any:
+    """ Retrieves the state shared through `map_file_ranges`."""
+
+    return _worker_state
+
+
+def _initialize_worker(state: Any):
+    """ Sets the shared state in a newly spawned worker process."""
+
+    global _worker_state
+    _worker_state = state
+
+
+def map_file_ranges(
+    func: Callable[[str, int, Optional[int]], Any],
+    filename_rrf: str,
+    num_workers: int = 1,
+    state: Any = None,
+) -> List[Any]:
+    """ Applies a function to newline-aligned byte ranges of a file, in a
+        process pool if more than one worker is requested, and returns the
+        results in file order.
+
+    Args:
+        func (Callable[[str, int, Optional[int]], Any]): A module-level
+            function or class-method called with the filename and the start and
+            end byte offsets of a range. Any state it needs, e.g., the CUI-DUI
+            map, must be retrieved through `get_worker_state`.
+        filename_rrf (str): Path to the file.
+        num_workers (int, optional): The number of worker processes. Defaults
+            to `1` in which case, or when the file is a `zip://` location, the
+            function is applied to the entire file in the current process.
+        state (Any, optional): The state made available to the function
+            through `get_worker_state`. Defaults to `None`.
+
+    Returns:
+        List[Any]: The results of the function for each range in file order.
+    """
+
+    global _worker_state
+
+    # Members of zip archives can only be read sequentially.
+    if num_workers <= 1 or is_zip_location(filename_rrf):
+        _worker_state = state
+        try:
+            return [func(filename_rrf, 0, None)]
+        finally:
+            _worker_state = None
+
+    # Use several ranges per worker to even out the load.
+    ranges = find_chunk_ranges(filename_rrf, num_workers * 4)
+
+    context = multiprocessing.get_context()
+    if context.get_start_method() == "fork":
+        # Forked workers inherit the state so it needn't be pickled.
+        _worker_state = state
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=context
+        )
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(state,),
+        )
+
+    # Expose the number of bytes of the completed ranges.
+    num_bytes_read = Counter()
+    _read_positions[filename_rrf] = lambda: num_bytes_read["bytes"]
+
+    def add_bytes_read(size: int, future: concurrent.futures.Future):
+        if not future.cancelled() and future.exception() is None:
+            num_bytes_read["bytes"] += size
+
+    try:
+        with executor:
+            futures = []
+            for start, end in ranges:
+                future = executor.submit(func, filename_rrf, start, end)
+                future.add_done_callback(
+                    functools.partial(add_bytes_read, end - start)
+                )
+                futures.append(future)
+            results = [future.result() for future in futures]
+    finally:
+        _worker_state = None
+
+    return results
@@ -0,0 +1,392 @@
+# coding=utf-8
+
+""" Columnar UMLS RRF file reading module
+
+This module contains functions that read the UMLS RRF files in columnar batches
+through the optional `pyarrow` dependency, only materializing the required
+columns, and apply the filter specs of the UMLS parsers, as well as the join
+between UMLS CUIs and MeSH descriptor IDs, as vectorized compute kernels.
+Only the rows that survive the filters are converted to Python objects.
+
+Notes:
+    `pyarrow` is an optional dependency, installed through the `arrow` extra,
+    and `BackendUnavailable` is raised when it's used without being installed.
+    It's only imported once the backend is used as importing it takes longer
+    than importing the rest of the package.
+"""
+
+import importlib.util
+from collections import Counter
+from typing import Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from mt_ingester import excs
+from mt_ingester.rrf import BLOCK_SIZE
+from mt_ingester.rrf import open_rrf
+from mt_ingester.rrf_filters import RrfFilterSpec
+
+
+def is_available() -> bool:
+    """ Checks whether `pyarrow` is installed.
+
+    Returns:
+        bool: Whether the columnar backend can be used.
+    """
+
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+# The `pyarrow` module, imported on first use through `_require_pyarrow`.
+pyarrow = None
+
+
+def _require_pyarrow():
+    """ Imports `pyarrow` on first use and raises `BackendUnavailable` if it
+        isn't installed.
+    """
+
+    global pyarrow
+
+    if pyarrow is not None:
+        return
+
+    # Importing the submodules binds the global `pyarrow` name.
+    try:
+        import pyarrow.csv
+        import pyarrow.compute
+    except ImportError:
+        pyarrow = None
+        msg = (
+            "The 'arrow' backend requires `pyarrow` which can be installed "
+            "through the `arrow` extra, e.g., `pip install mt_ingester[arrow]`."
+        )
+        raise excs.BackendUnavailable(msg)
+
+
+def iterate_rrf_batches(
+    filename_rrf: str,
+    fieldnames: Sequence[str],
+    columns: Sequence[str],
+    block_size: int = BLOCK_SIZE,
+    stats: Optional[Counter] = None,
+) -> Iterator["pyarrow.RecordBatch"]:
+    """ Reads an RRF file in columnar batches of the requested columns.
+
+    Args:
+        filename_rrf (str): Path to the RRF file or a `zip://` location.
+        fieldnames (Sequence[str]): The names of all fields of the RRF file.
+        columns (Sequence[str]): The names of the fields to read.
+        block_size (int, optional): The number of bytes parsed per batch.
+            Defaults to `BLOCK_SIZE`.
+        stats (Optional[Counter]): The counter the number of truncated lines
+            is added to under `malformed`. Defaults to `None`.
+
+    Yields:
+        pyarrow.RecordBatch: The next batch with the requested columns as
+            non-nullable strings.
+    """
+
+    _require_pyarrow()
+
+    # RRF lines end in a trailing delimiter which yields an extra empty field.
+    column_names = list(fieldnames) + ["_"]
+
+    def skip_row(row) -> str:
+        if stats is not None:
+            stats["malformed"] += 1
+        return "skip"
+
+    read_options = pyarrow.csv.ReadOptions(
+        column_names=column_names, block_size=block_size
+    )
+    # RRF files don't quote or escape their fields.
+    parse_options = pyarrow.csv.ParseOptions(
+        delimiter="|",
+        quote_char=False,
+        escape_char=False,
+        newlines_in_values=False,
+        # Skip truncated lines as the byte-level reader does.
+        invalid_row_handler=skip_row,
+    )
+    convert_options = pyarrow.csv.ConvertOptions(
+        include_columns=list(columns),
+        column_types={column: pyarrow.string() for column in columns},
+        strings_can_be_null=False,
+        quoted_strings_can_be_null=False,
+    )
+
+    with open_rrf(filename_rrf) as finp:
+        reader = pyarrow.csv.open_csv(
+            finp,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+        for batch in reader:
+            yield batch
+
+
+def _join_duis(
+    cuis: "pyarrow.Array",
+    cuis_map: "pyarrow.Array",
+    duis_map: "pyarrow.Array",
+) -> "pyarrow.Array":
+    """ Maps an array of CUIs to MeSH descriptor IDs through a pair of
+        parallel CUI and DUI arrays.
+    """
+
+    indices = pyarrow.compute.index_in(cuis, value_set=cuis_map)
+
+    return pyarrow.compute.take(duis_map, indices)
+
+
+def _create_map_arrays(
+    map_cui_dui: Mapping[str, str]
+) -> Tuple["pyarrow.Array", "pyarrow.Array"]:
+    """ Converts a mapping between CUIs and DUIs to parallel arrays."""
+
+    cuis = list(map_cui_dui.keys())
+    duis = [map_cui_dui[cui] for cui in cuis]
+
+    return pyarrow.array(cuis, pyarrow.string()), pyarrow.array(
+        duis, pyarrow.string()
+    )
+
+
+def iterate_mrsat(
+    filename_mrsat_rrf: str, fieldnames: Sequence[str]
+) -> Iterator[Tuple[str, str]]:
+    """ Reads the MRSAT.rrf file and yields the pairs of UMLS CUIs and MeSH
+        descriptor IDs it defines in file order.
+
+    Args:
+        filename_mrsat_rrf (str): Path to the MRSAT.rrf file.
+        fieldnames (Sequence[str]): The names of the MRSAT.rrf fields.
+
+    Yields:
+        Tuple[str, str]: The UMLS CUI and the MeSH descriptor ID.
+    """
+
+    _require_pyarrow()
+    compute = pyarrow.compute
+
+    for batch in iterate_rrf_batches(
+        filename_rrf=filename_mrsat_rrf,
+        fieldnames=fieldnames,
+        columns=["CUI", "CODE", "ATN", "ATV"],
+    ):
+        cui = batch.column("CUI")
+        code = batch.column("CODE")
+        atn = batch.column("ATN")
+        atv = batch.column("ATV")
+
+        # The DUI is defined under `CODE` for `TERMUI` attributes and under
+        # `ATV` for `MESH_DUI` attributes.
+        is_termui = compute.equal(atn, "TERMUI")
+        is_mesh_dui = compute.equal(atn, "MESH_DUI")
+        dui = compute.if_else(is_termui, code, atv)
+
+        mask = compute.and_(
+            compute.or_(is_termui, is_mesh_dui),
+            compute.and_(
+                compute.not_equal(cui, ""), compute.not_equal(atv, "")
+            ),
+        )
+        mask = compute.and_(mask, compute.starts_with(dui, "D"))
+
+        yield from zip(
+            compute.filter(cui, mask).to_pylist(),
+            compute.filter(dui, mask).to_pylist(),
+        )
+
+
+def _filter_batch(
+    batch: "pyarrow.RecordBatch",
+    filter_spec: RrfFilterSpec,
+    cuis_map: "pyarrow.Array",
+    stats: Counter,
+) -> "pyarrow.Array":
+    """ Evaluates the filters of a spec, followed by the CUI membership, on a
+        batch and counts the rows each of them drops.
+
+    Returns:
+        pyarrow.Array: The mask of the rows passing all filters.
+    """
+
+    compute = pyarrow.compute
+
+    mask = None
+    num_rows = batch.num_rows
+    stats["lines"] += num_rows
+
+    conditions = []
+    for filter_ in filter_spec.filters:
+        column = batch.column(filter_.field)
+        condition = None
+        if filter_.non_empty:
+            condition = compute.not_equal(column, "")
+        if filter_.include is not None:
+            condition = _and(
+                condition,
+                compute.is_in(
+                    column,
+                    value_set=pyarrow.array(
+                        sorted(filter_.include), pyarrow.string()
+                    ),
+                ),
+            )
+        if filter_.exclude is not None:
+            condition = _and(
+                condition,
+                compute.invert(
+                    compute.is_in(
+                        column,
+                        value_set=pyarrow.array(
+                            sorted(filter_.exclude), pyarrow.string()
+                        ),
+                    )
+                ),
+            )
+        if condition is not None:
+            conditions.append((filter_.field, condition))
+    conditions.append(
+        ("CUI", compute.is_in(batch.column("CUI"), value_set=cuis_map))
+    )
+
+    # Attribute the rows dropped by each condition as if the conditions were
+    # evaluated in order row by row.
+    for name, condition in conditions:
+        mask = _and(mask, condition)
+        num_rows_mask = compute.sum(compute.cast(mask, pyarrow.int64()))
+        num_rows_mask = num_rows_mask.as_py() or 0
+        stats[name] += num_rows - num_rows_mask
+        num_rows = num_rows_mask
+
+    stats["rows"] += num_rows
+
+    return mask
+
+
+def _and(
+    mask: Optional["pyarrow.Array"], condition: "pyarrow.Array"
+) -> "pyarrow.Array":
+    """ Combines an optional mask with a condition."""
+
+    if mask is None:
+        return condition
+
+    return pyarrow.compute.and_(mask, condition)
+
+
+def _get_columns(
+    columns: Sequence[str], filter_spec: RrfFilterSpec
+) -> List[str]:
+    """ Assembles the requested fields followed by the filtered fields and the
+        CUI.
+    """
+
+    names = list(columns)
+    for field in filter_spec.fields + ["CUI"]:
+        if field not in names:
+            names.append(field)
+
+    return names
+
+
+def iterate_mrconso(
+    filename_mrconso_rrf: str,
+    fieldnames: Sequence[str],
+    map_cui_dui: Mapping[str, str],
+    filter_spec: RrfFilterSpec,
+    stats: Optional[Counter] = None,
+) -> Iterator[Tuple[str, str]]:
+    """ Reads the MRCONSO.rrf file and yields the synonyms of MeSH descriptors
+        passing the filters in file order.
+
+    Args:
+        filename_mrconso_rrf (str): Path to the MRCONSO.rrf file.
+        fieldnames (Sequence[str]): The names of the MRCONSO.rrf fields.
+        map_cui_dui (Mapping[str, str]): Mapping between UMLS CUIs and MeSH
+            descriptor IDs.
+        filter_spec (RrfFilterSpec): The filters to apply.
+        stats (Optional[Counter]): The counter the number of rows dropped by
+            each filter is added to. Defaults to `None`.
+
+    Yields:
+        Tuple[str, str]: The MeSH descriptor ID and the synonym.
+    """
+
+    _require_pyarrow()
+    compute = pyarrow.compute
+
+    filter_spec.validate(fieldnames=fieldnames)
+    stats = stats if stats is not None else Counter()
+
+    cuis_map, duis_map = _create_map_arrays(map_cui_dui)
+
+    for batch in iterate_rrf_batches(
+        filename_rrf=filename_mrconso_rrf,
+        fieldnames=fieldnames,
+        columns=_get_columns(["CUI", "STR"], filter_spec),
+        stats=stats,
+    ):
+        mask = _filter_batch(batch, filter_spec, cuis_map, stats)
+
+        dui = _join_duis(
+            compute.filter(batch.column("CUI"), mask), cuis_map, duis_map
+        )
+
+        yield from zip(
+            dui.to_pylist(),
+            compute.filter(batch.column("STR"), mask).to_pylist(),
+        )
+
+
+def iterate_mrdef(
+    filename_mrdef_rrf: str,
+    fieldnames: Sequence[str],
+    map_cui_dui: Mapping[str, str],
+    filter_spec: RrfFilterSpec,
+    stats: Optional[Counter] = None,
+) -> Iterator[Tuple[str, str, str]]:
+    """ Reads the MRDEF.rrf file and yields the definitions of MeSH
+        descriptors passing the filters in file order.
+
+    Args:
+        filename_mrdef_rrf (str): Path to the MRDEF.rrf file.
+        fieldnames (Sequence[str]): The names of the MRDEF.rrf fields.
+        map_cui_dui (Mapping[str, str]): Mapping between UMLS CUIs and MeSH
+            descriptor IDs.
+        filter_spec (RrfFilterSpec): The filters to apply.
+        stats (Optional[Counter]): The counter the number of rows dropped by
+            each filter is added to. Defaults to `None`.
+
+    Yields:
+        Tuple[str, str, str]: The MeSH descriptor ID, the definition source,
+            and the definition.
+    """
+
+    _require_pyarrow()
+    compute = pyarrow.compute
+
+    filter_spec.validate(fieldnames=fieldnames)
+    stats = stats if stats is not None else Counter()
+
+    cuis_map, duis_map = _create_map_arrays(map_cui_dui)
+
+    for batch in iterate_rrf_batches(
+        filename_rrf=filename_mrdef_rrf,
+        fieldnames=fieldnames,
+        columns=_get_columns(["CUI", "SAB", "DEF"], filter_spec),
+        stats=stats,
+    ):
+        mask = _filter_batch(batch, filter_spec, cuis_map, stats)
+
+        dui = _join_duis(
+            compute.filter(batch.column("CUI"), mask), cuis_map, duis_map
+        )
+
+        yield from zip(
+            dui.to_pylist(),
+            compute.filter(batch.column("SAB"), mask).to_pylist(),
+            compute.filter(batch.column("DEF"), mask).to_pylist(),
+        )
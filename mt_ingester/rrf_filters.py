@@ -0,0 +1,392 @@
+# coding=utf-8
+
+""" RRF row filtering module
+
+This module contains the `RrfFilter` and `RrfFilterSpec` classes used to
+declare the conditions the rows of a UMLS RRF file must meet, e.g., their
+language, source, term type, suppressibility, or whether they're preferred, as
+well as the `iterate_filtered_rows` function which applies them cheapest-first
+and counts the rows dropped by each.
+"""
+
+import collections
+from typing import Container, Iterable, Iterator, List, Optional, Sequence
+
+from mt_ingester.rrf import iterate_rrf_rows
+
+
+class RrfFilter(object):
+    """ Class used to declare a condition on a single field of an RRF file.
+
+    Notes:
+        A row passes the filter if its value is non-empty, when `non_empty` is
+        set, in `include`, when defined, and not in `exclude`, when defined.
+    """
+
+    def __init__(
+        self,
+        field: str,
+        include: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+        non_empty: bool = False,
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            field (str): The name of the RRF field the filter applies to.
+            include (Optional[Iterable[str]]): The values to keep. Defaults to
+                `None` in which case all values are kept.
+            exclude (Optional[Iterable[str]]): The values to drop. Defaults to
+                `None` in which case no values are dropped.
+            non_empty (bool, optional): Whether to drop empty values.
+                Defaults to `False`.
+        """
+
+        # Internalize arguments.
+        self.field = field
+        self.include = frozenset(include) if include is not None else None
+        self.exclude = frozenset(exclude) if exclude is not None else None
+        self.non_empty = non_empty
+
+    @property
+    def cost(self) -> int:
+        """ The relative cost of evaluating the filter on a value."""
+
+        # A truthiness test is cheaper than hashing the value.
+        if self.include is None and self.exclude is None:
+            return 0
+
+        return 1
+
+    def matches(self, value: str) -> bool:
+        """ Checks whether a value passes the filter.
+
+        Args:
+            value (str): The field value.
+
+        Returns:
+            bool: Whether the value passes the filter.
+        """
+
+        if self.non_empty and not value:
+            return False
+
+        if self.include is not None and value not in self.include:
+            return False
+
+        if self.exclude is not None and value in self.exclude:
+            return False
+
+        return True
+
+    def __repr__(self) -> str:
+        msg = (
+            "RrfFilter(field={!r}, include={!r}, exclude={!r}, "
+            "non_empty={!r})"
+        )
+        msg_fmt = msg.format(
+            self.field,
+            sorted(self.include) if self.include is not None else None,
+            sorted(self.exclude) if self.exclude is not None else None,
+            self.non_empty,
+        )
+
+        return msg_fmt
+
+
+class RrfFilterSpec(object):
+    """ Class used to declare the filters applied to the rows of an RRF file.
+
+    Notes:
+        Filters are evaluated cheapest-first and in the declared order
+        otherwise. The values of the first filter keeping a set of values in a
+        field other than the first are also searched for as `|value|` tokens
+        so that lines lacking all of them are dropped before being split.
+    """
+
+    def __init__(self, filters: Sequence[RrfFilter] = ()):
+        """ Constructor and initialization.
+
+        Args:
+            filters (Sequence[RrfFilter]): The filters, at most one per field.
+        """
+
+        fields = [filter_.field for filter_ in filters]
+        if len(set(fields)) != len(fields):
+            msg = "Multiple filters were defined for the same field in {}."
+            msg_fmt = msg.format(fields)
+            raise ValueError(msg_fmt)
+
+        self.filters = sorted(filters, key=lambda filter_: filter_.cost)
+
+    @classmethod
+    def create(
+        cls,
+        languages: Optional[Iterable[str]] = None,
+        sources_include: Optional[Iterable[str]] = None,
+        sources_exclude: Optional[Iterable[str]] = None,
+        term_types_include: Optional[Iterable[str]] = None,
+        term_types_exclude: Optional[Iterable[str]] = None,
+        suppress: Optional[Iterable[str]] = None,
+        preferred_only: bool = False,
+        fields_non_empty: Iterable[str] = (),
+    ) -> "RrfFilterSpec":
+        """ Creates a filter spec from the values of the common UMLS fields.
+
+        Args:
+            languages (Optional[Iterable[str]]): The `LAT` values to keep.
+            sources_include (Optional[Iterable[str]]): The `SAB` values to
+                keep.
+            sources_exclude (Optional[Iterable[str]]): The `SAB` values to
+                drop.
+            term_types_include (Optional[Iterable[str]]): The `TTY` values to
+                keep.
+            term_types_exclude (Optional[Iterable[str]]): The `TTY` values to
+                drop.
+            suppress (Optional[Iterable[str]]): The `SUPPRESS` values to keep,
+                e.g., `N` for atoms that aren't suppressible.
+            preferred_only (bool, optional): Whether to only keep the atoms
+                whose `ISPREF` value is `Y`. Defaults to `False`.
+            fields_non_empty (Iterable[str]): The fields whose empty values
+                are dropped.
+
+        Returns:
+            RrfFilterSpec: The filter spec.
+
+        Notes:
+            Arguments defaulting to `None` don't filter the field.
+        """
+
+        kwargs_fields = collections.OrderedDict()
+
+        def update(field, **kwargs):
+            kwargs_fields.setdefault(field, {}).update(kwargs)
+
+        if languages is not None:
+            update("LAT", include=languages)
+        if sources_include is not None:
+            update("SAB", include=sources_include)
+        if sources_exclude is not None:
+            update("SAB", exclude=sources_exclude)
+        if term_types_include is not None:
+            update("TTY", include=term_types_include)
+        if term_types_exclude is not None:
+            update("TTY", exclude=term_types_exclude)
+        if suppress is not None:
+            update("SUPPRESS", include=suppress)
+        if preferred_only:
+            update("ISPREF", include=["Y"])
+        for field in fields_non_empty:
+            update(field, non_empty=True)
+
+        filters = [
+            RrfFilter(field=field, **kwargs)
+            for field, kwargs in kwargs_fields.items()
+        ]
+
+        return cls(filters=filters)
+
+    @property
+    def fields(self) -> List[str]:
+        """ The names of the filtered fields in evaluation order."""
+
+        return [filter_.field for filter_ in self.filters]
+
+    def replace(self, filter_: RrfFilter) -> "RrfFilterSpec":
+        """ Creates a copy of the spec where a filter replaces the filter of
+            the same field, if any.
+
+        Args:
+            filter_ (RrfFilter): The new filter.
+
+        Returns:
+            RrfFilterSpec: The new filter spec.
+        """
+
+        filters = [
+            filter_spec_
+            for filter_spec_ in self.filters
+            if filter_spec_.field != filter_.field
+        ]
+        filters.append(filter_)
+
+        return RrfFilterSpec(filters=filters)
+
+    def validate(self, fieldnames: Sequence[str]):
+        """ Checks that all filtered fields are defined in an RRF file.
+
+        Args:
+            fieldnames (Sequence[str]): The names of the RRF file fields.
+
+        Raises:
+            ValueError: Raised when a filtered field isn't defined.
+        """
+
+        for field in self.fields:
+            if field not in fieldnames:
+                msg = "Cannot filter on field '{}' which is not among {}."
+                msg_fmt = msg.format(field, list(fieldnames))
+                raise ValueError(msg_fmt)
+
+    def get_token_filter(
+        self, fieldnames: Sequence[str]
+    ) -> Optional[RrfFilter]:
+        """ Retrieves the filter whose values are used as substring tokens.
+
+        Args:
+            fieldnames (Sequence[str]): The names of the RRF file fields.
+
+        Returns:
+            Optional[RrfFilter]: The filter or `None` if no filter qualifies.
+        """
+
+        for filter_ in self.filters:
+            # The first field isn't preceded by a delimiter and a line with an
+            # empty value can't be told apart by a token.
+            if (
+                filter_.include is not None
+                and fieldnames.index(filter_.field) > 0
+                and all(filter_.include)
+            ):
+                return filter_
+
+        return None
+
+    def __repr__(self) -> str:
+        return "RrfFilterSpec(filters={!r})".format(self.filters)
+
+
+def iterate_filtered_rows(
+    filename_rrf: str,
+    fieldnames: Sequence[str],
+    columns: Sequence[str],
+    filter_spec: RrfFilterSpec,
+    cuis: Optional[Container[str]] = None,
+    stats: Optional[collections.Counter] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Iterator[List[str]]:
+    """ Iterates over the lines of an RRF file and yields the values of the
+        requested fields for the rows that pass the filters.
+
+    Notes:
+        The filters are evaluated on the split rows cheapest-first and the
+        CUIs, which may be looked up in a packed or memory-mapped map, are
+        only checked for rows that pass them.
+
+        The counts recorded in `stats` are keyed on the filtered field names,
+        `CUI` for rows whose CUI isn't in `cuis`, `malformed` for blank or
+        truncated lines, `lines` for all lines read, and `rows` for the rows
+        yielded.
+
+    Args:
+        filename_rrf (str): Path to the RRF file or a `zip://` location.
+        fieldnames (Sequence[str]): The names of the RRF file fields.
+        columns (Sequence[str]): The names of the fields to yield.
+        filter_spec (RrfFilterSpec): The filters to apply.
+        cuis (Optional[Container[str]]): UMLS CUIs the `CUI` field of a row
+            must be in. Defaults to `None` in which case CUIs aren't checked.
+        stats (Optional[collections.Counter]): The counter the number of rows
+            dropped by each filter is added to. Defaults to `None`.
+        start (int, optional): The byte offset of the first line to read.
+            Defaults to `0`.
+        end (Optional[int]): The byte offset at which to stop. Defaults to
+            `None` in which case the file is read to its end.
+
+    Yields:
+        List[str]: The decoded values of the requested fields.
+    """
+
+    filter_spec.validate(fieldnames=fieldnames)
+
+    # Extract the requested fields followed by the filtered fields and the CUI.
+    names = list(columns)
+    for field in filter_spec.fields + (["CUI"] if cuis is not None else []):
+        if field not in names:
+            names.append(field)
+
+    filter_token = filter_spec.get_token_filter(fieldnames=fieldnames)
+    if filter_token is not None:
+        tokens = sorted(
+            [
+                b"|" + value.encode("utf-8") + b"|"
+                for value in filter_token.include
+            ]
+        )
+    else:
+        tokens = None
+
+    stats_rows = collections.Counter()
+    rows = iterate_rrf_rows(
+        filename_rrf=filename_rrf,
+        columns=[fieldnames.index(name) for name in names],
+        tokens=tokens,
+        start=start,
+        end=end,
+        stats=stats_rows,
+    )
+
+    filters = [
+        (names.index(filter_.field), filter_)
+        for filter_ in filter_spec.filters
+    ]
+    position_cui = names.index("CUI") if cuis is not None else None
+    num_columns = len(columns)
+
+    counts = [0] * len(filters)
+    num_cuis = 0
+    num_rows = 0
+    try:
+        for values in rows:
+            for index, (position, filter_) in enumerate(filters):
+                if not filter_.matches(values[position]):
+                    counts[index] += 1
+                    break
+            else:
+                if cuis is not None and values[position_cui] not in cuis:
+                    num_cuis += 1
+                    continue
+
+                num_rows += 1
+                yield values[:num_columns]
+    finally:
+        rows.close()
+
+        if stats is not None:
+            stats["lines"] += stats_rows["lines"]
+            stats["malformed"] += stats_rows["malformed"]
+            if filter_token is not None:
+                stats[filter_token.field] += stats_rows["tokens"]
+            for (_, filter_), count in zip(filters, counts):
+                stats[filter_.field] += count
+            if cuis is not None:
+                stats["CUI"] += num_cuis
+            stats["rows"] += num_rows
+
+
+def format_filter_stats(
+    stats: collections.Counter, filter_spec: RrfFilterSpec
+) -> str:
+    """ Formats the number of rows dropped by each filter for logging.
+
+    Args:
+        stats (collections.Counter): The counts recorded through
+            `iterate_filtered_rows`.
+        filter_spec (RrfFilterSpec): The filters the counts were recorded for.
+
+    Returns:
+        str: The formatted counts, e.g., `LAT: 10, CUI: 5, malformed: 0 of 20
+            lines dropped, 5 rows kept`.
+    """
+
+    counts = ", ".join(
+        [
+            "{}: {}".format(name, stats[name])
+            for name in filter_spec.fields + ["CUI", "malformed"]
+        ]
+    )
+
+    msg = "{0} of {1} lines dropped, {2} rows kept"
+    msg_fmt = msg.format(counts, stats["lines"], stats["rows"])
+
+    return msg_fmt
@@ -0,0 +1,230 @@
+# coding=utf-8
+
+""" Shadow-schema support module
+
+This module contains the `ShadowSchema` class which allows the MeSH tables to
+be loaded into a separate shadow schema, created from the ORM metadata, while
+readers keep querying the live schema. Once the load has been validated the
+shadow schema replaces the live one through a pair of schema renames within a
+single short transaction so readers never observe a partial load.
+"""
+
+from typing import Dict, List
+
+import sqlalchemy
+
+from fform.orm_base import Base
+
+from mt_ingester import excs
+from mt_ingester.loggers import create_logger
+
+# Register the tables derived by `mt-ingester` with the ORM metadata.
+from mt_ingester import orm  # noqa: F401
+
+
+class ShadowSchema(object):
+    """ Class used to create, load, validate, and swap-in a shadow copy of the
+        MeSH schema.
+
+    Notes:
+        The live schema is renamed to `<schema>_previous` during the swap and
+        kept until the next swap so that a bad load can be rolled back by hand.
+        Foreign-keys defined in other schemas keep pointing to the tables of
+        the previous schema.
+    """
+
+    def __init__(
+        self,
+        engine: sqlalchemy.engine.Engine,
+        schema: str,
+        min_row_count_ratio: float = 0.9,
+        lock_timeout: str = "10s",
+        **kwargs
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): The engine connected to the
+                database holding the schema.
+            schema (str): The name of the live MeSH schema.
+            min_row_count_ratio (float, optional): The minimum ratio of the
+                shadow row count over the live row count every table must
+                satisfy for the shadow schema to be swapped in. Defaults to
+                `0.9`.
+            lock_timeout (str, optional): The maximum time the swap waits to
+                acquire its locks before giving up. Defaults to `10s`.
+        """
+
+        # Internalize arguments.
+        self.engine = engine
+        self.schema = schema
+        self.schema_shadow = "{}_shadow".format(schema)
+        self.schema_previous = "{}_previous".format(schema)
+        self.min_row_count_ratio = min_row_count_ratio
+        self.lock_timeout = lock_timeout
+
+        self.logger = create_logger(
+            logger_name=type(self).__name__,
+            logger_level=kwargs.get("logger_level", "DEBUG"),
+        )
+
+    @property
+    def tables(self) -> List[sqlalchemy.Table]:
+        """ The ORM tables defined under the live schema."""
+
+        return [
+            table
+            for table in Base.metadata.sorted_tables
+            if (table.schema or "public") == self.schema
+        ]
+
+    def _quote(self, identifier: str) -> str:
+        """ Quotes an SQL identifier."""
+
+        return self.engine.dialect.identifier_preparer.quote(identifier)
+
+    def create(self):
+        """ (Re)creates an empty shadow schema with the tables of the live
+            schema as defined in the ORM metadata.
+        """
+
+        msg = "Creating shadow schema '{}'."
+        msg_fmt = msg.format(self.schema_shadow)
+        self.logger.info(msg_fmt)
+
+        with self.engine.begin() as connection:
+            connection.execute(
+                "DROP SCHEMA IF EXISTS {} CASCADE".format(
+                    self._quote(self.schema_shadow)
+                )
+            )
+            connection.execute(
+                "CREATE SCHEMA {}".format(self._quote(self.schema_shadow))
+            )
+
+        Base.metadata.create_all(
+            self.engine.execution_options(
+                schema_translate_map={self.schema: self.schema_shadow}
+            ),
+            tables=self.tables,
+        )
+
+    def attach(self, engine: sqlalchemy.engine.Engine):
+        """ Redirects all statements issued through an engine, e.g., the one
+            of a `DalMesh` instance, from the live to the shadow schema.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): The engine to redirect.
+        """
+
+        engine.update_execution_options(
+            schema_translate_map={self.schema: self.schema_shadow}
+        )
+
+    def count_rows(self, schema: str) -> Dict[str, int]:
+        """ Counts the rows of the MeSH tables under a given schema.
+
+        Notes:
+            Tables missing from the schema, e.g., tables added to the ORM
+            metadata after the live schema was created, are skipped.
+
+        Args:
+            schema (str): The schema whose tables will be counted.
+
+        Returns:
+            Dict[str, int]: Dictionary keyed on the names of the existing
+                tables with values of the row counts.
+        """
+
+        counts = {}
+        with self.engine.connect() as connection:
+            for table in self.tables:
+                # `Inspector.has_table` requires SQLAlchemy 1.4 so the dialect
+                # is queried directly.
+                if not connection.dialect.has_table(
+                    connection, table.name, schema=schema
+                ):
+                    continue
+                counts[table.name] = connection.execute(
+                    "SELECT count(*) FROM {}.{}".format(
+                        self._quote(schema), self._quote(table.name)
+                    )
+                ).scalar()
+
+        return counts
+
+    def validate(self) -> Dict[str, int]:
+        """ Validates the row counts of the shadow tables against those of the
+            live tables.
+
+        Returns:
+            Dict[str, int]: The row counts of the shadow tables.
+
+        Raises:
+            excs.ShadowSchemaInvalid: Raised when the shadow schema holds no
+                rows or a table falls short of the live row count.
+        """
+
+        counts_shadow = self.count_rows(schema=self.schema_shadow)
+        counts_live = self.count_rows(schema=self.schema)
+
+        if not any(counts_shadow.values()):
+            msg = "Shadow schema '{}' holds no rows."
+            msg_fmt = msg.format(self.schema_shadow)
+            raise excs.ShadowSchemaInvalid(msg_fmt)
+
+        # Tables absent from the live schema have no count to fall short of.
+        for table_name, count_live in counts_live.items():
+            count_shadow = counts_shadow.get(table_name, 0)
+
+            msg = "Table '{}': {} live rows, {} shadow rows."
+            msg_fmt = msg.format(table_name, count_live, count_shadow)
+            self.logger.info(msg_fmt)
+
+            if count_shadow < count_live * self.min_row_count_ratio:
+                msg = (
+                    "Table '{}' holds {} rows in the shadow schema against {} "
+                    "in the live schema which is below the {} ratio."
+                )
+                msg_fmt = msg.format(
+                    table_name,
+                    count_shadow,
+                    count_live,
+                    self.min_row_count_ratio,
+                )
+                raise excs.ShadowSchemaInvalid(msg_fmt)
+
+        return counts_shadow
+
+    def swap(self):
+        """ Validates the shadow schema and swaps it in for the live schema
+            within a single transaction.
+        """
+
+        self.validate()
+
+        msg = "Swapping shadow schema '{}' in for '{}'."
+        msg_fmt = msg.format(self.schema_shadow, self.schema)
+        self.logger.info(msg_fmt)
+
+        # Dropping the previous schema within the same transaction keeps it
+        # around should either rename fail.
+        with self.engine.begin() as connection:
+            connection.execute(
+                "SET LOCAL lock_timeout = '{}'".format(self.lock_timeout)
+            )
+            connection.execute(
+                "DROP SCHEMA IF EXISTS {} CASCADE".format(
+                    self._quote(self.schema_previous)
+                )
+            )
+            connection.execute(
+                "ALTER SCHEMA {} RENAME TO {}".format(
+                    self._quote(self.schema), self._quote(self.schema_previous)
+                )
+            )
+            connection.execute(
+                "ALTER SCHEMA {} RENAME TO {}".format(
+                    self._quote(self.schema_shadow), self._quote(self.schema)
+                )
+            )
@@ -0,0 +1,239 @@
+# coding=utf-8
+
+""" Tree-number utilities module
+
+This module contains functions operating on the dotted MeSH tree numbers,
+e.g., `C04.557.337`, where every dot-separated prefix of a tree number is the
+tree number of one of its ancestors in the MeSH hierarchy, as well as their
+compact sortable encoding and the `TreeNumberIndex` class which answers
+subtree and ancestor queries over such encoded tree numbers in-process.
+"""
+
+import re
+import bisect
+import struct
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def get_tree_number_ancestors(tree_number: str) -> List[str]:
+    """ Retrieves the ancestors of a tree number, i.e., its dot-separated
+        prefixes, from the root down to its parent.
+
+    Args:
+        tree_number (str): The tree number, e.g., `C04.557.337`.
+
+    Returns:
+        List[str]: The ancestor tree numbers, e.g., `["C04", "C04.557"]`.
+    """
+
+    ancestors = []
+    index = tree_number.find(".")
+    while index != -1:
+        ancestors.append(tree_number[:index])
+        index = tree_number.find(".", index + 1)
+
+    return ancestors
+
+
+def get_tree_number_closure(
+    tree_numbers: Iterable[str],
+) -> Iterator[Tuple[str, str, int]]:
+    """ Computes the ancestor/descendant closure of a set of tree numbers.
+
+    Notes:
+        Every tree number is paired with itself at a depth of `0` so that a
+        subtree, including its root, is retrieved through a single lookup.
+        Ancestors missing from `tree_numbers` are paired nonetheless and can
+        be filtered by the caller.
+
+    Args:
+        tree_numbers (Iterable[str]): The tree numbers.
+
+    Returns:
+        Iterator[Tuple[str, str, int]]: The ancestor tree numbers, descendant
+            tree numbers, and the number of levels between them.
+    """
+
+    for tree_number in tree_numbers:
+        yield tree_number, tree_number, 0
+
+        ancestors = get_tree_number_ancestors(tree_number=tree_number)
+        for depth, ancestor in enumerate(reversed(ancestors), 1):
+            yield ancestor, tree_number, depth
+
+
+def get_tree_number_ids_missing(
+    tree_number_ids: Dict[str, int],
+) -> List[str]:
+    """ Retrieves the ancestor tree numbers missing from a mapping of tree
+        numbers to IDs, e.g., when only part of the hierarchy was ingested.
+
+    Args:
+        tree_number_ids (Dict[str, int]): Dictionary keyed on tree numbers.
+
+    Returns:
+        List[str]: The sorted ancestor tree numbers not in `tree_number_ids`.
+    """
+
+    missing = set()
+    for tree_number in tree_number_ids:
+        for ancestor in get_tree_number_ancestors(tree_number=tree_number):
+            if ancestor not in tree_number_ids:
+                missing.add(ancestor)
+
+    return sorted(missing)
+
+
+# The pattern tree numbers are encoded from, e.g., `C04.588.614`.
+regex_tree_number = re.compile(r"^[A-Z][0-9]{2}(\.[0-9]{3})*$")
+
+# The upper bound of the integer encoding of a tree-number level.
+LEVEL_MAX = 0xFFFF
+
+
+def get_tree_number_path(tree_number: str) -> Tuple[int, ...]:
+    """ Encodes a tree number as a path of integers, one per level.
+
+    Notes:
+        The first level, e.g., `C04`, is encoded as the index of its letter
+        times `100` plus its number, and the remaining levels as their number
+        so that paths sort in the same order as the tree numbers.
+
+    Args:
+        tree_number (str): The tree number, e.g., `C04.588.614`.
+
+    Returns:
+        Tuple[int, ...]: The path, e.g., `(204, 588, 614)`.
+
+    Raises:
+        ValueError: Raised when the tree number isn't of the MeSH format.
+    """
+
+    if not regex_tree_number.match(tree_number):
+        msg = "Invalid tree number '{}'."
+        msg_fmt = msg.format(tree_number)
+        raise ValueError(msg_fmt)
+
+    levels = tree_number.split(".")
+    root = levels[0]
+
+    path = [(ord(root[0]) - ord("A")) * 100 + int(root[1:])]
+    path.extend(int(level) for level in levels[1:])
+
+    return tuple(path)
+
+
+def encode_tree_number(tree_number: str) -> bytes:
+    """ Encodes a tree number as a fixed-width-per-level key which sorts like
+        the tree numbers and whose descendants are prefixed by it.
+
+    Notes:
+        Each level is packed as a big-endian 16-bit integer so that the
+        subtree of a key `k` is the range `[k, k + b"\\xff\\xff")`, see
+        `get_tree_number_key_range`.
+
+    Args:
+        tree_number (str): The tree number, e.g., `C04.588.614`.
+
+    Returns:
+        bytes: The key of two bytes per level.
+    """
+
+    path = get_tree_number_path(tree_number=tree_number)
+
+    return struct.pack(">{}H".format(len(path)), *path)
+
+
+def decode_tree_number(key: bytes) -> str:
+    """ Decodes a key created through `encode_tree_number`.
+
+    Args:
+        key (bytes): The key.
+
+    Returns:
+        str: The tree number.
+    """
+
+    path = struct.unpack(">{}H".format(len(key) // 2), key)
+
+    root = "{}{:02d}".format(chr(ord("A") + path[0] // 100), path[0] % 100)
+
+    return ".".join([root] + ["{:03d}".format(level) for level in path[1:]])
+
+
+def get_tree_number_key_range(key: bytes) -> Tuple[bytes, bytes]:
+    """ Retrieves the range of the keys under the subtree of a key,
+        including the key itself, as a `[lower, upper)` pair.
+
+    Args:
+        key (bytes): The key created through `encode_tree_number`.
+
+    Returns:
+        Tuple[bytes, bytes]: The inclusive lower and exclusive upper bounds.
+    """
+
+    return key, key + struct.pack(">H", LEVEL_MAX)
+
+
+class TreeNumberIndex(object):
+    """ In-process index of tree numbers answering subtree and ancestor
+        queries through binary searches over their sorted keys.
+    """
+
+    def __init__(self, tree_numbers: Iterable[str]):
+        """ Constructor and initialization.
+
+        Args:
+            tree_numbers (Iterable[str]): The tree numbers to index.
+        """
+
+        keys = {encode_tree_number(tree_number=tn): tn for tn in tree_numbers}
+        items = sorted(keys.items())
+
+        self.keys = [key for key, _ in items]  # type: List[bytes]
+        self.tree_numbers = [tn for _, tn in items]  # type: List[str]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, tree_number: str) -> bool:
+        key = encode_tree_number(tree_number)
+        index = bisect.bisect_left(self.keys, key)
+
+        return index < len(self.keys) and self.keys[index] == key
+
+    def get_subtree(self, tree_number: str) -> List[str]:
+        """ Retrieves the indexed tree numbers under a tree number, including
+            itself if indexed, in sorted order.
+
+        Args:
+            tree_number (str): The root of the subtree, e.g., `C04`.
+
+        Returns:
+            List[str]: The indexed tree numbers under the subtree.
+        """
+
+        lower, upper = get_tree_number_key_range(
+            encode_tree_number(tree_number)
+        )
+        start = bisect.bisect_left(self.keys, lower)
+        stop = bisect.bisect_left(self.keys, upper, lo=start)
+
+        return self.tree_numbers[start:stop]
+
+    def get_ancestors(self, tree_number: str) -> List[str]:
+        """ Retrieves the indexed ancestors of a tree number from the root
+            down to its parent.
+
+        Args:
+            tree_number (str): The tree number, e.g., `C04.588.614`.
+
+        Returns:
+            List[str]: The indexed ancestor tree numbers.
+        """
+
+        return [
+            ancestor
+            for ancestor in get_tree_number_ancestors(tree_number=tree_number)
+            if ancestor in self
+        ]
@@ -1,11 +1,51 @@
 # coding=utf-8
 
+import os
+import mmap
+import tempfile
+import itertools
+import importlib
+import contextlib
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+)
+
+
+T = TypeVar("T")
+
+# Map of the code objects of the methods decorated with
+# `log_ingestion_of_document` to the name of the document they ingest. Used to
+# attribute DAL calls to the record type being ingested.
+document_names_by_code = {}
+
+# Whether the methods decorated with `log_ingestion_of_document` log every
+# document they ingest. Read once at import time, through the
+# `MT_INGESTER_LOG_DOCUMENTS` environment variable, so that the decorated
+# methods are left unwrapped and incur no overhead unless it's enabled.
+do_log_documents = os.environ.get("MT_INGESTER_LOG_DOCUMENTS", "0") not in [
+    "",
+    "0",
+]
+
 
 def log_ingestion_of_document(document_name: str):
 
     # Define the actual decorator. This three-tier decorator functions are
     # necessary when defining decorator functions with arguments.
     def log_ingestion_of_document_decorator(func):
+        document_names_by_code[func.__code__] = document_name
+
+        # Leave the method unwrapped unless per-document logging is enabled.
+        if not do_log_documents:
+            return func
+
         # Define the wrapper function.
         def wrapper(self, *args, **kwargs):
 
@@ -20,3 +60,220 @@ def log_ingestion_of_document(document_name: str):
         return wrapper
 
     return log_ingestion_of_document_decorator
+
+
+def chunk_iterable(iterable: Iterable[T], chunk_size: int) -> Iterator[List[T]]:
+    """Splits an iterable into consecutive lists of at most `chunk_size`
+    items.
+
+    Args:
+        iterable (Iterable[T]): The iterable to be split.
+        chunk_size (int): The maximum number of items per chunk.
+
+    Yields:
+        List[T]: The next chunk of items.
+    """
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def call_dal(
+    dal, name: str, func: Callable[..., Any], num_rows: int = 0, **kwargs
+) -> Any:
+    """ Calls a function writing to the DB outside the DAL methods, e.g.,
+        through the DAL engine, so that the DAL proxies, e.g.,
+        `DalInstrumented`, account for it as a call to a DAL method.
+
+    Notes:
+        The proxies implement a `call_method` method with the signature of
+        this function, minus the DAL, which wraps the call and passes it on
+        to the proxied DAL through this function. A bare DAL calls the
+        function directly.
+
+    Args:
+        dal: The DAL instance or proxy.
+        name (str): The name the call is accounted for under, e.g.,
+            `insert_rows`.
+        func (Callable[..., Any]): The function to call.
+        num_rows (int, optional): The number of rows the call touches.
+            Defaults to `0`.
+        **kwargs: The arguments `func` is called with.
+
+    Returns:
+        Any: The result of `func`.
+    """
+
+    call_method = getattr(dal, "call_method", None)
+    if call_method is None:
+        return func(**kwargs)
+
+    return call_method(name=name, func=func, num_rows=num_rows, **kwargs)
+
+
+def get_padding(size: int) -> int:
+    """ Retrieves the number of bytes padding a size to a multiple of 8."""
+
+    return -size % 8
+
+
+@contextlib.contextmanager
+def open_atomic(filename: str) -> Iterator[BinaryIO]:
+    """ Opens a file for writing under a temporary name in the same directory
+        and renames it once complete so that concurrent readers never see a
+        partial file.
+
+    Notes:
+        The temporary file is removed should writing it fail.
+
+    Args:
+        filename (str): Path to the file.
+
+    Yields:
+        BinaryIO: The temporary file opened for binary writing.
+    """
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    fd, filename_tmp = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fout:
+            yield fout
+        os.replace(filename_tmp, filename)
+    except BaseException:
+        os.remove(filename_tmp)
+        raise
+
+
+def write_sections(fout: BinaryIO, sections: Iterable[bytes]):
+    """ Writes sections to a file each padded to a multiple of 8 bytes so
+        that they can be cast in place once mapped, see `MappedFile`.
+    """
+
+    for section in sections:
+        fout.write(section)
+        fout.write(bytes(get_padding(len(section))))
+
+
+class MappedFile(object):
+    """ Base class of the read-only mappings backed by a memory-mapped file.
+
+    Notes:
+        Subclasses name the attribute holding the path to the file in
+        `attr_filename` and implement `_open` which maps the file through
+        `_map` and slices its sections, written through `write_sections`,
+        through `_take` and `_skip`. The sections are cast in place so opening
+        the file only reads what `_open` does.
+
+        Instances can be pickled, e.g., when passed to worker processes, in
+        which case the file is mapped again rather than copied.
+    """
+
+    # The name of the attribute holding the path to the file.
+    attr_filename = "filename"
+
+    def _open(self):
+        """ Maps the file and reads its header and sections."""
+
+        raise NotImplementedError
+
+    def _map(self, offset: int = 0):
+        """ Maps the file and starts slicing its sections at an offset, e.g.,
+            the header size.
+        """
+
+        with open(getattr(self, self.attr_filename), "rb") as finp:
+            self._mmap = mmap.mmap(finp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._view = memoryview(self._mmap)
+        self._offset = offset
+        self._sections = []  # type: List[memoryview]
+
+    def _take(self, size: int, fmt: Optional[str] = None) -> memoryview:
+        """ Slices the next section of the file and casts it to a format,
+            e.g., `I`, if given.
+        """
+
+        section = self._view[self._offset : self._offset + size]
+        self._offset += size + get_padding(size)
+        if fmt:
+            section = section.cast(fmt)
+        self._sections.append(section)
+
+        return section
+
+    def _skip(self, size: int) -> int:
+        """ Skips the next section of the file, e.g., one sliced from the map
+            directly, and retrieves its offset.
+        """
+
+        offset = self._offset
+        self._offset += size + get_padding(size)
+
+        return offset
+
+    def close(self):
+        """ Unmaps the file."""
+
+        # The views of the map must be released before it can be closed.
+        for section in self._sections:
+            section.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __getstate__(self) -> dict:
+        return {self.attr_filename: getattr(self, self.attr_filename)}
+
+    def __setstate__(self, state: dict):
+        setattr(self, self.attr_filename, state[self.attr_filename])
+        self._open()
+
+
+class LazyModule(object):
+    """ Proxy deferring the import of a module until one of its attributes is
+        first accessed.
+
+    Notes:
+        Once imported, the module replaces the proxy under `name` in
+        `namespace`, e.g., the `globals()` of the importing module, so that
+        subsequent lookups bypass the proxy. Attribute lookups at definition
+        time, e.g., annotations, trigger the import unless they're deferred
+        through `from __future__ import annotations`.
+    """
+
+    def __init__(
+        self,
+        module_name: str,
+        namespace: Optional[dict] = None,
+        name: Optional[str] = None,
+    ):
+        """ Constructor and initialization.
+
+        Args:
+            module_name (str): The absolute name of the module, e.g.,
+                `lxml.etree`.
+            namespace (Optional[dict]): The namespace the proxy is bound in.
+                Defaults to `None` in which case the proxy isn't replaced.
+            name (Optional[str]): The name the proxy is bound to in
+                `namespace`. Defaults to `None` in which case the last
+                component of `module_name` is used.
+        """
+
+        self._module_name = module_name
+        self._namespace = namespace
+        self._name = name or module_name.rsplit(".", 1)[-1]
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._module_name)
+
+        namespace = self._namespace
+        if namespace is not None and namespace.get(self._name) is self:
+            namespace[self._name] = module
+
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        return "LazyModule({!r})".format(self._module_name)
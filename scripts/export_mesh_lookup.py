@@ -0,0 +1,133 @@
+# coding=utf-8
+
+""" Exports the names, tree numbers, and synonyms of the MeSH descriptors,
+    qualifiers, and supplemental records into a `MeshLookup` file which
+    services can map and query by UI rather than querying the DB.
+"""
+
+import argparse
+import itertools
+
+
+# The dependencies are imported within `main` so that `--help` doesn't import
+# them.
+def main(args):
+    from mt_ingester.lookup import MeshLookup
+    from mt_ingester.lookup import get_lookup_record
+    from mt_ingester.parsers import ParserUmlsConso
+    from mt_ingester.parsers import ParserXmlMeshDescriptors
+    from mt_ingester.parsers import ParserXmlMeshQualifiers
+    from mt_ingester.parsers import ParserXmlMeshSupplementals
+
+    docs = []
+    for parser_class, filenames in [
+        (ParserXmlMeshDescriptors, args.filenames_descriptors),
+        (ParserXmlMeshQualifiers, args.filenames_qualifiers),
+        (ParserXmlMeshSupplementals, args.filenames_supplementals),
+    ]:
+        parser = parser_class()
+        for filename in filenames or []:
+            docs.append(parser.parse(filename_xml=filename))
+
+    # Stream the UMLS synonyms grouped by descriptor when given.
+    synonyms = None
+    if args.filename_mrsat_rrf and args.filename_mrconso_rrf:
+        parser = ParserUmlsConso(
+            dirname_index=args.dirname_index,
+            filter_spec=ParserUmlsConso.create_filter_spec(
+                languages=args.languages
+            ),
+            dirname_tmp=args.dirname_tmp,
+        )
+        synonyms = parser.iterate_groups(
+            args.filename_mrsat_rrf, args.filename_mrconso_rrf
+        )
+
+    lookup = MeshLookup.build(
+        filename_lookup=args.filename_lookup,
+        records=map(get_lookup_record, itertools.chain.from_iterable(docs)),
+        synonyms=synonyms,
+    )
+    lookup.close()
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(
+        description="mt-ingester: MeSH lookup file exporter."
+    )
+
+    argument_parser.add_argument(
+        "--descriptors-filenames",
+        dest="filenames_descriptors",
+        help="MeSH descriptor XML filenames",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--qualifiers-filenames",
+        dest="filenames_qualifiers",
+        help="MeSH qualifier XML filenames",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--supplementals-filenames",
+        dest="filenames_supplementals",
+        help="MeSH supplemental record XML filenames",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--mr-sat-filename",
+        dest="filename_mrsat_rrf",
+        help=(
+            "MRSAT.rrf filename or `zip://<archive>!/<member>` location of "
+            "which the UMLS synonyms are added"
+        ),
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--mr-conso-filename",
+        dest="filename_mrconso_rrf",
+        help=(
+            "MRCONSO.rrf filename or `zip://<archive>!/<member>` location of "
+            "which the UMLS synonyms are added"
+        ),
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--languages",
+        dest="languages",
+        help=(
+            "`LAT` values of the MRCONSO.RRF rows to keep where `ALL` or no "
+            "values keep all languages"
+        ),
+        nargs="*",
+        default=["ENG"],
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--index-dir",
+        dest="dirname_index",
+        help=(
+            "Directory where the CUI-DUI index of the MRSAT.rrf file is "
+            "stored and reused from across runs"
+        ),
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--tmp-dir",
+        dest="dirname_tmp",
+        help="Directory under which the sorted runs are spilled",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--output-filename",
+        dest="filename_lookup",
+        help="Path to the lookup file to write",
+        required=True,
+    )
+
+    arguments = argument_parser.parse_args()
+
+    main(args=arguments)
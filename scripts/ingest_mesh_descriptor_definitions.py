@@ -3,14 +3,12 @@
 import os
 import argparse
 
-from fform.dals_mt import DalMesh
-
-from mt_ingester.parsers import ParserUmlsDef
-from mt_ingester.ingesters import IngesterUmlsDef
-from mt_ingester.config import import_config
-
 
+# The dependencies are imported within `main` so that `--help` doesn't import
+# them.
 def load_config(args):
+    from mt_ingester.config import import_config
+
     if args.config_file:
         cfg = import_config(fname_config_file=args.config_file)
     elif "CT_INGESTER_CONFIG" in os.environ:
@@ -24,6 +22,24 @@ def load_config(args):
 
 
 def main(args):
+    # Route the log records through a bounded queue drained by a background
+    # thread so that slow log handlers don't stall the ingestion.
+    if args.log_queue_size:
+        from mt_ingester.loggers import enable_queue_logging
+
+        enable_queue_logging(
+            max_size=args.log_queue_size, do_block=not args.log_queue_drop
+        )
+
+    from fform.dals_mt import DalMesh
+
+    from mt_ingester.parsers import ParserUmlsDef
+    from mt_ingester.ingesters import IngesterUmlsDef
+    from mt_ingester.instrumentation import DalInstrumented
+    from mt_ingester.profiling import create_profiler
+    from mt_ingester.profiling import get_profile_label
+    from mt_ingester.progress import ProgressReporter
+
     cfg = load_config(args=args)
 
     dal = DalMesh(
@@ -34,15 +50,78 @@ def main(args):
         sql_db=cfg.sql_db,
     )
 
-    parser = ParserUmlsDef()
-    ingester = IngesterUmlsDef(dal=dal)
+    # Profile the parse, transform, and DB write stages separately.
+    profiler = create_profiler(
+        mode=args.profile,
+        label=get_profile_label(
+            mode="definitions", filename=args.filename_mrdef_rrf
+        ),
+        dirname=args.dirname_profile,
+        top=args.profile_top,
+        logger_level=cfg.logger_level,
+    )
+    dal = profiler.wrap_dal(dal=dal)
+
+    # Report the progress and throughput at a fixed interval.
+    progress = ProgressReporter(
+        label=profiler.label,
+        interval=args.progress_interval,
+        logger_level=cfg.logger_level,
+    )
+    dal = progress.wrap_dal(dal=dal)
+
+    # Wrap the DAL to record per-method call statistics.
+    if args.instrument or args.instrument_json:
+        dal = DalInstrumented(dal=dal)
 
-    doc = parser.parse(
-        filename_mrsat_rrf=args.filename_mrsat_rrf,
-        filename_mrdef_rrf=args.filename_mrdef_rrf,
+    parser = ParserUmlsDef(
+        num_workers=args.num_workers,
+        dirname_index=args.dirname_index,
+        backend=args.backend,
+        filter_spec=ParserUmlsDef.create_filter_spec(
+            sources_include=args.sources_include,
+            sources_exclude=args.sources_exclude,
+            suppress=args.suppress,
+        ),
+        max_memory=(
+            args.max_memory * 2 ** 20 if args.max_memory is not None else None
+        ),
+        dirname_tmp=args.dirname_tmp,
+        logger_level=cfg.logger_level,
+    )
+    ingester = IngesterUmlsDef(
+        dal=dal, batch_size=args.batch_size, logger_level=cfg.logger_level
     )
 
-    ingester.ingest(document=doc)
+    with profiler, progress:
+        # Stream the definitions grouped by descriptor when the memory is
+        # capped.
+        if parser.max_memory is not None:
+            doc = progress.iterate(
+                profiler.iterate(
+                    "parse",
+                    parser.iterate_groups(
+                        filename_mrsat_rrf=args.filename_mrsat_rrf,
+                        filename_mrdef_rrf=args.filename_mrdef_rrf,
+                    ),
+                )
+            )
+        else:
+            with profiler.stage("parse"):
+                doc = parser.parse(
+                    filename_mrsat_rrf=args.filename_mrsat_rrf,
+                    filename_mrdef_rrf=args.filename_mrdef_rrf,
+                )
+
+        with profiler.stage("transform"):
+            ingester.ingest(document=doc)
+
+    profiler.log_summary()
+
+    if isinstance(dal, DalInstrumented):
+        dal.log_report()
+        if args.instrument_json:
+            dal.dump_report(filename_json=args.instrument_json)
 
 
 if __name__ == '__main__':
@@ -53,15 +132,153 @@ if __name__ == '__main__':
     argument_parser.add_argument(
         "--mr-sat-filename",
         dest="filename_mrsat_rrf",
-        help="MRSAT.rrf filename",
+        help="MRSAT.rrf filename or `zip://<archive>!/<member>` location",
         required=True,
     )
     argument_parser.add_argument(
         "--mr-def-filename",
         dest="filename_mrdef_rrf",
-        help="MRDEF.rrf filename",
+        help="MRDEF.rrf filename or `zip://<archive>!/<member>` location",
         required=True,
     )
+    argument_parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        help="Number of definitions per bulk insert",
+        type=int,
+        default=1000,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--num-workers",
+        dest="num_workers",
+        help="Number of processes the RRF files are parsed in",
+        type=int,
+        default=1,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--index-dir",
+        dest="dirname_index",
+        help=(
+            "Directory where the CUI-DUI index of the MRSAT.rrf file is "
+            "stored and reused from across runs"
+        ),
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--backend",
+        dest="backend",
+        help=(
+            "Backend UMLS RRF files are read with where 'arrow' requires "
+            "`pyarrow`"
+        ),
+        choices=["python", "arrow"],
+        default="python",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--sources-include",
+        dest="sources_include",
+        help="`SAB` values of the MRDEF.rrf rows to keep",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--sources-exclude",
+        dest="sources_exclude",
+        help="`SAB` values of the MRDEF.rrf rows to drop",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--suppress",
+        dest="suppress",
+        help="`SUPPRESS` values of the MRDEF.rrf rows to keep",
+        nargs="+",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--max-memory",
+        dest="max_memory",
+        help=(
+            "Memory in MB the parsed definitions may take before they're "
+            "spilled to disk as sorted runs"
+        ),
+        type=int,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--tmp-dir",
+        dest="dirname_tmp",
+        help="Directory the sorted runs are spilled to",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--instrument",
+        dest="instrument",
+        help="Record and report call statistics per DAL method",
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--instrument-json",
+        dest="instrument_json",
+        help="JSON file the DAL call statistics are written to",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--log-queue-size",
+        dest="log_queue_size",
+        help=(
+            "Maximum number of log records queued for a background thread "
+            "to handle where `0` handles them synchronously"
+        ),
+        type=int,
+        default=0,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--log-queue-drop",
+        dest="log_queue_drop",
+        help="Drop log records while the log queue is full instead of waiting",
+        action="store_true",
+    )
+    argument_parser.add_argument(
+        "--progress-interval",
+        dest="progress_interval",
+        help=(
+            "Interval in seconds between progress and throughput reports "
+            "where `0` disables them"
+        ),
+        type=float,
+        default=30.0,
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--profile",
+        dest="profile",
+        help=(
+            "Profile the parse, transform, and DB write stages separately "
+            "where 'sampling' is cheap enough for production loads"
+        ),
+        choices=["cprofile", "sampling", "tracemalloc"],
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--profile-dir",
+        dest="dirname_profile",
+        help="Directory the profiling artifacts are written to",
+        default=".",
+        required=False,
+    )
+    argument_parser.add_argument(
+        "--profile-top",
+        dest="profile_top",
+        help="Number of entries per stage in the profile summary",
+        type=int,
+        default=20,
+        required=False,
+    )
     argument_parser.add_argument(
         "--config-file",
         dest="config_file",
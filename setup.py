@@ -14,6 +14,10 @@ with open('CHANGELOG.md') as history_file:
 requirements = [
 ]
 
+extras_requirements = {
+    'arrow': ['pyarrow'],
+}
+
 setup_requirements = [
     'pytest-runner',
 ]
@@ -33,6 +37,7 @@ setup(
     packages=find_packages(include=['mt_ingester']),
     include_package_data=True,
     install_requires=requirements,
+    extras_require=extras_requirements,
     zip_safe=False,
     keywords='mt_ingester',
     classifiers=[
@@ -0,0 +1,144 @@
+# coding=utf-8
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from mt_ingester.annotator import Annotator
+from mt_ingester.annotator import collect_phrases
+from mt_ingester.annotator import get_record_names
+from mt_ingester.annotator import normalize_phrase
+from mt_ingester.parsers import ParserXmlMeshDescriptors
+
+from tests.assets.samples_mesh import get_sample_file
+from tests.assets.samples_mesh import EnumMeshFileSample
+
+
+class AnnotatorTest(unittest.TestCase):
+    """ Tests the `Annotator` class."""
+
+    def setUp(self):
+        """ Builds an automaton in a temporary directory."""
+
+        self.dirname = tempfile.mkdtemp()
+        self.filename_automaton = os.path.join(self.dirname, "annotator.bin")
+
+        self.phrases = collect_phrases(
+            [
+                ("D001", ["Lung Neoplasms", "Lung Cancer", "Lung"]),
+                ("D002", ["Neoplasms", "Cancer"]),
+                ("D003", ["Calcimycin", "A-23187"]),
+                ("D004", ["lung"]),
+            ]
+        )
+        self.annotator = Annotator.build(
+            filename_automaton=self.filename_automaton, phrases=self.phrases
+        )
+
+    def tearDown(self):
+        """ Closes the annotator and deletes the temporary directory."""
+
+        self.annotator.close()
+        shutil.rmtree(self.dirname)
+
+    def test_normalize_phrase(self):
+        """ Tests the `normalize_phrase` function."""
+
+        self.assertEqual(normalize_phrase("A-23187"), "a 23187")
+        self.assertEqual(
+            normalize_phrase("  Lung   Neoplasms, "), "lung neoplasms"
+        )
+        self.assertEqual(normalize_phrase("--"), "")
+
+    def test_collect_phrases(self):
+        """ Tests that names are normalized and their UIs merged."""
+
+        self.assertSetEqual(self.phrases["lung"], {"D001", "D004"})
+        self.assertSetEqual(self.phrases["a 23187"], {"D003"})
+        self.assertEqual(len(self.annotator), 7)
+
+    def test_annotate_longest(self):
+        """ Tests that the longest phrase starting at each token is kept."""
+
+        text = "Calcimycin (A 23187) on LUNG neoplasms, not lungs; cancer."
+
+        annotations = self.annotator.annotate_text(text=text)
+
+        self.assertListEqual(
+            [(text[start:end], uis) for start, end, uis in annotations],
+            [
+                ("Calcimycin", ("D003",)),
+                ("A 23187", ("D003",)),
+                ("LUNG neoplasms", ("D001",)),
+                ("cancer", ("D002",)),
+            ],
+        )
+
+    def test_annotate_all(self):
+        """ Tests that overlapping phrases are kept when requested."""
+
+        text = "lung cancer"
+
+        annotations = self.annotator.annotate([text], do_longest=False)[0]
+
+        self.assertListEqual(
+            annotations,
+            [
+                (0, 4, ("D001", "D004")),
+                (0, 11, ("D001",)),
+                (5, 11, ("D002",)),
+            ],
+        )
+
+    def test_annotate_lowercasing(self):
+        """ Tests that offsets are those of the text when lowercasing changes
+            its length.
+        """
+
+        text = "İ lung cancer"
+
+        annotations = self.annotator.annotate_text(text=text)
+
+        self.assertListEqual(annotations, [(2, 13, ("D001",))])
+
+    def test_open(self):
+        """ Tests that a pickled annotator maps the file again and that other
+            files are rejected.
+        """
+
+        annotator = pickle.loads(pickle.dumps(self.annotator))
+        self.addCleanup(annotator.close)
+
+        self.assertListEqual(
+            annotator.annotate_text("cancer"), [(0, 6, ("D002",))]
+        )
+
+        filename = os.path.join(self.dirname, "other.bin")
+        with open(filename, "wb") as fout:
+            fout.write(b"\0" * 128)
+
+        with self.assertRaises(ValueError):
+            Annotator(filename_automaton=filename)
+
+
+class GetRecordNamesTest(unittest.TestCase):
+    """ Tests the `get_record_names` function."""
+
+    def test_descriptor(self):
+        """ Tests retrieving the names of a sample descriptor."""
+
+        file = get_sample_file(mesh_file_type=EnumMeshFileSample.DESC)
+        self.addCleanup(os.remove, file.name)
+        self.addCleanup(file.close)
+
+        parser = ParserXmlMeshDescriptors()
+        doc = next(parser.parse(filename_xml=file.name))
+
+        ui, names = get_record_names(doc)
+
+        self.assertEqual(ui, "D000001")
+        self.assertListEqual(
+            names, ["Calcimycin", "Calcimycin", "A 23187", "A-23187"]
+        )
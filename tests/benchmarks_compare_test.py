@@ -0,0 +1,235 @@
+# coding=utf-8
+
+import io
+import os
+import shutil
+import argparse
+import tempfile
+import unittest
+import contextlib
+
+import ujson
+
+from benchmarks.compare import compare_results
+from benchmarks.compare import get_new_dal_methods
+from benchmarks.compare import main
+
+
+def create_results(**benchmarks) -> dict:
+    """ Creates the results of a suite run out of the throughput samples and
+        DAL methods of its benchmarks.
+    """
+
+    results = {}
+    for name, (samples, dal_methods) in benchmarks.items():
+        samples = sorted(samples)
+        results[name] = {
+            "records": 100,
+            "records_per_sec": samples[len(samples) // 2],
+            "records_per_sec_best": samples[-1],
+            "records_per_sec_worst": samples[0],
+            "peak_rss_mb": 50.0,
+            "dal_calls_per_record": float(sum(dal_methods.values())) / 100,
+            "dal_methods": dal_methods,
+        }
+
+    return {"metadata": {"records": {"desc": 100}}, "results": results}
+
+
+class CompareResultsTest(unittest.TestCase):
+    """ Tests the `compare_results` function."""
+
+    def get_regressed(self, rows):
+        return {
+            (row["benchmark"], row["metric"])
+            for row in rows
+            if row["regressed"]
+        }
+
+    def test_overlapping_spread(self):
+        """ Tests that a median drop within the spread of the repeats isn't a
+            regression.
+        """
+
+        rows = compare_results(
+            results_baseline=create_results(
+                parse_mrsat=([800.0, 1000.0, 1100.0], {})
+            ),
+            results_current=create_results(
+                parse_mrsat=([700.0, 850.0, 900.0], {})
+            ),
+        )
+
+        row = rows[0]
+        self.assertEqual(row["metric"], "records_per_sec")
+        self.assertAlmostEqual(row["change"], -0.15)
+        self.assertAlmostEqual(row["change_bounds"], 0.125)
+        self.assertSetEqual(self.get_regressed(rows), set())
+
+    def test_disjoint_spread(self):
+        """ Tests that the best of the current repeats falling below the worst
+            of the baseline by more than the threshold is a regression.
+        """
+
+        rows = compare_results(
+            results_baseline=create_results(
+                parse_mrsat=([900.0, 1000.0, 1100.0], {})
+            ),
+            results_current=create_results(
+                parse_mrsat=([700.0, 750.0, 800.0], {})
+            ),
+        )
+
+        self.assertSetEqual(
+            self.get_regressed(rows), {("parse_mrsat", "records_per_sec")}
+        )
+
+        # The threshold can be relaxed per benchmark.
+        rows = compare_results(
+            results_baseline=create_results(
+                parse_mrsat=([900.0, 1000.0, 1100.0], {})
+            ),
+            results_current=create_results(
+                parse_mrsat=([700.0, 750.0, 800.0], {})
+            ),
+            config={"benchmarks": {"parse_mrsat": {"throughput_drop": 0.2}}},
+        )
+
+        self.assertSetEqual(self.get_regressed(rows), set())
+
+    def test_single_sample(self):
+        """ Tests that results without a spread are compared value against
+            value.
+        """
+
+        results_baseline = {
+            "results": {"parse_mrsat": {"records_per_sec": 1000.0}}
+        }
+        results_current = {
+            "results": {"parse_mrsat": {"records_per_sec": 850.0}}
+        }
+
+        rows = compare_results(
+            results_baseline=results_baseline, results_current=results_current
+        )
+
+        self.assertAlmostEqual(rows[0]["change_bounds"], -0.15)
+        self.assertSetEqual(
+            self.get_regressed(rows), {("parse_mrsat", "records_per_sec")}
+        )
+
+    def test_dal_calls(self):
+        """ Tests that any additional DAL call is a regression and that
+            benchmarks missing from the current run are skipped.
+        """
+
+        rows = compare_results(
+            results_baseline=create_results(
+                ingest_synonyms=([100.0], {"insert_rows:Synonym": 10}),
+                ingest_definitions=([100.0], {"insert_rows:Definition": 10}),
+            ),
+            results_current=create_results(
+                ingest_synonyms=([100.0], {"insert_rows:Synonym": 11})
+            ),
+        )
+
+        self.assertSetEqual(
+            {row["benchmark"] for row in rows}, {"ingest_synonyms"}
+        )
+        self.assertSetEqual(
+            self.get_regressed(rows),
+            {("ingest_synonyms", "dal_calls_per_record")},
+        )
+
+
+class GetNewDalMethodsTest(unittest.TestCase):
+    """ Tests the `get_new_dal_methods` function."""
+
+    def test_get_new_dal_methods(self):
+        """ Tests that only the methods a benchmark didn't previously call are
+            retrieved.
+        """
+
+        new_dal_methods = get_new_dal_methods(
+            results_baseline=create_results(
+                ingest_synonyms=([100.0], {"insert_rows:Synonym": 10}),
+                ingest_definitions=([100.0], {}),
+            ),
+            results_current=create_results(
+                ingest_synonyms=(
+                    [100.0],
+                    {"iodi_synonym:Synonym": 5, "insert_rows:Synonym": 5},
+                ),
+                ingest_descriptors=([100.0], {"iodu_descriptor:": 1}),
+            ),
+        )
+
+        self.assertDictEqual(
+            new_dal_methods, {"ingest_synonyms": ["iodi_synonym:Synonym"]}
+        )
+
+
+class MainTest(unittest.TestCase):
+    """ Tests the exit status of the `main` function."""
+
+    def setUp(self):
+        """ Creates a temporary directory for the results files."""
+
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """ Deletes the temporary directory."""
+
+        shutil.rmtree(self.dirname)
+
+    def run_main(self, results_baseline, results_current):
+        filenames = []
+        for name, results in [
+            ("baseline.json", results_baseline),
+            ("current.json", results_current),
+        ]:
+            filename = os.path.join(self.dirname, name)
+            with open(filename, "w") as fout:
+                ujson.dump(results, fout)
+            filenames.append(filename)
+
+        args = argparse.Namespace(
+            baseline=filenames[0], current=filenames[1], thresholds=None
+        )
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            status = main(args=args)
+
+        return status, output.getvalue()
+
+    def test_exit_status(self):
+        """ Tests that the exit status is non-zero only upon a regression."""
+
+        status, _ = self.run_main(
+            results_baseline=create_results(parse_mrsat=([1000.0], {})),
+            results_current=create_results(parse_mrsat=([950.0], {})),
+        )
+        self.assertEqual(status, 0)
+
+        status, output = self.run_main(
+            results_baseline=create_results(parse_mrsat=([1000.0], {})),
+            results_current=create_results(parse_mrsat=([800.0], {})),
+        )
+        self.assertEqual(status, 1)
+        self.assertIn("Regressed benchmarks: parse_mrsat.", output)
+
+    def test_exit_status_new_dal_methods(self):
+        """ Tests that a new kind of DAL call fails the comparison even when
+            the number of calls doesn't grow.
+        """
+
+        status, output = self.run_main(
+            results_baseline=create_results(
+                ingest_synonyms=([100.0], {"insert_rows:Synonym": 10})
+            ),
+            results_current=create_results(
+                ingest_synonyms=([100.0], {"iodi_synonym:Synonym": 10})
+            ),
+        )
+
+        self.assertEqual(status, 1)
+        self.assertIn("New DAL calls in ingest_synonyms", output)
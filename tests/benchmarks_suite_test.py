@@ -0,0 +1,107 @@
+# coding=utf-8
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.suite import BENCHMARKS
+from benchmarks.suite import aggregate_results
+from benchmarks.suite import generate_inputs
+from benchmarks.suite import run_benchmark
+
+
+class RunBenchmarkTest(unittest.TestCase):
+    """ Tests running the parser benchmarks over small synthetic inputs."""
+
+    @classmethod
+    def setUpClass(cls):
+        """ Writes the synthetic inputs in a temporary directory."""
+
+        cls.dirname = tempfile.mkdtemp()
+        cls.inputs = generate_inputs(
+            dirname=cls.dirname,
+            num_descriptors=20,
+            num_qualifiers=5,
+            ratio_supplementals=1.0,
+            seed=0,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """ Deletes the temporary directory."""
+
+        shutil.rmtree(cls.dirname)
+
+    def test_generate_inputs(self):
+        """ Tests that the inputs are written and their records counted."""
+
+        for name in ["qual", "desc", "supp", "mrsat", "mrconso", "mrdef"]:
+            self.assertTrue(os.path.getsize(self.inputs[name]))
+
+        self.assertDictEqual(
+            self.inputs["records"],
+            {
+                "qual": 5,
+                "desc": 20,
+                "supp": 20,
+                "mrsat": 900,
+                "mrconso": 240,
+                "mrdef": 60,
+            },
+        )
+
+    def test_run_benchmark(self):
+        """ Tests that every parser benchmark runs without a database."""
+
+        for name, _, requires_dal in BENCHMARKS:
+            if requires_dal:
+                continue
+
+            result = run_benchmark(
+                name=name, inputs=self.inputs, filename_config=None
+            )
+
+            self.assertGreater(result["records"], 0, name)
+            self.assertGreater(result["records_per_sec"], 0.0, name)
+            self.assertEqual(result["dal_calls"], 0, name)
+            self.assertDictEqual(result["dal_methods"], {}, name)
+
+
+class AggregateResultsTest(unittest.TestCase):
+    """ Tests the `aggregate_results` function."""
+
+    def test_aggregate_results(self):
+        """ Tests that the median, best, worst, and spread of the throughput
+            of the repeats are recorded.
+        """
+
+        runs = [
+            {
+                "parse_mrsat": {
+                    "records": 10,
+                    "duration": duration,
+                    "records_per_sec": 10 / duration,
+                    "peak_rss_mb": peak_rss_mb,
+                    "dal_calls": 0,
+                    "dal_calls_per_record": 0.0,
+                    "dal_methods": {},
+                }
+            }
+            for duration, peak_rss_mb in [
+                (0.5, 30.0),
+                (0.1, 32.0),
+                (0.2, 31.0),
+            ]
+        ]
+
+        result = aggregate_results(runs=runs)["parse_mrsat"]
+
+        self.assertEqual(result["repeats"], 3)
+        self.assertAlmostEqual(result["duration"], 0.2)
+        self.assertAlmostEqual(result["records_per_sec"], 50.0)
+        self.assertAlmostEqual(result["records_per_sec_best"], 100.0)
+        self.assertAlmostEqual(result["records_per_sec_worst"], 20.0)
+        self.assertAlmostEqual(result["records_per_sec_spread"], 1.6)
+        self.assertEqual(result["peak_rss_mb"], 32.0)
+        self.assertEqual(result["records"], 10)
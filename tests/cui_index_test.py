@@ -0,0 +1,144 @@
+# coding=utf-8
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from mt_ingester.cui_index import CuiDuiIndex
+from mt_ingester.cui_index import FENCE_STRIDE
+from mt_ingester.cui_index import get_index_filename
+from mt_ingester.parsers import ParserUmlsSat
+
+from tests.assets.samples_umls import get_sample_file
+from tests.assets.samples_umls import EnumUmlsFileSample
+
+
+class CuiDuiIndexTest(unittest.TestCase):
+    """ Tests the `CuiDuiIndex` class."""
+
+    def setUp(self):
+        """ Creates a temporary directory for the index files."""
+
+        self.dirname = tempfile.mkdtemp()
+        self.filename_index = os.path.join(self.dirname, "MRSAT.idx")
+
+        # Span several blocks with every third CUI missing.
+        self.map_cui_dui = {
+            "C{:07d}".format(index): "D{:06d}".format(index // 2)
+            for index in range(FENCE_STRIDE * 5)
+            if index % 3
+        }
+
+    def tearDown(self):
+        """ Deletes the temporary directory."""
+
+        shutil.rmtree(self.dirname)
+
+    def test_build(self):
+        """ Tests looking CUIs up in a built index."""
+
+        index = CuiDuiIndex.build(
+            filename_index=self.filename_index, map_cui_dui=self.map_cui_dui
+        )
+
+        self.assertEqual(len(index), len(self.map_cui_dui))
+        self.assertDictEqual(dict(index), self.map_cui_dui)
+        for cui, dui in self.map_cui_dui.items():
+            self.assertIn(cui, index)
+            self.assertEqual(index[cui], dui)
+
+        for cui in ["C0000000", "C0000003", "C9999999", "C", "", "D000001"]:
+            self.assertNotIn(cui, index)
+            self.assertIsNone(index.get(cui))
+
+        index.close()
+
+    def test_empty(self):
+        """ Tests building and reopening an index without records."""
+
+        index = CuiDuiIndex.build(
+            filename_index=self.filename_index, map_cui_dui={}
+        )
+        self.addCleanup(index.close)
+
+        index_reopened = CuiDuiIndex(filename_index=self.filename_index)
+        self.addCleanup(index_reopened.close)
+
+        for index_ in [index, index_reopened]:
+            self.assertEqual(len(index_), 0)
+            self.assertListEqual(list(index_), [])
+            self.assertNotIn("C0000001", index_)
+            self.assertIsNone(index_.get("C0000001"))
+
+    def test_invalid(self):
+        """ Tests that files other than indexes are rejected."""
+
+        for content in [b"", b"MTCUI", b"\0" * 64]:
+            with open(self.filename_index, "wb") as fout:
+                fout.write(content)
+
+            with self.assertRaises(ValueError):
+                CuiDuiIndex(filename_index=self.filename_index)
+
+    def test_pickle(self):
+        """ Tests that a pickled index maps the same file."""
+
+        index = CuiDuiIndex.build(
+            filename_index=self.filename_index, map_cui_dui=self.map_cui_dui
+        )
+
+        index_unpickled = pickle.loads(pickle.dumps(index))
+
+        self.assertEqual(index_unpickled.filename_index, self.filename_index)
+        self.assertDictEqual(dict(index_unpickled), self.map_cui_dui)
+
+    def test_parser_reuse(self):
+        """ Tests that `ParserUmlsSat` writes the index on the first parse and
+            reuses it afterwards.
+        """
+
+        file_mrsat = get_sample_file(umls_file_type=EnumUmlsFileSample.MRSAT)
+        self.addCleanup(os.remove, file_mrsat.name)
+
+        map_cui_dui = ParserUmlsSat().parse(filename_mrsat_rrf=file_mrsat.name)
+
+        parser = ParserUmlsSat(dirname_index=self.dirname)
+        index = parser.parse(filename_mrsat_rrf=file_mrsat.name)
+
+        filename_index = get_index_filename(
+            dirname_index=self.dirname, filename_mrsat_rrf=file_mrsat.name
+        )
+        self.assertIsInstance(index, CuiDuiIndex)
+        self.assertEqual(index.filename_index, filename_index)
+        self.assertDictEqual(dict(index), dict(map_cui_dui))
+
+        mtime_ns = os.stat(filename_index).st_mtime_ns
+        index_reused = parser.parse(filename_mrsat_rrf=file_mrsat.name)
+
+        self.assertEqual(os.stat(filename_index).st_mtime_ns, mtime_ns)
+        self.assertDictEqual(dict(index_reused), dict(map_cui_dui))
+
+    def test_parser_invalid(self):
+        """ Tests that `ParserUmlsSat` writes an index again when the existing
+            one can't be opened.
+        """
+
+        file_mrsat = get_sample_file(umls_file_type=EnumUmlsFileSample.MRSAT)
+        self.addCleanup(os.remove, file_mrsat.name)
+
+        filename_index = get_index_filename(
+            dirname_index=self.dirname, filename_mrsat_rrf=file_mrsat.name
+        )
+        with open(filename_index, "wb") as fout:
+            fout.write(b"MTCUI")
+
+        parser = ParserUmlsSat(dirname_index=self.dirname)
+        index = parser.parse(filename_mrsat_rrf=file_mrsat.name)
+        self.addCleanup(index.close)
+
+        self.assertDictEqual(
+            dict(index),
+            dict(ParserUmlsSat().parse(filename_mrsat_rrf=file_mrsat.name)),
+        )
@@ -0,0 +1,103 @@
+# coding=utf-8
+
+import pickle
+import unittest
+
+from mt_ingester.cui_map import CuiDuiMap
+from mt_ingester.cui_map import MIN_CAPACITY
+from mt_ingester.cui_map import encode_ui
+from mt_ingester.cui_map import decode_ui
+
+
+class EncodeUiTest(unittest.TestCase):
+    """ Tests the `encode_ui` and `decode_ui` functions."""
+
+    def test_round_trip(self):
+        """ Tests that identifiers survive encoding including their padding."""
+
+        for ui in ["C0024537", "D016780", "D0016780", "D000068877", "C1"]:
+            self.assertEqual(decode_ui(encode_ui(ui)), ui)
+
+        self.assertNotEqual(encode_ui("D016780"), encode_ui("D0016780"))
+
+    def test_invalid(self):
+        """ Tests that identifiers of a different format aren't encoded."""
+
+        uis = ["", "C", "c0024537", "CL0024537", "C00245x7", "C1\n", "C²"]
+        for ui in uis:
+            self.assertIsNone(encode_ui(ui))
+
+
+class CuiDuiMapTest(unittest.TestCase):
+    """ Tests the `CuiDuiMap` class."""
+
+    def setUp(self):
+        """ Defines pairs with repeated CUIs and identifiers that can't be
+            encoded.
+        """
+
+        self.pairs = [
+            ("C0000003", "D000003"),
+            ("C0000001", "D000001"),
+            ("C0000002", "D000002"),
+            ("C0000001", "D000010"),
+            ("CX", "D000004"),
+            ("C0000005", "DX"),
+            ("C0000002", "DX"),
+            ("C0000005", "D000005"),
+            ("CX", "D000040"),
+        ]
+
+    def test_from_pairs(self):
+        """ Tests that the map matches a dictionary filled with the pairs."""
+
+        map_cui_dui = CuiDuiMap.from_pairs(self.pairs)
+
+        self.assertDictEqual(dict(map_cui_dui), dict(self.pairs))
+        self.assertEqual(len(map_cui_dui), len(dict(self.pairs)))
+        self.assertNotIn("C0000004", map_cui_dui)
+        self.assertNotIn(None, map_cui_dui)
+        with self.assertRaises(KeyError):
+            map_cui_dui["C0000004"]
+
+    def test_merge(self):
+        """ Tests that merging the maps of consecutive parts yields the map of
+            all pairs.
+        """
+
+        for split in range(len(self.pairs) + 1):
+            for split_second in range(split, len(self.pairs) + 1):
+                map_cui_dui = CuiDuiMap.merge(
+                    [
+                        CuiDuiMap.from_pairs(self.pairs[:split]),
+                        CuiDuiMap.from_pairs(self.pairs[split:split_second]),
+                        CuiDuiMap.from_pairs(self.pairs[split_second:]),
+                    ]
+                )
+                self.assertDictEqual(dict(map_cui_dui), dict(self.pairs))
+
+    def test_grow(self):
+        """ Tests that the map holds more pairs than its initial capacity
+            including overridden ones.
+        """
+
+        pairs = [
+            ("C{:07d}".format(index), "D{:06d}".format(index // 3))
+            for index in range(MIN_CAPACITY * 5)
+        ]
+        # Override every other pair.
+        pairs.extend([(cui, "D999999") for cui, _ in pairs[::2]])
+
+        map_cui_dui = CuiDuiMap.from_pairs(pairs)
+
+        self.assertEqual(len(map_cui_dui), MIN_CAPACITY * 5)
+        self.assertDictEqual(dict(map_cui_dui), dict(pairs))
+
+    def test_pickle(self):
+        """ Tests that the map survives pickling."""
+
+        map_cui_dui = pickle.loads(
+            pickle.dumps(CuiDuiMap.from_pairs(self.pairs))
+        )
+
+        self.assertDictEqual(dict(map_cui_dui), dict(self.pairs))
@@ -0,0 +1,96 @@
+# coding=utf-8
+
+import os
+import random
+import unittest
+
+from mt_ingester.external_sort import ExternalSorter
+from mt_ingester.external_sort import iterate_groups
+from mt_ingester.external_sort import estimate_size
+
+
+class ExternalSorterTest(unittest.TestCase):
+    """ Tests the `ExternalSorter` class."""
+
+    def test_sort_unique(self):
+        """ Tests that items spilled over several runs are merged sorted and
+            deduplicated and that the runs are removed afterwards.
+        """
+
+        random.seed(0)
+        items = [
+            ("D{:06d}".format(random.randint(0, 50)), random.randint(0, 5))
+            for _ in range(1000)
+        ]
+
+        sorter = ExternalSorter(max_items=64, chunk_size=10)
+        sorter.extend(items)
+
+        filenames_runs = list(sorter.filenames_runs)
+        self.assertEqual(len(filenames_runs), len(items) // 64)
+        for filename_run in filenames_runs:
+            self.assertTrue(os.path.exists(filename_run))
+
+        self.assertListEqual(list(sorter), sorted(set(items)))
+
+        for filename_run in filenames_runs:
+            self.assertFalse(os.path.exists(filename_run))
+
+    def test_in_memory(self):
+        """ Tests that no runs are spilled when the items fit in memory."""
+
+        sorter = ExternalSorter(max_items=10)
+        sorter.extend([3, 1, 2, 1])
+
+        self.assertListEqual(sorter.filenames_runs, [])
+        self.assertListEqual(list(sorter), [1, 2, 3])
+
+    def test_max_memory(self):
+        """ Tests that runs are spilled once the buffered items exceed the
+            memory cap regardless of their number.
+        """
+
+        items = [("D{:06d}".format(index), "x" * 100) for index in range(100)]
+        size_item = estimate_size(items[0])
+
+        sorter = ExternalSorter(max_items=1000, max_memory=size_item * 10)
+        sorter.extend(items[::-1])
+
+        self.assertEqual(len(sorter.filenames_runs), 9)
+        self.assertLessEqual(sorter.size, size_item * 10)
+        self.assertListEqual(list(sorter), items)
+
+    def test_add_runs(self):
+        """ Tests that runs spilled by other sorters under the run directory
+            are merged and removed along with the sorter's own.
+        """
+
+        sorter = ExternalSorter(max_items=2)
+        sorter_other = ExternalSorter(
+            max_items=2, dirname_tmp=sorter.dirname_runs
+        )
+        sorter_other.extend([5, 3, 4, 1])
+        sorter_other.spill()
+        filenames_runs = list(sorter_other.filenames_runs)
+
+        sorter.add_runs(filenames_runs)
+        sorter.extend([2, 3])
+
+        self.assertListEqual(list(sorter), [1, 2, 3, 4, 5])
+        for filename_run in filenames_runs:
+            self.assertFalse(os.path.exists(filename_run))
+
+
+class IterateGroupsTest(unittest.TestCase):
+    """ Tests the `iterate_groups` function."""
+
+    def test_iterate_groups(self):
+        """ Tests grouping sorted pairs by key."""
+
+        groups = list(
+            iterate_groups([("a", 1), ("a", 2), ("b", 3), ("c", 4), ("c", 5)])
+        )
+
+        self.assertListEqual(
+            groups, [("a", [1, 2]), ("b", [3]), ("c", [4, 5])]
+        )
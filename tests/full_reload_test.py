@@ -0,0 +1,103 @@
+# coding=utf-8
+
+import os
+import signal
+import tempfile
+
+from mt_ingester.full_reload import DeferredIndexes
+from mt_ingester.full_reload import get_mesh_schema
+from mt_ingester.full_reload import get_mesh_table_names
+from mt_ingester.orm import TreeNumberClosure
+from mt_ingester.orm import TreeNumberKey
+
+from tests.dal_mixins import DalMtTestBase
+
+
+class DeferredIndexesTest(DalMtTestBase):
+    """ Tests the `DeferredIndexes` class."""
+
+    def setUp(self):
+        """ Creates the schema and instantiates the context manager."""
+
+        super(DeferredIndexesTest, self).setUp()
+
+        self.filename_state = os.path.join(
+            tempfile.mkdtemp(), "full-reload.json"
+        )
+
+        self.deferred_indexes = DeferredIndexes(
+            engine=self.dal.engine,
+            schema=get_mesh_schema(),
+            table_names=get_mesh_table_names(),
+            filename_state=self.filename_state,
+            num_workers=2,
+        )
+
+    def test_drop_restore(self):
+        """ Tests that the indexes and foreign-keys are dropped within the
+            context and restored upon exit.
+        """
+
+        definitions_refr = self.deferred_indexes.retrieve_definitions()
+
+        self.assertTrue(definitions_refr["indexes"])
+        self.assertTrue(definitions_refr["foreign_keys"])
+
+        with self.deferred_indexes:
+            definitions = self.deferred_indexes.retrieve_definitions()
+            self.assertListEqual(definitions["indexes"], [])
+            self.assertListEqual(definitions["foreign_keys"], [])
+            self.assertTrue(os.path.exists(self.filename_state))
+
+        definitions_eval = self.deferred_indexes.retrieve_definitions()
+
+        self.assertDictEqual(definitions_eval, definitions_refr)
+        self.assertFalse(os.path.exists(self.filename_state))
+
+    def test_restore_on_abort(self):
+        """ Tests that the indexes and foreign-keys are restored when the load
+            raises an exception.
+        """
+
+        definitions_refr = self.deferred_indexes.retrieve_definitions()
+
+        with self.assertRaises(RuntimeError):
+            with self.deferred_indexes:
+                raise RuntimeError("aborted load")
+
+        definitions_eval = self.deferred_indexes.retrieve_definitions()
+
+        self.assertDictEqual(definitions_eval, definitions_refr)
+
+    def test_drop_failure(self):
+        """ Tests that the `SIGTERM` handler is restored when dropping the
+            indexes fails.
+        """
+
+        handler = signal.getsignal(signal.SIGTERM)
+        self.deferred_indexes.filename_state = os.path.join(
+            self.filename_state, "missing", "full-reload.json"
+        )
+
+        with self.assertRaises(OSError):
+            with self.deferred_indexes:
+                pass
+
+        self.assertIs(signal.getsignal(signal.SIGTERM), handler)
+
+    def test_missing_tables(self):
+        """ Tests that tables missing from the schema, e.g., those added after
+            it was created, are skipped.
+        """
+
+        for orm_class in [TreeNumberClosure, TreeNumberKey]:
+            orm_class.__table__.drop(self.dal.engine)
+
+        definitions_refr = self.deferred_indexes.retrieve_definitions()
+
+        with self.deferred_indexes:
+            pass
+
+        definitions_eval = self.deferred_indexes.retrieve_definitions()
+
+        self.assertDictEqual(definitions_eval, definitions_refr)
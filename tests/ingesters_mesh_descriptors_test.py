@@ -1,5 +1,6 @@
 # coding=utf-8
 
+import copy
 import datetime
 import os
 
@@ -8,6 +9,9 @@ from fform.orm_mt import DescriptorClassType
 
 from mt_ingester.parsers import ParserXmlMeshDescriptors
 from mt_ingester.ingesters import IngesterDocumentDescriptor
+from mt_ingester.orm import TreeNumberClosure
+from mt_ingester.orm import TreeNumberKey
+from mt_ingester.tree_numbers import encode_tree_number
 
 from tests.dal_mixins import DalMtTestBase
 from tests.assets.samples_mesh import get_sample_file
@@ -106,3 +110,62 @@ class IngesterMeshDescriptorTest(DalMtTestBase):
         self.assertEqual(len(obj.tree_numbers), 2)
         self.assertIsNotNone(obj.concepts)
         self.assertEqual(len(obj.concepts), 2)
+
+    def test_ingest_tree_number_closure(self):
+        """ Tests the `ingest_tree_number_closure` method and asserts the
+            `TreeNumberClosure` records.
+        """
+
+        ingester = IngesterDocumentDescriptor(
+            dal=self.dal,
+            do_ingest_links=False,
+        )
+
+        # Add the parent of the two tree numbers of the sample descriptor.
+        document = copy.deepcopy(self.document)
+        document["TreeNumberList"].append({"TreeNumber": "D03.633.100.221"})
+        ingester.ingest(doc=document)
+
+        # Three rows pairing each tree number with itself and two pairing the
+        # parent with its children. The remaining ancestors weren't ingested.
+        self.assertEqual(ingester.ingest_tree_number_closure(), 5)
+
+        table = TreeNumberClosure.__table__
+        with self.dal.engine.connect() as connection:
+            depths = sorted(
+                row.depth for row in connection.execute(table.select())
+            )
+        self.assertListEqual(depths, [0, 0, 0, 1, 1])
+
+        # Re-ingesting the closure replaces the records.
+        self.assertEqual(ingester.ingest_tree_number_closure(), 5)
+        with self.dal.engine.connect() as connection:
+            rows = list(connection.execute(table.select()))
+        self.assertEqual(len(rows), 5)
+
+    def test_ingest_tree_number_keys(self):
+        """ Tests the `ingest_tree_number_keys` method and asserts the
+            `TreeNumberKey` records.
+        """
+
+        ingester = IngesterDocumentDescriptor(
+            dal=self.dal,
+            do_ingest_links=False,
+        )
+
+        ingester.ingest(doc=self.document)
+
+        self.assertEqual(ingester.ingest_tree_number_keys(), 2)
+
+        table = TreeNumberKey.__table__
+        with self.dal.engine.connect() as connection:
+            keys = sorted(
+                bytes(row.key) for row in connection.execute(table.select())
+            )
+        self.assertListEqual(
+            keys,
+            [
+                encode_tree_number("D03.633.100.221.173"),
+                encode_tree_number("D03.633.100.221.174"),
+            ],
+        )
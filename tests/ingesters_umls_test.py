@@ -105,6 +105,59 @@ class IngesterUmlsConsoTest(DalMtTestBase):
 
             self.assertListEqual(synonyms_eval, synonyms_refr)
 
+    def test_ingest_batched_missing_descriptors(self):
+        """ Tests the `ingest` method of the ingester class with a batch size
+            smaller than the number of descriptors and descriptors missing from
+            the DB.
+        """
+
+        duis = sorted(self.dui_synonyms.keys())
+        dui_id = _create_fake_descriptor(dal=self.dal, ui=duis[0])
+
+        ingester = IngesterUmlsConso(dal=self.dal, batch_size=1)
+        ingester.ingest(document=self.dui_synonyms)
+
+        synonym_objs = self.dal.bget_by_attr(
+            orm_class=DescriptorSynonym,
+            attr_name="descriptor_id",
+            attr_values=[dui_id],
+        )  # type: List[DescriptorSynonym]
+        synonyms_eval = [synonym_obj.synonym for synonym_obj in synonym_objs]
+
+        self.assertListEqual(synonyms_eval, self.dui_synonyms[duis[0]])
+
+    def test_ingest_stream(self):
+        """ Tests the `ingest` method of the ingester class with the synonym
+            groups streamed through `ParserUmlsConso.iterate_groups`.
+        """
+
+        dui_ids = {}
+        for dui in self.dui_synonyms.keys():
+            dui_ids[dui] = _create_fake_descriptor(dal=self.dal, ui=dui)
+
+        groups = self.parser.iterate_groups(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrconso_rrf=self.file_mrconso.name,
+            max_run_size=2,
+        )
+
+        ingester = IngesterUmlsConso(dal=self.dal, batch_size=2)
+        ingester.ingest(document=groups)
+
+        for dui, dui_id in dui_ids.items():
+            synonym_objs = self.dal.bget_by_attr(
+                orm_class=DescriptorSynonym,
+                attr_name="descriptor_id",
+                attr_values=[dui_id],
+            )  # type: List[DescriptorSynonym]
+            synonyms_eval = [
+                synonym_obj.synonym for synonym_obj in synonym_objs
+            ]
+
+            self.assertListEqual(
+                sorted(synonyms_eval), sorted(self.dui_synonyms[dui])
+            )
+
 
 class IngesterUmlsDefTest(DalMtTestBase):
     """ Tests the `IngesterUmlsDef` class."""
@@ -164,3 +217,46 @@ class IngesterUmlsDefTest(DalMtTestBase):
                 definitions_refr.extend(v)
 
             self.assertListEqual(definitions_eval, definitions_refr)
+
+    def test_ingest_batched(self):
+        """ Tests the `ingest` method of the ingester class with a batch size
+            smaller than the number of definitions.
+        """
+
+        dui_ids = []
+        for dui in self.dui_definitions.keys():
+            dui_ids.append(_create_fake_descriptor(dal=self.dal, ui=dui))
+
+        ingester = IngesterUmlsDef(dal=self.dal, batch_size=1)
+        ingester.ingest(document=self.dui_definitions)
+
+        definition_objs = self.dal.bget_by_attr(
+            orm_class=DescriptorDefinition,
+            attr_name="descriptor_id",
+            attr_values=dui_ids,
+        )  # type: List[DescriptorDefinition]
+
+        num_definitions_refr = sum(
+            len(definitions)
+            for data in self.dui_definitions.values()
+            for definitions in data.values()
+        )
+
+        self.assertEqual(len(definition_objs), num_definitions_refr)
+
+    def test_ingest_rerun(self):
+        """ Tests that definitions skipped as already present aren't counted
+            as ingested.
+        """
+
+        for dui in self.dui_definitions.keys():
+            _create_fake_descriptor(dal=self.dal, ui=dui)
+
+        self.ingester.ingest(document=self.dui_definitions)
+
+        with self.assertLogs(self.ingester.logger, level="INFO") as logs:
+            self.ingester.ingest(document=self.dui_definitions)
+
+        self.assertTrue(
+            any("Ingested 0 definitions" in output for output in logs.output)
+        )
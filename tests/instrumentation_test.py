@@ -0,0 +1,136 @@
+# coding=utf-8
+
+import os
+import json
+import tempfile
+import unittest
+
+from mt_ingester.instrumentation import DalCallStats
+from mt_ingester.instrumentation import DalInstrumented
+from mt_ingester.loggers import create_logger
+from mt_ingester.utils import call_dal
+from mt_ingester.utils import log_ingestion_of_document
+
+
+class DalFake(object):
+    """ Fake DAL exposing methods with the signatures of the `DalMesh`
+        methods.
+    """
+
+    engine = "engine"
+
+    def iodi_tree_number(self, tree_number):
+        return 1
+
+    def biodi_descriptor_synonyms(self, descriptor_id, synonyms, md5s):
+        return None
+
+
+class IngesterFake(object):
+    """ Fake ingester with methods decorated as in the actual ingesters."""
+
+    def __init__(self, dal):
+        self.dal = dal
+        self.logger = create_logger(logger_name=type(self).__name__)
+
+    @log_ingestion_of_document(document_name="TreeNumber")
+    def ingest_tree_number(self, doc: dict):
+        return self.dal.iodi_tree_number(tree_number=doc["TreeNumber"])
+
+
+class DalInstrumentedTest(unittest.TestCase):
+    """ Tests the `DalInstrumented` class."""
+
+    def setUp(self):
+        """ Wraps a fake DAL."""
+
+        self.dal = DalInstrumented(dal=DalFake())
+
+    def test_passthrough(self):
+        """ Tests that attributes and results are passed through."""
+
+        self.assertEqual(self.dal.engine, "engine")
+        self.assertEqual(self.dal.iodi_tree_number(tree_number="A01"), 1)
+
+    def test_report(self):
+        """ Tests the recorded call counts, rows, and record types."""
+
+        ingester = IngesterFake(dal=self.dal)
+        for _ in range(3):
+            ingester.ingest_tree_number(doc={"TreeNumber": "A01"})
+
+        self.dal.biodi_descriptor_synonyms(
+            descriptor_id=1, synonyms=["a", "b"], md5s=[b"a", b"b"]
+        )
+
+        report = {
+            (entry["method"], entry["record_type"]): entry
+            for entry in self.dal.report()
+        }
+
+        entry = report[("iodi_tree_number", "TreeNumber")]
+        self.assertEqual(entry["count"], 3)
+        self.assertEqual(entry["rows"], 3)
+
+        entry = report[("biodi_descriptor_synonyms", "-")]
+        self.assertEqual(entry["count"], 1)
+        self.assertEqual(entry["rows"], 2)
+
+    def test_call_dal(self):
+        """ Tests that writes bypassing the DAL methods are recorded when
+            routed through `call_dal` and run as-is on a bare DAL.
+        """
+
+        def insert_rows(rows):
+            return len(rows)
+
+        for dal in [DalFake(), self.dal]:
+            result = call_dal(
+                dal=dal,
+                name="insert_rows",
+                func=insert_rows,
+                num_rows=2,
+                rows=[{"a": 1}, {"a": 2}],
+            )
+            self.assertEqual(result, 2)
+
+        entry = self.dal.report()[0]
+        self.assertEqual(entry["method"], "insert_rows")
+        self.assertEqual(entry["count"], 1)
+        self.assertEqual(entry["rows"], 2)
+
+    def test_dump_report(self):
+        """ Tests writing the report to a JSON file."""
+
+        self.dal.iodi_tree_number(tree_number="A01")
+
+        filename = os.path.join(tempfile.mkdtemp(), "report.json")
+        self.dal.dump_report(filename_json=filename)
+
+        with open(filename) as finp:
+            report = json.load(finp)
+
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]["method"], "iodi_tree_number")
+
+        os.remove(filename)
+
+
+class DalCallStatsTest(unittest.TestCase):
+    """ Tests the `DalCallStats` class."""
+
+    def test_bounded(self):
+        """ Tests that the sampled durations are bounded while the totals
+            cover every call.
+        """
+
+        stats = DalCallStats()
+        num_calls = stats.max_samples * 3
+        for index in range(num_calls):
+            stats.add(duration=float(index % 100), rows=1)
+
+        self.assertEqual(len(stats.durations), stats.max_samples)
+        self.assertEqual(stats.count, num_calls)
+        self.assertEqual(stats.rows, num_calls)
+        self.assertAlmostEqual(stats.mean, 49.5)
+        self.assertGreaterEqual(stats.p99, 97.0)
@@ -0,0 +1,88 @@
+# coding=utf-8
+
+import sys
+import subprocess
+import unittest
+
+from mt_ingester.utils import LazyModule
+
+
+def get_modules_imported(statement, modules):
+    """ Runs a statement in a fresh interpreter and retrieves which of the
+        given modules it imported.
+    """
+
+    statement_report = (
+        "{}; import sys; print(','.join(m for m in {!r} if m in sys.modules))"
+    ).format(statement, modules)
+
+    output = subprocess.check_output(
+        [sys.executable, "-c", statement_report], universal_newlines=True
+    )
+
+    return [module for module in output.strip().split(",") if module]
+
+
+class LazyImportsTest(unittest.TestCase):
+    """ Tests that the heavy dependencies are imported on first use."""
+
+    modules_heavy = ["lxml", "pyarrow", "sqlalchemy", "fform"]
+
+    def test_package(self):
+        """ Tests that importing the package and the main module doesn't
+            import the heavy dependencies.
+        """
+
+        statements = ["import mt_ingester", "import mt_ingester.mt_ingester"]
+        for statement in statements:
+            self.assertListEqual(
+                get_modules_imported(statement, self.modules_heavy), []
+            )
+
+    def test_parsers(self):
+        """ Tests that importing the parsers doesn't import the heavy
+            dependencies while parsing XML imports `lxml`.
+        """
+
+        self.assertListEqual(
+            get_modules_imported(
+                "from mt_ingester.parsers import ParserUmlsConso",
+                self.modules_heavy,
+            ),
+            [],
+        )
+
+        self.assertListEqual(
+            get_modules_imported(
+                "from mt_ingester.parsers import etree; etree.iterparse",
+                ["lxml"],
+            ),
+            ["lxml"],
+        )
+
+
+class LazyModuleTest(unittest.TestCase):
+    """ Tests the `LazyModule` class."""
+
+    def test_rebind(self):
+        """ Tests that the module is imported on first attribute access and
+            rebound in the namespace.
+        """
+
+        namespace = {}
+        namespace["json_"] = LazyModule("json", namespace, "json_")
+
+        self.assertIsInstance(namespace["json_"], LazyModule)
+        self.assertEqual(namespace["json_"].dumps([1]), "[1]")
+
+        import json
+
+        self.assertIs(namespace["json_"], json)
+
+    def test_missing(self):
+        """ Tests that a missing module raises `ImportError` on first use."""
+
+        module = LazyModule("mt_ingester_missing_module")
+
+        with self.assertRaises(ImportError):
+            module.attribute
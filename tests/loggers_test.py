@@ -0,0 +1,128 @@
+# coding=utf-8
+
+import logging
+import threading
+import unittest
+
+from mt_ingester import loggers
+from mt_ingester.loggers import create_logger
+from mt_ingester.loggers import enable_queue_logging
+from mt_ingester.loggers import disable_queue_logging
+
+
+class HandlerRecording(logging.Handler):
+    """ Handler recording the messages it handles and the threads it handles
+        them in, optionally waiting for an event before handling each.
+    """
+
+    def __init__(self, event=None):
+        super(HandlerRecording, self).__init__()
+
+        self.event = event
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        if self.event is not None:
+            self.event.wait()
+        self.messages.append(self.format(record))
+        self.threads.append(threading.current_thread())
+
+
+class QueueLoggingTest(unittest.TestCase):
+    """ Tests the queued logging."""
+
+    def tearDown(self):
+        """ Stops the listener should a test fail."""
+
+        disable_queue_logging()
+
+    def create_logger(self, name):
+        logger = create_logger(logger_name=name, logger_level="INFO")
+        self.addCleanup(logger.handlers.clear)
+
+        return logger
+
+    def test_queue(self):
+        """ Tests that records are handled by the listener thread and flushed
+            when queued logging is disabled.
+        """
+
+        handler = HandlerRecording()
+        queue_handler = enable_queue_logging(handlers=[handler])
+        logger = self.create_logger(name="QueueLoggingTest.test_queue")
+
+        self.assertIs(loggers.queue_handler, queue_handler)
+        self.assertListEqual(logger.handlers, [queue_handler])
+
+        for index in range(100):
+            logger.info("Message %d", index)
+        logger.debug("Filtered")
+
+        disable_queue_logging()
+
+        self.assertIsNone(loggers.queue_handler)
+        self.assertListEqual(
+            handler.messages,
+            ["Message {}".format(index) for index in range(100)],
+        )
+        self.assertNotIn(threading.current_thread(), handler.threads)
+
+        # Records logged after the listener was stopped are handled directly.
+        logger.info("After")
+        self.assertEqual(handler.messages[-1], "After")
+        self.assertIs(handler.threads[-1], threading.current_thread())
+
+    def test_drop(self):
+        """ Tests that records are dropped and counted when the queue is full
+            and the drop policy is used.
+        """
+
+        event = threading.Event()
+        handler = HandlerRecording(event=event)
+        queue_handler = enable_queue_logging(
+            max_size=2, do_block=False, handlers=[handler]
+        )
+        logger = self.create_logger(name="QueueLoggingTest.test_drop")
+
+        for index in range(10):
+            logger.info("Message %d", index)
+
+        event.set()
+        disable_queue_logging()
+
+        # The listener may have dequeued the first record before the queue
+        # filled up.
+        self.assertGreaterEqual(queue_handler.num_dropped, 7)
+        self.assertEqual(
+            len(handler.messages), 10 - queue_handler.num_dropped + 1
+        )
+        self.assertEqual(
+            handler.messages[-1],
+            "Dropped {} log records while the log queue was full.".format(
+                queue_handler.num_dropped
+            ),
+        )
+
+    def test_block(self):
+        """ Tests that no records are dropped when the block policy is used."""
+
+        event = threading.Event()
+        handler = HandlerRecording(event=event)
+        enable_queue_logging(max_size=2, do_block=True, handlers=[handler])
+        logger = self.create_logger(name="QueueLoggingTest.test_block")
+
+        thread = threading.Thread(
+            target=lambda: [logger.info("Message %d", i) for i in range(10)]
+        )
+        thread.start()
+        thread.join(timeout=0.1)
+
+        # The logging thread waits for room in the queue.
+        self.assertTrue(thread.is_alive())
+
+        event.set()
+        thread.join()
+        disable_queue_logging()
+
+        self.assertEqual(len(handler.messages), 10)
@@ -0,0 +1,167 @@
+# coding=utf-8
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from mt_ingester.lookup import MeshLookup
+from mt_ingester.lookup import get_lookup_record
+from mt_ingester.parsers import ParserXmlMeshDescriptors
+from mt_ingester.parsers import ParserXmlMeshQualifiers
+from mt_ingester.parsers import ParserXmlMeshSupplementals
+
+from tests.assets.samples_mesh import get_sample_file
+from tests.assets.samples_mesh import EnumMeshFileSample
+
+
+class MeshLookupTest(unittest.TestCase):
+    """ Tests the `MeshLookup` class."""
+
+    def setUp(self):
+        """ Builds a lookup file in a temporary directory."""
+
+        self.dirname = tempfile.mkdtemp()
+        self.filename_lookup = os.path.join(self.dirname, "lookup.bin")
+
+        self.lookup = MeshLookup.build(
+            filename_lookup=self.filename_lookup,
+            records=[
+                ("D002", "Neoplasms", ["C04"], ["Tumors", "Cancer"]),
+                ("D001", "Lung Neoplasms", ["C04.588.894", "C08.381"], []),
+                ("Q000000981", "diagnostic imaging", ["Y04.010"], []),
+                ("C000002", "bevonium", [], ["Bevonium Methyl Sulfate"]),
+            ],
+            synonyms=[
+                ("D001", ["lung neoplasms", "lung cancer"]),
+                ("D002", ["cancer", "neoplasia"]),
+                ("D999", ["unknown"]),
+            ],
+        )
+
+    def tearDown(self):
+        """ Closes the lookup and deletes the temporary directory."""
+
+        self.lookup.close()
+        shutil.rmtree(self.dirname)
+
+    def test_get(self):
+        """ Tests retrieving records by their UI."""
+
+        self.assertDictEqual(
+            self.lookup["D001"],
+            {
+                "name": "Lung Neoplasms",
+                "tree_numbers": ["C04.588.894", "C08.381"],
+                "synonyms": ["lung cancer"],
+            },
+        )
+        self.assertEqual(
+            self.lookup.get_name("Q000000981"), "diagnostic imaging"
+        )
+        self.assertListEqual(self.lookup.get_tree_numbers("C000002"), [])
+        self.assertListEqual(
+            self.lookup.get_synonyms("D002"), ["Tumors", "Cancer", "neoplasia"]
+        )
+
+    def test_missing(self):
+        """ Tests that absent UIs are reported as such."""
+
+        for ui in ["D000", "D0015", "D999", "Q0000009810", ""]:
+            self.assertNotIn(ui, self.lookup)
+            self.assertIsNone(self.lookup.get(ui))
+            with self.assertRaises(KeyError):
+                self.lookup.get_name(ui)
+
+    def test_iterate(self):
+        """ Tests that the UIs are iterated over in sorted order."""
+
+        self.assertEqual(len(self.lookup), 4)
+        self.assertListEqual(
+            list(self.lookup), ["C000002", "D001", "D002", "Q000000981"]
+        )
+
+    def test_open(self):
+        """ Tests that a pickled lookup maps the file again and that other
+            files are rejected.
+        """
+
+        lookup = pickle.loads(pickle.dumps(self.lookup))
+        self.addCleanup(lookup.close)
+
+        self.assertEqual(lookup.get_name("D002"), "Neoplasms")
+
+        filename = os.path.join(self.dirname, "other.bin")
+        with open(filename, "wb") as fout:
+            fout.write(b"\0" * 128)
+
+        with self.assertRaises(ValueError):
+            MeshLookup(filename_lookup=filename)
+
+    def test_empty(self):
+        """ Tests building a lookup without records."""
+
+        lookup = MeshLookup.build(
+            filename_lookup=os.path.join(self.dirname, "empty.bin"),
+            records=[],
+        )
+        self.addCleanup(lookup.close)
+
+        self.assertEqual(len(lookup), 0)
+        self.assertNotIn("D001", lookup)
+
+
+class GetLookupRecordTest(unittest.TestCase):
+    """ Tests the `get_lookup_record` function."""
+
+    def get_doc(self, mesh_file_type, parser_class):
+        file = get_sample_file(mesh_file_type=mesh_file_type)
+        self.addCleanup(os.remove, file.name)
+        self.addCleanup(file.close)
+
+        return next(parser_class().parse(filename_xml=file.name))
+
+    def test_descriptor(self):
+        """ Tests retrieving the record of a sample descriptor."""
+
+        doc = self.get_doc(EnumMeshFileSample.DESC, ParserXmlMeshDescriptors)
+
+        ui, name, tree_numbers, synonyms = get_lookup_record(doc)
+
+        self.assertEqual(ui, "D000001")
+        self.assertEqual(name, "Calcimycin")
+        self.assertListEqual(
+            tree_numbers, ["D03.633.100.221.173", "D03.633.100.221.174"]
+        )
+        self.assertListEqual(synonyms, ["A 23187", "A-23187"])
+
+    def test_qualifier(self):
+        """ Tests retrieving the record of a sample qualifier."""
+
+        doc = self.get_doc(EnumMeshFileSample.QUAL, ParserXmlMeshQualifiers)
+
+        ui, name, tree_numbers, _ = get_lookup_record(doc)
+
+        self.assertEqual(ui, "Q000000981")
+        self.assertEqual(name, "diagnostic imaging")
+        self.assertListEqual(tree_numbers, ["Y04.010", "Y04.011"])
+
+    def test_supplemental(self):
+        """ Tests retrieving the record of a sample supplemental record."""
+
+        doc = self.get_doc(
+            EnumMeshFileSample.SUPP, ParserXmlMeshSupplementals
+        )
+
+        ui, name, tree_numbers, _ = get_lookup_record(doc)
+
+        self.assertEqual(ui, doc["SupplementalRecordUI"])
+        self.assertEqual(name, doc["SupplementalRecordName"])
+        self.assertListEqual(tree_numbers, [])
+
+    def test_invalid(self):
+        """ Tests that other documents are rejected."""
+
+        with self.assertRaises(ValueError):
+            get_lookup_record({"PMID": "1"})
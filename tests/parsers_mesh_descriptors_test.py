@@ -1,6 +1,7 @@
 # coding=utf-8
 
 import os
+import logging
 import datetime
 import unittest
 
@@ -40,6 +41,28 @@ class ParserMeshDescriptorsTest(unittest.TestCase):
         self.file_xml.close()
         os.remove(self.file.name)
 
+    def test_logger_level(self):
+        """ Tests that the logging level is passed on to the logger."""
+
+        parser = ParserXmlMeshDescriptors(logger_level="WARNING")
+
+        self.assertEqual(parser.logger.level, logging.WARNING)
+
+        parser.logger.setLevel(logging.DEBUG)
+
+    def test_get_position(self):
+        """ Tests the byte offset the XML file has been read up to."""
+
+        parser = ParserXmlMeshDescriptors()
+        self.assertIsNone(parser.get_position())
+
+        docs = parser.parse(filename_xml=self.file.name)
+        next(docs)
+        self.assertGreater(parser.get_position(), 0)
+
+        list(docs)
+        self.assertIsNone(parser.get_position())
+
     def test_parse_descriptor_record(self):
         """ Tests the `parse_descriptor_record` method and asserts the values
             on the top-level fields.
@@ -1,6 +1,8 @@
 # coding=utf-8
 
 import os
+import shutil
+import tempfile
 import unittest
 
 from mt_ingester.parsers import ParserUmlsSat
@@ -32,7 +34,7 @@ class ParserUmlsSatTest(unittest.TestCase):
         map_cui_dui = self.parser.parse(filename_mrsat_rrf=self.file.name)
 
         self.assertDictEqual(
-            map_cui_dui,
+            dict(map_cui_dui),
             {
                 'C0001175': 'D000163',
                 'C0006118': 'D001932',
@@ -44,6 +46,18 @@ class ParserUmlsSatTest(unittest.TestCase):
             }
         )
 
+    def test_parse_parallel(self):
+        """ Tests that parsing in multiple processes yields the same result as
+            parsing serially.
+        """
+
+        map_cui_dui = self.parser.parse(filename_mrsat_rrf=self.file.name)
+
+        parser = ParserUmlsSat(num_workers=2)
+        map_cui_dui_parallel = parser.parse(filename_mrsat_rrf=self.file.name)
+
+        self.assertDictEqual(dict(map_cui_dui_parallel), dict(map_cui_dui))
+
 
 class ParserUmlsConsoTest(unittest.TestCase):
     """ Tests the `ParserUmlsConso` class."""
@@ -104,6 +118,98 @@ class ParserUmlsConsoTest(unittest.TestCase):
                 sorted(list(dui_synonyms_refr[k])),
             )
 
+    def test_parse_parallel(self):
+        """ Tests that parsing in multiple processes yields the same result as
+            parsing serially.
+        """
+
+        dui_synonyms = self.parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrconso_rrf=self.file_mrconso.name,
+        )
+
+        parser = ParserUmlsConso(num_workers=2)
+        dui_synonyms_parallel = parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrconso_rrf=self.file_mrconso.name,
+        )
+
+        self.assertDictEqual(
+            {k: sorted(v) for k, v in dui_synonyms_parallel.items()},
+            {k: sorted(v) for k, v in dui_synonyms.items()},
+        )
+
+    def test_iterate_groups(self):
+        """ Tests that streaming the synonyms grouped by descriptor yields the
+            same synonyms as `parse` in descriptor order.
+        """
+
+        dui_synonyms = self.parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrconso_rrf=self.file_mrconso.name,
+        )
+
+        # Spill a run every other synonym to exercise the merge.
+        groups = list(
+            self.parser.iterate_groups(
+                filename_mrsat_rrf=self.file_mrsat.name,
+                filename_mrconso_rrf=self.file_mrconso.name,
+                max_run_size=2,
+            )
+        )
+
+        self.assertListEqual(
+            groups,
+            [(k, sorted(v)) for k, v in sorted(dui_synonyms.items())],
+        )
+
+    def test_iterate_groups_parallel(self):
+        """ Tests that streaming the synonyms through sorted runs spilled by
+            multiple processes yields the same groups as streaming serially.
+        """
+
+        groups = list(
+            self.parser.iterate_groups(
+                filename_mrsat_rrf=self.file_mrsat.name,
+                filename_mrconso_rrf=self.file_mrconso.name,
+            )
+        )
+
+        parser = ParserUmlsConso(num_workers=2)
+        groups_parallel = list(
+            parser.iterate_groups(
+                filename_mrsat_rrf=self.file_mrsat.name,
+                filename_mrconso_rrf=self.file_mrconso.name,
+                max_run_size=4,
+            )
+        )
+
+        self.assertListEqual(groups_parallel, groups)
+        self.assertEqual(parser.filter_stats, self.parser.filter_stats)
+
+    def test_parse_max_memory(self):
+        """ Tests that parsing under a memory cap, spilling sorted runs, yields
+            the same result as parsing in memory.
+        """
+
+        dui_synonyms = self.parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrconso_rrf=self.file_mrconso.name,
+        )
+
+        # Cap the memory below the size of a single synonym so that every
+        # synonym is spilled.
+        parser = ParserUmlsConso(max_memory=1)
+        dui_synonyms_capped = parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrconso_rrf=self.file_mrconso.name,
+        )
+
+        self.assertDictEqual(
+            {k: sorted(v) for k, v in dui_synonyms_capped.items()},
+            {k: sorted(v) for k, v in dui_synonyms.items()},
+        )
+
 
 class ParserUmlsDefTest(unittest.TestCase):
     """ Tests the `ParserUmlsDef` class."""
@@ -190,3 +296,125 @@ class ParserUmlsDefTest(unittest.TestCase):
                     sorted(list(dui_definitions[k][kk])),
                     sorted(list(dui_definitions_refr[k][kk])),
                 )
+
+    def test_parse_parallel(self):
+        """ Tests that parsing in multiple processes yields the same result as
+            parsing serially.
+        """
+
+        dui_definitions = self.parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrdef_rrf=self.file_mrdef.name,
+        )
+
+        parser = ParserUmlsDef(num_workers=2)
+        dui_definitions_parallel = parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrdef_rrf=self.file_mrdef.name,
+        )
+
+        self.assertDictEqual(dui_definitions_parallel, dui_definitions)
+
+    def test_parse_duplicates(self):
+        """ Tests that duplicate definitions are dropped while the order in
+            which definitions are first encountered is retained.
+        """
+
+        definitions = ["Definition {}.".format(index) for index in range(50)]
+
+        file_mrdef = tempfile.NamedTemporaryFile(
+            mode="w", suffix=".RRF", delete=False
+        )
+        self.addCleanup(os.remove, file_mrdef.name)
+        with file_mrdef:
+            for index in list(range(50)) + list(range(49, -1, -1)):
+                file_mrdef.write(
+                    "C0001175|A{0:08d}|AT{0:09d}||MSH|{1}|N||\n".format(
+                        index, definitions[index]
+                    )
+                )
+
+        dui_definitions = self.parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrdef_rrf=file_mrdef.name,
+        )
+
+        self.assertDictEqual(dui_definitions, {"D000163": {"MSH": definitions}})
+
+    def test_parse_index(self):
+        """ Tests that parsing through a CUI-DUI index yields the same result
+            as parsing without one.
+        """
+
+        dirname_index = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dirname_index)
+
+        dui_definitions = self.parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrdef_rrf=self.file_mrdef.name,
+        )
+
+        parser = ParserUmlsDef(dirname_index=dirname_index, num_workers=2)
+        for _ in range(2):
+            dui_definitions_index = parser.parse(
+                filename_mrsat_rrf=self.file_mrsat.name,
+                filename_mrdef_rrf=self.file_mrdef.name,
+            )
+            self.assertDictEqual(dui_definitions_index, dui_definitions)
+
+    def test_iterate_groups(self):
+        """ Tests that streaming the definitions grouped by descriptor, with
+            and without a memory cap, yields the result of `parse` in
+            descriptor order.
+        """
+
+        for kwargs in [{}, {"sources_exclude": ["NCI"]}]:
+            dui_definitions = self.parser.parse(
+                filename_mrsat_rrf=self.file_mrsat.name,
+                filename_mrdef_rrf=self.file_mrdef.name,
+                **kwargs
+            )
+
+            for parser in [ParserUmlsDef(), ParserUmlsDef(max_memory=1)]:
+                groups = list(
+                    parser.iterate_groups(
+                        filename_mrsat_rrf=self.file_mrsat.name,
+                        filename_mrdef_rrf=self.file_mrdef.name,
+                        max_run_size=2,
+                        **kwargs
+                    )
+                )
+
+                self.assertListEqual(
+                    [dui for dui, _ in groups], sorted(dui_definitions)
+                )
+                self.assertDictEqual(dict(groups), dui_definitions)
+
+    def test_parse_max_memory_duplicates(self):
+        """ Tests that parsing under a memory cap drops duplicate definitions
+            while retaining the order in which they're first encountered.
+        """
+
+        definitions = ["Definition {}.".format(index) for index in range(50)]
+
+        file_mrdef = tempfile.NamedTemporaryFile(
+            mode="w", suffix=".RRF", delete=False
+        )
+        self.addCleanup(os.remove, file_mrdef.name)
+        with file_mrdef:
+            for index in list(range(49, -1, -1)) + list(range(50)):
+                file_mrdef.write(
+                    "C0001175|A{0:08d}|AT{0:09d}||MSH|{1}|N||\n".format(
+                        index, definitions[index]
+                    )
+                )
+
+        parser = ParserUmlsDef(max_memory=1024)
+        dui_definitions = parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrdef_rrf=file_mrdef.name,
+        )
+
+        self.assertDictEqual(
+            dui_definitions, {"D000163": {"MSH": definitions[::-1]}}
+        )
@@ -0,0 +1,251 @@
+# coding=utf-8
+
+import os
+import time
+import pstats
+import shutil
+import tempfile
+import unittest
+import tracemalloc
+
+from mt_ingester.profiling import Profiler
+from mt_ingester.profiling import ProfilerCprofile
+from mt_ingester.profiling import ProfilerSampling
+from mt_ingester.profiling import ProfilerTracemalloc
+from mt_ingester.profiling import create_profiler
+from mt_ingester.profiling import get_profile_label
+from mt_ingester.utils import call_dal
+
+
+class DalFake(object):
+    """ Fake DAL exposing a method and an attribute."""
+
+    engine = "engine"
+
+    def iodi_tree_number(self, tree_number):
+        return len(tree_number)
+
+
+def insert_rows(rows):
+    return len(rows)
+
+
+def parse(num_docs):
+    for index in range(num_docs):
+        yield {"TreeNumber": "A{:02d}".format(index)}
+
+
+def busy(duration):
+    time_start = time.perf_counter()
+    while time.perf_counter() - time_start < duration:
+        pass
+
+
+def busy_other(duration):
+    busy(duration=duration)
+
+
+class ProfilerTestBase(unittest.TestCase):
+    """ Creates a temporary directory for the profiling artifacts."""
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dirname)
+
+    def run_pipeline(self, profiler, num_docs=3):
+        dal = profiler.wrap_dal(dal=DalFake())
+
+        results = []
+        with profiler:
+            for doc in profiler.iterate("parse", parse(num_docs=num_docs)):
+                with profiler.stage("transform"):
+                    results.append(
+                        dal.iodi_tree_number(tree_number=doc["TreeNumber"])
+                    )
+                    call_dal(
+                        dal=dal,
+                        name="insert_rows",
+                        func=insert_rows,
+                        num_rows=1,
+                        rows=[doc],
+                    )
+
+        return results
+
+
+class ProfilerTest(ProfilerTestBase):
+    """ Tests the `Profiler` class used when profiling is disabled."""
+
+    def test_passthrough(self):
+        """ Tests that the DAL and iterables are left unwrapped."""
+
+        profiler = create_profiler(mode=None, dirname=self.dirname)
+        dal = DalFake()
+        docs = parse(num_docs=1)
+
+        self.assertIs(type(profiler), Profiler)
+        self.assertIs(profiler.wrap_dal(dal=dal), dal)
+        self.assertIs(profiler.iterate("parse", docs), docs)
+        self.assertListEqual(self.run_pipeline(profiler), [3, 3, 3])
+
+        profiler.log_summary()
+        self.assertListEqual(os.listdir(self.dirname), [])
+
+    def test_unknown_mode(self):
+        """ Tests that an unknown mode raises an exception."""
+
+        with self.assertRaises(ValueError):
+            create_profiler(mode="unknown")
+
+    def test_get_profile_label(self):
+        """ Tests the labels of plain files and `zip://` locations."""
+
+        self.assertEqual(
+            get_profile_label(mode="descriptors", filename="/data/desc.xml"),
+            "descriptors-desc.xml",
+        )
+        self.assertEqual(
+            get_profile_label(
+                mode="synonyms",
+                filename="zip:///data/umls.zip!/2019AA/META/MRCONSO.RRF",
+            ),
+            "synonyms-MRCONSO.RRF",
+        )
+        self.assertEqual(get_profile_label(mode="shadow-swap"), "shadow-swap")
+
+
+class ProfilerCprofileTest(ProfilerTestBase):
+    """ Tests the `ProfilerCprofile` class."""
+
+    def test_stages(self):
+        """ Tests that each stage is profiled separately and that DAL calls
+            are taken out of the transform stage.
+        """
+
+        profiler = create_profiler(
+            mode="cprofile", label="descriptors-desc.xml", dirname=self.dirname
+        )
+        self.assertIsInstance(profiler, ProfilerCprofile)
+
+        self.assertListEqual(self.run_pipeline(profiler), [3, 3, 3])
+        self.assertListEqual(
+            list(profiler.profiles.keys()), ["parse", "transform", "write"]
+        )
+
+        functions = {
+            stage: set(
+                [
+                    function
+                    for _, _, function in pstats.Stats(profile).stats.keys()
+                ]
+            )
+            for stage, profile in profiler.profiles.items()
+        }
+        self.assertIn("parse", functions["parse"])
+        self.assertIn("iodi_tree_number", functions["write"])
+        self.assertNotIn("iodi_tree_number", functions["transform"])
+        self.assertIn("insert_rows", functions["write"])
+        self.assertNotIn("insert_rows", functions["transform"])
+
+        profiler.log_summary()
+        self.assertListEqual(
+            sorted(os.listdir(self.dirname)),
+            [
+                "descriptors-desc.xml.cprofile.parse.prof",
+                "descriptors-desc.xml.cprofile.transform.prof",
+                "descriptors-desc.xml.cprofile.write.prof",
+            ],
+        )
+
+
+class ProfilerSamplingTest(ProfilerTestBase):
+    """ Tests the `ProfilerSampling` class."""
+
+    def test_samples(self):
+        """ Tests that samples are attributed to the current stage."""
+
+        profiler = create_profiler(
+            mode="sampling", label="test", dirname=self.dirname, interval=0.001
+        )
+        self.assertIsInstance(profiler, ProfilerSampling)
+
+        with profiler:
+            busy(duration=0.05)
+            with profiler.stage("transform"):
+                busy(duration=0.2)
+        self.assertIsNone(profiler.thread)
+
+        stages = set([stage for stage, _ in profiler.samples.keys()])
+        self.assertSetEqual(stages, {"transform"})
+        self.assertTrue(
+            any(
+                codes[-1].co_name == "busy"
+                for _, codes in profiler.samples.keys()
+            )
+        )
+        self.assertIn("Stage 'transform'", profiler.summarize())
+
+        filenames = profiler.dump()
+        self.assertListEqual(
+            filenames, [os.path.join(self.dirname, "test.sampling.collapsed")]
+        )
+        with open(filenames[0]) as fin:
+            for line in fin:
+                stack, count = line.rsplit(" ", 1)
+                self.assertTrue(stack.startswith("transform;"))
+                self.assertGreater(int(count), 0)
+
+    def test_dump_stacks(self):
+        """ Tests that the samples of several call paths within a stage are
+            dumped sorted by their stack.
+        """
+
+        profiler = create_profiler(
+            mode="sampling", label="test", dirname=self.dirname, interval=0.001
+        )
+
+        with profiler:
+            with profiler.stage("transform"):
+                busy(duration=0.1)
+                busy_other(duration=0.1)
+
+        self.assertGreater(len(profiler.samples), 1)
+
+        filenames = profiler.dump()
+        with open(filenames[0]) as fin:
+            stacks = [line.rsplit(" ", 1)[0] for line in fin]
+
+        self.assertListEqual(stacks, sorted(stacks))
+        self.assertTrue(any("busy_other" in stack for stack in stacks))
+        self.assertIn("Stage 'transform'", profiler.summarize())
+
+class ProfilerTracemallocTest(ProfilerTestBase):
+    """ Tests the `ProfilerTracemalloc` class."""
+
+    def test_sizes(self):
+        """ Tests that the memory retained by a stage is attributed to it."""
+
+        profiler = create_profiler(
+            mode="tracemalloc", label="test", dirname=self.dirname
+        )
+        self.assertIsInstance(profiler, ProfilerTracemalloc)
+
+        with profiler:
+            with profiler.stage("parse"):
+                retained = [str(index) * 4 for index in range(100000)]
+            with profiler.stage("transform"):
+                [str(index) * 4 for index in range(100000)]
+        self.assertFalse(tracemalloc.is_tracing())
+
+        self.assertGreater(profiler.sizes["parse"], 2 ** 20)
+        self.assertLess(profiler.sizes["transform"], 2 ** 20)
+        self.assertGreaterEqual(profiler.size_peak, profiler.sizes["parse"])
+        self.assertEqual(len(retained), 100000)
+
+        self.assertListEqual(
+            profiler.dump(),
+            [os.path.join(self.dirname, "test.tracemalloc.snapshot")],
+        )
+        self.assertIn("Stage 'parse'", profiler.summarize())
@@ -0,0 +1,147 @@
+# coding=utf-8
+
+import time
+import unittest
+
+from mt_ingester.progress import ProgressReporter
+from mt_ingester.progress import DalCounted
+from mt_ingester.progress import get_rss
+from mt_ingester.utils import call_dal
+
+
+class DalFake(object):
+    """ Fake DAL exposing a method and an attribute."""
+
+    engine = "engine"
+
+    def iodi_tree_number(self, tree_number):
+        return len(tree_number)
+
+
+def insert_rows(rows):
+    return len(rows)
+
+
+class ProgressReporterTest(unittest.TestCase):
+    """ Tests the `ProgressReporter` class."""
+
+    def test_disabled(self):
+        """ Tests that the DAL and iterables are left unwrapped when the
+            interval isn't positive.
+        """
+
+        progress = ProgressReporter(interval=0)
+        dal = DalFake()
+        docs = iter([1, 2])
+
+        self.assertIs(progress.wrap_dal(dal=dal), dal)
+        self.assertIs(progress.iterate(docs), docs)
+
+        with progress:
+            self.assertIsNone(progress.thread)
+
+    def test_counts(self):
+        """ Tests that records and DAL calls are counted."""
+
+        progress = ProgressReporter(interval=60.0)
+        dal = progress.wrap_dal(dal=DalFake())
+        self.assertIsInstance(dal, DalCounted)
+        self.assertEqual(dal.engine, "engine")
+
+        with progress:
+            for doc in progress.iterate(["A01", "A02", "A03"]):
+                dal.iodi_tree_number(tree_number=doc)
+                dal.iodi_tree_number(tree_number=doc)
+        self.assertIsNone(progress.thread)
+
+        self.assertEqual(progress.num_records, 3)
+        self.assertEqual(progress.num_dal_calls, 6)
+
+    def test_call_dal(self):
+        """ Tests that writes made outside the DAL methods through `call_dal`
+            are counted as DAL calls.
+        """
+
+        progress = ProgressReporter(interval=60.0)
+        dal = progress.wrap_dal(dal=DalFake())
+
+        result = call_dal(
+            dal=dal, name="insert_rows", func=insert_rows, rows=[1, 2, 3]
+        )
+
+        self.assertEqual(result, 3)
+        self.assertEqual(progress.num_dal_calls, 1)
+
+    def test_report(self):
+        """ Tests the rates since the last report and the ETA."""
+
+        position = {"value": 0}
+        progress = ProgressReporter(interval=60.0)
+        progress.track_file(size=1000, get_position=lambda: position["value"])
+        progress.time_start = progress.time_last = 100.0
+
+        progress.num_records = 50
+        progress.num_dal_calls = 200
+        position["value"] = 250
+        report = progress.report(now=110.0)
+
+        self.assertEqual(report["records"], 50)
+        self.assertAlmostEqual(report["records_per_sec"], 5.0)
+        self.assertAlmostEqual(report["dal_calls_per_sec"], 20.0)
+        self.assertAlmostEqual(report["fraction"], 0.25)
+        self.assertAlmostEqual(report["eta"], 30.0)
+        self.assertGreater(report["rss_mb"], 0)
+
+        progress.num_records = 60
+        position["value"] = 500
+        report = progress.report(now=120.0)
+
+        self.assertAlmostEqual(report["records_per_sec"], 1.0)
+        self.assertAlmostEqual(report["dal_calls_per_sec"], 0.0)
+        self.assertAlmostEqual(report["eta"], 20.0)
+
+        self.assertEqual(
+            ProgressReporter.format_report(report=report),
+            "60 records, 1.0 records/sec, 0.0 DAL calls/sec, {:.1f} MB RSS, "
+            "50.0% read, ETA 0:00:20".format(report["rss_mb"]),
+        )
+
+    def test_report_without_file(self):
+        """ Tests that no ETA is reported without a file position."""
+
+        progress = ProgressReporter(interval=60.0)
+        progress.time_start = progress.time_last = 100.0
+        progress.track_file(size=None, get_position=lambda: None)
+
+        report = progress.report(now=101.0)
+
+        self.assertIsNone(report["fraction"])
+        self.assertIsNone(report["eta"])
+        self.assertNotIn("ETA", ProgressReporter.format_report(report=report))
+
+    def test_interval(self):
+        """ Tests that reports are logged at the interval."""
+
+        progress = ProgressReporter(interval=0.01)
+        reports = []
+        progress.log_report = lambda: reports.append(progress.report())
+
+        with progress:
+            for _ in progress.iterate(range(5)):
+                time.sleep(0.02)
+
+        self.assertGreater(len(reports), 1)
+        self.assertLessEqual(reports[-1]["records"], 5)
+
+
+class GetRssTest(unittest.TestCase):
+    """ Tests the `get_rss` function."""
+
+    def test_get_rss(self):
+        """ Tests that the RSS grows with allocations."""
+
+        rss = get_rss()
+        data = bytearray(64 * 2 ** 20)
+        data[:: 4096] = b"x" * len(data[:: 4096])
+
+        self.assertGreater(get_rss(), rss + 32)
@@ -0,0 +1,130 @@
+# coding=utf-8
+
+import os
+import shutil
+import zipfile
+import tempfile
+import unittest
+
+from mt_ingester import rrf_arrow
+from mt_ingester.parsers import ParserUmlsSat
+from mt_ingester.parsers import ParserUmlsConso
+from mt_ingester.parsers import ParserUmlsDef
+
+from tests.assets.samples_umls import get_sample_file
+from tests.assets.samples_umls import EnumUmlsFileSample
+
+
+@unittest.skipIf(not rrf_arrow.is_available(), "`pyarrow` is not installed")
+class RrfArrowTest(unittest.TestCase):
+    """ Tests that the `arrow` backend of the UMLS parsers yields the same
+        results as the `python` backend.
+    """
+
+    def setUp(self):
+        """ Retrieves sample MRSAT.RRF, MRCONSO.RRF, and MRDEF.RRF files."""
+
+        self.file_mrsat = get_sample_file(
+            umls_file_type=EnumUmlsFileSample.MRSAT,
+        )
+        self.file_mrconso = get_sample_file(
+            umls_file_type=EnumUmlsFileSample.MRCONSO,
+        )
+        self.file_mrdef = get_sample_file(
+            umls_file_type=EnumUmlsFileSample.MRDEF,
+        )
+
+    def tearDown(self):
+        """ Deletes the temporary RRF files."""
+
+        os.remove(self.file_mrsat.name)
+        os.remove(self.file_mrconso.name)
+        os.remove(self.file_mrdef.name)
+
+    def test_parse_sat(self):
+        """ Tests the `parse` method of the `ParserUmlsSat` class."""
+
+        self.assertDictEqual(
+            dict(
+                ParserUmlsSat(backend="arrow").parse(
+                    filename_mrsat_rrf=self.file_mrsat.name
+                )
+            ),
+            dict(
+                ParserUmlsSat().parse(filename_mrsat_rrf=self.file_mrsat.name)
+            ),
+        )
+
+    def test_parse_conso(self):
+        """ Tests the `parse` and `iterate_groups` methods of the
+            `ParserUmlsConso` class.
+        """
+
+        kwargs = {
+            "filename_mrsat_rrf": self.file_mrsat.name,
+            "filename_mrconso_rrf": self.file_mrconso.name,
+        }
+
+        parser = ParserUmlsConso()
+        parser_arrow = ParserUmlsConso(backend="arrow")
+
+        dui_synonyms = parser.parse(**kwargs)
+        dui_synonyms_arrow = parser_arrow.parse(**kwargs)
+
+        self.assertSetEqual(set(dui_synonyms_arrow), set(dui_synonyms))
+        for dui, synonyms in dui_synonyms.items():
+            self.assertListEqual(
+                sorted(dui_synonyms_arrow[dui]), sorted(synonyms)
+            )
+
+        self.assertListEqual(
+            list(parser_arrow.iterate_groups(**kwargs)),
+            list(parser.iterate_groups(**kwargs)),
+        )
+
+    def test_parse_def(self):
+        """ Tests the `parse` method of the `ParserUmlsDef` class with and
+            without source filters.
+        """
+
+        for kwargs in [
+            {},
+            {"sources_include": ["NCI", "MSH"]},
+            {"sources_exclude": ["NCI_NICHD"]},
+        ]:
+            kwargs.update(
+                {
+                    "filename_mrsat_rrf": self.file_mrsat.name,
+                    "filename_mrdef_rrf": self.file_mrdef.name,
+                }
+            )
+            self.assertDictEqual(
+                ParserUmlsDef(backend="arrow").parse(**kwargs),
+                ParserUmlsDef().parse(**kwargs),
+            )
+
+    def test_parse_zip(self):
+        """ Tests that the `arrow` backend reads `zip://` locations."""
+
+        dirname = tempfile.mkdtemp()
+        try:
+            filename_archive = os.path.join(dirname, "umls.zip")
+            with zipfile.ZipFile(filename_archive, "w") as archive:
+                archive.write(self.file_mrsat.name, "META/MRSAT.RRF")
+
+            location = "zip://{}!/META/MRSAT.RRF".format(filename_archive)
+
+            self.assertDictEqual(
+                dict(
+                    ParserUmlsSat(backend="arrow").parse(
+                        filename_mrsat_rrf=location
+                    )
+                ),
+                dict(
+                    ParserUmlsSat().parse(
+                        filename_mrsat_rrf=self.file_mrsat.name
+                    )
+                ),
+            )
+        finally:
+            shutil.rmtree(dirname)
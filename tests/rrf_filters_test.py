@@ -0,0 +1,277 @@
+# coding=utf-8
+
+import os
+import collections
+import unittest
+
+from mt_ingester.rrf_filters import RrfFilter
+from mt_ingester.rrf_filters import RrfFilterSpec
+from mt_ingester.rrf_filters import iterate_filtered_rows
+from mt_ingester.rrf_filters import format_filter_stats
+from mt_ingester.parsers import ParserUmlsConso
+from mt_ingester.parsers import ParserUmlsDef
+
+from tests.assets.samples_umls import get_sample_file
+from tests.assets.samples_umls import EnumUmlsFileSample
+
+
+class RrfFilterTest(unittest.TestCase):
+    """ Tests the `RrfFilter` class."""
+
+    def test_matches(self):
+        """ Tests the included, excluded, and empty values."""
+
+        filter_ = RrfFilter(
+            field="SAB",
+            include=["MSH", "NCI"],
+            exclude=["NCI"],
+            non_empty=True,
+        )
+
+        self.assertTrue(filter_.matches("MSH"))
+        self.assertFalse(filter_.matches("NCI"))
+        self.assertFalse(filter_.matches("CSP"))
+        self.assertFalse(filter_.matches(""))
+
+        self.assertTrue(RrfFilter(field="SAB").matches(""))
+        self.assertFalse(RrfFilter(field="SAB", exclude=[""]).matches(""))
+
+
+class RrfFilterSpecTest(unittest.TestCase):
+    """ Tests the `RrfFilterSpec` class."""
+
+    def setUp(self):
+        """ Retrieves the MRCONSO.RRF field names."""
+
+        self.fieldnames = ParserUmlsConso.fieldnames_mrconso
+
+    def test_create(self):
+        """ Tests that filters are ordered cheapest-first and merged per
+            field.
+        """
+
+        filter_spec = RrfFilterSpec.create(
+            languages=["ENG"],
+            sources_include=["MSH"],
+            sources_exclude=["NCI"],
+            preferred_only=True,
+            fields_non_empty=["SDUI", "SAB"],
+        )
+
+        self.assertListEqual(
+            filter_spec.fields, ["SDUI", "LAT", "SAB", "ISPREF"]
+        )
+        self.assertTrue(filter_spec.filters[2].non_empty)
+        self.assertSetEqual(set(filter_spec.filters[2].exclude), {"NCI"})
+
+    def test_duplicate_fields(self):
+        """ Tests that a field cannot be filtered twice."""
+
+        with self.assertRaises(ValueError):
+            RrfFilterSpec(filters=[RrfFilter("SAB"), RrfFilter("SAB")])
+
+    def test_replace(self):
+        """ Tests that a filter replaces the filter of its field."""
+
+        filter_spec = RrfFilterSpec.create(
+            sources_include=["MSH"], fields_non_empty=["DEF"]
+        )
+        filter_spec_new = filter_spec.replace(
+            RrfFilter("SAB", exclude=["NCI"])
+        )
+
+        self.assertIsNotNone(filter_spec.filters[1].include)
+        self.assertListEqual(filter_spec_new.fields, ["DEF", "SAB"])
+        self.assertIsNone(filter_spec_new.filters[1].include)
+
+    def test_validate(self):
+        """ Tests that filtering an unknown field raises an exception."""
+
+        filter_spec = RrfFilterSpec(filters=[RrfFilter("UNKNOWN")])
+
+        with self.assertRaises(ValueError):
+            filter_spec.validate(fieldnames=self.fieldnames)
+
+    def test_token_filter(self):
+        """ Tests which filter is used for the substring pre-filter."""
+
+        # Filters on the first field, excluding, or keeping empty values can't
+        # be used.
+        filter_spec = RrfFilterSpec(
+            filters=[
+                RrfFilter("CUI", include=["C0024537"]),
+                RrfFilter("SAB", exclude=["NCI"]),
+                RrfFilter("SUPPRESS", include=["", "N"]),
+            ]
+        )
+        self.assertIsNone(
+            filter_spec.get_token_filter(fieldnames=self.fieldnames)
+        )
+
+        filter_spec = RrfFilterSpec.create(
+            languages=["ENG"], term_types_include=["PM"]
+        )
+        self.assertEqual(
+            filter_spec.get_token_filter(fieldnames=self.fieldnames).field,
+            "LAT",
+        )
+
+
+class IterateFilteredRowsTest(unittest.TestCase):
+    """ Tests the `iterate_filtered_rows` function."""
+
+    def setUp(self):
+        """ Retrieves a sample MRCONSO.RRF file."""
+
+        self.file = get_sample_file(umls_file_type=EnumUmlsFileSample.MRCONSO)
+        self.fieldnames = ParserUmlsConso.fieldnames_mrconso
+
+    def tearDown(self):
+        """ Deletes the temporary MRCONSO.RRF file."""
+
+        os.remove(self.file.name)
+
+    def test_stats(self):
+        """ Tests that the rows dropped by each filter are counted once."""
+
+        filter_spec = ParserUmlsConso.create_filter_spec(
+            term_types_include=["PM", "MH"]
+        )
+        cuis = {"C0024537", "C0006118", "C1527390", "C0153633"}
+        stats = collections.Counter()
+
+        rows = list(
+            iterate_filtered_rows(
+                filename_rrf=self.file.name,
+                fieldnames=self.fieldnames,
+                columns=["CUI", "TTY"],
+                filter_spec=filter_spec,
+                cuis=cuis,
+                stats=stats,
+            )
+        )
+
+        self.assertListEqual(rows, [["C0024537", "PM"], ["C0006118", "PM"]])
+        # The leading blank line lacks the `|ENG|` token.
+        self.assertEqual(stats["lines"], 12)
+        self.assertEqual(stats["LAT"], 1)
+        self.assertEqual(stats["SDUI"], 2)
+        self.assertEqual(stats["TTY"], 3)
+        self.assertEqual(stats["CUI"], 4)
+        self.assertEqual(stats["rows"], 2)
+        self.assertEqual(
+            sum([stats[name] for name in ["malformed", "SDUI", "LAT", "TTY"]])
+            + stats["CUI"]
+            + stats["rows"],
+            stats["lines"],
+        )
+        self.assertEqual(
+            format_filter_stats(stats=stats, filter_spec=filter_spec),
+            (
+                "SDUI: 2, LAT: 1, TTY: 3, CUI: 4, malformed: 0 of 12 lines "
+                "dropped, 2 rows kept"
+            ),
+        )
+
+    def test_token_filter_stats(self):
+        """ Tests that lines dropped by the substring pre-filter are counted
+            against the filter they were derived from.
+        """
+
+        filter_spec = ParserUmlsConso.create_filter_spec(languages=["FRE"])
+        stats = collections.Counter()
+
+        rows = list(
+            iterate_filtered_rows(
+                filename_rrf=self.file.name,
+                fieldnames=self.fieldnames,
+                columns=["CUI"],
+                filter_spec=filter_spec,
+                stats=stats,
+            )
+        )
+
+        self.assertListEqual(rows, [])
+        self.assertEqual(stats["LAT"], 12)
+        self.assertEqual(stats["rows"], 0)
+
+
+class ParserUmlsFiltersTest(unittest.TestCase):
+    """ Tests the filter specs of the UMLS parsers."""
+
+    def setUp(self):
+        """ Retrieves sample MRSAT.RRF, MRCONSO.RRF, and MRDEF.RRF files."""
+
+        self.file_mrsat = get_sample_file(
+            umls_file_type=EnumUmlsFileSample.MRSAT,
+        )
+        self.file_mrconso = get_sample_file(
+            umls_file_type=EnumUmlsFileSample.MRCONSO,
+        )
+        self.file_mrdef = get_sample_file(
+            umls_file_type=EnumUmlsFileSample.MRDEF,
+        )
+
+    def tearDown(self):
+        """ Deletes the temporary RRF files."""
+
+        os.remove(self.file_mrsat.name)
+        os.remove(self.file_mrconso.name)
+        os.remove(self.file_mrdef.name)
+
+    def test_conso_all_languages(self):
+        """ Tests that `ALL` or no languages keep all languages."""
+
+        for languages in [None, [], ["ALL"], ["ENG", "ALL"]]:
+            filter_spec = ParserUmlsConso.create_filter_spec(
+                languages=languages
+            )
+            self.assertListEqual(filter_spec.fields, ["SDUI"])
+
+        filter_spec = ParserUmlsConso.create_filter_spec(languages=["FRE"])
+        self.assertIn("LAT", filter_spec.fields)
+
+    def test_conso_preferred_only(self):
+        """ Tests that only the preferred atoms are kept."""
+
+        parser = ParserUmlsConso(
+            filter_spec=ParserUmlsConso.create_filter_spec(preferred_only=True)
+        )
+
+        dui_synonyms = parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrconso_rrf=self.file_mrconso.name,
+        )
+
+        self.assertDictEqual(
+            {dui: sorted(synonyms) for dui, synonyms in dui_synonyms.items()},
+            {
+                "D016780": ["plasmodium vivax malaria"],
+                "D001932": [
+                    "brain tumors",
+                    "brain tumors, primary",
+                    "neoplasm, brain",
+                    "neoplasms, intracranial",
+                ],
+                "D000163": [
+                    "acquired immunodeficiency syndromes",
+                    "syndromes, acquired immunodeficiency",
+                ],
+            },
+        )
+        self.assertEqual(parser.filter_stats["ISPREF"], 2)
+
+    def test_def_suppress(self):
+        """ Tests that the `SUPPRESS` filter applies to the definitions."""
+
+        parser = ParserUmlsDef(
+            filter_spec=ParserUmlsDef.create_filter_spec(suppress=["O"])
+        )
+
+        dui_definitions = parser.parse(
+            filename_mrsat_rrf=self.file_mrsat.name,
+            filename_mrdef_rrf=self.file_mrdef.name,
+        )
+
+        self.assertDictEqual(dui_definitions, {})
+        self.assertEqual(parser.filter_stats["SUPPRESS"], 7)
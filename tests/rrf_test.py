@@ -0,0 +1,275 @@
+# coding=utf-8
+
+import io
+import os
+import gzip
+import shutil
+import zipfile
+import tempfile
+import unittest
+
+from mt_ingester.rrf import iterate_lines_with_tokens
+from mt_ingester.rrf import iterate_rrf_rows
+from mt_ingester.rrf import find_chunk_ranges
+from mt_ingester.rrf import get_read_position
+from mt_ingester.rrf import map_file_ranges
+from mt_ingester.rrf import open_rrf
+
+from tests.assets.samples_umls import get_sample_file
+from tests.assets.samples_umls import EnumUmlsFileSample
+
+
+class IterateLinesWithTokensTest(unittest.TestCase):
+    """ Tests the `iterate_lines_with_tokens` function."""
+
+    def test_block_boundaries(self):
+        """ Tests that matching lines are found in file order regardless of
+            how lines straddle the block boundaries.
+        """
+
+        lines = [
+            "C{:07d}|{}|value {}".format(index, "KEEP" * (index % 3), index)
+            for index in range(100)
+        ]
+        content = "\n".join(lines).encode("utf-8")
+
+        lines_refr = [
+            line.encode("utf-8")
+            for line in lines
+            if "KEEP" in line or "|value 7" in line
+        ]
+
+        for block_size in [1, 7, 64, 4096]:
+            lines_eval = list(
+                iterate_lines_with_tokens(
+                    file_rrf=io.BytesIO(content),
+                    tokens=[b"KEEP", b"|value 7"],
+                    block_size=block_size,
+                )
+            )
+            self.assertListEqual(lines_eval, lines_refr)
+
+
+class IterateRrfRowsTest(unittest.TestCase):
+    """ Tests the `iterate_rrf_rows` function."""
+
+    def setUp(self):
+        """ Retrieves a sample MRSAT.RRF file."""
+
+        self.file = get_sample_file(umls_file_type=EnumUmlsFileSample.MRSAT)
+
+    def tearDown(self):
+        """ Deletes the temporary MRSAT.RRF file."""
+
+        os.remove(self.file.name)
+
+    def test_columns(self):
+        """ Tests extracting columns from all non-blank lines."""
+
+        rows = list(iterate_rrf_rows(self.file.name, columns=[0, 8]))
+
+        self.assertEqual(len(rows), 7)
+        self.assertListEqual(rows[0], ["C0024537", "MESH_DUI"])
+
+    def test_prefilters(self):
+        """ Tests the token and CUI pre-filters."""
+
+        rows = list(
+            iterate_rrf_rows(
+                self.file.name,
+                columns=[0, 5],
+                tokens=[b"|TERMUI|"],
+                cuis={"C0750974", "C0024537"},
+            )
+        )
+
+        self.assertListEqual(rows, [["C0750974", "D001932"]])
+
+    def test_ranges(self):
+        """ Tests that reading the rows range by range yields the same rows as
+            reading the entire file.
+        """
+
+        rows = list(iterate_rrf_rows(self.file.name, columns=[0, 8]))
+
+        for num_chunks in [1, 2, 5, 50]:
+            rows_ranges = []
+            for start, end in find_chunk_ranges(self.file.name, num_chunks):
+                rows_ranges.extend(
+                    iterate_rrf_rows(
+                        self.file.name, columns=[0, 8], start=start, end=end
+                    )
+                )
+            self.assertListEqual(rows_ranges, rows)
+
+    def test_read_position(self):
+        """ Tests that the read position of an entire file advances while it's
+            read and that ranges don't register one.
+        """
+
+        self.assertIsNone(get_read_position(self.file.name + ".missing"))
+
+        start, end = find_chunk_ranges(self.file.name, 2)[0]
+        list(
+            iterate_rrf_rows(self.file.name, columns=[0], start=start, end=end)
+        )
+        self.assertIsNone(get_read_position(self.file.name))
+
+        rows = iterate_rrf_rows(self.file.name, columns=[0])
+        next(rows)
+        self.assertGreater(get_read_position(self.file.name), 0)
+
+        list(rows)
+        self.assertEqual(
+            get_read_position(self.file.name),
+            os.path.getsize(self.file.name),
+        )
+
+
+class FindChunkRangesTest(unittest.TestCase):
+    """ Tests the `find_chunk_ranges` function."""
+
+    def setUp(self):
+        """ Retrieves a sample MRSAT.RRF file."""
+
+        self.file = get_sample_file(umls_file_type=EnumUmlsFileSample.MRSAT)
+
+    def tearDown(self):
+        """ Deletes the temporary MRSAT.RRF file."""
+
+        os.remove(self.file.name)
+
+    def test_find_chunk_ranges(self):
+        """ Tests that the ranges are contiguous, cover the entire file, and
+            start at the beginning of a line.
+        """
+
+        with open(self.file.name, "rb") as finp:
+            content = finp.read()
+
+        for num_chunks in [1, 3, 100]:
+            ranges = find_chunk_ranges(self.file.name, num_chunks)
+
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], len(content))
+            for (_, end), (start, _) in zip(ranges[:-1], ranges[1:]):
+                self.assertEqual(end, start)
+                self.assertEqual(content[start - 1 : start], b"\n")
+
+    def test_map_file_ranges(self):
+        """ Tests that the results of a parallel map are returned in file
+            order.
+        """
+
+        results = map_file_ranges(
+            func=_read_range, filename_rrf=self.file.name, num_workers=2
+        )
+
+        with open(self.file.name, "rb") as finp:
+            self.assertEqual(b"".join(results), finp.read())
+
+        # The bytes of all completed ranges are exposed as the read position.
+        self.assertEqual(
+            get_read_position(self.file.name),
+            os.path.getsize(self.file.name),
+        )
+
+
+class OpenRrfTest(unittest.TestCase):
+    """ Tests the `open_rrf` function with `zip://` locations."""
+
+    def setUp(self):
+        """ Writes a sample MRSAT.RRF file, both whole and gzipped in parts,
+            into an archive nested within another archive.
+        """
+
+        file_mrsat = get_sample_file(umls_file_type=EnumUmlsFileSample.MRSAT)
+        with open(file_mrsat.name, "rb") as finp:
+            self.content = finp.read()
+        os.remove(file_mrsat.name)
+
+        # Split the file in the middle of a line as in the UMLS distribution.
+        size_part = len(self.content) // 3
+        parts = [
+            self.content[:size_part],
+            self.content[size_part : size_part * 2],
+            self.content[size_part * 2 :],
+        ]
+
+        self.dirname = tempfile.mkdtemp()
+        filename_inner = os.path.join(self.dirname, "2019aa-1-meta.nlm")
+        with zipfile.ZipFile(filename_inner, "w") as archive:
+            archive.writestr("2019AA/META/MRSAT.RRF", self.content)
+            # Write the parts out of order as they're read by name.
+            for suffix, part in [
+                ("ab", parts[1]),
+                ("aa", parts[0]),
+                ("ac", parts[2]),
+            ]:
+                archive.writestr(
+                    "2019AA/META/MRSAT_SPLIT.RRF.{}.gz".format(suffix),
+                    gzip.compress(part),
+                )
+
+        self.filename_archive = os.path.join(self.dirname, "umls.zip")
+        with zipfile.ZipFile(
+            self.filename_archive, "w", zipfile.ZIP_DEFLATED
+        ) as archive:
+            archive.write(filename_inner, "2019aa-1-meta.nlm")
+
+        self.location = "zip://{}!/2019aa-1-meta.nlm!/2019AA/META/".format(
+            self.filename_archive
+        )
+
+    def tearDown(self):
+        """ Deletes the temporary archives."""
+
+        shutil.rmtree(self.dirname)
+
+    def test_member(self):
+        """ Tests reading a member of a nested archive."""
+
+        with open_rrf(self.location + "MRSAT.RRF") as finp:
+            self.assertEqual(finp.read(), self.content)
+
+    def test_split_member(self):
+        """ Tests reading a member gzipped and split into parts as a single
+            stream.
+        """
+
+        with open_rrf(self.location + "MRSAT_SPLIT.RRF") as finp:
+            self.assertEqual(finp.read(), self.content)
+
+        rows = list(
+            iterate_rrf_rows(
+                self.location + "MRSAT_SPLIT.RRF",
+                columns=[0, 8],
+                tokens=[b"|MESH_DUI|"],
+            )
+        )
+        self.assertListEqual(rows[0], ["C0024537", "MESH_DUI"])
+
+    def test_parallel_fallback(self):
+        """ Tests that ranges of members are mapped serially."""
+
+        results = map_file_ranges(
+            func=lambda filename, start, end: (start, end),
+            filename_rrf=self.location + "MRSAT.RRF",
+            num_workers=4,
+        )
+
+        self.assertListEqual(results, [(0, None)])
+
+    def test_missing_member(self):
+        """ Tests that a missing member raises a `FileNotFoundError`."""
+
+        with self.assertRaises(FileNotFoundError):
+            open_rrf(self.location + "MRCONSO.RRF")
+
+
+def _read_range(filename, start, end):
+    """ Reads a byte range of a file."""
+
+    with open(filename, "rb") as finp:
+        finp.seek(start)
+        return finp.read(end - start)
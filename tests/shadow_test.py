@@ -0,0 +1,155 @@
+# coding=utf-8
+
+import datetime
+
+from fform.orm_mt import Descriptor
+from fform.orm_mt import DescriptorClassType
+
+from mt_ingester import excs
+from mt_ingester.full_reload import get_mesh_schema
+from mt_ingester.orm import TreeNumberClosure
+from mt_ingester.orm import TreeNumberKey
+from mt_ingester.shadow import ShadowSchema
+
+from tests.dal_mixins import DalMtTestBase
+
+
+class ShadowSchemaTest(DalMtTestBase):
+    """ Tests the `ShadowSchema` class."""
+
+    def setUp(self):
+        """ Creates the schema and a shadow copy thereof and redirects a second
+            DAL to the shadow schema.
+        """
+
+        super(ShadowSchemaTest, self).setUp()
+
+        self.shadow_schema = ShadowSchema(
+            engine=self.dal.engine, schema=get_mesh_schema()
+        )
+        self.shadow_schema.create()
+
+        self.dal_shadow = self.setup_dal()
+        self.shadow_schema.attach(engine=self.dal_shadow.engine)
+
+    def tearDown(self):
+        """ Drops the shadow and previous schemas."""
+
+        with self.dal.engine.begin() as connection:
+            for schema in [
+                self.shadow_schema.schema_shadow,
+                self.shadow_schema.schema_previous,
+            ]:
+                connection.execute(
+                    "DROP SCHEMA IF EXISTS {} CASCADE".format(schema)
+                )
+
+        super(ShadowSchemaTest, self).tearDown()
+
+    def _create_descriptor(self, ui: str) -> int:
+        return self.dal_shadow.iodu_descriptor(
+            descriptor_class=DescriptorClassType.ONE,
+            ui=ui,
+            name=ui,
+            created=datetime.date.today(),
+            revised=datetime.date.today(),
+            established=datetime.date.today(),
+            annotation=None,
+            history_note=None,
+            nlm_classification_number=None,
+            online_note=None,
+            public_mesh_note=None,
+            consider_also=None,
+        )
+
+    def test_load_into_shadow(self):
+        """ Tests that records ingested through the redirected DAL are only
+            visible in the shadow schema.
+        """
+
+        self._create_descriptor(ui="D000001")
+
+        self.assertIsNone(
+            self.dal.get_by_attr(
+                orm_class=Descriptor, attr_name="ui", attr_value="D000001"
+            )
+        )
+        self.assertEqual(
+            self.shadow_schema.count_rows(
+                schema=self.shadow_schema.schema_shadow
+            )[Descriptor.__tablename__],
+            1,
+        )
+
+    def test_swap(self):
+        """ Tests that swapping the shadow schema in exposes its records
+            through the live schema.
+        """
+
+        self._create_descriptor(ui="D000001")
+
+        self.shadow_schema.swap()
+
+        self.assertIsNotNone(
+            self.dal.get_by_attr(
+                orm_class=Descriptor, attr_name="ui", attr_value="D000001"
+            )
+        )
+
+    def test_swap_previous(self):
+        """ Tests that the previous schema left by an earlier swap is replaced
+            by the live schema.
+        """
+
+        schema_previous = self.shadow_schema.schema_previous
+        with self.dal.engine.begin() as connection:
+            connection.execute("CREATE SCHEMA {}".format(schema_previous))
+            connection.execute(
+                "CREATE TABLE {}.marker (id INTEGER)".format(schema_previous)
+            )
+
+        self._create_descriptor(ui="D000001")
+
+        self.shadow_schema.swap()
+
+        with self.dal.engine.connect() as connection:
+            dialect = connection.dialect
+            self.assertFalse(
+                dialect.has_table(connection, "marker", schema=schema_previous)
+            )
+            self.assertTrue(
+                dialect.has_table(
+                    connection,
+                    Descriptor.__tablename__,
+                    schema=schema_previous,
+                )
+            )
+
+    def test_swap_empty(self):
+        """ Tests that an empty shadow schema is never swapped in."""
+
+        with self.assertRaises(excs.ShadowSchemaInvalid):
+            self.shadow_schema.swap()
+
+    def test_swap_missing_live_tables(self):
+        """ Tests that tables missing from the live schema, e.g., those added
+            after it was created, don't prevent the swap.
+        """
+
+        for orm_class in [TreeNumberClosure, TreeNumberKey]:
+            orm_class.__table__.drop(self.dal.engine)
+
+        self._create_descriptor(ui="D000001")
+
+        self.assertNotIn(
+            TreeNumberClosure.__tablename__,
+            self.shadow_schema.count_rows(schema=self.shadow_schema.schema),
+        )
+
+        self.shadow_schema.swap()
+
+        self.assertIsNotNone(
+            self.dal.get_by_attr(
+                orm_class=Descriptor, attr_name="ui", attr_value="D000001"
+            )
+        )
@@ -0,0 +1,148 @@
+# coding=utf-8
+
+import unittest
+
+from mt_ingester.tree_numbers import get_tree_number_ancestors
+from mt_ingester.tree_numbers import get_tree_number_closure
+from mt_ingester.tree_numbers import get_tree_number_ids_missing
+from mt_ingester.tree_numbers import get_tree_number_path
+from mt_ingester.tree_numbers import get_tree_number_key_range
+from mt_ingester.tree_numbers import encode_tree_number
+from mt_ingester.tree_numbers import decode_tree_number
+from mt_ingester.tree_numbers import TreeNumberIndex
+
+
+class TreeNumbersTest(unittest.TestCase):
+    """ Tests the tree-number utility functions."""
+
+    def test_get_tree_number_ancestors(self):
+        """ Tests the `get_tree_number_ancestors` function."""
+
+        self.assertListEqual(get_tree_number_ancestors("C04"), [])
+        self.assertListEqual(
+            get_tree_number_ancestors("C04.557.337"), ["C04", "C04.557"]
+        )
+
+    def test_get_tree_number_closure(self):
+        """ Tests the `get_tree_number_closure` function."""
+
+        closure = set(get_tree_number_closure(["C04", "C04.557.337"]))
+
+        self.assertSetEqual(
+            closure,
+            {
+                ("C04", "C04", 0),
+                ("C04.557.337", "C04.557.337", 0),
+                ("C04.557", "C04.557.337", 1),
+                ("C04", "C04.557.337", 2),
+            },
+        )
+
+    def test_get_tree_number_ids_missing(self):
+        """ Tests the `get_tree_number_ids_missing` function."""
+
+        missing = get_tree_number_ids_missing(
+            {"C04": 1, "C04.557.337": 2, "C04.557.337.100": 3, "A01.100": 4}
+        )
+
+        self.assertListEqual(missing, ["A01", "C04.557"])
+
+
+class TreeNumberEncodingTest(unittest.TestCase):
+    """ Tests the encoding of tree numbers."""
+
+    tree_numbers = [
+        "A01",
+        "C04",
+        "C04.588",
+        "C04.588.614",
+        "C04.588.614.250",
+        "C04.588.999",
+        "C04.589",
+        "C10.228",
+        "Z01.107.567",
+    ]
+
+    def test_get_tree_number_path(self):
+        """ Tests the `get_tree_number_path` function."""
+
+        self.assertTupleEqual(
+            get_tree_number_path("C04.588.614"), (204, 588, 614)
+        )
+        self.assertTupleEqual(get_tree_number_path("A00"), (0,))
+
+        for tree_number in ["", "c04", "C4", "C04.58", "C04.588.", "C04-588"]:
+            with self.assertRaises(ValueError):
+                get_tree_number_path(tree_number)
+
+    def test_encode_decode(self):
+        """ Tests that keys decode to the encoded tree numbers and are two
+            bytes per level.
+        """
+
+        for tree_number in self.tree_numbers:
+            key = encode_tree_number(tree_number)
+            self.assertEqual(len(key), 2 * (tree_number.count(".") + 1))
+            self.assertEqual(decode_tree_number(key), tree_number)
+
+    def test_order(self):
+        """ Tests that keys sort like the tree numbers."""
+
+        keys = [encode_tree_number(tn) for tn in reversed(self.tree_numbers)]
+
+        self.assertListEqual(
+            [decode_tree_number(key) for key in sorted(keys)],
+            sorted(self.tree_numbers),
+        )
+
+    def test_get_tree_number_key_range(self):
+        """ Tests that the keys under a subtree fall within its range."""
+
+        lower, upper = get_tree_number_key_range(encode_tree_number("C04.588"))
+
+        under = [
+            tree_number
+            for tree_number in self.tree_numbers
+            if lower <= encode_tree_number(tree_number) < upper
+        ]
+
+        self.assertListEqual(
+            under, ["C04.588", "C04.588.614", "C04.588.614.250", "C04.588.999"]
+        )
+
+
+class TreeNumberIndexTest(unittest.TestCase):
+    """ Tests the `TreeNumberIndex` class."""
+
+    def setUp(self):
+        self.index = TreeNumberIndex(
+            ["C04.588.614", "C04", "C04.588", "C04.589", "A01", "C04"]
+        )
+
+    def test_contains(self):
+        """ Tests membership and deduplication."""
+
+        self.assertEqual(len(self.index), 5)
+        self.assertIn("C04.588", self.index)
+        self.assertNotIn("C04.590", self.index)
+
+    def test_get_subtree(self):
+        """ Tests the `get_subtree` method."""
+
+        self.assertListEqual(
+            self.index.get_subtree("C04"),
+            ["C04", "C04.588", "C04.588.614", "C04.589"],
+        )
+        self.assertListEqual(
+            self.index.get_subtree("C04.588"), ["C04.588", "C04.588.614"]
+        )
+        self.assertListEqual(self.index.get_subtree("B01"), [])
+
+    def test_get_ancestors(self):
+        """ Tests the `get_ancestors` method."""
+
+        self.assertListEqual(
+            self.index.get_ancestors("C04.588.614.250"),
+            ["C04", "C04.588", "C04.588.614"],
+        )
+        self.assertListEqual(self.index.get_ancestors("A01.100"), ["A01"])